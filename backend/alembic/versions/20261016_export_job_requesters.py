@@ -0,0 +1,38 @@
+"""Add export_job_requesters so users who joined an export job can follow it
+
+Revision ID: export_job_requesters_001
+Revises: live_chat_counters_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'export_job_requesters_001'
+down_revision = 'live_chat_counters_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'export_job_requesters',
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['export_jobs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id', 'user_id')
+    )
+    op.create_index('ix_export_job_requesters_user_id', 'export_job_requesters', ['user_id'])
+    # Existing jobs were followed by their requester only
+    op.execute(
+        "INSERT INTO export_job_requesters (job_id, user_id) "
+        "SELECT id, requested_by_id FROM export_jobs WHERE requested_by_id IS NOT NULL"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_export_job_requesters_user_id', table_name='export_job_requesters')
+    op.drop_table('export_job_requesters')
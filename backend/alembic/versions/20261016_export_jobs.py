@@ -0,0 +1,57 @@
+"""Add export_jobs for background report exports
+
+Revision ID: export_jobs_001
+Revises: ticket_fact_sketch_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'export_jobs_001'
+down_revision = 'ticket_fact_sketch_001'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status IN ('PENDING', 'IN_PROGRESS')")
+
+
+def upgrade():
+    op.create_table(
+        'export_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dedupe_key', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED', name='exportjobstatus'), nullable=False),
+        sa.Column('report_type', sa.String(length=50), nullable=False),
+        sa.Column('export_format', sa.String(length=20), nullable=False),
+        sa.Column('start_date', sa.String(length=50), nullable=True),
+        sa.Column('end_date', sa.String(length=50), nullable=True),
+        sa.Column('filters', sa.JSON(), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('file_name', sa.String(length=255), nullable=True),
+        sa.Column('file_path', sa.String(length=500), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('requested_by_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_export_jobs_id', 'export_jobs', ['id'])
+    op.create_index('ix_export_jobs_dedupe_key', 'export_jobs', ['dedupe_key'])
+    # One pending/running job per identical request
+    op.create_index(
+        'uq_export_jobs_active_dedupe_key', 'export_jobs', ['dedupe_key'], unique=True,
+        postgresql_where=ACTIVE, sqlite_where=ACTIVE
+    )
+
+
+def downgrade():
+    op.drop_index('uq_export_jobs_active_dedupe_key', table_name='export_jobs')
+    op.drop_index('ix_export_jobs_dedupe_key', table_name='export_jobs')
+    op.drop_index('ix_export_jobs_id', table_name='export_jobs')
+    op.drop_table('export_jobs')
+    sa.Enum(name='exportjobstatus').drop(op.get_bind(), checkfirst=True)
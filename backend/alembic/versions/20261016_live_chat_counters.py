@@ -0,0 +1,46 @@
+"""Add denormalised unread counts and last-message pointer to live chat
+
+Revision ID: live_chat_counters_001
+Revises: live_message_conv_idx_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'live_chat_counters_001'
+down_revision = 'live_message_conv_idx_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('live_conversation_participants',
+                  sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('live_conversations', sa.Column('last_message_id', sa.Integer(), nullable=True))
+
+    # Backfill from existing messages
+    op.execute("""
+        UPDATE live_conversation_participants p SET unread_count = (
+            SELECT COUNT(*) FROM live_messages m
+            WHERE m.conversation_id = p.conversation_id
+              AND NOT m.is_deleted
+              AND m.sender_id != p.user_id
+              AND (p.last_read_message_id IS NULL OR m.id > p.last_read_message_id)
+        )
+    """)
+    op.execute("""
+        UPDATE live_conversations c SET last_message_id = (
+            SELECT m.id FROM live_messages m
+            WHERE m.conversation_id = c.id AND NOT m.is_deleted
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT 1
+        )
+    """)
+
+
+def downgrade():
+    op.drop_column('live_conversations', 'last_message_id')
+    op.drop_column('live_conversation_participants', 'unread_count')
@@ -0,0 +1,27 @@
+"""Add (conversation_id, created_at) index to live_messages
+
+Revision ID: live_message_conv_idx_001
+Revises: report_cron_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'live_message_conv_idx_001'
+down_revision = 'report_cron_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_live_messages_conversation_created',
+        'live_messages',
+        ['conversation_id', 'created_at']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_live_messages_conversation_created', table_name='live_messages')
@@ -0,0 +1,31 @@
+"""Add number_sequences table for INC/REQ/PRB/CHG/KE numbering
+
+Counters are seeded lazily from the highest existing number on first use.
+
+Revision ID: number_seq_001
+Revises: ticket_search_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'number_seq_001'
+down_revision = 'ticket_search_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'number_sequences',
+        sa.Column('prefix', sa.String(20), primary_key=True),
+        sa.Column('last_value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table('number_sequences')
@@ -0,0 +1,24 @@
+"""Add per-recipient delivery status to report_executions
+
+Revision ID: report_deliveries_001
+Revises: export_jobs_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'report_deliveries_001'
+down_revision = 'export_jobs_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('report_executions', sa.Column('deliveries', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('report_executions', 'deliveries')
@@ -0,0 +1,26 @@
+"""Add cron expression and time zone to scheduled_reports
+
+Revision ID: report_cron_001
+Revises: report_deliveries_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'report_cron_001'
+down_revision = 'report_deliveries_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('scheduled_reports', sa.Column('cron_expression', sa.String(100), nullable=True))
+    op.add_column('scheduled_reports', sa.Column('timezone', sa.String(64), nullable=True, server_default='UTC'))
+
+
+def downgrade():
+    op.drop_column('scheduled_reports', 'timezone')
+    op.drop_column('scheduled_reports', 'cron_expression')
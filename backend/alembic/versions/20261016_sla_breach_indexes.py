@@ -0,0 +1,38 @@
+"""Add partial indexes for the SLA breach scanner
+
+Revision ID: sla_breach_idx_001
+Revises: ticket_counters_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'sla_breach_idx_001'
+down_revision = 'ticket_counters_001'
+branch_labels = None
+depends_on = None
+
+OPEN_STATUSES = "('NEW', 'OPEN', 'IN_PROGRESS', 'PENDING')"
+
+
+def upgrade():
+    # Only open tickets whose SLA hasn't been flagged yet, so the indexes stay
+    # small no matter how much ticket history accumulates
+    op.create_index(
+        'ix_tickets_response_due_unbreached', 'tickets', ['response_due'],
+        postgresql_where=sa.text(f"response_breached IS NOT TRUE AND status IN {OPEN_STATUSES}"),
+        sqlite_where=sa.text(f"response_breached IS NOT 1 AND status IN {OPEN_STATUSES}"),
+    )
+    op.create_index(
+        'ix_tickets_resolution_due_unbreached', 'tickets', ['resolution_due'],
+        postgresql_where=sa.text(f"resolution_breached IS NOT TRUE AND status IN {OPEN_STATUSES}"),
+        sqlite_where=sa.text(f"resolution_breached IS NOT 1 AND status IN {OPEN_STATUSES}"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_tickets_resolution_due_unbreached', table_name='tickets')
+    op.drop_index('ix_tickets_response_due_unbreached', table_name='tickets')
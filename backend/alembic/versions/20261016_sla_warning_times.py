@@ -0,0 +1,46 @@
+"""Add SLA breach warning times to tickets
+
+Revision ID: sla_warning_001
+Revises: sla_breach_idx_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'sla_warning_001'
+down_revision = 'sla_breach_idx_001'
+branch_labels = None
+depends_on = None
+
+OPEN_STATUSES = "('NEW', 'OPEN', 'IN_PROGRESS', 'PENDING')"
+WARNING_THRESHOLD = 0.8
+
+
+def upgrade():
+    op.add_column('tickets', sa.Column('response_warning_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tickets', sa.Column('resolution_warning_at', sa.DateTime(timezone=True), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Existing open tickets: warn at the threshold of the wall-clock window
+        # between creation and the due time
+        for sla in ('response', 'resolution'):
+            op.execute(f"""
+                UPDATE tickets
+                SET {sla}_warning_at = {sla}_due - ({sla}_due - created_at) * {1 - WARNING_THRESHOLD}
+                WHERE {sla}_due IS NOT NULL
+                  AND {sla}_breached IS NOT TRUE
+                  AND created_at IS NOT NULL
+                  AND status IN {OPEN_STATUSES}
+            """)
+        op.execute("""
+            UPDATE tickets SET response_warning_at = NULL
+            WHERE first_response_at IS NOT NULL AND response_warning_at IS NOT NULL
+        """)
+
+
+def downgrade():
+    op.drop_column('tickets', 'resolution_warning_at')
+    op.drop_column('tickets', 'response_warning_at')
@@ -0,0 +1,52 @@
+"""Add ticket_counters rollup for dashboard counts
+
+Revision ID: ticket_counters_001
+Revises: number_seq_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ticket_counters_001'
+down_revision = 'number_seq_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ticket_counters',
+        sa.Column('status', sa.String(20), primary_key=True),
+        sa.Column('priority', sa.String(20), primary_key=True),
+        sa.Column('assignee_id', sa.Integer(), primary_key=True),
+        sa.Column('assigned_group_id', sa.Integer(), primary_key=True),
+        sa.Column('requester_id', sa.Integer(), primary_key=True),
+        sa.Column('ticket_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('breached_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_ticket_counters_assignee_id', 'ticket_counters', ['assignee_id'])
+    op.create_index('ix_ticket_counters_requester_id', 'ticket_counters', ['requester_id'])
+
+    # Backfill from existing tickets
+    op.execute("""
+        INSERT INTO ticket_counters
+            (status, priority, assignee_id, assigned_group_id, requester_id, ticket_count, breached_count)
+        SELECT
+            COALESCE(CAST(status AS VARCHAR), ''), COALESCE(CAST(priority AS VARCHAR), ''),
+            COALESCE(assignee_id, 0), COALESCE(assigned_group_id, 0), COALESCE(requester_id, 0),
+            COUNT(*), SUM(CASE WHEN resolution_breached THEN 1 ELSE 0 END)
+        FROM tickets
+        GROUP BY status, priority, assignee_id, assigned_group_id, requester_id
+    """)
+
+    op.create_index('ix_tickets_resolved_at', 'tickets', ['resolved_at'])
+
+
+def downgrade():
+    op.drop_index('ix_tickets_resolved_at', table_name='tickets')
+    op.drop_index('ix_ticket_counters_requester_id', table_name='ticket_counters')
+    op.drop_index('ix_ticket_counters_assignee_id', table_name='ticket_counters')
+    op.drop_table('ticket_counters')
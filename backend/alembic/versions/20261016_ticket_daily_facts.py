@@ -0,0 +1,93 @@
+"""Add ticket_daily_facts rollup for the trend reports
+
+Revision ID: ticket_facts_001
+Revises: sla_warning_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ticket_facts_001'
+down_revision = 'sla_warning_001'
+branch_labels = None
+depends_on = None
+
+DIMENSIONS = """
+    COALESCE(category_id, 0), COALESCE(CAST(priority AS VARCHAR), ''),
+    COALESCE(assigned_group_id, 0), COALESCE(assignee_id, 0),
+    COALESCE(CAST(status AS VARCHAR), ''), COALESCE(CAST(ticket_type AS VARCHAR), '')
+"""
+
+
+def upgrade():
+    op.create_table(
+        'ticket_daily_facts',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('priority', sa.String(length=20), nullable=False),
+        sa.Column('assigned_group_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('assignee_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('ticket_type', sa.String(length=20), nullable=False),
+        sa.Column('ticket_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('responded_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('response_minutes_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('response_minutes_sq', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('response_minutes_min', sa.Float(), nullable=True),
+        sa.Column('response_minutes_max', sa.Float(), nullable=True),
+        sa.Column('resolved_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resolution_minutes_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('resolution_minutes_sq', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('resolution_minutes_min', sa.Float(), nullable=True),
+        sa.Column('resolution_minutes_max', sa.Float(), nullable=True),
+        sa.Column('sla_met_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('response_breached_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resolution_breached_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resolved_on_day_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint(
+            'day', 'category_id', 'priority', 'assigned_group_id', 'assignee_id', 'status', 'ticket_type'
+        ),
+    )
+    op.create_index('ix_ticket_daily_facts_category_day', 'ticket_daily_facts', ['category_id', 'day'])
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Backfill: one row per creation-day bucket, plus the resolution-day counts
+        op.execute(f"""
+            INSERT INTO ticket_daily_facts
+                (day, category_id, priority, assigned_group_id, assignee_id, status, ticket_type,
+                 ticket_count, responded_count, response_minutes_sum, response_minutes_sq,
+                 response_minutes_min, response_minutes_max, resolved_count,
+                 resolution_minutes_sum, resolution_minutes_sq, resolution_minutes_min,
+                 resolution_minutes_max, sla_met_count, response_breached_count,
+                 resolution_breached_count, resolved_on_day_count)
+            SELECT day, c, p, g, a, s, t,
+                   SUM(n), SUM(responded), COALESCE(SUM(rm), 0), COALESCE(SUM(rm * rm), 0), MIN(rm), MAX(rm),
+                   SUM(resolved), COALESCE(SUM(sm), 0), COALESCE(SUM(sm * sm), 0), MIN(sm), MAX(sm),
+                   SUM(met), SUM(rb), SUM(sb), SUM(on_day)
+            FROM (
+                SELECT (created_at AT TIME ZONE 'UTC')::date AS day, {DIMENSIONS},
+                       1 AS n,
+                       CASE WHEN first_response_at IS NOT NULL THEN 1 ELSE 0 END AS responded,
+                       EXTRACT(EPOCH FROM first_response_at - created_at) / 60.0 AS rm,
+                       CASE WHEN resolved_at IS NOT NULL THEN 1 ELSE 0 END AS resolved,
+                       EXTRACT(EPOCH FROM resolved_at - created_at) / 60.0 AS sm,
+                       CASE WHEN resolved_at <= resolution_due THEN 1 ELSE 0 END AS met,
+                       CASE WHEN response_breached THEN 1 ELSE 0 END AS rb,
+                       CASE WHEN resolution_breached THEN 1 ELSE 0 END AS sb,
+                       0 AS on_day
+                FROM tickets WHERE created_at IS NOT NULL
+                UNION ALL
+                SELECT (resolved_at AT TIME ZONE 'UTC')::date, {DIMENSIONS},
+                       0, 0, NULL, 0, NULL, 0, 0, 0, 1
+                FROM tickets WHERE resolved_at IS NOT NULL
+            ) AS f (day, c, p, g, a, s, t, n, responded, rm, resolved, sm, met, rb, sb, on_day)
+            GROUP BY day, c, p, g, a, s, t
+        """)
+
+
+def downgrade():
+    op.drop_index('ix_ticket_daily_facts_category_day', table_name='ticket_daily_facts')
+    op.drop_table('ticket_daily_facts')
@@ -0,0 +1,64 @@
+"""Add response/resolution quantile sketches to ticket_daily_facts
+
+Revision ID: ticket_fact_sketch_001
+Revises: ticket_facts_001
+Create Date: 2026-10-16
+
+"""
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ticket_fact_sketch_001'
+down_revision = 'ticket_facts_001'
+branch_labels = None
+depends_on = None
+
+# Must match app.services.quantile_sketch (SKETCH_RELATIVE_ACCURACY = 0.01)
+LOG_GAMMA = math.log((1 + 0.01) / (1 - 0.01))
+
+DIMENSIONS = """
+    COALESCE(category_id, 0) AS c, COALESCE(CAST(priority AS VARCHAR), '') AS p,
+    COALESCE(assigned_group_id, 0) AS g, COALESCE(assignee_id, 0) AS a,
+    COALESCE(CAST(status AS VARCHAR), '') AS s, COALESCE(CAST(ticket_type AS VARCHAR), '') AS t
+"""
+
+
+def upgrade():
+    op.add_column('ticket_daily_facts', sa.Column('response_sketch', sa.Text(), nullable=True))
+    op.add_column('ticket_daily_facts', sa.Column('resolution_sketch', sa.Text(), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Backfill: bucket every ticket's minutes like QuantileSketch.add and
+        # store {"bucket": count, "z": zero count} per fact row
+        for sla, end_column in (('response', 'first_response_at'), ('resolution', 'resolved_at')):
+            op.execute(f"""
+                WITH v AS (
+                    SELECT (created_at AT TIME ZONE 'UTC')::date AS day, {DIMENSIONS},
+                           EXTRACT(EPOCH FROM {end_column} - created_at) / 60.0 AS m
+                    FROM tickets
+                    WHERE created_at IS NOT NULL AND {end_column} IS NOT NULL
+                ), b AS (
+                    SELECT day, c, p, g, a, s, t,
+                           CASE WHEN m <= 0 THEN 'z'
+                                ELSE CAST(CAST(CEIL(LN(m) / {LOG_GAMMA!r}) AS INTEGER) AS VARCHAR) END AS bin,
+                           COUNT(*) AS n
+                    FROM v GROUP BY day, c, p, g, a, s, t, bin
+                ), sk AS (
+                    SELECT day, c, p, g, a, s, t, CAST(json_object_agg(bin, n) AS TEXT) AS sketch
+                    FROM b GROUP BY day, c, p, g, a, s, t
+                )
+                UPDATE ticket_daily_facts f SET {sla}_sketch = sk.sketch
+                FROM sk
+                WHERE f.day = sk.day AND f.category_id = sk.c AND f.priority = sk.p
+                  AND f.assigned_group_id = sk.g AND f.assignee_id = sk.a
+                  AND f.status = sk.s AND f.ticket_type = sk.t
+            """)
+
+
+def downgrade():
+    op.drop_column('ticket_daily_facts', 'resolution_sketch')
+    op.drop_column('ticket_daily_facts', 'response_sketch')
@@ -0,0 +1,23 @@
+"""Add (created_at, id) index for keyset pagination of tickets
+
+Revision ID: ticket_keyset_001
+Revises: avatar_data_001, project_mgmt_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'ticket_keyset_001'
+down_revision = ('avatar_data_001', 'project_mgmt_001')  # Merges the two live_chat_001 branches
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_tickets_created_at_id', table_name='tickets')
@@ -0,0 +1,42 @@
+"""Add trigram index on tickets.ticket_number for substring number search
+
+The trigram index also serves prefix LIKE, so it replaces the
+varchar_pattern_ops index from ticket_search_001.
+
+Revision ID: ticket_number_trgm_001
+Revises: export_job_requesters_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'ticket_number_trgm_001'
+down_revision = 'export_job_requesters_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Serves ticket_number LIKE '%000123%' (see ticket_search_service)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tickets_ticket_number_trgm "
+        "ON tickets USING GIN (ticket_number gin_trgm_ops)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_tickets_ticket_number_pattern")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tickets_ticket_number_pattern "
+        "ON tickets (ticket_number varchar_pattern_ops)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_tickets_ticket_number_trgm")
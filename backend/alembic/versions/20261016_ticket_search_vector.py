@@ -0,0 +1,47 @@
+"""Add full-text search vector and ticket number prefix index to tickets
+
+The search_vector column is generated by PostgreSQL from title (weight A)
+and description (weight B), so it never needs to be maintained by the app.
+It is intentionally not mapped on the Ticket model - see
+app/services/ticket_search_service.py.
+
+Revision ID: ticket_search_001
+Revises: ticket_keyset_001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'ticket_search_001'
+down_revision = 'ticket_keyset_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tickets_search_vector ON tickets USING GIN (search_vector)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tickets_ticket_number_pattern "
+        "ON tickets (ticket_number varchar_pattern_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_tickets_ticket_number_pattern")
+    op.execute("DROP INDEX IF EXISTS ix_tickets_search_vector")
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector")
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, case
+from sqlalchemy import func, case
 from datetime import datetime, timedelta
 import logging
 from app.core.database import get_db
@@ -10,6 +10,7 @@ from app.models.ticket import Ticket, TicketStatus, TicketPriority
 from app.models.ticket_activity import TicketActivity
 from app.models.change import ChangeActivity
 from app.models.problem import ProblemActivity
+from app.services.dashboard_service import DashboardService
 
 logger = logging.getLogger(__name__)
 
@@ -33,90 +34,8 @@ async def get_dashboard_stats(
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics"""
-
-    # Check if user is end user - filter to only their tickets
-    end_user = is_end_user(current_user)
-
-    # Base query for end users
-    def base_query():
-        q = db.query(Ticket)
-        if end_user:
-            q = q.filter(Ticket.requester_id == current_user.id)
-        return q
-
-    # Total tickets
-    total_tickets = base_query().count()
-
-    # Open tickets (NEW, OPEN, IN_PROGRESS)
-    open_tickets = base_query().filter(
-        Ticket.status.in_([
-            TicketStatus.NEW.value,
-            TicketStatus.OPEN.value,
-            TicketStatus.IN_PROGRESS.value
-        ])
-    ).count()
-
-    # My assigned tickets (for agents) / My submitted tickets (for end users)
-    if end_user:
-        my_tickets = base_query().filter(
-            Ticket.status != TicketStatus.CLOSED.value
-        ).count()
-    else:
-        my_tickets = db.query(Ticket).filter(
-            Ticket.assignee_id == current_user.id,
-            Ticket.status != TicketStatus.CLOSED.value
-        ).count()
-
-    # Unassigned tickets (only for staff)
-    unassigned = 0
-    if not end_user:
-        unassigned = db.query(Ticket).filter(
-            Ticket.assignee_id == None,
-            Ticket.status != TicketStatus.CLOSED.value
-        ).count()
-
-    # SLA breached tickets
-    sla_breached = base_query().filter(
-        and_(
-            Ticket.resolution_breached == True,
-            Ticket.status != TicketStatus.CLOSED.value
-        )
-    ).count()
-
-    # Critical tickets
-    critical_tickets = base_query().filter(
-        Ticket.priority == TicketPriority.CRITICAL.value,
-        Ticket.status != TicketStatus.CLOSED.value
-    ).count()
-
-    # Resolved today
-    today = datetime.now().date()
-    resolved_today = base_query().filter(
-        func.date(Ticket.resolved_at) == today
-    ).count()
-
-    # Pending tickets
-    pending_tickets = base_query().filter(
-        Ticket.status == TicketStatus.PENDING.value
-    ).count()
-
-    # Closed tickets (for end users to see their resolved issues)
-    closed_tickets = base_query().filter(
-        Ticket.status.in_([TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value])
-    ).count()
-
-    return {
-        "total_tickets": total_tickets,
-        "open_tickets": open_tickets,
-        "my_tickets": my_tickets,
-        "unassigned": unassigned,
-        "sla_breached": sla_breached,
-        "critical_tickets": critical_tickets,
-        "resolved_today": resolved_today,
-        "pending_tickets": pending_tickets,
-        "closed_tickets": closed_tickets,
-        "is_end_user": end_user
-    }
+    # End users only see counters for tickets they raised
+    return DashboardService.get_stats(db, current_user.id, is_end_user(current_user))
 
 @router.get("/tickets-by-status")
 async def get_tickets_by_status(
@@ -124,10 +43,7 @@ async def get_tickets_by_status(
     db: Session = Depends(get_db)
 ):
     """Get ticket counts by status"""
-    status_counts = db.query(
-        Ticket.status,
-        func.count(Ticket.id).label('count')
-    ).group_by(Ticket.status).all()
+    status_counts = DashboardService.count_by_status(db)
 
     return [
         {
@@ -144,13 +60,7 @@ async def get_tickets_by_priority(
     db: Session = Depends(get_db)
 ):
     """Get ticket count by priority"""
-    
-    priority_counts = db.query(
-        Ticket.priority,
-        func.count(Ticket.id).label('count')
-    ).filter(
-        Ticket.status != TicketStatus.CLOSED.value
-    ).group_by(Ticket.priority).all()
+    priority_counts = DashboardService.count_open_by_priority(db)
     
     return [
         {
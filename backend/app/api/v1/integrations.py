@@ -3,7 +3,6 @@ API endpoints for external integrations (JIRA, Trello, Asana)
 """
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -19,6 +18,7 @@ from app.models.integration import (
 from app.services.integration_service import (
     IntegrationService, JiraService, TrelloService, AsanaService
 )
+from app.services.number_allocator import NumberAllocator
 
 router = APIRouter(prefix="/integrations", tags=["Integrations"])
 
@@ -637,9 +637,8 @@ async def run_import_job(
                         continue
 
                     # Create ticket
-                    max_number = db.query(func.max(Ticket.ticket_number)).scalar() or 0
                     ticket = Ticket(
-                        ticket_number=max_number + 1,
+                        ticket_number=NumberAllocator.next_number(db, "INC"),
                         ticket_type=TicketType.INCIDENT,
                         title=item_data["title"][:500] if item_data["title"] else "Imported Ticket",
                         description=item_data.get("description", ""),
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, UploadFile, File, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func, desc
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, and_, func, desc, select
 from typing import List, Optional
 from datetime import datetime
 import os
@@ -17,7 +17,7 @@ from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.models.live_chat import (
     LiveConversation, LiveMessage, MessageAttachment, MessageReaction,
-    MessageReadReceipt, UserOnlineStatus, ConversationType, MessageType,
+    MessageReadReceipt, ConversationType, MessageType,
     conversation_participants
 )
 from app.schemas.live_chat import (
@@ -26,6 +26,7 @@ from app.schemas.live_chat import (
     ReactionCreate, ReactionSummary, AttachmentResponse, ParticipantInfo,
     OnlineStatusResponse
 )
+from app.services.chat_counter_service import ChatCounterService
 from app.services.websocket_manager import manager
 
 router = APIRouter(prefix="/chat", tags=["Live Chat"])
@@ -48,89 +49,100 @@ MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
 
 def get_conversation_response(conversation: LiveConversation, current_user_id: int, db: Session) -> dict:
     """Build conversation response with participants and unread count"""
-    participants = []
-    for participant in conversation.participants:
-        # Check online status
-        online_status = db.query(UserOnlineStatus).filter(
-            UserOnlineStatus.user_id == participant.id
-        ).first()
-
-        # Get participant role in conversation
-        participant_link = db.execute(
-            conversation_participants.select().where(
-                and_(
-                    conversation_participants.c.conversation_id == conversation.id,
-                    conversation_participants.c.user_id == participant.id
-                )
-            )
-        ).first()
+    return get_conversation_responses([conversation], current_user_id, db)[0]
 
-        participants.append(ParticipantInfo(
-            id=participant.id,
-            full_name=participant.full_name,
-            avatar_url=participant.avatar_url,
-            is_online=online_status.is_online if online_status else False,
-            is_admin=participant_link.is_admin if participant_link else False
-        ))
 
-    # Get unread count
-    last_read = db.execute(
-        conversation_participants.select().where(
-            and_(
-                conversation_participants.c.conversation_id == conversation.id,
-                conversation_participants.c.user_id == current_user_id
-            )
-        )
-    ).first()
-
-    unread_count = 0
-    if last_read and last_read.last_read_message_id:
-        unread_count = db.query(LiveMessage).filter(
-            LiveMessage.conversation_id == conversation.id,
-            LiveMessage.id > last_read.last_read_message_id,
-            LiveMessage.sender_id != current_user_id,
-            LiveMessage.is_deleted == False
-        ).count()
-    elif last_read:
-        unread_count = db.query(LiveMessage).filter(
-            LiveMessage.conversation_id == conversation.id,
-            LiveMessage.sender_id != current_user_id,
-            LiveMessage.is_deleted == False
-        ).count()
+# Everything get_message_response reads, loaded for a batch of messages at once
+MESSAGE_RESPONSE_OPTIONS = (
+    selectinload(LiveMessage.sender),
+    selectinload(LiveMessage.attachments),
+    selectinload(LiveMessage.reactions).selectinload(MessageReaction.user),
+    selectinload(LiveMessage.read_receipts),
+    selectinload(LiveMessage.reply_to).selectinload(LiveMessage.sender),
+)
 
-    # Get last message
-    last_message = db.query(LiveMessage).filter(
-        LiveMessage.conversation_id == conversation.id,
-        LiveMessage.is_deleted == False
-    ).order_by(desc(LiveMessage.created_at)).first()
 
-    last_message_data = None
-    if last_message:
-        last_message_data = get_message_response(last_message, current_user_id, db)
+def get_conversation_responses(conversations: List[LiveConversation], current_user_id: int, db: Session) -> List[dict]:
+    """
+    Build conversation responses for a page of conversations with a fixed
+    number of queries, however many conversations and participants:
+    participants with admin flags and unread counts in one query, and last
+    messages in one query (plus the eager loads get_message_response needs).
+    Unread counts (others' messages only) and last messages (never deleted
+    ones) are the denormalised ones kept by ChatCounterService; presence
+    comes from memory.
+    """
+    if not conversations:
+        return []
+    conv_ids = [conversation.id for conversation in conversations]
+
+    # Participants, their admin flag and unread counts
+    participant_rows = db.execute(
+        select(
+            conversation_participants.c.conversation_id,
+            conversation_participants.c.is_admin,
+            conversation_participants.c.unread_count,
+            User.id,
+            User.full_name,
+            User.avatar_url
+        ).join(
+            User, User.id == conversation_participants.c.user_id
+        ).where(
+            conversation_participants.c.conversation_id.in_(conv_ids)
+        ).order_by(conversation_participants.c.conversation_id, User.id)
+    ).all()
+    presence = manager.presence.get_presence({row.id for row in participant_rows})
+    participants = {conv_id: [] for conv_id in conv_ids}
+    unread_counts = {}
+    for row in participant_rows:
+        if row.id == current_user_id:
+            unread_counts[row.conversation_id] = row.unread_count
+        participants[row.conversation_id].append(ParticipantInfo(
+            id=row.id,
+            full_name=row.full_name,
+            avatar_url=row.avatar_url,
+            is_online=presence[row.id].is_online,
+            is_admin=bool(row.is_admin)
+        ))
 
-    # For direct conversations, use other user's name as conversation name
-    name = conversation.name
-    if conversation.conversation_type == ConversationType.DIRECT:
-        other_participant = next(
-            (p for p in participants if p.id != current_user_id), None
+    last_message_ids = [c.last_message_id for c in conversations if c.last_message_id]
+    last_messages = {
+        message.conversation_id: message
+        for message in db.query(LiveMessage).options(*MESSAGE_RESPONSE_OPTIONS).filter(
+            LiveMessage.id.in_(last_message_ids),
+            LiveMessage.is_deleted == False
         )
-        if other_participant:
-            name = other_participant.full_name
-
-    return {
-        "id": conversation.id,
-        "conversation_type": conversation.conversation_type.value if hasattr(conversation.conversation_type, 'value') else conversation.conversation_type,
-        "name": name,
-        "description": conversation.description,
-        "avatar_url": conversation.avatar_url,
-        "created_by_id": conversation.created_by_id,
-        "created_at": conversation.created_at,
-        "updated_at": conversation.updated_at,
-        "last_message_at": conversation.last_message_at,
-        "participants": participants,
-        "unread_count": unread_count,
-        "last_message": last_message_data
-    }
+    } if last_message_ids else {}
+
+    responses = []
+    for conversation in conversations:
+        conv_participants = participants[conversation.id]
+        last_message = last_messages.get(conversation.id)
+
+        # For direct conversations, use other user's name as conversation name
+        name = conversation.name
+        if conversation.conversation_type == ConversationType.DIRECT:
+            other_participant = next(
+                (p for p in conv_participants if p.id != current_user_id), None
+            )
+            if other_participant:
+                name = other_participant.full_name
+
+        responses.append({
+            "id": conversation.id,
+            "conversation_type": conversation.conversation_type.value if hasattr(conversation.conversation_type, 'value') else conversation.conversation_type,
+            "name": name,
+            "description": conversation.description,
+            "avatar_url": conversation.avatar_url,
+            "created_by_id": conversation.created_by_id,
+            "created_at": conversation.created_at,
+            "updated_at": conversation.updated_at,
+            "last_message_at": conversation.last_message_at,
+            "participants": conv_participants,
+            "unread_count": unread_counts.get(conversation.id, 0),
+            "last_message": get_message_response(last_message, current_user_id, db) if last_message else None
+        })
+    return responses
 
 
 def get_message_response(message: LiveMessage, current_user_id: int, db: Session) -> dict:
@@ -289,7 +301,8 @@ async def create_conversation(
             message_type=MessageType.SYSTEM
         )
         db.add(system_message)
-        conversation.last_message_at = datetime.utcnow()
+        db.flush()
+        ChatCounterService.message_added(db, system_message)
 
     db.commit()
     db.refresh(conversation)
@@ -334,7 +347,7 @@ async def get_conversations(
 
     conversations = query.offset(skip).limit(page_size).all()
 
-    items = [get_conversation_response(conv, current_user.id, db) for conv in conversations]
+    items = get_conversation_responses(conversations, current_user.id, db)
 
     return {
         "items": items,
@@ -451,6 +464,7 @@ async def add_participants(
 
     # Add new participants
     added = []
+    added_ids = []
     for user_id in user_ids:
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
@@ -475,6 +489,9 @@ async def add_participants(
                 )
             )
             added.append(user.full_name)
+            added_ids.append(user_id)
+
+    ChatCounterService.participants_added(db, conversation_id, added_ids)
 
     if added:
         # Create system message
@@ -485,7 +502,8 @@ async def add_participants(
             message_type=MessageType.SYSTEM
         )
         db.add(system_message)
-        conversation.last_message_at = datetime.utcnow()
+        db.flush()
+        ChatCounterService.message_added(db, system_message)
 
     db.commit()
 
@@ -550,7 +568,8 @@ async def remove_participant(
             message_type=MessageType.SYSTEM
         )
         db.add(system_message)
-        conversation.last_message_at = datetime.utcnow()
+        db.flush()
+        ChatCounterService.message_added(db, system_message)
 
     db.commit()
 
@@ -653,12 +672,13 @@ async def send_message(
         reply_to_id=data.reply_to_id
     )
     db.add(message)
+    db.flush()
 
-    # Update conversation last_message_at
+    # Count it as unread and make it the conversation's last message
+    ChatCounterService.message_added(db, message)
     conversation = db.query(LiveConversation).filter(
         LiveConversation.id == conversation_id
     ).first()
-    conversation.last_message_at = datetime.utcnow()
 
     db.commit()
     db.refresh(message)
@@ -749,11 +769,11 @@ async def send_message_with_attachments(
         )
         db.add(attachment)
 
-    # Update conversation last_message_at
+    # Count it as unread and make it the conversation's last message
+    ChatCounterService.message_added(db, message)
     conversation = db.query(LiveConversation).filter(
         LiveConversation.id == conversation_id
     ).first()
-    conversation.last_message_at = datetime.utcnow()
 
     db.commit()
     db.refresh(message)
@@ -895,6 +915,8 @@ async def delete_message(
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
+    if not message.is_deleted:
+        ChatCounterService.message_deleted(db, message)
     message.is_deleted = True
     message.deleted_at = datetime.utcnow()
 
@@ -1018,17 +1040,7 @@ async def mark_message_read(
     current_last_read = participant_row.last_read_message_id or 0
 
     if message_id > current_last_read:
-        db.execute(
-            conversation_participants.update().where(
-                and_(
-                    conversation_participants.c.conversation_id == conversation_id,
-                    conversation_participants.c.user_id == current_user.id
-                )
-            ).values(
-                last_read_at=datetime.utcnow(),
-                last_read_message_id=message_id
-            )
-        )
+        ChatCounterService.mark_read(db, conversation_id, current_user.id, message_id)
         db.commit()
 
         # Broadcast read receipt
@@ -1045,33 +1057,18 @@ async def mark_conversation_read(
 ):
     """Mark all messages in a conversation as read"""
 
-    # Get latest message
-    latest_message = db.query(LiveMessage).filter(
-        LiveMessage.conversation_id == conversation_id
-    ).order_by(desc(LiveMessage.created_at)).first()
+    # Read up to the conversation's last message
+    last_message_id = ChatCounterService.mark_all_read(db, conversation_id, current_user.id)
 
-    if not latest_message:
+    if last_message_id is None:
         return {"message": "No messages to mark as read"}
 
-    # Update last_read in participants table
-    db.execute(
-        conversation_participants.update().where(
-            and_(
-                conversation_participants.c.conversation_id == conversation_id,
-                conversation_participants.c.user_id == current_user.id
-            )
-        ).values(
-            last_read_at=datetime.utcnow(),
-            last_read_message_id=latest_message.id
-        )
-    )
-
     db.commit()
 
     # Broadcast read receipt
-    await manager.send_message_read(conversation_id, latest_message.id, current_user.id)
+    await manager.send_message_read(conversation_id, last_message_id, current_user.id)
 
-    return {"message": "Marked as read", "last_read_message_id": latest_message.id}
+    return {"message": "Marked as read", "last_read_message_id": last_message_id}
 
 
 # ==================== User Search Endpoints ====================
@@ -1093,21 +1090,16 @@ async def search_users(
         )
     ).limit(20).all()
 
-    result = []
-    for user in users:
-        online_status = db.query(UserOnlineStatus).filter(
-            UserOnlineStatus.user_id == user.id
-        ).first()
-
-        result.append({
+    presence = manager.presence.get_presence([user.id for user in users])
+    return [
+        {
             "id": user.id,
             "full_name": user.full_name,
             "avatar_url": user.avatar_url,
-            "is_online": online_status.is_online if online_status else False,
+            "is_online": presence[user.id].is_online,
             "is_admin": False
-        })
-
-    return result
+        } for user in users
+    ]
 
 
 @router.post("/conversations/{conversation_id}/leave")
@@ -1157,7 +1149,8 @@ async def leave_conversation(
         message_type=MessageType.SYSTEM
     )
     db.add(system_message)
-    conversation.last_message_at = datetime.utcnow()
+    db.flush()
+    ChatCounterService.message_added(db, system_message)
 
     db.commit()
 
@@ -1174,20 +1167,16 @@ async def get_online_users(
 ):
     """Get online status of users"""
 
-    query = db.query(UserOnlineStatus)
-
-    if user_ids:
-        ids = [int(id.strip()) for id in user_ids.split(",")]
-        query = query.filter(UserOnlineStatus.user_id.in_(ids))
-
-    statuses = query.all()
+    ids = [int(id.strip()) for id in user_ids.split(",")] if user_ids else None
 
+    # Users never seen online have no status
     return [
         OnlineStatusResponse(
-            user_id=s.user_id,
-            is_online=s.is_online,
-            last_seen=s.last_seen
-        ) for s in statuses
+            user_id=p.user_id,
+            is_online=p.is_online,
+            last_seen=p.last_seen
+        ) for p in manager.presence.get_presence(ids).values()
+        if p.is_online or p.last_seen
     ]
 
 
@@ -1230,26 +1219,9 @@ async def websocket_endpoint(
 
         user_id_int = user.id
 
-        # Connect
+        # Connect; presence is saved to user_online_status in batches
         await manager.connect(websocket, user_id_int)
 
-        # Update online status in DB
-        online_status = db.query(UserOnlineStatus).filter(
-            UserOnlineStatus.user_id == user_id_int
-        ).first()
-
-        if online_status:
-            online_status.is_online = True
-            online_status.last_seen = datetime.utcnow()
-        else:
-            online_status = UserOnlineStatus(
-                user_id=user_id_int,
-                is_online=True
-            )
-            db.add(online_status)
-
-        db.commit()
-
         # Get user's conversations and subscribe
         user_conversations = db.query(LiveConversation).join(
             conversation_participants,
@@ -1291,43 +1263,18 @@ async def websocket_endpoint(
                     # Create new session for DB update
                     db = SessionLocal()
                     try:
-                        db.execute(
-                            conversation_participants.update().where(
-                                and_(
-                                    conversation_participants.c.conversation_id == conv_id,
-                                    conversation_participants.c.user_id == user_id_int
-                                )
-                            ).values(
-                                last_read_at=datetime.utcnow(),
-                                last_read_message_id=msg_id
-                            )
-                        )
+                        ChatCounterService.mark_read(db, conv_id, user_id_int, msg_id)
                         db.commit()
                     finally:
                         db.close()
                     await manager.send_message_read(conv_id, msg_id, user_id_int)
 
             elif msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await manager.send_to_socket(websocket, user_id_int, {"type": "pong"})
 
     except WebSocketDisconnect:
         pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        # Disconnect and update status
         await manager.disconnect(websocket, user_id_int)
-
-        # Update online status
-        if not manager.is_user_online(user_id_int):
-            db = SessionLocal()
-            try:
-                db.query(UserOnlineStatus).filter(
-                    UserOnlineStatus.user_id == user_id_int
-                ).update({
-                    "is_online": False,
-                    "last_seen": datetime.utcnow()
-                })
-                db.commit()
-            finally:
-                db.close()
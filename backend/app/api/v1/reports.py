@@ -1,26 +1,33 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Query, HTTPException, Header
+from fastapi.responses import FileResponse, StreamingResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, case
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List
 import os
-from app.core.database import get_db
+import json
+from app.core.database import get_db, SessionLocal
 from app.core.dependencies import get_current_user, require_teamlead_or_above, require_manager_or_above
 from app.models.user import User
 from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.ticket_daily_fact import TicketDailyFact
+from app.models.export_job import ExportJob, ExportJobStatus
 from app.models.category import Category
-from app.services.reporting_service import ReportingService
-from app.services.export_service import ExportService
+from app.services.reporting_service import ReportingService, parse_date, EXPORT_REPORT_TYPES
+from app.services.streaming_export_service import StreamingExportService, EXPORT_DATASETS
+from app.services.export_job_service import ExportJobService, EXPORT_FORMATS
+from app.services.report_cache import ReportCache
 from app.schemas.reporting import (
     SLAComplianceRequest, SLAComplianceResponse,
     TicketAgingRequest, TicketAgingResponse,
     TechnicianPerformanceRequest, TechnicianPerformance,
     ResponseTimeTrendsRequest, ResponseTimeTrend,
     ResolutionTimeAnalysisRequest, ResolutionTimeAnalysis,
+    TimePercentilesRequest, TimePercentiles,
     TicketVolumeTrendsRequest, TicketVolumeResponse,
     CategoryBreakdownRequest, CategoryBreakdown,
-    ExportReportRequest, ExportResponse
+    ExportReportRequest, ExportJobResponse
 )
 
 router = APIRouter(
@@ -398,6 +405,7 @@ async def get_ticket_aging(
 @router.post("/technician-performance", response_model=List[TechnicianPerformance])
 async def get_technician_performance(
     request: TechnicianPerformanceRequest,
+    stream: bool = Query(False, description="Stream rows as newline-delimited JSON"),
     current_user: User = Depends(require_manager_or_above()),
     db: Session = Depends(get_db)
 ):
@@ -409,6 +417,9 @@ async def get_technician_performance(
     - Average first response time
     - SLA compliance rate
     - Open tickets count
+
+    With ?stream=true rows are sent as NDJSON while they are read, so large
+    teams don't have to be buffered.
     """
     reporting_service = ReportingService(db)
 
@@ -416,6 +427,20 @@ async def get_technician_performance(
     start_date = datetime.strptime(request.start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
     end_date = datetime.strptime(request.end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
 
+    if stream:
+        def rows():
+            # Own session: the response body is produced after this handler returns
+            stream_db = SessionLocal()
+            try:
+                for row in ReportingService(stream_db).iter_technician_performance(
+                    start_date=start_date, end_date=end_date, user_id=request.user_id
+                ):
+                    yield json.dumps(row) + "\n"
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
     performance_data = reporting_service.get_technician_performance(
         start_date=start_date,
         end_date=end_date,
@@ -459,6 +484,7 @@ async def get_resolution_time_analysis(
     Analyze resolution times grouped by:
     - Priority
     - Category
+    - Group
     - Assignee
 
     Returns average, min, max, and median resolution times
@@ -477,6 +503,30 @@ async def get_resolution_time_analysis(
     return analysis_data
 
 
+@router.post("/time-percentiles", response_model=List[TimePercentiles])
+async def get_time_percentiles(
+    request: TimePercentilesRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    p50/p90/p99 response or resolution times (hours) grouped by priority,
+    category, group or assignee. Values are within 1% of the exact percentile.
+    """
+    reporting_service = ReportingService(db)
+
+    # Parse date strings to timezone-aware datetime objects
+    start_date = datetime.strptime(request.start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    end_date = datetime.strptime(request.end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+    return reporting_service.get_time_percentiles(
+        start_date=start_date,
+        end_date=end_date,
+        metric=request.metric.value,
+        group_by=request.group_by.value
+    )
+
+
 @router.post("/ticket-volume-trends", response_model=TicketVolumeResponse)
 async def get_ticket_volume_trends(
     request: TicketVolumeTrendsRequest,
@@ -531,22 +581,24 @@ async def get_category_breakdown(
     return breakdown_data
 
 
-def parse_date(date_str: Optional[str]) -> Optional[datetime]:
-    """Parse date string to datetime"""
-    if not date_str:
-        return None
-    try:
-        # Try ISO format first
-        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-    except ValueError:
-        try:
-            # Try simple date format
-            return datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-        except ValueError:
-            return None
+def _export_job_response(job: ExportJob) -> ExportJobResponse:
+    completed = job.status == ExportJobStatus.COMPLETED
+    return ExportJobResponse(
+        job_id=job.id,
+        status=job.status.value,
+        progress=job.progress,
+        report_type=job.report_type,
+        format=job.export_format,
+        file_name=job.file_name,
+        download_url=f"/reports/download/{job.file_name}" if completed and job.file_name else None,
+        error_message=job.error_message,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at
+    )
 
 
-@router.post("/export")
+@router.post("/export", response_model=ExportJobResponse, status_code=202)
 async def export_report(
     request: ExportReportRequest,
     current_user: User = Depends(get_current_user),
@@ -555,99 +607,111 @@ async def export_report(
     """
     Export any report to PDF, Excel, or CSV format
 
-    Supports all report types with custom filters
+    The export runs in a background worker process: poll
+    GET /reports/export/jobs/{job_id} until it is COMPLETED, then fetch
+    download_url. An identical request made while a job is still pending or
+    running returns that job instead of starting another.
     """
-    try:
-        reporting_service = ReportingService(db)
-        export_service = ExportService(db)
-
-        # Parse dates with defaults (last 30 days)
-        start_dt = parse_date(request.start_date)
-        end_dt = parse_date(request.end_date)
-
-        # Default to last 30 days if no dates provided
-        if not start_dt:
-            start_dt = datetime.now(timezone.utc) - timedelta(days=30)
-        if not end_dt:
-            end_dt = datetime.now(timezone.utc)
-
-        # Generate report data based on type
-        if request.report_type == "sla_compliance":
-            data = reporting_service.get_sla_compliance_metrics(
-                start_date=start_dt,
-                end_date=end_dt,
-                priority=request.filters.get("priority") if request.filters else None,
-                category_id=request.filters.get("category_id") if request.filters else None
-            )
-        elif request.report_type == "ticket_aging":
-            data = reporting_service.get_ticket_aging_report(
-                status_filter=request.filters.get("status_filter") if request.filters else None,
-                priority_filter=request.filters.get("priority_filter") if request.filters else None,
-                assignee_id=request.filters.get("assignee_id") if request.filters else None
-            )
-        elif request.report_type == "technician_performance":
-            data = reporting_service.get_technician_performance(
-                start_date=start_dt,
-                end_date=end_dt,
-                user_id=request.filters.get("user_id") if request.filters else None
-            )
-        elif request.report_type == "ticket_volume":
-            data = reporting_service.get_ticket_volume_trends(
-                start_date=start_dt,
-                end_date=end_dt,
-                granularity=request.filters.get("granularity", "daily") if request.filters else "daily"
-            )
-        elif request.report_type == "category_breakdown":
-            data = reporting_service.get_category_breakdown(
-                start_date=start_dt,
-                end_date=end_dt
-            )
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported report type: {request.report_type}")
-
-        # Export based on format
-        if request.format == "excel":
-            file_path = export_service.export_to_excel(
-                data=data,
-                report_name=request.report_type,
-                sheet_name="Report"
-            )
-        elif request.format == "pdf":
-            file_path = export_service.export_to_pdf(
-                data=data,
-                report_name=request.report_type,
-                title=f"{request.report_type.replace('_', ' ').title()} Report"
-            )
-        elif request.format == "csv":
-            file_path = export_service.export_to_csv(
-                data=data,
-                report_name=request.report_type
-            )
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported export format: {request.format}")
-
-        # Extract filename from path (works on both Windows and Unix)
-        file_name = os.path.basename(file_path) if file_path else None
-
-        return ExportResponse(
-            success=True,
-            file_path=file_path,
-            file_name=file_name,
-            download_url=f"/reports/download/{file_name}" if file_name else None,
-            message="Report exported successfully"
+    if request.report_type not in EXPORT_REPORT_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported report type: {request.report_type}")
+    if request.format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {request.format}")
+
+    job, _ = await run_in_threadpool(
+        ExportJobService.enqueue,
+        db,
+        request.report_type,
+        request.format,
+        request.start_date,
+        request.end_date,
+        request.filters,
+        current_user.id
+    )
+    return _export_job_response(job)
+
+
+@router.get("/export/jobs", response_model=List[ExportJobResponse])
+async def list_export_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Your most recent export jobs, including ones you joined, newest first"""
+    return [_export_job_response(job) for job in ExportJobService.list_jobs(db, current_user.id, limit)]
+
+
+@router.get("/export/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Status and progress (0-100) of an export job, with its download link once
+    complete. Only the users who requested the job can see it (Manager+: any job).
+    """
+    job = ExportJobService.get_job(db, job_id)
+    if job and not ExportJobService.is_requester(db, job.id, current_user.id):
+        try:
+            require_manager_or_above()(current_user)
+        except HTTPException:
+            # Not found rather than forbidden, so job ids cannot be probed
+            job = None
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return _export_job_response(job)
+
+
+@router.get("/export/stream/{dataset}")
+async def stream_export(
+    dataset: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    format: str = Query("csv", pattern="^(csv|excel)$"),
+    current_user: User = Depends(require_teamlead_or_above())
+):
+    """
+    Stream a CSV or Excel export of tickets, assets or audit_logs (Team Lead+;
+    audit logs Manager+), optionally limited by created_at.
+
+    Rows are read with a server-side cursor. CSV is written to the response as
+    rows arrive, so exports of any size start at once; Excel is written to a
+    write-only workbook and sent when complete. Both use flat memory.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown export dataset: {dataset}")
+    if dataset == "audit_logs":
+        require_manager_or_above()(current_user)
+
+    if format == "excel":
+        filepath = await run_in_threadpool(
+            StreamingExportService.export_xlsx, dataset, parse_date(start_date), parse_date(end_date)
+        )
+        return FileResponse(
+            filepath,
+            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            filename=os.path.basename(filepath)
         )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error exporting report: {str(e)}")
+    filename = f"SupportX_{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        StreamingExportService.stream_csv(dataset, parse_date(start_date), parse_date(end_date)),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/download/{filename}")
 async def download_report(
     filename: str,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user)
 ):
     """
     Download an exported report file
+
+    Sends an ETag and answers a matching If-None-Match with 304, so a
+    client that already holds the file does not download it again.
     """
     export_dir = "exports/reports"
     filepath = os.path.join(export_dir, filename)
@@ -655,6 +719,12 @@ async def download_report(
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail="File not found")
 
+    etag = ReportCache.etag(filepath)
+    ReportCache.touch(filepath)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if ReportCache.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
     # Determine media type based on file extension
     if filename.endswith('.pdf'):
         media_type = 'application/pdf'
@@ -668,7 +738,8 @@ async def download_report(
     return FileResponse(
         path=filepath,
         filename=filename,
-        media_type=media_type
+        media_type=media_type,
+        headers=headers
     )
 
 
@@ -837,53 +908,49 @@ async def get_sla_by_percentage(
     else:
         end = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
 
-    # Overall SLA metrics
-    overall = db.query(
-        func.count(Ticket.id).label('total'),
-        func.sum(case((Ticket.resolution_breached == True, 1), else_=0)).label('resolution_breached'),
-        func.sum(case((Ticket.response_breached == True, 1), else_=0)).label('response_breached')
-    ).filter(
-        and_(
-            Ticket.created_at >= start,
-            Ticket.created_at <= end
-        )
-    ).first()
-
-    total_tickets = overall.total or 0
-    resolution_breached = overall.resolution_breached or 0
-    response_breached = overall.response_breached or 0
+    # Served from the ticket_daily_facts rollup, by the day tickets were created
+    in_range = and_(
+        TicketDailyFact.day >= ReportingService.fact_day(start),
+        TicketDailyFact.day <= ReportingService.fact_day(end)
+    )
 
-    # By priority
+    # By priority; the overall figures are their sum
     priority_stats = db.query(
-        Ticket.priority,
-        func.count(Ticket.id).label('total'),
-        func.sum(case((Ticket.resolution_breached == True, 1), else_=0)).label('resolution_breached'),
-        func.sum(case((Ticket.response_breached == True, 1), else_=0)).label('response_breached')
-    ).filter(
-        and_(
-            Ticket.created_at >= start,
-            Ticket.created_at <= end
-        )
-    ).group_by(Ticket.priority).all()
+        TicketDailyFact.priority,
+        func.sum(TicketDailyFact.ticket_count).label('total'),
+        func.sum(TicketDailyFact.resolution_breached_count).label('resolution_breached'),
+        func.sum(TicketDailyFact.response_breached_count).label('response_breached')
+    ).filter(in_range).group_by(TicketDailyFact.priority).having(
+        func.sum(TicketDailyFact.ticket_count) > 0
+    ).all()
+
+    total_tickets = sum(stat.total for stat in priority_stats)
+    resolution_breached = sum(stat.resolution_breached or 0 for stat in priority_stats)
+    response_breached = sum(stat.response_breached or 0 for stat in priority_stats)
+
+    # Weekly trend (last 8 weeks), one query over the daily rows
+    today = ReportingService.fact_day(datetime.now(timezone.utc))
+    first_day = today - timedelta(weeks=8) + timedelta(days=1)
+    daily = {
+        row.day: (row.total, row.breached)
+        for row in db.query(
+            TicketDailyFact.day,
+            func.sum(TicketDailyFact.ticket_count).label('total'),
+            func.sum(TicketDailyFact.resolution_breached_count).label('breached')
+        ).filter(
+            TicketDailyFact.day >= first_day,
+            TicketDailyFact.day <= today
+        ).group_by(TicketDailyFact.day)
+    }
 
-    # Weekly trend (last 8 weeks)
     trends = []
     for i in range(8, 0, -1):
-        week_end = datetime.now(timezone.utc) - timedelta(weeks=i-1)
+        week_end = today - timedelta(weeks=i-1)
         week_start = week_end - timedelta(weeks=1)
+        week = [daily.get(week_start + timedelta(days=d), (0, 0)) for d in range(1, 8)]
 
-        week_stats = db.query(
-            func.count(Ticket.id).label('total'),
-            func.sum(case((Ticket.resolution_breached == True, 1), else_=0)).label('breached')
-        ).filter(
-            and_(
-                Ticket.created_at >= week_start,
-                Ticket.created_at < week_end
-            )
-        ).first()
-
-        week_total = week_stats.total or 0
-        week_breached = week_stats.breached or 0
+        week_total = sum(total or 0 for total, _ in week)
+        week_breached = sum(breached or 0 for _, breached in week)
         compliance = round(((week_total - week_breached) / week_total * 100), 2) if week_total > 0 else 100
 
         trends.append({
@@ -913,7 +980,7 @@ async def get_sla_by_percentage(
         },
         "by_priority": [
             {
-                "priority": str(stat.priority).replace('TicketPriority.', ''),
+                "priority": stat.priority or "None",
                 "total_tickets": stat.total,
                 "resolution_breached": stat.resolution_breached or 0,
                 "response_breached": stat.response_breached or 0,
@@ -6,6 +6,7 @@ from app.core.database import get_db
 from app.core.dependencies import get_current_user, require_manager_or_above
 from app.models.user import User
 from app.services.scheduled_report_service import ScheduledReportService
+from app.services.report_scheduler import get_scheduler_status
 from app.schemas.scheduled_report import (
     ScheduledReportCreate,
     ScheduledReportUpdate,
@@ -46,6 +47,8 @@ async def get_scheduled_reports(
             export_format=r.export_format.value,
             schedule_time=r.schedule_time,
             schedule_day=r.schedule_day,
+            cron_expression=r.cron_expression,
+            timezone=r.timezone,
             recipients=r.recipients or [],
             filters=r.filters,
             is_active=r.is_active,
@@ -76,6 +79,8 @@ async def create_scheduled_report(
         export_format=report_data.export_format.value,
         schedule_time=report_data.schedule_time,
         schedule_day=report_data.schedule_day,
+        cron_expression=report_data.cron_expression,
+        timezone_name=report_data.timezone,
         recipients=report_data.recipients,
         filters=report_data.filters,
         is_active=report_data.is_active,
@@ -91,6 +96,8 @@ async def create_scheduled_report(
         export_format=report.export_format.value,
         schedule_time=report.schedule_time,
         schedule_day=report.schedule_day,
+        cron_expression=report.cron_expression,
+        timezone=report.timezone,
         recipients=report.recipients or [],
         filters=report.filters,
         is_active=report.is_active,
@@ -103,6 +110,18 @@ async def create_scheduled_report(
     )
 
 
+@router.get("/scheduler/status")
+async def scheduler_status(
+    current_user: User = Depends(require_manager_or_above())
+):
+    """
+    Scheduler jobs, this process's report schedule timer and its report
+    executor metrics: runs claimed, succeeded, failed and overdue, and queue
+    lag from due time to start (Manager+ only)
+    """
+    return get_scheduler_status()
+
+
 @router.get("/{report_id}", response_model=ScheduledReportResponse)
 async def get_scheduled_report(
     report_id: int,
@@ -123,6 +142,8 @@ async def get_scheduled_report(
         export_format=report.export_format.value,
         schedule_time=report.schedule_time,
         schedule_day=report.schedule_day,
+        cron_expression=report.cron_expression,
+        timezone=report.timezone,
         recipients=report.recipients or [],
         filters=report.filters,
         is_active=report.is_active,
@@ -153,9 +174,14 @@ async def update_scheduled_report(
     if 'export_format' in update_dict and update_dict['export_format']:
         update_dict['export_format'] = update_dict['export_format'].value
 
-    report = ScheduledReportService.update_scheduled_report(
-        db, report_id, **update_dict
-    )
+    try:
+        report = ScheduledReportService.update_scheduled_report(
+            db, report_id, **update_dict
+        )
+    except ValueError as e:
+        # e.g. weekly with a schedule_day past 7, kept from a monthly schedule
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not report:
         raise HTTPException(status_code=404, detail="Scheduled report not found")
@@ -169,6 +195,8 @@ async def update_scheduled_report(
         export_format=report.export_format.value,
         schedule_time=report.schedule_time,
         schedule_day=report.schedule_day,
+        cron_expression=report.cron_expression,
+        timezone=report.timezone,
         recipients=report.recipients or [],
         filters=report.filters,
         is_active=report.is_active,
@@ -224,7 +252,8 @@ async def execute_report_now(
         record_count=execution.record_count,
         email_sent=execution.email_sent,
         email_sent_at=execution.email_sent_at,
-        email_error=execution.email_error
+        email_error=execution.email_error,
+        deliveries=execution.deliveries
     )
 
 
@@ -254,7 +283,8 @@ async def get_report_execution_history(
             record_count=e.record_count,
             email_sent=e.email_sent,
             email_sent_at=e.email_sent_at,
-            email_error=e.email_error
+            email_error=e.email_error,
+            deliveries=e.deliveries
         )
         for e in executions
     ]
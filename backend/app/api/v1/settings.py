@@ -6,6 +6,7 @@ from app.core.database import get_db
 from app.core.dependencies import get_current_user, require_admin
 from app.models.user import User
 from app.models.system_settings import SystemSettings
+from app.services.sla_config import SLAConfigCache
 from datetime import datetime
 
 router = APIRouter(prefix="/settings", tags=["Settings"])
@@ -159,6 +160,7 @@ async def update_setting(
     setting.value = update_data.value
     setting.updated_at = datetime.utcnow()
     db.commit()
+    SLAConfigCache.invalidate()
     db.refresh(setting)
 
     return setting
@@ -201,6 +203,7 @@ async def update_settings_bulk(
             updated_keys.append(key)
 
     db.commit()
+    SLAConfigCache.invalidate()
 
     return {"message": f"Updated {len(updated_keys)} settings", "updated_keys": updated_keys}
 
@@ -264,6 +267,7 @@ async def reset_setting(
         setting.value = defaults[key]
         setting.updated_at = datetime.utcnow()
         db.commit()
+        SLAConfigCache.invalidate()
         db.refresh(setting)
 
     return setting
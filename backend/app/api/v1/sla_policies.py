@@ -10,6 +10,7 @@ from app.schemas.sla_policy import (
 )
 from app.models.user import User
 from app.models.sla_policy import SLAPolicy
+from app.services.sla_config import SLAConfigCache
 
 router = APIRouter(prefix="/sla-policies", tags=["SLA Policies"])
 
@@ -59,6 +60,7 @@ async def create_sla_policy(
     policy = SLAPolicy(**policy_data.dict())
     db.add(policy)
     db.commit()
+    SLAConfigCache.invalidate()
     db.refresh(policy)
     return policy
 
@@ -84,6 +86,7 @@ async def update_sla_policy(
         setattr(policy, key, value)
 
     db.commit()
+    SLAConfigCache.invalidate()
     db.refresh(policy)
     return policy
 
@@ -108,6 +111,7 @@ async def delete_sla_policy(
 
     db.delete(policy)
     db.commit()
+    SLAConfigCache.invalidate()
     return {"message": "SLA policy deleted successfully"}
 
 
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Union
 import os
+import time
 import uuid
+import logging
 from pathlib import Path
 from fastapi.responses import FileResponse
 from app.core.database import get_db
@@ -14,7 +16,7 @@ from app.schemas.ticket import (
 )
 from app.core.dependencies import require_manager_or_above
 from app.models.ticket_activity import TicketActivity
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import PaginatedResponse, CursorPaginatedResponse
 from app.services.ticket_service import TicketService
 from app.services.sla_service import SLAService
 from app.services.notification_service import NotificationService
@@ -23,15 +25,50 @@ from app.models.ticket import Ticket, TicketAsset
 from app.models.ticket_attachment import TicketAttachment
 from app.models.asset import Asset
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
 UPLOAD_DIR = Path("uploads/tickets")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-@router.get("", response_model=PaginatedResponse)
+def _ticket_list_item(t: Ticket) -> dict:
+    return {
+        "id": t.id,
+        "ticket_number": t.ticket_number,
+        "ticket_type": t.ticket_type,
+        "title": t.title,
+        "description": t.description[:100] + "..." if len(t.description) > 100 else t.description,
+        "status": t.status,
+        "priority": t.priority,
+        "impact": t.impact,
+        "urgency": t.urgency,
+        "requester_id": t.requester_id,
+        "requester_name": t.requester.full_name if t.requester else None,
+        "assignee_id": t.assignee_id,
+        "assignee_name": t.assignee.full_name if t.assignee else None,
+        "category_id": t.category_id,
+        "category_name": t.category.name if t.category else None,
+        "subcategory_name": t.subcategory.name if t.subcategory else None,
+        "created_at": t.created_at,
+        "updated_at": t.updated_at,
+    }
+
+def _report_search_time(response: Response, search: Optional[str], started: float) -> None:
+    if not search:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    response.headers["Server-Timing"] = f"search;dur={elapsed_ms:.1f}"
+    logger.debug("Ticket search %r took %.1f ms", search, elapsed_ms)
+
+@router.get("", response_model=Union[PaginatedResponse, CursorPaginatedResponse])
 async def get_tickets_list(
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     search: Optional[str] = None,
     ticket_type: Optional[str] = None,
     status: Optional[str] = None,
@@ -42,13 +79,17 @@ async def get_tickets_list(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get list of tickets with filters"""
-    skip = (page - 1) * page_size
+    """
+    Get list of tickets with filters.
+
+    When `search` is set the query time is reported in a Server-Timing header.
 
-    tickets, total = TicketService.get_tickets(
-        db,
-        skip=skip,
-        limit=page_size,
+    pagination=cursor switches to keyset pagination: pass the returned
+    next_cursor back as `cursor` to fetch the following page. The total is
+    only returned when include_total=true, and total_is_estimate says whether
+    it is a planner estimate rather than an exact count.
+    """
+    filters = dict(
         search=search,
         ticket_type=ticket_type,
         status=status,
@@ -58,33 +99,29 @@ async def get_tickets_list(
         is_unassigned=is_unassigned,
         current_user=current_user
     )
-    
-    ticket_list = [
-        {
-            "id": t.id,
-            "ticket_number": t.ticket_number,
-            "ticket_type": t.ticket_type,
-            "title": t.title,
-            "description": t.description[:100] + "..." if len(t.description) > 100 else t.description,
-            "status": t.status,
-            "priority": t.priority,
-            "impact": t.impact,
-            "urgency": t.urgency,
-            "requester_id": t.requester_id,
-            "requester_name": t.requester.full_name if t.requester else None,
-            "assignee_id": t.assignee_id,
-            "assignee_name": t.assignee.full_name if t.assignee else None,
-            "category_id": t.category_id,
-            "category_name": t.category.name if t.category else None,
-            "subcategory_name": t.subcategory.name if t.subcategory else None,
-            "created_at": t.created_at,
-            "updated_at": t.updated_at,
-        }
-        for t in tickets
-    ]
-    
+
+    started = time.perf_counter()
+
+    if pagination == "cursor" or cursor:
+        tickets, next_cursor, total, total_is_estimate = TicketService.get_tickets_by_cursor(
+            db, cursor=cursor, limit=page_size, include_total=include_total, **filters
+        )
+        _report_search_time(response, search, started)
+        return CursorPaginatedResponse(
+            items=[_ticket_list_item(t) for t in tickets],
+            page_size=page_size,
+            next_cursor=next_cursor,
+            has_more=next_cursor is not None,
+            total=total,
+            total_is_estimate=total_is_estimate
+        )
+
+    skip = (page - 1) * page_size
+    tickets, total = TicketService.get_tickets(db, skip=skip, limit=page_size, **filters)
+    _report_search_time(response, search, started)
+
     return PaginatedResponse(
-        items=ticket_list,
+        items=[_ticket_list_item(t) for t in tickets],
         total=total,
         page=page,
         page_size=page_size,
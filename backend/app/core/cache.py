@@ -0,0 +1,62 @@
+"""
+Small in-process caches shared by services.
+
+These caches are per worker process - they trade a few seconds of staleness
+for not hitting the database on every request.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe key/value cache where every entry expires after `ttl` seconds"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                self._evict()
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def _evict(self) -> None:
+        # Drop expired entries first, then the oldest half if still full
+        now = time.monotonic()
+        for k in [k for k, (exp, _) in self._data.items() if exp < now]:
+            del self._data[k]
+        if len(self._data) >= self.maxsize:
+            oldest = sorted(self._data.items(), key=lambda item: item[1][0])
+            for k, _ in oldest[: len(oldest) // 2 or 1]:
+                del self._data[k]
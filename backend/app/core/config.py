@@ -14,6 +14,37 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Live chat event fan-out between API workers: "redis" (pub/sub on
+    # REDIS_URL) whenever more than one worker serves WebSockets, "local" for
+    # a single worker
+    CHAT_BACKPLANE: str = "local"
+    CHAT_PUBLISH_TIMEOUT_SECONDS: float = 1.0
+    # How often presence changes are saved to user_online_status, in batches
+    PRESENCE_FLUSH_SECONDS: float = 2.0
+
+    # Record numbers (INC/REQ/PRB/CHG/KE) reserved per round trip by each worker.
+    # Larger blocks mean fewer counter updates but numbers from different
+    # workers interleave and a restart leaves gaps.
+    NUMBER_BLOCK_SIZE: int = 1
+
+    # Fraction of an SLA target that may elapse before SLA_BREACH_WARNING is sent
+    SLA_WARNING_THRESHOLD: float = 0.8
+
+    # Worker processes per API process rendering background report exports
+    EXPORT_WORKERS: int = 2
+    # Size bound of exports/reports; least recently used files are evicted
+    REPORT_CACHE_MAX_MB: int = 1024
+    # Scheduled reports run concurrently per API process, and the time after
+    # which a run's queries and SMTP calls time out
+    SCHEDULED_REPORT_WORKERS: int = 4
+    SCHEDULED_REPORT_TIMEOUT_SECONDS: int = 600
+    # How often the in-memory report schedule is reloaded, to pick up edits
+    # made through other API processes
+    SCHEDULED_REPORT_RESYNC_MINUTES: int = 15
+    # Days of ticket_daily_facts recomputed by the nightly rebuild; older days
+    # only change when old tickets are edited, which the flush hook handles
+    TICKET_FACT_REBUILD_DAYS: int = 35
     
     # Email Settings
     SMTP_HOST: str = "smtp.gmail.com"
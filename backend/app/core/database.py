@@ -1,6 +1,10 @@
+import json
+from typing import Tuple
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker, Session, Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from .config import settings
 
 engine = create_engine(
@@ -22,4 +26,34 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+class _ExplainJSON(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper so bind params go through normal processing"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_ExplainJSON, "postgresql")
+def _compile_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_row_count(db: Session, query: Query) -> Tuple[int, bool]:
+    """
+    Return (rows, is_estimate): the planner's row estimate for a query,
+    without executing it.
+
+    Only PostgreSQL exposes planner estimates; on other dialects this falls
+    back to an exact COUNT and is_estimate is False.
+    """
+    query = query.order_by(None)
+    if db.get_bind().dialect.name != "postgresql":
+        return query.count(), False
+    plan = db.execute(_ExplainJSON(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"]), True
@@ -14,11 +14,20 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler for startup/shutdown events"""
     # Startup
     from app.services.report_scheduler import start_scheduler
+    from app.services.sla_warning_service import SLAWarningService
+    from app.services.export_job_service import ExportJobService
+    from app.services.websocket_manager import manager
     start_scheduler()
+    SLAWarningService.start()
+    ExportJobService.start()
+    await manager.start()
     yield
     # Shutdown
     from app.services.report_scheduler import stop_scheduler
     stop_scheduler()
+    SLAWarningService.stop()
+    ExportJobService.stop()
+    await manager.stop()
 
 
 app = FastAPI(
@@ -8,11 +8,14 @@ from app.models.ticket import Ticket, TicketType, TicketStatus, TicketPriority,
 from app.models.ticket_comment import TicketComment
 from app.models.ticket_attachment import TicketAttachment
 from app.models.ticket_activity import TicketActivity
+from app.models.ticket_counter import TicketCounter
+from app.models.ticket_daily_fact import TicketDailyFact
 from app.models.category import Category, Subcategory
 from app.models.group import Group, group_members
 from app.models.sla_policy import SLAPolicy
 from app.models.sla_pause import SLAPause
 from app.models.system_settings import SystemSettings
+from app.models.number_sequence import NumberSequence
 from app.models.asset import (
     Asset,
     AssetType,
@@ -44,6 +47,7 @@ from app.models.scheduled_report import (
     ScheduledReport, ReportExecution, ReportTemplate,
     ReportType, ReportFrequency, ExportFormat
 )
+from app.models.export_job import ExportJob, ExportJobStatus
 from app.models.change_template import ChangeTemplate
 from app.models.integration import (
     Integration, ImportJob, ImportedItem,
@@ -73,6 +77,8 @@ __all__ = [
     "TicketComment",
     "TicketAttachment",
     "TicketActivity",
+    "TicketCounter",
+    "TicketDailyFact",
     "Category",
     "Subcategory",
     "Group",
@@ -99,6 +105,7 @@ __all__ = [
     'ArticleView',
     'ArticleStatus',
     'SystemSettings',
+    'NumberSequence',
     'Notification',
     'NotificationPreference',
     'NotificationType',
@@ -120,6 +127,8 @@ __all__ = [
     'ReportType',
     'ReportFrequency',
     'ExportFormat',
+    'ExportJob',
+    'ExportJobStatus',
     'ChangeTemplate',
     'Integration',
     'ImportJob',
@@ -0,0 +1,65 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum, Index, Table, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+
+from app.core.database import Base
+
+
+class ExportJobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    IN_PROGRESS = "IN_PROGRESS"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+# Statuses whose dedupe_key must be unique: identical requests join the job
+ACTIVE_EXPORT_STATUSES = ("PENDING", "IN_PROGRESS")
+_ACTIVE = text("status IN ('PENDING', 'IN_PROGRESS')")
+
+# Everyone who asked for a job, including those who joined an identical request
+export_job_requesters = Table(
+    'export_job_requesters',
+    Base.metadata,
+    Column('job_id', Integer, ForeignKey('export_jobs.id', ondelete='CASCADE'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True),
+)
+
+
+class ExportJob(Base):
+    """Report export rendered in the background by app.services.export_job_service"""
+    __tablename__ = "export_jobs"
+    __table_args__ = (
+        Index(
+            "uq_export_jobs_active_dedupe_key", "dedupe_key", unique=True,
+            postgresql_where=_ACTIVE, sqlite_where=_ACTIVE,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # sha256 of report type, format, dates and filters as requested
+    dedupe_key = Column(String(64), nullable=False, index=True)
+    status = Column(Enum(ExportJobStatus), nullable=False, default=ExportJobStatus.PENDING)
+
+    # Request
+    report_type = Column(String(50), nullable=False)
+    export_format = Column(String(20), nullable=False)
+    start_date = Column(String(50), nullable=True)
+    end_date = Column(String(50), nullable=True)
+    filters = Column(JSON, nullable=True)
+
+    # Progress (0-100) and result
+    progress = Column(Integer, nullable=False, default=0)
+    file_name = Column(String(255), nullable=True)
+    file_path = Column(String(500), nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    requested_by = relationship("User", foreign_keys=[requested_by_id])
+
+    def __repr__(self):
+        return f"<ExportJob {self.id} {self.report_type}/{self.export_format} {self.status}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Table, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Table, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -43,6 +43,8 @@ conversation_participants = Table(
     Column('is_muted', Boolean, default=False),
     Column('last_read_at', DateTime(timezone=True), nullable=True),
     Column('last_read_message_id', Integer, nullable=True),
+    # Maintained by ChatCounterService
+    Column('unread_count', Integer, nullable=False, default=0, server_default='0'),
 )
 
 
@@ -78,6 +80,7 @@ class LiveConversation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_message_at = Column(DateTime(timezone=True), nullable=True)
+    last_message_id = Column(Integer, nullable=True)  # Maintained by ChatCounterService
 
     # Relationships
     created_by = relationship("User", foreign_keys=[created_by_id])
@@ -93,6 +96,10 @@ class LiveConversation(Base):
 class LiveMessage(Base):
     """Individual chat message"""
     __tablename__ = "live_messages"
+    __table_args__ = (
+        # Latest messages of a conversation (conversation list, message history)
+        Index("ix_live_messages_conversation_created", "conversation_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("live_conversations.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class NumberSequence(Base):
+    """Counter behind human-readable record numbers (INC-000123, PRB-000045, ...)"""
+    __tablename__ = "number_sequences"
+
+    prefix = Column(String(20), primary_key=True)
+    last_value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<NumberSequence {self.prefix}={self.last_value}>"
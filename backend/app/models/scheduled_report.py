@@ -49,6 +49,8 @@ class ScheduledReport(Base):
     # Schedule settings
     schedule_time = Column(String(5))  # HH:MM format
     schedule_day = Column(Integer)  # For weekly (1-7) or monthly (1-31)
+    cron_expression = Column(String(100))  # Overrides frequency, time and day when set
+    timezone = Column(String(64), default="UTC")  # Zone the schedule is evaluated in
     last_run_at = Column(DateTime)
     next_run_at = Column(DateTime)
 
@@ -92,6 +94,8 @@ class ReportExecution(Base):
     email_sent = Column(Boolean, default=False)
     email_sent_at = Column(DateTime)
     email_error = Column(Text)
+    # Per recipient: [{"recipient", "status": "sent" | "failed", "sent_at" | "error"}]
+    deliveries = Column(JSON)
 
     # Relationships
     scheduled_report = relationship("ScheduledReport", back_populates="executions")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -35,6 +35,10 @@ class TicketUrgency(enum.Enum):
     MEDIUM = "MEDIUM"
     HIGH = "HIGH"
 
+# Statuses whose SLA clocks are still running, for the partial SLA indexes
+_SLA_OPEN = "('NEW', 'OPEN', 'IN_PROGRESS', 'PENDING')"
+
+
 class TicketAsset(Base):
     """Junction table for many-to-many relationship between tickets and assets"""
     __tablename__ = "ticket_assets"
@@ -52,6 +56,21 @@ class TicketAsset(Base):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Keyset pagination order for the ticket list (created_at desc, id desc)
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        # SLA breach scanner: only open tickets whose SLA hasn't been flagged yet
+        Index(
+            "ix_tickets_response_due_unbreached", "response_due",
+            postgresql_where=text(f"response_breached IS NOT TRUE AND status IN {_SLA_OPEN}"),
+            sqlite_where=text(f"response_breached IS NOT 1 AND status IN {_SLA_OPEN}"),
+        ),
+        Index(
+            "ix_tickets_resolution_due_unbreached", "resolution_due",
+            postgresql_where=text(f"resolution_breached IS NOT TRUE AND status IN {_SLA_OPEN}"),
+            sqlite_where=text(f"resolution_breached IS NOT 1 AND status IN {_SLA_OPEN}"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ticket_number = Column(String(50), unique=True, nullable=False, index=True)
@@ -74,8 +93,11 @@ class Ticket(Base):
     first_response_at = Column(DateTime(timezone=True), nullable=True)
     response_breached = Column(Boolean, default=False)
     resolution_breached = Column(Boolean, default=False)
+    # When the SLA_BREACH_WARNING for each SLA is due; cleared once it is sent
+    response_warning_at = Column(DateTime(timezone=True), nullable=True)
+    resolution_warning_at = Column(DateTime(timezone=True), nullable=True)
     resolution_notes = Column(Text, nullable=True)
-    resolved_at = Column(DateTime(timezone=True), nullable=True)
+    resolved_at = Column(DateTime(timezone=True), nullable=True, index=True)
     resolved_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     closed_at = Column(DateTime(timezone=True), nullable=True)
     closed_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Index
+from app.core.database import Base
+
+
+class TicketCounter(Base):
+    """
+    Rollup of ticket counts per (status, priority, assignee, group, requester).
+
+    Maintained in the same transaction as ticket changes by
+    app.services.ticket_counter_service and repaired by its reconcile job.
+    Missing ids are stored as 0 so the composite key stays unique.
+    """
+    __tablename__ = "ticket_counters"
+    __table_args__ = (
+        Index("ix_ticket_counters_assignee_id", "assignee_id"),
+        Index("ix_ticket_counters_requester_id", "requester_id"),
+    )
+
+    status = Column(String(20), primary_key=True)
+    priority = Column(String(20), primary_key=True)
+    assignee_id = Column(Integer, primary_key=True, default=0)
+    assigned_group_id = Column(Integer, primary_key=True, default=0)
+    requester_id = Column(Integer, primary_key=True, default=0)
+    ticket_count = Column(Integer, nullable=False, default=0)
+    breached_count = Column(Integer, nullable=False, default=0)  # resolution SLA breached
+
+    def __repr__(self):
+        return f"<TicketCounter {self.status}/{self.priority} a={self.assignee_id} n={self.ticket_count}>"
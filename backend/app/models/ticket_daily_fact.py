@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, String, Float, Date, Text, Index
+from app.core.database import Base
+
+
+class TicketDailyFact(Base):
+    """
+    Daily rollup of ticket facts per (day, category, priority, group, assignee,
+    status, type), read by the trend reports instead of scanning tickets.
+
+    A ticket counts towards the row of the UTC day it was created, which holds
+    its response/resolution minutes and SLA outcome, and towards the row of the
+    day it was resolved (resolved_on_day_count). Maintained in the same
+    transaction as ticket changes by app.services.ticket_fact_service and
+    rebuilt nightly. Missing ids are stored as 0 so the composite key stays
+    unique.
+    """
+    __tablename__ = "ticket_daily_facts"
+    __table_args__ = (
+        Index("ix_ticket_daily_facts_category_day", "category_id", "day"),
+    )
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True, default=0)
+    priority = Column(String(20), primary_key=True)
+    assigned_group_id = Column(Integer, primary_key=True, default=0)
+    assignee_id = Column(Integer, primary_key=True, default=0)
+    status = Column(String(20), primary_key=True)
+    ticket_type = Column(String(20), primary_key=True)
+
+    # Tickets created on this day
+    ticket_count = Column(Integer, nullable=False, default=0)
+    responded_count = Column(Integer, nullable=False, default=0)
+    response_minutes_sum = Column(Float, nullable=False, default=0)
+    response_minutes_sq = Column(Float, nullable=False, default=0)
+    response_minutes_min = Column(Float, nullable=True)
+    response_minutes_max = Column(Float, nullable=True)
+    resolved_count = Column(Integer, nullable=False, default=0)
+    resolution_minutes_sum = Column(Float, nullable=False, default=0)
+    resolution_minutes_sq = Column(Float, nullable=False, default=0)
+    resolution_minutes_min = Column(Float, nullable=True)
+    resolution_minutes_max = Column(Float, nullable=True)
+    sla_met_count = Column(Integer, nullable=False, default=0)  # resolved by resolution_due
+    response_breached_count = Column(Integer, nullable=False, default=0)
+    resolution_breached_count = Column(Integer, nullable=False, default=0)
+    # QuantileSketch (JSON) of the response/resolution minutes, for percentiles
+    response_sketch = Column(Text, nullable=True)
+    resolution_sketch = Column(Text, nullable=True)
+
+    # Tickets resolved on this day, whenever they were created
+    resolved_on_day_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TicketDailyFact {self.day} {self.status}/{self.priority} n={self.ticket_count}>"
@@ -22,4 +22,12 @@ class PaginatedResponse(BaseModel):
     total_pages: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CursorPaginatedResponse(BaseModel):
+    items: list
+    page_size: int
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total: Optional[int] = None
+    total_is_estimate: bool = False
@@ -41,9 +41,15 @@ class GranularityEnum(str, Enum):
 class GroupByEnum(str, Enum):
     PRIORITY = "priority"
     CATEGORY = "category"
+    GROUP = "group"
     ASSIGNEE = "assignee"
 
 
+class TimeMetricEnum(str, Enum):
+    RESPONSE = "response"
+    RESOLUTION = "resolution"
+
+
 # ============================================================================
 # REQUEST SCHEMAS
 # ============================================================================
@@ -79,6 +85,13 @@ class ResolutionTimeAnalysisRequest(BaseModel):
     group_by: GroupByEnum = GroupByEnum.PRIORITY
 
 
+class TimePercentilesRequest(BaseModel):
+    start_date: str
+    end_date: str
+    metric: TimeMetricEnum = TimeMetricEnum.RESOLUTION
+    group_by: GroupByEnum = GroupByEnum.PRIORITY
+
+
 class TicketVolumeTrendsRequest(BaseModel):
     start_date: str
     end_date: str
@@ -260,6 +273,14 @@ class ResolutionTimeAnalysis(BaseModel):
     ticket_count: int
 
 
+class TimePercentiles(BaseModel):
+    group: str
+    ticket_count: int
+    p50_hours: float
+    p90_hours: float
+    p99_hours: float
+
+
 class TicketVolumeTrendData(BaseModel):
     period: str
     created: int
@@ -326,9 +347,15 @@ class ReportExecutionResponse(BaseModel):
         from_attributes = True
 
 
-class ExportResponse(BaseModel):
-    success: bool
-    file_path: Optional[str] = None
+class ExportJobResponse(BaseModel):
+    job_id: int
+    status: str  # PENDING, IN_PROGRESS, COMPLETED, FAILED
+    progress: int
+    report_type: str
+    format: str
     file_name: Optional[str] = None
-    download_url: Optional[str] = None
-    message: Optional[str] = None
+    download_url: Optional[str] = None  # set once COMPLETED
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
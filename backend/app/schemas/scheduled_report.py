@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
+from app.services.report_schedule import validate_cron_expression, validate_timezone
+
 
 class ReportTypeEnum(str, Enum):
     SLA_COMPLIANCE = "sla_compliance"
@@ -37,10 +39,29 @@ class ScheduledReportCreate(BaseModel):
     export_format: ExportFormatEnum = ExportFormatEnum.PDF
     schedule_time: str = Field(..., pattern=r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$', description="Time in HH:MM format")
     schedule_day: Optional[int] = Field(None, ge=1, le=31, description="Day of week (1-7) for weekly, day of month (1-31) for monthly")
+    cron_expression: Optional[str] = Field(None, max_length=100, description="Five-field crontab; overrides frequency, time and day")
+    timezone: str = Field("UTC", description="IANA time zone the schedule is evaluated in")
     recipients: List[str] = Field(..., min_items=1, description="List of email addresses")
     filters: Optional[Dict[str, Any]] = None
     is_active: bool = True
 
+    @field_validator('cron_expression')
+    @classmethod
+    def check_cron_expression(cls, v):
+        return validate_cron_expression(v) if v and v.strip() else v
+
+    @field_validator('timezone')
+    @classmethod
+    def check_timezone(cls, v):
+        validate_timezone(v)
+        return v
+
+    @model_validator(mode='after')
+    def check_weekly_day(self):
+        if self.frequency == ReportFrequencyEnum.WEEKLY and self.schedule_day and self.schedule_day > 7:
+            raise ValueError("schedule_day must be 1-7 (Monday-Sunday) for weekly reports")
+        return self
+
 
 class ScheduledReportUpdate(BaseModel):
     """Schema for updating a scheduled report"""
@@ -51,10 +72,24 @@ class ScheduledReportUpdate(BaseModel):
     export_format: Optional[ExportFormatEnum] = None
     schedule_time: Optional[str] = Field(None, pattern=r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$')
     schedule_day: Optional[int] = Field(None, ge=1, le=31)
+    cron_expression: Optional[str] = Field(None, max_length=100, description="Empty string clears it")
+    timezone: Optional[str] = None
     recipients: Optional[List[str]] = None
     filters: Optional[Dict[str, Any]] = None
     is_active: Optional[bool] = None
 
+    @field_validator('cron_expression')
+    @classmethod
+    def check_cron_expression(cls, v):
+        return validate_cron_expression(v) if v and v.strip() else v
+
+    @field_validator('timezone')
+    @classmethod
+    def check_timezone(cls, v):
+        if v is not None:
+            validate_timezone(v)
+        return v
+
 
 class ScheduledReportResponse(BaseModel):
     """Schema for scheduled report response"""
@@ -66,6 +101,8 @@ class ScheduledReportResponse(BaseModel):
     export_format: str
     schedule_time: Optional[str]
     schedule_day: Optional[int]
+    cron_expression: Optional[str] = None
+    timezone: Optional[str] = None
     recipients: List[str]
     filters: Optional[Dict[str, Any]]
     is_active: bool
@@ -85,7 +122,12 @@ class ReportExecutionResponse(BaseModel):
     id: int
     scheduled_report_id: int
     executed_at: datetime
-    status: str
+    status: str = Field(
+        ...,
+        description="success; failed (not generated, see error_message, or every recipient "
+                    "failed, see email_error and deliveries); or partial (generated, but some "
+                    "recipients failed)"
+    )
     error_message: Optional[str]
     file_path: Optional[str]
     file_size: Optional[int]
@@ -93,6 +135,7 @@ class ReportExecutionResponse(BaseModel):
     email_sent: bool
     email_sent_at: Optional[datetime]
     email_error: Optional[str]
+    deliveries: Optional[List[Dict[str, Any]]] = None
 
     class Config:
         from_attributes = True
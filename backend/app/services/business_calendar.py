@@ -0,0 +1,129 @@
+"""
+Business-hours calendar arithmetic for SLA due dates.
+
+BusinessCalendar.add_minutes gives the same results as the original
+day-by-day loop in SLAService.add_business_minutes, but in constant time:
+whole weeks are skipped arithmetically, the first and last partial days are
+handled directly, and holidays are counted with bisect over a sorted list.
+
+All arithmetic is wall-clock in the start time's timezone, like the loop it
+replaces, so a due date at 10:00 stays 10:00 across a DST change.
+"""
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Union
+
+
+class BusinessCalendar:
+    def __init__(self, start_hour: int = 9, end_hour: int = 18,
+                 working_days: Iterable[int] = (0, 1, 2, 3, 4),
+                 holidays: Iterable[date] = ()):
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.working_days = frozenset(working_days)
+        # Only holidays that fall on working days affect the arithmetic
+        self.holidays: List[date] = sorted({d for d in holidays if d.weekday() in self.working_days})
+        self._holiday_set = frozenset(self.holidays)
+        self.day_minutes = (end_hour - start_hour) * 60
+        self.days_per_week = len(self.working_days)
+
+        if self.day_minutes <= 0 or not self.working_days:
+            raise ValueError("Business calendar has no working time")
+
+    def is_working_day(self, day: date) -> bool:
+        return day.weekday() in self.working_days and day not in self._holiday_set
+
+    def _next_working_day(self, day: date) -> date:
+        """First working day strictly after day"""
+        day += timedelta(days=1)
+        while not self.is_working_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def _add_weekdays(self, day: date, count: int) -> date:
+        """The count-th working weekday after day (ignoring holidays)"""
+        weeks, rest = divmod(count, self.days_per_week)
+        if rest == 0 and weeks > 0:
+            weeks, rest = weeks - 1, self.days_per_week
+        day += timedelta(weeks=weeks)
+        while rest:
+            day += timedelta(days=1)
+            if day.weekday() in self.working_days:
+                rest -= 1
+        return day
+
+    def _add_working_days(self, day: date, count: int) -> date:
+        """The count-th working day after day, skipping holidays"""
+        if count <= 0:
+            return day
+        target = self._add_weekdays(day, count)
+        if not self.holidays:
+            return target
+        # Each holiday in (day, target] pushes the target one working day further;
+        # repeat until the extension itself contains no new holidays
+        counted = 0
+        while True:
+            in_range = bisect_right(self.holidays, target) - bisect_right(self.holidays, day)
+            if in_range == counted:
+                return target
+            target = self._add_weekdays(target, in_range - counted)
+            counted = in_range
+
+    def _day_start(self, day: date, tzinfo) -> datetime:
+        return datetime(day.year, day.month, day.day, self.start_hour, tzinfo=tzinfo)
+
+    def add_minutes(self, start_time: datetime, minutes: int) -> datetime:
+        """Add business minutes to start_time"""
+        if minutes <= 0:
+            return start_time
+
+        current = start_time
+        day = current.date()
+        hour = current.hour
+
+        # Move onto working time, as the first pass of the original loop did
+        if hour >= self.end_hour or not self.is_working_day(day):
+            day = self._next_working_day(day)
+            current = self._day_start(day, current.tzinfo)
+        elif hour < self.start_hour:
+            current = self._day_start(day, current.tzinfo)
+
+        # First (possibly partial) day; seconds past the minute are not counted
+        minutes_until_eod = (self.end_hour - current.hour) * 60 - current.minute
+        if current.second or current.microsecond:
+            minutes_until_eod -= 1
+        if minutes <= minutes_until_eod:
+            return current + timedelta(minutes=minutes)
+        remaining = minutes - minutes_until_eod
+
+        # Whole days, then the final partial day (1..day_minutes minutes into it)
+        full_days, remaining = divmod(remaining - 1, self.day_minutes)
+        last_day = self._add_working_days(day, full_days + 1)
+        return self._day_start(last_day, current.tzinfo) + timedelta(minutes=remaining + 1)
+
+    def add_minutes_many(self, start_times: Sequence[datetime],
+                         minutes: Union[int, Sequence[int]]) -> List[datetime]:
+        """
+        Due dates for a batch of tickets sharing this calendar.
+
+        minutes may be one value for every ticket or one per ticket.
+        """
+        if isinstance(minutes, int):
+            minutes = [minutes] * len(start_times)
+        if len(minutes) != len(start_times):
+            raise ValueError("start_times and minutes must have the same length")
+        return [self.add_minutes(start, mins) for start, mins in zip(start_times, minutes)]
+
+
+def parse_holidays(value: Optional[str]) -> List[date]:
+    """Parse a comma-separated list of ISO dates, ignoring invalid entries"""
+    holidays = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            holidays.append(date.fromisoformat(part))
+        except ValueError:
+            continue
+    return holidays
@@ -5,16 +5,13 @@ from datetime import datetime
 from app.models.change import Change, ChangeActivity, ChangeTask, ChangeStatus, ChangeType
 from app.models.user import User
 from app.schemas.change import ChangeCreate, ChangeUpdate
+from app.services.number_allocator import NumberAllocator
 
 class ChangeService:
     @staticmethod
     def generate_change_number(db: Session) -> str:
         """Generate unique change number"""
-        last_change = db.query(Change).order_by(Change.id.desc()).first()
-        if last_change:
-            last_num = int(last_change.change_number.split('-')[1])
-            return f"CHG-{last_num + 1:06d}"
-        return "CHG-000001"
+        return NumberAllocator.next_number(db, "CHG")
     
     @staticmethod
     def create_change(db: Session, change_data: ChangeCreate, requester_id: int) -> Change:
@@ -0,0 +1,146 @@
+"""
+Pub/sub backplane carrying live chat events between API workers.
+
+Each worker holds only its own WebSockets. ConnectionManager delivers an
+event to its local sockets, then publishes it here. Every other worker
+receives it and delivers it to the sockets it holds. Workers recognise and
+skip their own events.
+
+- RedisBackplane (CHAT_BACKPLANE=redis) uses Redis pub/sub on REDIS_URL, so
+  events reach workers on every host within one Redis round trip. Publishes
+  time out after CHAT_PUBLISH_TIMEOUT_SECONDS. The listener resubscribes
+  with backoff if Redis goes away; meanwhile each worker still serves its
+  own sockets.
+- LocalBackplane is the in-process stand-in for a single worker and for
+  tests. Backplanes sharing a LocalHub behave like workers sharing Redis.
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHAT_CHANNEL = "supportx:live_chat"
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _encode(event: Dict[str, Any]) -> str:
+    return json.dumps(event, default=str, separators=(",", ":"))
+
+
+class Backplane(ABC):
+    """Publishes chat events to every worker and hands received events to a handler"""
+
+    @abstractmethod
+    async def start(self, handler: Handler) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, event: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def stop(self) -> None:
+        ...
+
+
+class LocalHub:
+    """What the Redis channel is to RedisBackplane: every backplane started on it"""
+
+    def __init__(self):
+        self.backplanes: List["LocalBackplane"] = []
+
+
+class LocalBackplane(Backplane):
+    def __init__(self, hub: Optional[LocalHub] = None):
+        self.hub = hub or LocalHub()
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+        if self not in self.hub.backplanes:
+            self.hub.backplanes.append(self)
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        # Round-trip through JSON, as over Redis
+        payload = _encode(event)
+        for backplane in list(self.hub.backplanes):
+            try:
+                await backplane._handler(json.loads(payload))
+            except Exception as e:
+                logger.error(f"Error handling chat event: {e}")
+
+    async def stop(self) -> None:
+        if self in self.hub.backplanes:
+            self.hub.backplanes.remove(self)
+
+
+class RedisBackplane(Backplane):
+    def __init__(self, url: str, channel: str = CHAT_CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler) -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(self.url, decode_responses=True)
+        self._task = asyncio.create_task(self._listen(handler))
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        if self._redis is None:
+            return
+        await asyncio.wait_for(
+            self._redis.publish(self.channel, _encode(event)),
+            settings.CHAT_PUBLISH_TIMEOUT_SECONDS
+        )
+
+    async def _listen(self, handler: Handler) -> None:
+        delay = 1
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                if delay > 1:
+                    logger.info("Chat backplane resubscribed")
+                delay = 1
+                async for message in pubsub.listen():
+                    try:
+                        await handler(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.error(f"Error handling chat event: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Chat backplane disconnected: {e}; retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def create_backplane() -> Backplane:
+    if settings.CHAT_BACKPLANE == "redis":
+        return RedisBackplane(settings.REDIS_URL)
+    return LocalBackplane()
@@ -0,0 +1,172 @@
+"""
+Denormalised live chat counters, so the inbox reads them instead of counting messages.
+
+- live_conversation_participants.unread_count: messages from others after
+  last_read_message_id, or all of them if the participant has never read
+  the conversation. Deleted messages never count.
+- live_conversations.last_message_id: the conversation's latest message
+  that is not deleted.
+
+The chat endpoints update both in the same transaction as the change:
+message_added for every new message (system messages included),
+message_deleted, mark_read / mark_all_read, and participants_added. Leaving
+a conversation deletes the participant row and its counter with it.
+Each update is a single UPDATE, so concurrent senders never lose increments.
+reconcile() recomputes both from live_messages and repairs any drift; it is
+scheduled from report_scheduler.
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import and_, desc, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.live_chat import LiveConversation, LiveMessage, conversation_participants
+
+logger = logging.getLogger(__name__)
+
+participants = conversation_participants
+
+
+def unread_count_expression():
+    """The true unread count of each participants row, as a correlated subquery"""
+    return select(func.count(LiveMessage.id)).where(
+        LiveMessage.conversation_id == participants.c.conversation_id,
+        LiveMessage.is_deleted == False,
+        LiveMessage.sender_id != participants.c.user_id,
+        or_(
+            participants.c.last_read_message_id.is_(None),
+            LiveMessage.id > participants.c.last_read_message_id
+        )
+    ).scalar_subquery()
+
+
+def latest_message_expression(*criteria):
+    """Id of each conversation's latest message that is not deleted, as a correlated subquery"""
+    return select(LiveMessage.id).where(
+        LiveMessage.conversation_id == LiveConversation.id,
+        LiveMessage.is_deleted == False,
+        *criteria
+    ).order_by(desc(LiveMessage.created_at), desc(LiveMessage.id)).limit(1).scalar_subquery()
+
+
+def _participant(conversation_id: int, user_id: int):
+    return and_(participants.c.conversation_id == conversation_id, participants.c.user_id == user_id)
+
+
+class ChatCounterService:
+    @staticmethod
+    def message_added(db: Session, message: LiveMessage) -> None:
+        """Count a new (flushed) message as unread and make it the conversation's last message"""
+        db.execute(
+            participants.update().where(
+                participants.c.conversation_id == message.conversation_id,
+                participants.c.user_id != message.sender_id
+            ).values(unread_count=participants.c.unread_count + 1)
+        )
+        # Guarded so a slower concurrent send cannot move the pointer back
+        db.execute(
+            update(LiveConversation).where(
+                LiveConversation.id == message.conversation_id,
+                or_(LiveConversation.last_message_id.is_(None), LiveConversation.last_message_id < message.id)
+            ).values(last_message_id=message.id, last_message_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def message_deleted(db: Session, message: LiveMessage) -> None:
+        """
+        Uncount a message that is being soft-deleted from everyone it was unread
+        for, and if it was the last message, point to the one before it.
+        """
+        db.execute(
+            participants.update().where(
+                participants.c.conversation_id == message.conversation_id,
+                participants.c.user_id != message.sender_id,
+                participants.c.unread_count > 0,
+                or_(
+                    participants.c.last_read_message_id.is_(None),
+                    participants.c.last_read_message_id < message.id
+                )
+            ).values(unread_count=participants.c.unread_count - 1)
+        )
+        # The message is not flagged deleted yet, so skip it by id
+        db.execute(
+            update(LiveConversation).where(
+                LiveConversation.id == message.conversation_id,
+                LiveConversation.last_message_id == message.id
+            ).values(last_message_id=latest_message_expression(LiveMessage.id != message.id))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def mark_read(db: Session, conversation_id: int, user_id: int, message_id: int) -> None:
+        """Move a participant's read position to message_id and recount what is left after it"""
+        db.execute(
+            participants.update().where(_participant(conversation_id, user_id)).values(
+                last_read_at=datetime.utcnow(),
+                last_read_message_id=message_id
+            )
+        )
+        # Only the messages after the new position are counted
+        db.execute(
+            participants.update().where(_participant(conversation_id, user_id))
+            .values(unread_count=unread_count_expression())
+        )
+
+    @staticmethod
+    def mark_all_read(db: Session, conversation_id: int, user_id: int) -> Optional[int]:
+        """
+        Read up to the last message; returns its id, or None if there are no messages.
+
+        The count is recomputed rather than zeroed, so a message sent after
+        last_message_id was read stays unread.
+        """
+        last_message_id = db.query(LiveConversation.last_message_id).filter(
+            LiveConversation.id == conversation_id
+        ).scalar()
+        if last_message_id is None:
+            return None
+        ChatCounterService.mark_read(db, conversation_id, user_id, last_message_id)
+        return last_message_id
+
+    @staticmethod
+    def participants_added(db: Session, conversation_id: int, user_ids: List[int]) -> None:
+        """New participants have read nothing yet, so every existing message is unread"""
+        if not user_ids:
+            return
+        db.execute(
+            participants.update().where(
+                participants.c.conversation_id == conversation_id,
+                participants.c.user_id.in_(user_ids)
+            ).values(unread_count=unread_count_expression())
+        )
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Recompute unread counts and last-message pointers and fix rows that drifted.
+
+        Each repair is one UPDATE whose subquery recounts live_messages. A message
+        sent while it runs can leave one count off by one until the next run.
+        Returns the number of rows repaired.
+        """
+        unread = unread_count_expression()
+        counts = db.execute(
+            participants.update().where(participants.c.unread_count != unread)
+            .values(unread_count=unread)
+        ).rowcount
+
+        latest = latest_message_expression()
+        pointers = db.execute(
+            update(LiveConversation).where(
+                func.coalesce(LiveConversation.last_message_id, 0) != func.coalesce(latest, 0)
+            ).values(last_message_id=latest, updated_at=LiveConversation.updated_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        db.commit()
+        if counts or pointers:
+            logger.warning(f"Chat counters: repaired {counts} unread counts and {pointers} last-message pointers")
+        return counts + pointers
@@ -0,0 +1,140 @@
+"""
+Dashboard ticket counters.
+
+Counters are read from the `ticket_counters` rollup (see
+ticket_counter_service), so each scope costs one SUM(...) FILTER (WHERE ...)
+over a handful of rollup rows instead of a scan of `tickets`. Results are
+still cached briefly so that many agents polling the dashboard share a
+single query per refresh window:
+
+- global: every ticket (shared by all staff)
+- assignee: tickets assigned to one agent ("my tickets")
+- requester: tickets raised by one end user
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import func, and_
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.ticket_counter import TicketCounter
+
+DASHBOARD_CACHE_TTL = 15  # seconds
+
+_counter_cache = TTLCache(ttl=DASHBOARD_CACHE_TTL)
+
+OPEN_STATUSES = [TicketStatus.NEW.value, TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value]
+
+
+class DashboardService:
+    @staticmethod
+    def _aggregate(db: Session, counter_scope: list, ticket_scope: list) -> dict:
+        """Compute every counter for the given scope in a single pass over the rollup"""
+        not_closed = TicketCounter.status != TicketStatus.CLOSED.value
+        unassigned = TicketCounter.assignee_id == 0
+        critical = TicketCounter.priority == TicketPriority.CRITICAL.value
+        tickets = func.sum(TicketCounter.ticket_count)
+
+        row = db.query(
+            tickets.label("total"),
+            tickets.filter(TicketCounter.status.in_(OPEN_STATUSES)).label("open"),
+            tickets.filter(not_closed).label("not_closed"),
+            tickets.filter(unassigned).label("unassigned_all"),
+            tickets.filter(and_(unassigned, not_closed)).label("unassigned"),
+            func.sum(TicketCounter.breached_count).filter(not_closed).label("sla_breached"),
+            tickets.filter(critical).label("critical_all"),
+            tickets.filter(and_(critical, not_closed)).label("critical"),
+            tickets.filter(TicketCounter.status == TicketStatus.PENDING.value).label("pending"),
+            tickets.filter(TicketCounter.status.in_([
+                TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value
+            ])).label("closed"),
+        ).filter(*counter_scope).one()
+
+        counters = {key: int(value or 0) for key, value in row._mapping.items()}
+
+        # Time-based, so it can't live in the rollup; a range scan on resolved_at
+        start_of_day = datetime.combine(date.today(), time.min)
+        counters["resolved_today"] = db.query(func.count(Ticket.id)).filter(
+            Ticket.resolved_at >= start_of_day,
+            Ticket.resolved_at < start_of_day + timedelta(days=1),
+            *ticket_scope
+        ).scalar() or 0
+        return counters
+
+    @staticmethod
+    def get_counters(db: Session, requester_id: Optional[int] = None,
+                     assignee_id: Optional[int] = None) -> dict:
+        """
+        Cached counters for the global scope, or for one requester/assignee.
+
+        The cache key includes the date so resolved_today rolls over at midnight.
+        """
+        if requester_id is not None:
+            key = ("requester", requester_id)
+            counter_scope = [TicketCounter.requester_id == requester_id]
+            ticket_scope = [Ticket.requester_id == requester_id]
+        elif assignee_id is not None:
+            key = ("assignee", assignee_id)
+            counter_scope = [TicketCounter.assignee_id == assignee_id]
+            ticket_scope = [Ticket.assignee_id == assignee_id]
+        else:
+            key, counter_scope, ticket_scope = ("global",), [], []
+
+        return _counter_cache.get_or_set(
+            key + (date.today(),),
+            lambda: DashboardService._aggregate(db, counter_scope, ticket_scope)
+        )
+
+    @staticmethod
+    def count_by_status(db: Session) -> list:
+        """[(status, count)] from the rollup"""
+        return db.query(
+            TicketCounter.status, func.sum(TicketCounter.ticket_count)
+        ).group_by(TicketCounter.status).having(func.sum(TicketCounter.ticket_count) > 0).all()
+
+    @staticmethod
+    def count_open_by_priority(db: Session) -> list:
+        """[(priority, count)] of tickets that are not closed, from the rollup"""
+        return db.query(
+            TicketCounter.priority, func.sum(TicketCounter.ticket_count)
+        ).filter(
+            TicketCounter.status != TicketStatus.CLOSED.value
+        ).group_by(TicketCounter.priority).having(func.sum(TicketCounter.ticket_count) > 0).all()
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop all cached counters (e.g. after bulk imports)"""
+        _counter_cache.invalidate()
+
+    @staticmethod
+    def get_stats(db: Session, user_id: int, end_user: bool) -> dict:
+        """Counters for the /dashboard/stats widgets"""
+        if end_user:
+            mine = DashboardService.get_counters(db, requester_id=user_id)
+            return {
+                "total_tickets": mine["total"],
+                "open_tickets": mine["open"],
+                "my_tickets": mine["not_closed"],
+                "unassigned": 0,
+                "sla_breached": mine["sla_breached"],
+                "critical_tickets": mine["critical"],
+                "resolved_today": mine["resolved_today"],
+                "pending_tickets": mine["pending"],
+                "closed_tickets": mine["closed"],
+                "is_end_user": True
+            }
+
+        overall = DashboardService.get_counters(db)
+        mine = DashboardService.get_counters(db, assignee_id=user_id)
+        return {
+            "total_tickets": overall["total"],
+            "open_tickets": overall["open"],
+            "my_tickets": mine["not_closed"],
+            "unassigned": overall["unassigned"],
+            "sla_breached": overall["sla_breached"],
+            "critical_tickets": overall["critical"],
+            "resolved_today": overall["resolved_today"],
+            "pending_tickets": overall["pending"],
+            "closed_tickets": overall["closed"],
+            "is_end_user": False
+        }
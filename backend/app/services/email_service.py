@@ -1,12 +1,94 @@
 import smtplib
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List
+from typing import Iterator, List, Optional
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Errors after which an SMTP connection is dropped and opened again
+SMTP_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPConnection:
+    """One SMTP session reused for many messages, opened on the first send"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.server: Optional[smtplib.SMTP] = None
+        self.last_used = time.monotonic()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=self.timeout)
+        if settings.SMTP_TLS:
+            server.starttls()
+        if settings.SMTP_USER:
+            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return server
+
+    def send(self, msg: Message) -> None:
+        """Send a message, reconnecting once if the server dropped the session"""
+        if self.server is None:
+            self.server = self._connect()
+        try:
+            self.server.send_message(msg)
+        except SMTP_CONNECTION_ERRORS:
+            self.close()
+            self.server = self._connect()
+            self.server.send_message(msg)
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+
+class SMTPConnectionPool:
+    """Idle SMTP connections kept for reuse, so batches of mail skip the connect and login"""
+
+    def __init__(self, max_idle: int = 4, idle_seconds: float = 60, timeout: float = 60):
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._idle: List[SMTPConnection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[SMTPConnection]:
+        conn = None
+        with self._lock:
+            while self._idle and conn is None:
+                candidate = self._idle.pop()
+                # Servers drop idle sessions; do not reuse stale ones
+                if time.monotonic() - candidate.last_used < self.idle_seconds:
+                    conn = candidate
+                else:
+                    candidate.close()
+        conn = conn or SMTPConnection(self.timeout)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        with self._lock:
+            if conn.server is not None and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+# Scheduled report runs send through this pool, so use their timeout
+smtp_pool = SMTPConnectionPool(timeout=settings.SCHEDULED_REPORT_TIMEOUT_SECONDS)
+
 class EmailService:
     @staticmethod
     def send_email(to_emails: List[str], subject: str, body: str, html_body: str = None):
@@ -0,0 +1,289 @@
+"""
+Background report exports.
+
+POST /reports/export records an ExportJob and returns at once. The report is
+built and rendered by ExportService in a worker process, so PDF charts and
+large workbooks never block an API worker or its event loop.
+
+- Identical requests (report type, format, dates and filters) made while a
+  job is pending or running get that job back. A partial unique index on
+  dedupe_key over active jobs makes this hold across API workers too.
+- Everyone who requested or joined a job is recorded in
+  export_job_requesters; only they (and managers) can see it.
+- A worker claims a job with a conditional UPDATE before running it, so a
+  job submitted twice (e.g. resubmitted at startup) runs once.
+- Workers record progress in the job row, which the status endpoints read.
+- Jobs left running by a crashed worker, or never picked up (e.g. lost
+  with a broken pool), are failed after EXPORT_JOB_TIMEOUT_MINUTES, which
+  releases their dedupe key. A worker only completes a job still marked
+  running, so a job failed as stale stays failed.
+- Rendering goes through ReportCache, so a report whose data has not
+  changed since it was last rendered completes without rendering.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (configures every mapper in worker processes)
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.export_job import ExportJob, ExportJobStatus, ACTIVE_EXPORT_STATUSES, export_job_requesters
+from app.services.report_cache import ReportCache
+from app.services.reporting_service import ReportingService, parse_date
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("pdf", "excel", "csv")
+EXPORT_JOB_TIMEOUT_MINUTES = 30
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Process pool for export jobs, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: workers start clean instead of inheriting the API
+            # process's threads and pooled database connections
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def dedupe_key(
+    report_type: str,
+    export_format: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    filters: Optional[Dict[str, Any]]
+) -> str:
+    payload = json.dumps([report_type, export_format, start_date, end_date, filters or {}],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _set_progress(db: Session, job_id: int, progress: int) -> None:
+    db.query(ExportJob).filter(ExportJob.id == job_id).update(
+        {ExportJob.progress: progress}, synchronize_session=False
+    )
+    db.commit()
+
+
+def run_export_job(job_id: int, session_factory: Callable[[], Session] = SessionLocal) -> None:
+    """Worker process entry point: claim the job, build the report and render it"""
+    db = session_factory()
+    try:
+        claimed = db.query(ExportJob).filter(
+            ExportJob.id == job_id,
+            ExportJob.status == ExportJobStatus.PENDING
+        ).update({
+            ExportJob.status: ExportJobStatus.IN_PROGRESS,
+            ExportJob.started_at: datetime.now(timezone.utc),
+            ExportJob.progress: 5,
+        }, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return
+
+        job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+        try:
+            data = ReportingService(db).get_export_data(
+                job.report_type, parse_date(job.start_date), parse_date(job.end_date), job.filters
+            )
+            _set_progress(db, job_id, 40)
+            file_path, cached = ReportCache.render(data, job.report_type, job.export_format, job.filters)
+
+            file_name = os.path.basename(file_path)
+            # Conditional, so a job failed as stale meanwhile is not flipped back
+            completed = db.query(ExportJob).filter(
+                ExportJob.id == job_id,
+                ExportJob.status == ExportJobStatus.IN_PROGRESS
+            ).update({
+                ExportJob.file_path: file_path,
+                ExportJob.file_name: file_name,
+                ExportJob.status: ExportJobStatus.COMPLETED,
+                ExportJob.progress: 100,
+                ExportJob.completed_at: datetime.now(timezone.utc),
+            }, synchronize_session=False)
+            db.commit()
+            if completed:
+                logger.info(f"Export job {job_id} completed: {file_name}{' (cached)' if cached else ''}")
+            else:
+                logger.warning(f"Export job {job_id} finished after it was failed as stale")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Export job {job_id} failed: {e}")
+            db.query(ExportJob).filter(
+                ExportJob.id == job_id,
+                ExportJob.status == ExportJobStatus.IN_PROGRESS
+            ).update({
+                ExportJob.status: ExportJobStatus.FAILED,
+                ExportJob.error_message: str(e),
+                ExportJob.completed_at: datetime.now(timezone.utc),
+            }, synchronize_session=False)
+            db.commit()
+    finally:
+        db.close()
+
+
+class ExportJobService:
+    @staticmethod
+    def _active_job(db: Session, key: str) -> Optional[ExportJob]:
+        return db.query(ExportJob).filter(
+            ExportJob.dedupe_key == key,
+            ExportJob.status.in_(ACTIVE_EXPORT_STATUSES)
+        ).first()
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        report_type: str,
+        export_format: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        requested_by_id: Optional[int] = None,
+        submit: bool = True
+    ) -> Tuple[ExportJob, bool]:
+        """
+        Queue an export, or return the pending/running job for an identical
+        request. Returns (job, created).
+        """
+        key = dedupe_key(report_type, export_format, start_date, end_date, filters)
+        existing = ExportJobService._active_job(db, key)
+        if existing:
+            ExportJobService._add_requester(db, existing.id, requested_by_id)
+            return existing, False
+
+        job = ExportJob(
+            dedupe_key=key,
+            status=ExportJobStatus.PENDING,
+            report_type=report_type,
+            export_format=export_format,
+            start_date=start_date,
+            end_date=end_date,
+            filters=filters,
+            progress=0,
+            requested_by_id=requested_by_id,
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # An identical request was queued concurrently: join its job
+            db.rollback()
+            existing = ExportJobService._active_job(db, key)
+            if existing:
+                ExportJobService._add_requester(db, existing.id, requested_by_id)
+                return existing, False
+            raise
+        db.refresh(job)
+        ExportJobService._add_requester(db, job.id, requested_by_id)
+
+        if submit:
+            ExportJobService.submit(job.id)
+        return job, True
+
+    @staticmethod
+    def _add_requester(db: Session, job_id: int, user_id: Optional[int]) -> None:
+        if user_id is None or ExportJobService.is_requester(db, job_id, user_id):
+            return
+        db.execute(export_job_requesters.insert().values(job_id=job_id, user_id=user_id))
+        try:
+            db.commit()
+        except IntegrityError:
+            # The same user joined concurrently
+            db.rollback()
+
+    @staticmethod
+    def is_requester(db: Session, job_id: int, user_id: int) -> bool:
+        """Whether the user requested the job or joined it with an identical request"""
+        return db.query(export_job_requesters).filter(
+            export_job_requesters.c.job_id == job_id,
+            export_job_requesters.c.user_id == user_id
+        ).first() is not None
+
+    @staticmethod
+    def submit(job_id: int) -> None:
+        """Hand a job to the process pool"""
+        global _executor
+        try:
+            get_executor().submit(run_export_job, job_id)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool
+            logger.error("Export process pool broken, restarting it")
+            with _executor_lock:
+                _executor = None
+            get_executor().submit(run_export_job, job_id)
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[ExportJob]:
+        return db.query(ExportJob).filter(ExportJob.id == job_id).first()
+
+    @staticmethod
+    def list_jobs(db: Session, user_id: int, limit: int = 20) -> List[ExportJob]:
+        return db.query(ExportJob).join(
+            export_job_requesters, export_job_requesters.c.job_id == ExportJob.id
+        ).filter(
+            export_job_requesters.c.user_id == user_id
+        ).order_by(ExportJob.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def fail_stale_jobs(db: Session) -> int:
+        """
+        Fail jobs running, or pending, longer than EXPORT_JOB_TIMEOUT_MINUTES;
+        returns how many
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=EXPORT_JOB_TIMEOUT_MINUTES)
+        count = db.query(ExportJob).filter(or_(
+            and_(ExportJob.status == ExportJobStatus.IN_PROGRESS, ExportJob.started_at < cutoff),
+            and_(ExportJob.status == ExportJobStatus.PENDING, ExportJob.created_at < cutoff)
+        )).update({
+            ExportJob.status: ExportJobStatus.FAILED,
+            ExportJob.error_message: "Export timed out",
+            ExportJob.completed_at: datetime.now(timezone.utc),
+        }, synchronize_session=False)
+        db.commit()
+        return count
+
+    @staticmethod
+    def start() -> None:
+        """Resubmit jobs still pending from before a restart"""
+        db = SessionLocal()
+        try:
+            pending = [job_id for job_id, in db.query(ExportJob.id).filter(
+                ExportJob.status == ExportJobStatus.PENDING
+            ).all()]
+        except Exception as e:
+            logger.error(f"Error loading pending export jobs: {e}")
+            return
+        finally:
+            db.close()
+
+        for job_id in pending:
+            ExportJobService.submit(job_id)
+        if pending:
+            logger.info(f"Resubmitted {len(pending)} pending export jobs")
+
+    @staticmethod
+    def stop() -> None:
+        """Shut the pool down; queued jobs stay PENDING and are resubmitted at startup"""
+        global _executor
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+                _executor = None
@@ -1,12 +1,14 @@
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, PieChart, LineChart, Reference
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, PageBreak, Image
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.platypus.flowables import HRFlowable
 from reportlab.graphics.shapes import Drawing, String, Line, Rect
@@ -16,7 +18,7 @@ from reportlab.graphics.charts.linecharts import HorizontalLineChart
 from reportlab.graphics.charts.legends import Legend
 from reportlab.graphics.widgets.markers import makeMarker
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Sequence, Tuple
 import os
 import csv
 
@@ -48,6 +50,13 @@ EXCEL_PURPLE_LIGHT = "F5F3FF"
 EXCEL_GREEN = "10B981"
 EXCEL_RED = "EF4444"
 
+# Above this many table rows Excel reports are written in write-only mode:
+# rows are streamed to the file with shared named styles instead of a styled
+# cell object per value, so memory no longer grows with the report
+RICH_EXCEL_MAX_ROWS = 5000
+
+EXCEL_HEADER_STYLE = "supportx_header"
+
 
 class ExportService:
     """Service for exporting reports to Excel, PDF, and CSV with professional styling and charts"""
@@ -67,6 +76,10 @@ class ExportService:
         filename = f"SupportX_{report_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         filepath = os.path.join(self.export_dir, filename)
 
+        if self._excel_row_count(report_name, data) > RICH_EXCEL_MAX_ROWS:
+            self._export_to_excel_write_only(data, report_name, sheet_name, filepath)
+            return filepath
+
         wb = Workbook()
         ws = wb.active
         ws.title = sheet_name
@@ -943,7 +956,8 @@ class ExportService:
                     f"{tech.get('sla_compliance', 0):.1f}%"
                 ])
 
-            table = Table(perf_data, colWidths=[1.6*inch, 0.8*inch, 0.9*inch, 1*inch, 0.9*inch, 0.8*inch])
+            # LongTable lays out page by page, so thousands of rows stay linear
+            table = LongTable(perf_data, colWidths=[1.6*inch, 0.8*inch, 0.9*inch, 1*inch, 0.9*inch, 0.8*inch], repeatRows=1)
             table.setStyle(self._get_table_style())
             story.append(table)
         else:
@@ -1277,6 +1291,102 @@ class ExportService:
                 for item in data:
                     writer.writerow([str(item.get(k, '')) for k in headers])
 
+    # ============================================================================
+    # WRITE-ONLY EXCEL (LARGE REPORTS)
+    # ============================================================================
+
+    @staticmethod
+    def write_only_workbook() -> Workbook:
+        """Write-only workbook with the SupportX named styles registered once"""
+        wb = Workbook(write_only=True)
+        side = Side(style='thin', color='E5E7EB')
+        wb.add_named_style(NamedStyle(
+            name=EXCEL_HEADER_STYLE,
+            font=Font(bold=True, color="FFFFFF", size=11),
+            fill=PatternFill(start_color=EXCEL_PURPLE, end_color=EXCEL_PURPLE, fill_type="solid"),
+            alignment=Alignment(horizontal='center'),
+            border=Border(left=side, right=side, top=side, bottom=side),
+        ))
+        return wb
+
+    @staticmethod
+    def write_table(wb: Workbook, title: str, headers: Sequence[str], rows: Iterable[Sequence[Any]],
+                    width: int = 18) -> int:
+        """
+        Stream a table into a new sheet of a write-only workbook and return the
+        number of data rows. Rows are appended as plain values; the header uses
+        the shared named style and alternate rows are banded by one conditional
+        format over the whole table rather than a fill on every cell.
+        """
+        ws = wb.create_sheet(title[:31])
+        last_col = get_column_letter(max(len(headers), 1))
+        # Column widths and frozen panes go in the sheet header, before any row
+        for col in range(1, len(headers) + 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        ws.freeze_panes = "A2"
+
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.style = EXCEL_HEADER_STYLE
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        count = 0
+        for row in rows:
+            ws.append(row)
+            count += 1
+
+        if count:
+            table_range = f"A2:{last_col}{count + 1}"
+            ws.auto_filter.ref = f"A1:{last_col}{count + 1}"
+            alt_fill = PatternFill(start_color=EXCEL_PURPLE_LIGHT, end_color=EXCEL_PURPLE_LIGHT, fill_type="solid")
+            ws.conditional_formatting.add(table_range, FormulaRule(formula=["MOD(ROW(),2)=1"], fill=alt_fill))
+        return count
+
+    def _excel_row_count(self, report_name: str, data: Any) -> int:
+        """Number of table rows an Excel report will hold"""
+        if report_name == "ticket_aging" and isinstance(data, dict):
+            return sum(len(bucket.get('tickets', [])) for bucket in data.get('buckets', {}).values())
+        if report_name in ("sla_compliance", "ticket_volume", "category_breakdown"):
+            return 0
+        return len(data) if isinstance(data, list) else 0
+
+    def _excel_tables(self, data: Any, report_name: str, sheet_name: str) -> List[Tuple[str, List[str], Iterable]]:
+        """(sheet title, headers, rows) of a large report, rows generated lazily"""
+        if report_name == "ticket_aging":
+            summary = data.get('summary', {})
+            total = sum(summary.values()) or 1
+            tickets = (
+                ticket
+                for bucket in data.get('buckets', {}).values()
+                for ticket in bucket.get('tickets', [])
+            )
+            return [
+                ("Aging Summary", ['Age Bucket', 'Ticket Count', 'Percentage'],
+                 ([bucket, count, f"{count / total * 100:.1f}%"] for bucket, count in summary.items())),
+                ("Ticket Details", ['Ticket #', 'Title', 'Priority', 'Status', 'Assignee', 'Age (Days)', 'Age (Hours)'],
+                 ([t.get('ticket_number', ''), t.get('title', '')[:50], t.get('priority', ''), t.get('status', ''),
+                   t.get('assignee_name', ''), t.get('age_days', 0), t.get('age_hours', 0)] for t in tickets)),
+            ]
+        if report_name == "technician_performance":
+            return [(
+                "Team Performance",
+                ['Technician', 'Email', 'Total', 'Resolved', 'Open', 'Resolution %', 'Avg Time (h)', 'SLA %'],
+                ([t.get('user_name', ''), t.get('email', ''), t.get('total_tickets', 0), t.get('resolved_tickets', 0),
+                  t.get('open_tickets', 0), round(t.get('resolution_rate', 0), 1),
+                  round(t.get('avg_resolution_time_hours', 0), 1), round(t.get('sla_compliance', 0), 1)]
+                 for t in data),
+            )]
+        headers = list(data[0].keys()) if data and isinstance(data[0], dict) else []
+        return [(sheet_name, headers, ([str(item.get(key, '')) for key in headers] for item in data))]
+
+    def _export_to_excel_write_only(self, data: Any, report_name: str, sheet_name: str, filepath: str):
+        wb = self.write_only_workbook()
+        for title, headers, rows in self._excel_tables(data, report_name, sheet_name):
+            self.write_table(wb, title, headers, rows)
+        wb.save(filepath)
+
     # ============================================================================
     # HELPER METHODS
     # ============================================================================
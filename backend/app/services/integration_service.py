@@ -5,7 +5,6 @@ import httpx
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app.models.integration import (
     Integration, ImportJob, ImportedItem,
@@ -14,6 +13,7 @@ from app.models.integration import (
 from app.models.ticket import Ticket, TicketType, TicketStatus, TicketPriority
 from app.models.category import Category
 from app.models.user import User
+from app.services.number_allocator import NumberAllocator
 
 
 class IntegrationService:
@@ -203,11 +203,8 @@ class IntegrationService:
         external_data: Optional[Dict] = None
     ) -> Ticket:
         """Create a ticket from external data"""
-        # Get next ticket number
-        max_number = db.query(func.max(Ticket.ticket_number)).scalar() or 0
-
         ticket = Ticket(
-            ticket_number=max_number + 1,
+            ticket_number=NumberAllocator.next_number(db, "INC"),
             ticket_type=TicketType.INCIDENT,
             title=title[:500] if title else "Imported Ticket",
             description=description or "",
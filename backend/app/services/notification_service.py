@@ -292,6 +292,39 @@ class NotificationService:
             action_url=f"/tickets/{ticket.id}"
         )
     
+    @staticmethod
+    def notify_sla_breach_warning(db: Session, ticket, breach_type: str, due: datetime):
+        """Warn the assignee that a ticket's response or resolution SLA is about to be breached"""
+        if not ticket.assignee_id:
+            return
+        due_text = f" (due {due.strftime('%Y-%m-%d %H:%M')})" if due else ""
+        NotificationService.create_notification(
+            db=db,
+            user_id=ticket.assignee_id,
+            notification_type=NotificationType.SLA_BREACH_WARNING,
+            title=f"SLA Warning: {ticket.ticket_number}",
+            message=f"The {breach_type} SLA for ticket '{ticket.title}' is about to be breached{due_text}",
+            entity_type="ticket",
+            entity_id=ticket.id,
+            action_url=f"/tickets/{ticket.id}"
+        )
+
+    @staticmethod
+    def notify_sla_breached(db: Session, ticket, breach_type: str):
+        """Notify the assignee that a ticket's response or resolution SLA was breached"""
+        if not ticket.assignee_id:
+            return
+        NotificationService.create_notification(
+            db=db,
+            user_id=ticket.assignee_id,
+            notification_type=NotificationType.SLA_BREACHED,
+            title=f"SLA Breached: {ticket.ticket_number}",
+            message=f"The {breach_type} SLA for ticket '{ticket.title}' has been breached",
+            entity_type="ticket",
+            entity_id=ticket.id,
+            action_url=f"/tickets/{ticket.id}"
+        )
+
     @staticmethod
     def notify_ticket_status_changed(db: Session, ticket, old_status: str, new_status: str, user: User):
         """Notify when ticket status changes"""
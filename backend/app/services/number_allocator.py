@@ -0,0 +1,143 @@
+"""
+Allocator for human-readable record numbers (INC-000123, CHG-000045, ...).
+
+Each prefix has one row in `number_sequences`. Numbers are reserved with a
+single UPDATE ... RETURNING in its own short transaction, so the counter row
+is locked for microseconds rather than for the whole create transaction, and
+no request ever scans the target table. With NUMBER_BLOCK_SIZE > 1 each worker
+reserves a block and hands numbers out from memory.
+
+Numbers are never reused: a rolled-back create leaves a gap, as with a
+database sequence.
+
+The separate transaction runs on a second pooled connection while the
+caller's session stays open. It never waits on the caller: the caller's
+transaction does not touch number_sequences, and seeding only reads the
+numbered table. It does need a free connection, so a request creating a
+record uses two at once.
+
+SQLite allows one writer at a time, so once the caller has written, a second
+connection would wait on the caller's own lock until "database is locked".
+There the number is reserved in the caller's transaction instead, one at a
+time (a rolled-back create then hands its number out again).
+"""
+import threading
+from typing import Dict, List
+from sqlalchemy import update, select, func, insert, literal, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.number_sequence import NumberSequence
+from app.models.ticket import Ticket
+from app.models.problem import Problem, KnownError
+from app.models.change import Change
+from app.utils.helpers import generate_ticket_number
+
+# Column holding existing numbers for each prefix, used to seed a new counter
+NUMBER_COLUMNS = {
+    "INC": Ticket.ticket_number,
+    "REQ": Ticket.ticket_number,
+    "PRB": Problem.problem_number,
+    "KE": KnownError.known_error_number,
+    "CHG": Change.change_number,
+}
+
+# Dialects with a single writer, where numbers are reserved in the caller's transaction
+CALLER_TRANSACTION_DIALECTS = {"sqlite"}
+
+_blocks: Dict[str, List[int]] = {}  # prefix -> [next_value, last_reserved_value]
+_lock = threading.Lock()
+
+
+class NumberAllocator:
+    @staticmethod
+    def next_number(db: Session, prefix: str) -> str:
+        """Return the next formatted number for prefix, e.g. INC-000124"""
+        return generate_ticket_number(prefix, NumberAllocator.next_value(db, prefix))
+
+    @staticmethod
+    def next_value(db: Session, prefix: str) -> int:
+        if db.get_bind().dialect.name in CALLER_TRANSACTION_DIALECTS:
+            return NumberAllocator._reserve_in_transaction(db, prefix)
+        with _lock:
+            block = _blocks.get(prefix)
+            if block is None or block[0] > block[1]:
+                block_size = max(settings.NUMBER_BLOCK_SIZE, 1)
+                last = NumberAllocator._reserve(db, prefix, block_size)
+                block = [last - block_size + 1, last]
+                _blocks[prefix] = block
+            value = block[0]
+            block[0] += 1
+            return value
+
+    @staticmethod
+    def reset() -> None:
+        """Forget reserved blocks (tests / after restoring a database)"""
+        with _lock:
+            _blocks.clear()
+
+    @staticmethod
+    def _advance(conn, prefix: str, count: int):
+        """Advance the counter by count; returns the new last value, or None if it has no row"""
+        return conn.execute(
+            update(NumberSequence)
+            .where(NumberSequence.prefix == prefix)
+            .values(last_value=NumberSequence.last_value + count)
+            .returning(NumberSequence.last_value)
+        ).scalar()
+
+    @staticmethod
+    def _reserve(db: Session, prefix: str, count: int) -> int:
+        """Advance the counter by count in its own transaction; returns the new last value"""
+        bind = db.get_bind()
+        engine = getattr(bind, "engine", bind)
+        with engine.begin() as conn:
+            last = NumberAllocator._advance(conn, prefix, count)
+        if last is not None:
+            return last
+
+        with engine.begin() as conn:
+            start = NumberAllocator._highest_number(conn, prefix)
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(NumberSequence).values(prefix=prefix, last_value=start))
+        except IntegrityError:
+            # Another worker seeded it first
+            pass
+        with engine.begin() as conn:
+            return NumberAllocator._advance(conn, prefix, count)
+
+    @staticmethod
+    def _reserve_in_transaction(db: Session, prefix: str) -> int:
+        """Take the next value in the caller's transaction (single-writer databases)"""
+        conn = db.connection()
+        last = NumberAllocator._advance(conn, prefix, 1)
+        if last is not None:
+            return last
+        # Insert-if-missing in one statement, which holds the write lock throughout
+        conn.execute(insert(NumberSequence).from_select(
+            ["prefix", "last_value"],
+            select(literal(prefix), literal(NumberAllocator._highest_number(conn, prefix)))
+            .where(~exists().where(NumberSequence.prefix == prefix))
+        ))
+        return NumberAllocator._advance(conn, prefix, 1)
+
+    @staticmethod
+    def _highest_number(conn, prefix: str) -> int:
+        """Highest existing number for prefix in its table, to seed a new counter from"""
+        column = NUMBER_COLUMNS.get(prefix)
+        if column is None:
+            return 0
+        # Zero-padded numbers sort lexically within the same length
+        latest = conn.execute(
+            select(column)
+            .where(column.like(f"{prefix}-%"))
+            .order_by(func.length(column).desc(), column.desc())
+            .limit(1)
+        ).scalar()
+        if not latest:
+            return 0
+        try:
+            return int(latest.split("-")[-1])
+        except ValueError:
+            return 0
@@ -0,0 +1,249 @@
+"""
+Live chat presence, held in memory and shared between workers over the chat backplane.
+
+- Each worker knows its own connected users. It announces changes as they
+  happen, and its full user list every PRESENCE_HEARTBEAT_SECONDS.
+- Other workers keep what they heard. A worker not heard from for
+  PRESENCE_TTL_SECONDS (e.g. it crashed) no longer counts, and its users go
+  offline.
+- Lookups (is_online, get_presence) never touch the database.
+
+user_online_status is a durable mirror for last_seen and for other
+services. Each worker writes its own users' rows, and the rows of users
+left behind by a worker that expired. A presence change only marks the user
+dirty. Every PRESENCE_FLUSH_SECONDS the dirty users' current state is
+upserted in batches from a thread, so a reconnect storm after a deploy
+costs a few multi-row statements instead of a commit per socket.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.live_chat import UserOnlineStatus
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_HEARTBEAT_SECONDS = 15
+PRESENCE_TTL_SECONDS = 3 * PRESENCE_HEARTBEAT_SECONDS
+# Rows per upsert statement
+PRESENCE_FLUSH_BATCH = 1000
+
+
+class UserPresence(NamedTuple):
+    user_id: int
+    is_online: bool
+    last_seen: Optional[datetime]
+
+
+class PresenceService:
+    def __init__(
+        self,
+        worker_id: str,
+        publish: Callable[[Dict[str, Any]], Awaitable[None]],
+        session_factory=None
+    ):
+        self.worker_id = worker_id
+        self._publish = publish
+        self._session_factory = session_factory or SessionLocal
+        # Users with a socket on this worker
+        self.local: Set[int] = set()
+        # Users connected to other workers: {worker_id: (last heard, user_ids)}
+        self.remote_users: Dict[str, Tuple[float, Set[int]]] = {}
+        self.last_seen: Dict[int, datetime] = {}
+        # Users whose row in user_online_status is out of date
+        self._dirty: Set[int] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        await self.load()
+        self._tasks = [
+            asyncio.create_task(self._heartbeat()),
+            asyncio.create_task(self._flush_periodically()),
+        ]
+        # Ask the other workers for their users rather than wait a heartbeat
+        await self._publish({"kind": "hello"})
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        # This worker's users are offline unless connected elsewhere
+        users, self.local = self.local, set()
+        self._went_offline(users)
+        await self._publish({"kind": "worker_stopped"})
+        await self.flush()
+
+    async def load(self) -> None:
+        """Seed last_seen from user_online_status"""
+        def read():
+            db = self._session_factory()
+            try:
+                return db.query(UserOnlineStatus.user_id, UserOnlineStatus.last_seen).all()
+            finally:
+                db.close()
+
+        try:
+            rows = await run_in_threadpool(read)
+        except Exception as e:
+            logger.error(f"Could not load last seen times: {e}")
+            return
+        for user_id, last_seen in rows:
+            self.last_seen.setdefault(user_id, last_seen)
+
+    async def connected(self, user_id: int) -> None:
+        """The user's first socket on this worker opened"""
+        self.local.add(user_id)
+        self._touch([user_id])
+        await self._publish({"kind": "presence", "user_ids": [user_id], "online": True})
+
+    async def disconnected(self, user_id: int) -> None:
+        """The user's last socket on this worker closed"""
+        self.local.discard(user_id)
+        self._went_offline([user_id])
+        await self._publish({"kind": "presence", "user_ids": [user_id], "online": False})
+
+    def _touch(self, user_ids: Iterable[int], save: bool = True) -> None:
+        now = datetime.now(timezone.utc)
+        for user_id in user_ids:
+            self.last_seen[user_id] = now
+            if save:
+                self._dirty.add(user_id)
+
+    def _went_offline(self, user_ids: Iterable[int], save: bool = True) -> None:
+        self._touch([user_id for user_id in user_ids if not self.is_online(user_id)], save)
+
+    async def handle(self, event: Dict[str, Any]) -> None:
+        """Apply a presence event published by another worker, which saves its own users"""
+        origin = event.get("origin")
+        kind = event.get("kind")
+        if kind == "presence":
+            _, before = self.remote_users.get(origin, (0.0, set()))
+            if event.get("full"):
+                users = set(event["user_ids"])
+            elif event.get("online"):
+                users = before | set(event["user_ids"])
+            else:
+                users = before - set(event["user_ids"])
+            self.remote_users[origin] = (time.monotonic(), users)
+            self._touch(users - before, save=False)
+            self._went_offline(before - users, save=False)
+        elif kind == "hello":
+            await self._publish_presence()
+        elif kind == "worker_stopped":
+            _, users = self.remote_users.pop(origin, (0.0, set()))
+            self._went_offline(users, save=False)
+
+    def expire(self) -> None:
+        """Forget workers that stopped announcing their users, saving those users as offline"""
+        cutoff = time.monotonic() - PRESENCE_TTL_SECONDS
+        for worker_id, (heard, users) in list(self.remote_users.items()):
+            if heard < cutoff:
+                logger.warning(f"Chat worker {worker_id} not heard from for {PRESENCE_TTL_SECONDS}s, "
+                               f"marking its {len(users)} users offline")
+                del self.remote_users[worker_id]
+                self._went_offline(users)
+
+    def _remote_online(self) -> Set[int]:
+        cutoff = time.monotonic() - PRESENCE_TTL_SECONDS
+        online = set()
+        for heard, users in list(self.remote_users.values()):
+            if heard >= cutoff:
+                online |= users
+        return online
+
+    def is_online(self, user_id: int) -> bool:
+        if user_id in self.local:
+            return True
+        cutoff = time.monotonic() - PRESENCE_TTL_SECONDS
+        return any(user_id in users for heard, users in list(self.remote_users.values()) if heard >= cutoff)
+
+    def online_users(self) -> Set[int]:
+        return self.local | self._remote_online()
+
+    def get_presence(self, user_ids: Optional[Iterable[int]] = None) -> Dict[int, UserPresence]:
+        """Presence of user_ids (default: every user seen), from memory"""
+        online = self.online_users()
+        if user_ids is None:
+            user_ids = online | set(self.last_seen)
+        return {
+            user_id: UserPresence(user_id, user_id in online, self.last_seen.get(user_id))
+            for user_id in user_ids
+        }
+
+    async def _publish_presence(self) -> None:
+        await self._publish({"kind": "presence", "full": True, "user_ids": list(self.local)})
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await self._publish_presence()
+            self.expire()
+            await asyncio.sleep(PRESENCE_HEARTBEAT_SECONDS)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.PRESENCE_FLUSH_SECONDS)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write the dirty users' current presence to user_online_status; returns rows written"""
+        if not self._dirty:
+            return 0
+        online = self.online_users()
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"user_id": user_id, "is_online": user_id in online, "last_seen": self.last_seen.get(user_id, now)}
+            for user_id in sorted(self._dirty)
+        ]
+        self._dirty = set()
+        try:
+            await run_in_threadpool(self._write, rows)
+        except Exception as e:
+            logger.error(f"Could not save presence of {len(rows)} users: {e}")
+            # Retry with the then-current state, unless already dirty again
+            self._dirty.update(row["user_id"] for row in rows)
+            return 0
+        return len(rows)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        db = self._session_factory()
+        try:
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            elif dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                dialect_insert = None
+
+            for start in range(0, len(rows), PRESENCE_FLUSH_BATCH):
+                batch = rows[start:start + PRESENCE_FLUSH_BATCH]
+                if dialect_insert is None:
+                    self._write_each(db, batch)
+                    continue
+                stmt = dialect_insert(UserOnlineStatus).values(batch)
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=[UserOnlineStatus.user_id],
+                    set_={"is_online": stmt.excluded.is_online, "last_seen": stmt.excluded.last_seen}
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _write_each(db, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            updated = db.query(UserOnlineStatus).filter(UserOnlineStatus.user_id == row["user_id"]).update(
+                {"is_online": row["is_online"], "last_seen": row["last_seen"]}
+            )
+            if not updated:
+                db.execute(insert(UserOnlineStatus).values(**row))
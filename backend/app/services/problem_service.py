@@ -13,6 +13,7 @@ from app.schemas.problem import (
     KnownErrorCreate, KnownErrorUpdate,
     ProblemIncidentLinkCreate, ProblemCommentCreate
 )
+from app.services.number_allocator import NumberAllocator
 from fastapi import HTTPException, status
 import math
 
@@ -23,20 +24,7 @@ class ProblemService:
     @staticmethod
     def generate_problem_number(db: Session) -> str:
         """Generate unique problem number"""
-        # Get the latest problem number
-        latest_problem = db.query(Problem).order_by(Problem.id.desc()).first()
-
-        if latest_problem and latest_problem.problem_number:
-            # Extract number from format PRB-XXXXXX
-            try:
-                last_num = int(latest_problem.problem_number.split('-')[1])
-                new_num = last_num + 1
-            except:
-                new_num = 1
-        else:
-            new_num = 1
-
-        return f"PRB-{new_num:06d}"
+        return NumberAllocator.next_number(db, "PRB")
 
     @staticmethod
     def create_problem(
@@ -564,18 +552,7 @@ class KnownErrorService:
     @staticmethod
     def generate_known_error_number(db: Session) -> str:
         """Generate unique known error number"""
-        latest_ke = db.query(KnownError).order_by(KnownError.id.desc()).first()
-
-        if latest_ke and latest_ke.known_error_number:
-            try:
-                last_num = int(latest_ke.known_error_number.split('-')[1])
-                new_num = last_num + 1
-            except:
-                new_num = 1
-        else:
-            new_num = 1
-
-        return f"KE-{new_num:06d}"
+        return NumberAllocator.next_number(db, "KE")
 
     @staticmethod
     def create_known_error(
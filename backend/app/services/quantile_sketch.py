@@ -0,0 +1,99 @@
+"""
+Mergeable quantile sketch (DDSketch) for response/resolution times.
+
+Values are counted in logarithmic buckets: bucket i holds the values in
+(gamma^(i-1), gamma^i] with gamma = (1 + a) / (1 - a). Any quantile read
+back is within a relative error `a` of the exact value at the same rank,
+whatever the distribution. Two sketches merge by adding bucket counts, and
+a value is removed again by subtracting its count, so sketches stored per
+ticket_daily_facts row can be kept up to date incrementally and combined
+over any date range or slice.
+
+Zero and negative values (e.g. a response recorded before creation) are
+counted in a separate zero bucket.
+"""
+import json
+import math
+from typing import Dict, Optional
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+ZERO_KEY = "z"
+
+
+class QuantileSketch:
+    __slots__ = ("bins", "zero_count")
+
+    gamma = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+    _log_gamma = math.log(gamma)
+
+    def __init__(self, bins: Optional[Dict[int, int]] = None, zero_count: int = 0):
+        self.bins: Dict[int, int] = bins or {}
+        self.zero_count = zero_count
+
+    @classmethod
+    def index(cls, value: float) -> int:
+        return math.ceil(math.log(value) / cls._log_gamma)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Count a value; a negative count removes it again"""
+        if value <= 0:
+            self.zero_count += count
+            return
+        i = self.index(value)
+        n = self.bins.get(i, 0) + count
+        if n:
+            self.bins[i] = n
+        else:
+            del self.bins[i]
+
+    def merge(self, other: "QuantileSketch", sign: int = 1) -> None:
+        """Add (sign=1) or subtract (sign=-1) another sketch's counts"""
+        self.zero_count += sign * other.zero_count
+        for i, count in other.bins.items():
+            n = self.bins.get(i, 0) + sign * count
+            if n:
+                self.bins[i] = n
+            else:
+                del self.bins[i]
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.zero_count or self.bins)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate of the value at rank floor(q * count) of the sorted values
+        (so q=0.5 is the upper median), or None if the sketch is empty.
+        """
+        total = self.count
+        if total <= 0:
+            return None
+        rank = min(int(q * total), total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.bins):
+            seen += self.bins[i]
+            if rank < seen:
+                # Midpoint (in relative terms) of (gamma^(i-1), gamma^i]
+                return 2 * self.gamma ** i / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_json(self) -> Optional[str]:
+        if not self:
+            return None
+        data = {str(i): n for i, n in self.bins.items()}
+        if self.zero_count:
+            data[ZERO_KEY] = self.zero_count
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: Optional[str]) -> "QuantileSketch":
+        if not text:
+            return cls()
+        data = json.loads(text)
+        zero_count = data.pop(ZERO_KEY, 0)
+        return cls({int(i): n for i, n in data.items()}, zero_count)
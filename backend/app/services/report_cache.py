@@ -0,0 +1,144 @@
+"""
+Content-addressed cache of rendered report files in exports/reports.
+
+A rendered report depends only on its inputs: report type, format, filters,
+PDF title and the report data. The cache key hashes all of them, with the
+data itself serving as the data version. The reports read from the rollups
+are cheap to query. Any ticket change that alters a report changes its key,
+while unchanged data (last month's SLA report pulled by twenty managers)
+maps to the file that was already rendered.
+
+Cached files are named SupportX_<report_type>_<key>.<ext> and are never
+rewritten with different data, so the key doubles as a strong ETag. Every
+hit or download sets the file's access time. evict() keeps the directory
+under REPORT_CACHE_MAX_MB by deleting the least recently used files, the
+ad-hoc ones included.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.export_service import ExportService
+
+logger = logging.getLogger(__name__)
+
+# Bump when the ExportService layouts change so old renders are not served
+REPORT_CACHE_VERSION = 1
+
+EXTENSIONS = {"pdf": "pdf", "excel": "xlsx", "csv": "csv"}
+CACHED_FILE = re.compile(r"^SupportX_\w+_([0-9a-f]{32})\.(pdf|xlsx|csv)$")
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {key: value for key, value in (filters or {}).items() if value not in (None, "", [])}
+
+
+class ReportCache:
+    @staticmethod
+    def cache_key(
+        report_type: str,
+        export_format: str,
+        data: Any,
+        filters: Optional[Dict[str, Any]] = None,
+        title: Optional[str] = None
+    ) -> str:
+        payload = json.dumps(
+            [REPORT_CACHE_VERSION, report_type, export_format, normalize_filters(filters),
+             title if export_format == "pdf" else None, data],
+            sort_keys=True, default=str, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def touch(filepath: str) -> None:
+        """Mark a file as used: set its access time, leaving mtime (and the ETag) alone"""
+        try:
+            os.utime(filepath, (time.time(), os.stat(filepath).st_mtime))
+        except OSError:
+            pass
+
+    @staticmethod
+    def render(
+        data: Any,
+        report_type: str,
+        export_format: str,
+        filters: Optional[Dict[str, Any]] = None,
+        title: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        Path of the rendered report, rendering it with ExportService unless an
+        identical one is cached. Returns (file path, cache hit).
+        """
+        if export_format not in EXTENSIONS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        export_service = ExportService()
+        key = ReportCache.cache_key(report_type, export_format, data, filters, title)
+        filepath = os.path.join(
+            export_service.export_dir, f"SupportX_{report_type}_{key}.{EXTENSIONS[export_format]}"
+        )
+        if os.path.exists(filepath):
+            ReportCache.touch(filepath)
+            return filepath, True
+
+        if export_format == "excel":
+            rendered = export_service.export_to_excel(data=data, report_name=report_type, sheet_name="Report")
+        elif export_format == "pdf":
+            rendered = export_service.export_to_pdf(
+                data=data,
+                report_name=report_type,
+                title=title or f"{report_type.replace('_', ' ').title()} Report"
+            )
+        else:
+            rendered = export_service.export_to_csv(data=data, report_name=report_type)
+        os.replace(rendered, filepath)
+
+        ReportCache.evict(export_service.export_dir)
+        return filepath, False
+
+    @staticmethod
+    def etag(filepath: str) -> str:
+        """Strong ETag: the cache key for cached renders, else size and mtime"""
+        match = CACHED_FILE.match(os.path.basename(filepath))
+        if match:
+            return f'"{match.group(1)}"'
+        stat = os.stat(filepath)
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+    @staticmethod
+    def evict(export_dir: str = "exports/reports", max_bytes: Optional[int] = None) -> int:
+        """Delete least recently used files until the directory fits in max_bytes; returns how many"""
+        if max_bytes is None:
+            max_bytes = settings.REPORT_CACHE_MAX_MB * 1024 * 1024
+        if not os.path.isdir(export_dir):
+            return 0
+
+        files = []
+        for entry in os.scandir(export_dir):
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+
+        deleted = 0
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                deleted += 1
+            except OSError as e:
+                logger.error(f"Error deleting report file {path}: {e}")
+        return deleted
@@ -0,0 +1,382 @@
+"""
+When scheduled reports run.
+
+Recurrence: every report's schedule is an APScheduler trigger evaluated in
+the report's time zone, so DST changes move the UTC run time and "08:00"
+stays 08:00 local time.
+- daily and weekly are cron triggers on schedule_time (weekly on
+  schedule_day, 1-7 Monday-Sunday).
+- monthly runs on schedule_day and quarterly on the 1st of Jan/Apr/Jul/Oct.
+  A day past the end of a month runs on its last day, so the 31st runs on
+  Feb 28/29 and Apr 30.
+- cron_expression, when set, replaces all of the above. It is a standard
+  five-field crontab with Sunday 0 (or 7). As in cron, when both day of
+  month and day of week are restricted (neither starts with "*"), a day
+  matching either runs.
+
+Wakeups: ReportTimer keeps an in-memory min-heap of next_run_at and sleeps
+until the earliest, then has the executor claim whatever is due. Reports are
+thus delivered on time without polling scheduled_reports.
+- At startup the heap is loaded from next_run_at.
+- A Session after_commit hook pushes every report whose next_run_at or
+  is_active changed, or that was deleted. Claims advance next_run_at with a
+  bulk UPDATE, so claim_due_reports pushes those itself.
+- Schedules edited in another API process reach this one at the next
+  resync (SCHEDULED_REPORT_RESYNC_MINUTES), which reloads the heap.
+"""
+import calendar
+import heapq
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pytz
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.combining import OrTrigger
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.scheduled_report import ScheduledReport
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]  # schedule_day 1-7
+CRON_WEEKDAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat", "sun"]  # crontab 0-7
+QUARTER_MONTHS = (1, 4, 7, 10)
+
+
+class MonthDayTrigger(BaseTrigger):
+    """Fires at hour:minute on a day of the given months, clamped to the month's last day"""
+
+    def __init__(self, day: int, hour: int, minute: int, months=range(1, 13), tz=pytz.utc):
+        self.day = day
+        self.hour = hour
+        self.minute = minute
+        self.months = tuple(months)
+        self.timezone = tz
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        local = now.astimezone(self.timezone)
+        year, month = local.year, local.month
+        for _ in range(13):
+            if month in self.months:
+                day = min(self.day, calendar.monthrange(year, month)[1])
+                fire = self.timezone.normalize(self.timezone.localize(
+                    datetime(year, month, day, self.hour, self.minute)
+                ))
+                if fire > now:
+                    return fire
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return None
+
+    def __str__(self):
+        return f"month_day[day={self.day}, time={self.hour:02d}:{self.minute:02d}, months={self.months}]"
+
+
+def validate_timezone(name: str):
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        raise ValueError(f"Unknown time zone: {name}")
+
+
+def _cron_weekday(value: str) -> int:
+    if value.isdigit():
+        day = int(value)
+    elif value.lower() in CRON_WEEKDAYS:
+        day = CRON_WEEKDAYS.index(value.lower())
+    else:
+        raise ValueError(f"Invalid day of week: {value}")
+    if day > 7:
+        raise ValueError(f"Invalid day of week: {value}")
+    return day
+
+
+def _cron_day_of_week(field: str) -> str:
+    """
+    Crontab day-of-week (Sunday 0 or 7, or names) as APScheduler day names.
+
+    APScheduler numbers Monday 0, so numbers, ranges and steps (including
+    * and */N) are expanded over crontab's 0-6 here rather than passed on.
+    """
+    days = []
+    for part in field.split(","):
+        match = re.fullmatch(r"(\*|\w+)(?:-(\w+))?(?:/(\d+))?", part)
+        if not match or (match.group(1) == "*" and match.group(2)):
+            raise ValueError(f"Invalid day of week: {part}")
+        step = int(match.group(3) or 1)
+        if step < 1:
+            raise ValueError(f"Invalid day of week: {part}")
+        if match.group(1) == "*":
+            first, last = 0, 6
+        else:
+            first = _cron_weekday(match.group(1))
+            last = _cron_weekday(match.group(2)) if match.group(2) else (6 if match.group(3) else first)
+        if first > last:
+            raise ValueError(f"Invalid day of week: {part}")
+        days.extend(CRON_WEEKDAYS[day] for day in range(first, last + 1, step))
+    # Keep crontab order from Sunday, without the 7 alias repeating it
+    return ",".join(sorted(set(days), key=CRON_WEEKDAYS.index))
+
+
+def crontab_trigger(expression: str, tz=pytz.utc) -> BaseTrigger:
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: {expression}")
+    minute, hour, day, month, day_of_week = fields
+    try:
+        weekdays = _cron_day_of_week(day_of_week)
+        if day.startswith("*") or day_of_week.startswith("*"):
+            return CronTrigger(minute=minute, hour=hour, day=day, month=month, day_of_week=weekdays, timezone=tz)
+        # Both restricted: cron runs on days matching either field
+        return OrTrigger([
+            CronTrigger(minute=minute, hour=hour, day=day, month=month, timezone=tz),
+            CronTrigger(minute=minute, hour=hour, month=month, day_of_week=weekdays, timezone=tz),
+        ])
+    except (ValueError, IndexError) as e:
+        raise ValueError(f"Invalid cron expression {expression!r}: {e}")
+
+
+def validate_cron_expression(expression: str) -> str:
+    crontab_trigger(expression)
+    return expression
+
+
+def build_trigger(
+    frequency: str,
+    schedule_time: Optional[str],
+    schedule_day: Optional[int] = None,
+    cron_expression: Optional[str] = None,
+    timezone_name: Optional[str] = None
+) -> BaseTrigger:
+    tz = validate_timezone(timezone_name or "UTC")
+    if cron_expression:
+        return crontab_trigger(cron_expression, tz)
+
+    hour, minute = map(int, (schedule_time or "00:00").split(':'))
+    if frequency == "weekly":
+        day = schedule_day or 1
+        if not 1 <= day <= 7:
+            raise ValueError(f"Weekly reports need schedule_day 1-7 (Monday-Sunday), got {day}")
+        return CronTrigger(day_of_week=SCHEDULE_WEEKDAYS[day - 1], hour=hour, minute=minute, timezone=tz)
+    if frequency == "monthly":
+        return MonthDayTrigger(schedule_day or 1, hour, minute, tz=tz)
+    if frequency == "quarterly":
+        return MonthDayTrigger(1, hour, minute, months=QUARTER_MONTHS, tz=tz)
+    return CronTrigger(hour=hour, minute=minute, timezone=tz)
+
+
+def next_run_time(
+    frequency: str,
+    schedule_time: Optional[str],
+    schedule_day: Optional[int] = None,
+    cron_expression: Optional[str] = None,
+    timezone_name: Optional[str] = None,
+    after: Optional[datetime] = None
+) -> Optional[datetime]:
+    """First run strictly after `after` (default now), in UTC"""
+    after = after or datetime.now(timezone.utc)
+    trigger = build_trigger(frequency, schedule_time, schedule_day, cron_expression, timezone_name)
+    fire = trigger.get_next_fire_time(None, after + timedelta(microseconds=1))
+    return fire.astimezone(timezone.utc) if fire else None
+
+
+def next_run_for(report: ScheduledReport, after: Optional[datetime] = None) -> Optional[datetime]:
+    return next_run_time(
+        report.frequency.value, report.schedule_time, report.schedule_day,
+        report.cron_expression, report.timezone, after
+    )
+
+
+class ReportTimer:
+    """
+    Min-heap of (next run, report) served by one timer thread.
+
+    Like WarningTimer, rescheduling pushes a new entry and skips the stale one
+    when it reaches the top. Everything due at a wakeup is handed to one
+    fire() call, since a single claim picks up all due reports.
+    """
+
+    def __init__(self, fire: Callable[[List[int]], None]):
+        self._fire = fire
+        self._heap: List[Tuple[float, int]] = []
+        self._pending: Dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def schedule(self, report_id: int, when: float) -> None:
+        with self._cond:
+            if self._pending.get(report_id) == when:
+                return
+            self._pending[report_id] = when
+            heapq.heappush(self._heap, (when, report_id))
+            if self._heap[0][0] == when:
+                self._cond.notify()
+
+    def cancel(self, report_id: int) -> None:
+        with self._cond:
+            self._pending.pop(report_id, None)
+
+    def replace(self, entries: Dict[int, float]) -> None:
+        """Swap in a freshly loaded schedule"""
+        with self._cond:
+            self._pending = dict(entries)
+            self._heap = [(when, report_id) for report_id, when in entries.items()]
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def next_due(self) -> Optional[float]:
+        with self._cond:
+            while self._heap and self._pending.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[int]:
+        """Remove and return every live entry due at or before now"""
+        due = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                when, report_id = heapq.heappop(self._heap)
+                if self._pending.get(report_id) == when:
+                    del self._pending[report_id]
+                    due.append(report_id)
+        return due
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="report-schedule-timer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stopped)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+            due = self.pop_due(time.time())
+            if due:
+                try:
+                    self._fire(due)
+                except Exception as e:
+                    logger.error(f"Error dispatching scheduled reports {due}: {e}")
+
+
+def _timestamp(value: datetime) -> float:
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
+class ReportScheduleService:
+    @staticmethod
+    def start() -> None:
+        """Load next run times and start the timer thread"""
+        ReportScheduleService.resync()
+        _timer.start()
+        logger.info(f"Report schedule timer started with {len(_timer)} scheduled reports")
+
+    @staticmethod
+    def stop() -> None:
+        _timer.stop()
+
+    @staticmethod
+    def resync() -> int:
+        """Reload the heap from scheduled_reports; returns how many reports are scheduled"""
+        db = SessionLocal()
+        try:
+            return ReportScheduleService.load(db)
+        except Exception as e:
+            logger.error(f"Could not load report schedules: {e}")
+            return len(_timer)
+        finally:
+            db.close()
+
+    @staticmethod
+    def load(db: Session) -> int:
+        rows = db.execute(
+            select(ScheduledReport.id, ScheduledReport.next_run_at).where(
+                ScheduledReport.is_active == True,
+                ScheduledReport.next_run_at.isnot(None)
+            )
+        ).all()
+        _timer.replace({report_id: _timestamp(next_run_at) for report_id, next_run_at in rows})
+        return len(rows)
+
+    @staticmethod
+    def schedule_report(report_id: int, next_run_at: Optional[datetime]) -> None:
+        if not _timer.running:
+            return
+        if next_run_at is None:
+            _timer.cancel(report_id)
+        else:
+            _timer.schedule(report_id, _timestamp(next_run_at))
+
+    @staticmethod
+    def status() -> Dict:
+        next_due = _timer.next_due()
+        return {
+            "running": _timer.running,
+            "scheduled_reports": len(_timer),
+            "next_run_at": datetime.fromtimestamp(next_due, timezone.utc).isoformat() if next_due else None,
+        }
+
+    @staticmethod
+    def fire(report_ids: List[int]) -> None:
+        """Have the executor claim due reports, these among them"""
+        from app.services.scheduled_report_executor import get_report_executor
+
+        logger.info(f"Scheduled reports due: {report_ids}")
+        get_report_executor().dispatch()
+
+
+_timer = ReportTimer(ReportScheduleService.fire)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_schedule_changes(session: Session, flush_context) -> None:
+    if not _timer.running:
+        return
+    changes = session.info.setdefault("report_schedule_changes", {})
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, ScheduledReport):
+            continue
+        state = inspect(obj)
+        if state.attrs.next_run_at.history.has_changes() or state.attrs.is_active.history.has_changes():
+            changes[obj.id] = obj.next_run_at if obj.is_active else None
+    for obj in session.deleted:
+        if isinstance(obj, ScheduledReport):
+            changes[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_report_changes(session: Session) -> None:
+    changes = session.info.pop("report_schedule_changes", None)
+    for report_id, next_run_at in (changes or {}).items():
+        ReportScheduleService.schedule_report(report_id, next_run_at)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_schedule_changes(session: Session) -> None:
+    session.info.pop("report_schedule_changes", None)
@@ -5,11 +5,12 @@ Handles automatic execution of scheduled reports
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import logging
 
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.services.scheduled_report_service import ScheduledReportService
+from app.services.report_schedule import ReportScheduleService
 
 logger = logging.getLogger(__name__)
 
@@ -32,32 +33,16 @@ def get_scheduler():
     return scheduler
 
 
-def process_due_reports():
-    """Process all reports that are due to run"""
-    logger.info("Checking for due scheduled reports...")
+def resync_report_schedule():
+    """Reload the report schedule timer, then claim anything overdue it missed"""
+    from app.services.report_schedule import ReportScheduleService
+    from app.services.scheduled_report_executor import get_report_executor
 
-    db = SessionLocal()
     try:
-        due_reports = ScheduledReportService.get_due_reports(db)
-        logger.info(f"Found {len(due_reports)} reports due for execution")
-
-        for report in due_reports:
-            try:
-                logger.info(f"Executing report: {report.name} (ID: {report.id})")
-                execution = ScheduledReportService.execute_report(
-                    db, report, send_email=True
-                )
-                logger.info(
-                    f"Report executed: {report.name}, Status: {execution.status}, "
-                    f"Email sent: {execution.email_sent}"
-                )
-            except Exception as e:
-                logger.error(f"Error executing report {report.name}: {e}")
-
+        ReportScheduleService.resync()
+        get_report_executor().dispatch()
     except Exception as e:
-        logger.error(f"Error processing due reports: {e}")
-    finally:
-        db.close()
+        logger.error(f"Error resyncing report schedule: {e}")
 
 
 def start_scheduler():
@@ -69,21 +54,68 @@ def start_scheduler():
         logger.info("Scheduler is already running")
         return
 
-    # Add job to check for due reports every 5 minutes
+    # Scheduled reports run from the timer thread, which wakes when the next
+    # one is due; this only picks up schedules edited by other processes
+    ReportScheduleService.start()
     scheduler.add_job(
-        process_due_reports,
-        trigger=IntervalTrigger(minutes=5),
-        id='check_due_reports',
-        name='Check and execute due reports',
+        resync_report_schedule,
+        trigger=IntervalTrigger(minutes=settings.SCHEDULED_REPORT_RESYNC_MINUTES),
+        id='resync_report_schedule',
+        name='Reload scheduled report run times',
         replace_existing=True
     )
 
-    # Add daily cleanup job at 3 AM UTC
+    # Flag SLA breaches as they happen rather than when a ticket is next opened
     scheduler.add_job(
-        cleanup_old_report_files,
-        trigger=CronTrigger(hour=3, minute=0),
-        id='cleanup_report_files',
-        name='Cleanup old report files',
+        check_sla_breaches,
+        trigger=IntervalTrigger(minutes=1),
+        id='check_sla_breaches',
+        name='Flag SLA breaches',
+        replace_existing=True
+    )
+
+    # Repair any drift in the dashboard ticket_counters rollup
+    scheduler.add_job(
+        reconcile_ticket_counters,
+        trigger=IntervalTrigger(minutes=30),
+        id='reconcile_ticket_counters',
+        name='Reconcile dashboard ticket counters',
+        replace_existing=True
+    )
+
+    # Repair any drift in the live chat unread counts and last-message pointers
+    scheduler.add_job(
+        reconcile_chat_counters,
+        trigger=IntervalTrigger(hours=1),
+        id='reconcile_chat_counters',
+        name='Reconcile live chat unread counters',
+        replace_existing=True
+    )
+
+    # Rebuild the ticket_daily_facts rollup behind the trend reports nightly
+    scheduler.add_job(
+        rebuild_ticket_facts,
+        trigger=CronTrigger(hour=2, minute=30),
+        id='rebuild_ticket_facts',
+        name='Rebuild daily ticket facts',
+        replace_existing=True
+    )
+
+    # Release export jobs left running by a crashed worker
+    scheduler.add_job(
+        fail_stale_export_jobs,
+        trigger=IntervalTrigger(minutes=10),
+        id='fail_stale_export_jobs',
+        name='Fail stale export jobs',
+        replace_existing=True
+    )
+
+    # Size-bounded LRU eviction of rendered reports (renders also evict)
+    scheduler.add_job(
+        evict_report_files,
+        trigger=IntervalTrigger(hours=1),
+        id='evict_report_files',
+        name='Evict least recently used report files',
         replace_existing=True
     )
 
@@ -93,42 +125,109 @@ def start_scheduler():
 
 def stop_scheduler():
     """Stop the report scheduler"""
+    from app.services.scheduled_report_executor import shutdown_report_executor
+
     global scheduler
     if scheduler and scheduler.running:
         scheduler.shutdown(wait=False)
         logger.info("Report scheduler stopped")
+    ReportScheduleService.stop()
+    shutdown_report_executor()
 
 
-def cleanup_old_report_files():
-    """Clean up report files older than 30 days"""
-    import os
-    from datetime import timedelta
-    from pathlib import Path
+def evict_report_files():
+    """Keep exports/reports under REPORT_CACHE_MAX_MB, least recently used files first"""
+    from app.services.report_cache import ReportCache
 
-    logger.info("Starting cleanup of old report files...")
+    try:
+        deleted = ReportCache.evict()
+        if deleted:
+            logger.info(f"Evicted {deleted} report files")
+    except Exception as e:
+        logger.error(f"Error evicting report files: {e}")
 
-    export_dir = Path("exports/reports")
-    if not export_dir.exists():
-        return
 
-    cutoff_time = datetime.now() - timedelta(days=30)
+def check_sla_breaches():
+    """Flag newly breached SLAs, record breach events and notify assignees"""
+    from app.services.sla_service import SLAService
 
-    deleted_count = 0
-    for file_path in export_dir.glob("*"):
-        if file_path.is_file():
-            file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-            if file_mtime < cutoff_time:
-                try:
-                    file_path.unlink()
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Error deleting file {file_path}: {e}")
+    db = SessionLocal()
+    try:
+        breached = SLAService.check_and_update_breaches(db)
+        if breached:
+            logger.info(f"SLA breach check flagged {breached} breaches")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error checking SLA breaches: {e}")
+    finally:
+        db.close()
 
-    logger.info(f"Cleanup completed. Deleted {deleted_count} old report files.")
+
+def reconcile_ticket_counters():
+    """Recompute ticket_counters from tickets and fix any drift"""
+    from app.services.ticket_counter_service import TicketCounterService
+
+    db = SessionLocal()
+    try:
+        repaired = TicketCounterService.reconcile(db)
+        logger.info(f"Ticket counter reconciliation done, {repaired} rows repaired")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error reconciling ticket counters: {e}")
+    finally:
+        db.close()
+
+
+def reconcile_chat_counters():
+    """Recompute live chat unread counts and last-message pointers and fix any drift"""
+    from app.services.chat_counter_service import ChatCounterService
+
+    db = SessionLocal()
+    try:
+        repaired = ChatCounterService.reconcile(db)
+        logger.info(f"Chat counter reconciliation done, {repaired} rows repaired")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error reconciling chat counters: {e}")
+    finally:
+        db.close()
+
+
+def rebuild_ticket_facts():
+    """Recompute recent ticket_daily_facts from tickets, repairing any drift"""
+    from app.services.ticket_fact_service import TicketFactService
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=settings.TICKET_FACT_REBUILD_DAYS)
+    db = SessionLocal()
+    try:
+        TicketFactService.rebuild(db, since=since)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding ticket daily facts: {e}")
+    finally:
+        db.close()
+
+
+def fail_stale_export_jobs():
+    """Fail background export jobs whose worker died mid-run"""
+    from app.services.export_job_service import ExportJobService
+
+    db = SessionLocal()
+    try:
+        failed = ExportJobService.fail_stale_jobs(db)
+        if failed:
+            logger.warning(f"Failed {failed} stale export jobs")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error failing stale export jobs: {e}")
+    finally:
+        db.close()
 
 
 def get_scheduler_status():
     """Get the current status of the scheduler"""
+    from app.services.scheduled_report_executor import get_report_executor
+
     global scheduler
     if scheduler is None:
         return {"status": "not_initialized", "jobs": []}
@@ -144,5 +243,7 @@ def get_scheduler_status():
 
     return {
         "status": "running" if scheduler.running else "stopped",
-        "jobs": jobs
+        "jobs": jobs,
+        "report_schedule": ReportScheduleService.status(),
+        "report_executor": get_report_executor().metrics.snapshot()
     }
@@ -1,14 +1,37 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, case, extract
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from sqlalchemy import func, and_, or_, case, extract, bindparam, literal, DateTime
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from collections import defaultdict
 
 from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.ticket_daily_fact import TicketDailyFact
 from app.models.user import User
 from app.models.category import Category
+from app.models.group import Group
 from app.models.sla_policy import SLAPolicy
 from app.services.sla_service import now_local, LOCAL_TZ
+from app.services.quantile_sketch import QuantileSketch
+
+# Report types get_export_data can build
+EXPORT_REPORT_TYPES = (
+    "sla_compliance", "ticket_aging", "technician_performance", "ticket_volume", "category_breakdown"
+)
+
+
+def parse_date(date_str: Optional[str]) -> Optional[datetime]:
+    """Parse date string to datetime"""
+    if not date_str:
+        return None
+    try:
+        # Try ISO format first
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            # Try simple date format
+            return datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
 
 
 class ReportingService:
@@ -41,99 +64,40 @@ class ReportingService:
             at_risk_count: Tickets approaching breach
             breached_count: Currently breached tickets
         """
-        # Build base query - SLA compliance is tracked for INCIDENT tickets only
+        # SLA compliance is tracked for INCIDENT tickets only
         # Service Requests, Problems, and Changes have different SLA handling
-        query = self.db.query(Ticket).filter(Ticket.ticket_type == "INCIDENT")
-
-        # Apply filters
+        filters = [Ticket.ticket_type == "INCIDENT"]
         if start_date:
-            query = query.filter(Ticket.created_at >= start_date)
+            filters.append(Ticket.created_at >= start_date)
         if end_date:
-            query = query.filter(Ticket.created_at <= end_date)
+            filters.append(Ticket.created_at <= end_date)
         if priority:
-            query = query.filter(Ticket.priority == priority)
+            filters.append(Ticket.priority == priority)
         if category_id:
-            query = query.filter(Ticket.category_id == category_id)
+            filters.append(Ticket.category_id == category_id)
 
-        tickets = query.all()
-
-        # Calculate metrics
-        total_tickets = len(tickets)
+        now = now_local()
+        row = self.db.query(
+            func.count(Ticket.id).label("total"),
+            self._count_if(self._response_met(now)).label("response_met"),
+            self._count_if(self._response_breached(now)).label("response_breached"),
+            self._count_if(self._resolution_met_on_close()).label("resolution_met"),
+            self._count_if(or_(
+                self._resolution_breached_on_close(),
+                and_(~self._is_done(), Ticket.resolution_breached.is_(True))
+            )).label("resolution_breached"),
+            self._count_if(self._at_risk(now)).label("at_risk"),
+        ).filter(*filters).one()
+
+        total_tickets = row.total or 0
         if total_tickets == 0:
             return self._empty_sla_metrics()
 
-        # Response time compliance
-        response_met = 0
-        response_breached = 0
-        resolution_met = 0
-        resolution_breached = 0
-        at_risk_count = 0
-
-        for ticket in tickets:
-            # Check response SLA based on first_response_at
-            if ticket.response_due:
-                if ticket.first_response_at:
-                    # Response was made - check if within SLA
-                    first_response = ticket.first_response_at
-                    response_due = ticket.response_due
-                    if first_response.tzinfo is None:
-                        first_response = first_response.replace(tzinfo=LOCAL_TZ)
-                    if response_due.tzinfo is None:
-                        response_due = response_due.replace(tzinfo=LOCAL_TZ)
-
-                    if first_response <= response_due:
-                        response_met += 1
-                    else:
-                        response_breached += 1
-                elif ticket.response_breached:
-                    response_breached += 1
-                elif ticket.status in [TicketStatus.RESOLVED, TicketStatus.CLOSED]:
-                    # Ticket resolved/closed without first response tracking - count as met if not breached
-                    response_met += 1
-                else:
-                    # Ticket still open, check if due date passed
-                    response_due = ticket.response_due
-                    if response_due.tzinfo is None:
-                        response_due = response_due.replace(tzinfo=LOCAL_TZ)
-                    if now_local() > response_due:
-                        response_breached += 1
-                    else:
-                        response_met += 1  # Still within time
-
-            # Check resolution SLA
-            if ticket.status in [TicketStatus.RESOLVED, TicketStatus.CLOSED]:
-                if ticket.resolved_at and ticket.resolution_due:
-                    resolved_at = ticket.resolved_at
-                    resolution_due = ticket.resolution_due
-                    if resolved_at.tzinfo is None:
-                        resolved_at = resolved_at.replace(tzinfo=LOCAL_TZ)
-                    if resolution_due.tzinfo is None:
-                        resolution_due = resolution_due.replace(tzinfo=LOCAL_TZ)
-
-                    if resolved_at <= resolution_due:
-                        resolution_met += 1
-                    else:
-                        resolution_breached += 1
-            elif ticket.resolution_breached:
-                resolution_breached += 1
-
-            # Check at-risk tickets (80% of SLA time used but not yet breached)
-            if ticket.status not in [TicketStatus.RESOLVED, TicketStatus.CLOSED]:
-                if ticket.resolution_due and not ticket.resolution_breached:
-                    resolution_due = ticket.resolution_due
-                    created_at = ticket.created_at
-                    if resolution_due.tzinfo is None:
-                        resolution_due = resolution_due.replace(tzinfo=LOCAL_TZ)
-                    if created_at.tzinfo is None:
-                        created_at = created_at.replace(tzinfo=LOCAL_TZ)
-
-                    time_remaining = resolution_due - now_local()
-                    total_sla_time = resolution_due - created_at
-                    if total_sla_time.total_seconds() > 0 and time_remaining.total_seconds() > 0:
-                        time_used_ratio = 1 - (time_remaining.total_seconds() / total_sla_time.total_seconds())
-                        # At risk if 80% or more used but still has time remaining (not breached)
-                        if time_used_ratio >= 0.8:
-                            at_risk_count += 1
+        response_met = int(row.response_met or 0)
+        response_breached = int(row.response_breached or 0)
+        resolution_met = int(row.resolution_met or 0)
+        resolution_breached = int(row.resolution_breached or 0)
+        at_risk_count = int(row.at_risk or 0)
 
         # Calculate percentages
         response_compliance = (
@@ -146,14 +110,11 @@ class ReportingService:
         )
         overall_compliance = (response_compliance + resolution_compliance) / 2
 
-        # Breakdown by priority
-        by_priority = self._calculate_sla_by_priority(tickets)
-
-        # Breakdown by category
-        by_category = self._calculate_sla_by_category(tickets)
+        # Breakdowns by priority and category
+        by_priority, by_category = self._calculate_sla_breakdowns(filters)
 
         # 7-day trend
-        trend_data = self._calculate_sla_trend(start_date or now_local() - timedelta(days=7))
+        trend_data = self._calculate_sla_trend(start_date or now - timedelta(days=7))
 
         return {
             "overall_compliance": round(overall_compliance, 2),
@@ -171,97 +132,157 @@ class ReportingService:
             "trend_data": trend_data
         }
 
-    def _calculate_sla_by_priority(self, tickets: List[Ticket]) -> List[Dict]:
-        """Calculate SLA compliance by priority"""
-        priorities = defaultdict(lambda: {"met": 0, "breached": 0, "total": 0})
+    # SLA outcome predicates, evaluated per ticket inside the aggregate queries
 
-        for ticket in tickets:
-            priority = ticket.priority.value if ticket.priority else "MEDIUM"
-            priorities[priority]["total"] += 1
-
-            if ticket.resolved_at and ticket.resolution_due:
-                if ticket.resolved_at <= ticket.resolution_due:
-                    priorities[priority]["met"] += 1
-                else:
-                    priorities[priority]["breached"] += 1
-
-        result = []
-        for priority, stats in priorities.items():
-            compliance = (
-                (stats["met"] / (stats["met"] + stats["breached"]) * 100)
-                if (stats["met"] + stats["breached"]) > 0 else 0
-            )
-            result.append({
-                "priority": priority,
-                "total": stats["total"],
-                "met": stats["met"],
-                "breached": stats["breached"],
-                "compliance": round(compliance, 2)
-            })
+    @staticmethod
+    def _count_if(condition):
+        return func.sum(case((condition, 1), else_=0))
 
-        return sorted(result, key=lambda x: x["priority"])
+    @staticmethod
+    def _is_done():
+        return Ticket.status.in_([TicketStatus.RESOLVED, TicketStatus.CLOSED])
 
-    def _calculate_sla_by_category(self, tickets: List[Ticket]) -> List[Dict]:
-        """Calculate SLA compliance by category"""
-        categories = defaultdict(lambda: {"met": 0, "breached": 0, "total": 0, "name": ""})
+    def _response_met(self, now: datetime):
+        """Responded in time; or, with no response recorded and not flagged breached, closed or still within time"""
+        no_response_not_flagged = and_(
+            Ticket.first_response_at.is_(None), Ticket.response_breached.isnot(True)
+        )
+        return and_(Ticket.response_due.isnot(None), or_(
+            Ticket.first_response_at <= Ticket.response_due,
+            and_(no_response_not_flagged, self._is_done()),
+            and_(no_response_not_flagged, ~self._is_done(), Ticket.response_due >= now),
+        ))
+
+    def _response_breached(self, now: datetime):
+        """Responded late, flagged breached, or still open without a response past the due time"""
+        no_response = Ticket.first_response_at.is_(None)
+        return and_(Ticket.response_due.isnot(None), or_(
+            Ticket.first_response_at > Ticket.response_due,
+            and_(no_response, Ticket.response_breached.is_(True)),
+            and_(no_response, Ticket.response_breached.isnot(True), ~self._is_done(),
+                 Ticket.response_due < now),
+        ))
+
+    def _resolution_met_on_close(self):
+        return and_(self._is_done(), Ticket.resolved_at <= Ticket.resolution_due)
+
+    def _resolution_breached_on_close(self):
+        return and_(self._is_done(), Ticket.resolved_at > Ticket.resolution_due)
+
+    def _at_risk(self, now: datetime):
+        """Open, not breached, with time left but 80% or more of the resolution window used"""
+        due = self._epoch(Ticket.resolution_due)
+        remaining = due - self._epoch(bindparam("now_at_risk", now, type_=DateTime(timezone=True)))
+        total = due - self._epoch(Ticket.created_at)
+        return and_(
+            ~self._is_done(),
+            Ticket.resolution_due.isnot(None),
+            Ticket.resolution_breached.isnot(True),
+            total > 0,
+            remaining > 0,
+            1 - remaining / total >= 0.8,
+        )
 
-        for ticket in tickets:
-            cat_id = ticket.category_id or 0
-            cat_name = ticket.category.name if ticket.category else "Uncategorized"
-            categories[cat_id]["name"] = cat_name
-            categories[cat_id]["total"] += 1
-
-            if ticket.resolved_at and ticket.resolution_due:
-                if ticket.resolved_at <= ticket.resolution_due:
-                    categories[cat_id]["met"] += 1
-                else:
-                    categories[cat_id]["breached"] += 1
-
-        result = []
-        for cat_id, stats in categories.items():
-            compliance = (
-                (stats["met"] / (stats["met"] + stats["breached"]) * 100)
-                if (stats["met"] + stats["breached"]) > 0 else 0
-            )
-            result.append({
+    def _epoch(self, expr):
+        """Seconds since the epoch for a datetime expression"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return extract("epoch", expr)
+        return func.julianday(expr) * 86400.0
+
+    def _calculate_sla_breakdowns(self, filters: list) -> Tuple[List[Dict], List[Dict]]:
+        """
+        SLA compliance by priority and by category from one grouped query.
+
+        Met/breached here count any ticket with resolved_at and resolution_due
+        set, whatever its current status.
+        """
+        rows = self.db.query(
+            Ticket.priority,
+            Ticket.category_id,
+            Category.name,
+            func.count(Ticket.id).label("total"),
+            self._count_if(Ticket.resolved_at <= Ticket.resolution_due).label("met"),
+            self._count_if(Ticket.resolved_at > Ticket.resolution_due).label("breached"),
+        ).outerjoin(
+            Category, Category.id == Ticket.category_id
+        ).filter(*filters).group_by(
+            Ticket.priority, Ticket.category_id, Category.name
+        ).all()
+
+        priorities = defaultdict(lambda: {"met": 0, "breached": 0, "total": 0})
+        categories = defaultdict(lambda: {"met": 0, "breached": 0, "total": 0, "name": ""})
+        for ticket_priority, cat_id, cat_name, total, met, breached in rows:
+            for stats in (
+                priorities[ticket_priority.value if ticket_priority else "MEDIUM"],
+                categories[cat_id or 0],
+            ):
+                stats["total"] += total
+                stats["met"] += int(met or 0)
+                stats["breached"] += int(breached or 0)
+            categories[cat_id or 0]["name"] = cat_name if cat_name is not None else "Uncategorized"
+
+        by_priority = [
+            {
+                "priority": name,
+                "total": stats["total"],
+                "met": stats["met"],
+                "breached": stats["breached"],
+                "compliance": self._compliance(stats),
+            }
+            for name, stats in priorities.items()
+        ]
+        by_category = [
+            {
                 "category_id": cat_id,
                 "category_name": stats["name"],
                 "total": stats["total"],
                 "met": stats["met"],
                 "breached": stats["breached"],
-                "compliance": round(compliance, 2)
-            })
+                "compliance": self._compliance(stats),
+            }
+            for cat_id, stats in categories.items()
+        ]
+        return (
+            sorted(by_priority, key=lambda x: x["priority"]),
+            sorted(by_category, key=lambda x: (-x["total"], x["category_id"]))[:10]  # Top 10
+        )
 
-        return sorted(result, key=lambda x: x["total"], reverse=True)[:10]  # Top 10
+    @staticmethod
+    def _compliance(stats: Dict) -> float:
+        judged = stats["met"] + stats["breached"]
+        return round(stats["met"] / judged * 100, 2) if judged > 0 else 0
 
     def _calculate_sla_trend(self, start_date: datetime) -> List[Dict]:
         """Calculate 7-day SLA compliance trend"""
+        # Day boundaries are computed here (as before) so days keep start_date's
+        # time of day and wall-clock length; the query buckets tickets into them
+        boundaries = [start_date + timedelta(days=i) for i in range(8)]
+        day = case(
+            *[(Ticket.created_at < boundaries[i + 1], i) for i in range(7)]
+        ).label("day")
+
+        rows = self.db.query(
+            day,
+            func.count(Ticket.id),
+            self._count_if(Ticket.resolved_at <= Ticket.resolution_due),
+            self._count_if(Ticket.resolved_at > Ticket.resolution_due),
+        ).filter(
+            Ticket.created_at >= boundaries[0],
+            Ticket.created_at < boundaries[7],
+            Ticket.ticket_type == "INCIDENT"
+        ).group_by(day).all()
+        by_day = {index: (total, int(met or 0), int(breached or 0)) for index, total, met, breached in rows}
+
         trend = []
         for i in range(7):
-            day_start = start_date + timedelta(days=i)
-            day_end = day_start + timedelta(days=1)
-
-            tickets = self.db.query(Ticket).filter(
-                and_(
-                    Ticket.created_at >= day_start,
-                    Ticket.created_at < day_end,
-                    Ticket.ticket_type == "INCIDENT"
-                )
-            ).all()
-
-            met = sum(1 for t in tickets if t.resolved_at and t.resolution_due
-                     and t.resolved_at <= t.resolution_due)
-            breached = sum(1 for t in tickets if t.resolved_at and t.resolution_due
-                          and t.resolved_at > t.resolution_due)
-
+            total, met, breached = by_day.get(i, (0, 0, 0))
             compliance = (met / (met + breached) * 100) if (met + breached) > 0 else 0
-
             trend.append({
-                "date": day_start.strftime("%Y-%m-%d"),
+                "date": boundaries[i].strftime("%Y-%m-%d"),
                 "compliance": round(compliance, 2),
                 "met": met,
                 "breached": breached,
-                "total": len(tickets)
+                "total": total
             })
 
         return trend
@@ -406,65 +427,108 @@ class ReportingService:
         - SLA compliance rate
         - Customer satisfaction (if available)
         """
-        query = self.db.query(User).filter(User.is_active == True)
+        return list(self.iter_technician_performance(start_date, end_date, user_id))
 
+    def iter_technician_performance(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[int] = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Technician performance rows, busiest first, streamed from one query.
+
+        Tickets are aggregated with a single GROUP BY assignee joined to users,
+        and rows are fetched batch_size at a time, so memory stays flat however
+        many technicians there are.
+        """
+        done = Ticket.status.in_([TicketStatus.RESOLVED, TicketStatus.CLOSED])
+        created = self._epoch(Ticket.created_at)
+        total = func.count(Ticket.id)
+
+        query = self.db.query(
+            User.id,
+            User.full_name,
+            User.email,
+            total.label("total_tickets"),
+            self._count_if(done).label("resolved_tickets"),
+            func.avg(case(
+                (and_(done, Ticket.resolved_at.isnot(None)), self._epoch(Ticket.resolved_at) - created)
+            )).label("avg_resolution_seconds"),
+            func.avg(case(
+                (Ticket.first_response_at.isnot(None), self._epoch(Ticket.first_response_at) - created)
+            )).label("avg_response_seconds"),
+            self._count_if(and_(done, Ticket.resolved_at <= Ticket.resolution_due)).label("sla_met"),
+        ).join(
+            Ticket, Ticket.assignee_id == User.id
+        ).filter(
+            User.is_active == True,
+            Ticket.created_at >= start_date,
+            Ticket.created_at <= end_date
+        )
         if user_id:
             query = query.filter(User.id == user_id)
 
-        users = query.all()
-        performance_data = []
+        query = query.group_by(User.id, User.full_name, User.email).order_by(total.desc(), User.id)
 
-        for user in users:
-            # Get tickets assigned to this user
-            tickets = self.db.query(Ticket).filter(
-                and_(
-                    Ticket.assignee_id == user.id,
-                    Ticket.created_at >= start_date,
-                    Ticket.created_at <= end_date
-                )
-            ).all()
-
-            if not tickets:
-                continue
+        for row in query.yield_per(batch_size):
+            total_tickets = row.total_tickets
+            resolved = int(row.resolved_tickets or 0)
+            sla_met = int(row.sla_met or 0)
+            yield {
+                "user_id": row.id,
+                "user_name": row.full_name,
+                "email": row.email,
+                "total_tickets": total_tickets,
+                "resolved_tickets": resolved,
+                "resolution_rate": round((resolved / total_tickets * 100), 2) if total_tickets > 0 else 0,
+                "avg_resolution_time_hours": round(float(row.avg_resolution_seconds or 0) / 3600, 2),
+                "avg_response_time_hours": round(float(row.avg_response_seconds or 0) / 3600, 2),
+                "sla_compliance": round((sla_met / resolved * 100), 2) if resolved else 0,
+                "open_tickets": total_tickets - resolved
+            }
 
-            total_tickets = len(tickets)
-            resolved_tickets = [t for t in tickets if t.status in [TicketStatus.RESOLVED, TicketStatus.CLOSED]]
-
-            # Calculate average resolution time
-            resolution_times = [
-                (t.resolved_at - t.created_at).total_seconds() / 3600
-                for t in resolved_tickets if t.resolved_at
-            ]
-            avg_resolution_time = sum(resolution_times) / len(resolution_times) if resolution_times else 0
-
-            # Calculate average first response time using first_response_at
-            response_times = [
-                (t.first_response_at - t.created_at).total_seconds() / 3600
-                for t in tickets if t.first_response_at
-            ]
-            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-
-            # Calculate SLA compliance
-            sla_met = sum(
-                1 for t in resolved_tickets
-                if t.resolved_at and t.resolution_due and t.resolved_at <= t.resolution_due
-            )
-            sla_compliance = (sla_met / len(resolved_tickets) * 100) if resolved_tickets else 0
+    # ============================================================================
+    # DAILY FACT ROLLUP (ticket_daily_facts)
+    # ============================================================================
 
-            performance_data.append({
-                "user_id": user.id,
-                "user_name": user.full_name,
-                "email": user.email,
-                "total_tickets": total_tickets,
-                "resolved_tickets": len(resolved_tickets),
-                "resolution_rate": round((len(resolved_tickets) / total_tickets * 100), 2) if total_tickets > 0 else 0,
-                "avg_resolution_time_hours": round(avg_resolution_time, 2),
-                "avg_response_time_hours": round(avg_response_time, 2),
-                "sla_compliance": round(sla_compliance, 2),
-                "open_tickets": total_tickets - len(resolved_tickets)
-            })
+    @staticmethod
+    def fact_day(value: datetime) -> date:
+        """The ticket_daily_facts day a timestamp falls on (UTC)"""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+
+    def _facts_between(self, start_date: datetime, end_date: datetime):
+        """Fact rows for the days from start_date through end_date, inclusive"""
+        return and_(
+            TicketDailyFact.day >= self.fact_day(start_date),
+            TicketDailyFact.day <= self.fact_day(end_date),
+        )
 
-        return sorted(performance_data, key=lambda x: x["total_tickets"], reverse=True)
+    @staticmethod
+    def _period(day: date, granularity: str) -> str:
+        if granularity == "daily":
+            return day.strftime("%Y-%m-%d")
+        if granularity == "weekly":
+            return day.strftime("%Y-W%U")
+        return day.strftime("%Y-%m")
+
+    @staticmethod
+    def _fold_minutes(groups: Dict[str, Dict[str, float]], key: str, row) -> None:
+        """Merge a (count, minutes, min_minutes, max_minutes) fact row into groups[key]"""
+        stats = groups.setdefault(key, {"count": 0, "minutes": 0.0, "min": None, "max": None})
+        stats["count"] += row.count
+        stats["minutes"] += row.minutes
+        if row.min_minutes is not None:
+            stats["min"] = row.min_minutes if stats["min"] is None else min(stats["min"], row.min_minutes)
+        if row.max_minutes is not None:
+            stats["max"] = row.max_minutes if stats["max"] is None else max(stats["max"], row.max_minutes)
+
+    @staticmethod
+    def _fact_is_done():
+        return TicketDailyFact.status.in_([TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value])
 
     # ============================================================================
     # RESPONSE TIME TRENDS
@@ -477,48 +541,33 @@ class ReportingService:
         granularity: str = "daily"  # daily, weekly, monthly
     ) -> List[Dict[str, Any]]:
         """
-        Get first response time trends over time using first_response_at field
+        Get first response time trends over time, by the day tickets were created
         """
-        tickets = self.db.query(Ticket).filter(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date,
-                Ticket.first_response_at.isnot(None)
-            )
-        ).all()
-
-        # Group by time period
-        response_data = defaultdict(list)
-
-        for ticket in tickets:
-            if granularity == "daily":
-                period = ticket.created_at.strftime("%Y-%m-%d")
-            elif granularity == "weekly":
-                period = ticket.created_at.strftime("%Y-W%U")
-            else:  # monthly
-                period = ticket.created_at.strftime("%Y-%m")
-
-            # Calculate response time in hours
-            created_at = ticket.created_at
-            first_response = ticket.first_response_at
-            if created_at.tzinfo is None:
-                created_at = created_at.replace(tzinfo=LOCAL_TZ)
-            if first_response.tzinfo is None:
-                first_response = first_response.replace(tzinfo=LOCAL_TZ)
-
-            response_time = (first_response - created_at).total_seconds() / 3600
-            response_data[period].append(response_time)
+        rows = self.db.query(
+            TicketDailyFact.day,
+            func.sum(TicketDailyFact.responded_count).label("count"),
+            func.sum(TicketDailyFact.response_minutes_sum).label("minutes"),
+            func.min(TicketDailyFact.response_minutes_min).label("min_minutes"),
+            func.max(TicketDailyFact.response_minutes_max).label("max_minutes"),
+        ).filter(
+            self._facts_between(start_date, end_date),
+            TicketDailyFact.responded_count > 0
+        ).group_by(TicketDailyFact.day).all()
+
+        # Fold days into periods
+        periods: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            self._fold_minutes(periods, self._period(row.day, granularity), row)
 
-        # Calculate statistics
         trend_data = []
-        for period in sorted(response_data.keys()):
-            times = response_data[period]
+        for period in sorted(periods):
+            stats = periods[period]
             trend_data.append({
                 "period": period,
-                "avg_response_time_hours": round(sum(times) / len(times), 2),
-                "min_response_time_hours": round(min(times), 2),
-                "max_response_time_hours": round(max(times), 2),
-                "ticket_count": len(times)
+                "avg_response_time_hours": round(stats["minutes"] / stats["count"] / 60, 2),
+                "min_response_time_hours": round((stats["min"] or 0) / 60, 2),
+                "max_response_time_hours": round((stats["max"] or 0) / 60, 2),
+                "ticket_count": stats["count"]
             })
 
         return trend_data
@@ -531,50 +580,119 @@ class ReportingService:
         self,
         start_date: datetime,
         end_date: datetime,
-        group_by: str = "priority"  # priority, category, assignee
+        group_by: str = "priority"  # priority, category, group, assignee
     ) -> List[Dict[str, Any]]:
         """
-        Analyze resolution times grouped by different criteria
+        Analyze resolution times of resolved/closed tickets grouped by different criteria
         """
-        tickets = self.db.query(Ticket).filter(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date,
-                Ticket.resolved_at.isnot(None),
-                Ticket.status.in_([TicketStatus.RESOLVED, TicketStatus.CLOSED])
-            )
-        ).all()
-
-        grouped_data = defaultdict(list)
-
-        for ticket in tickets:
-            resolution_time = (ticket.resolved_at - ticket.created_at).total_seconds() / 3600
-
-            if group_by == "priority":
-                group_key = ticket.priority.value if ticket.priority else "NONE"
-            elif group_by == "category":
-                group_key = ticket.category.name if ticket.category else "Uncategorized"
-            elif group_by == "assignee":
-                group_key = ticket.assignee.full_name if ticket.assignee else "Unassigned"
-            else:
-                group_key = "All"
-
-            grouped_data[group_key].append(resolution_time)
+        key = self._fact_group_key(group_by)
+        filters = [self._facts_between(start_date, end_date), self._fact_is_done()]
+        rows = self.db.query(
+            key.label("key"),
+            func.sum(TicketDailyFact.resolved_count).label("count"),
+            func.sum(TicketDailyFact.resolution_minutes_sum).label("minutes"),
+            func.min(TicketDailyFact.resolution_minutes_min).label("min_minutes"),
+            func.max(TicketDailyFact.resolution_minutes_max).label("max_minutes"),
+        ).filter(*filters, TicketDailyFact.resolved_count > 0).group_by(key).all()
+
+        names = self._group_names(group_by, [row.key for row in rows])
+        sketches = self._by_name(self._merged_sketches("resolution", key, filters), names)
+
+        # Different ids can share a display name; merge them like the report always has
+        grouped: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            self._fold_minutes(grouped, names.get(row.key, row.key), row)
 
-        # Calculate statistics
         analysis_data = []
-        for group_key, times in grouped_data.items():
+        for group_key, stats in grouped.items():
+            median = sketches[group_key].quantile(0.5) if group_key in sketches else None
             analysis_data.append({
                 "group": group_key,
-                "avg_resolution_time_hours": round(sum(times) / len(times), 2),
-                "min_resolution_time_hours": round(min(times), 2),
-                "max_resolution_time_hours": round(max(times), 2),
-                "median_resolution_time_hours": round(sorted(times)[len(times) // 2], 2),
-                "ticket_count": len(times)
+                "avg_resolution_time_hours": round(stats["minutes"] / stats["count"] / 60, 2),
+                "min_resolution_time_hours": round((stats["min"] or 0) / 60, 2),
+                "max_resolution_time_hours": round((stats["max"] or 0) / 60, 2),
+                "median_resolution_time_hours": round((median or 0) / 60, 2),
+                "ticket_count": stats["count"]
             })
 
         return sorted(analysis_data, key=lambda x: x["avg_resolution_time_hours"])
 
+    # ============================================================================
+    # RESPONSE / RESOLUTION TIME PERCENTILES
+    # ============================================================================
+
+    def get_time_percentiles(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        metric: str = "resolution",  # response, resolution
+        group_by: str = "priority",  # priority, category, group, assignee, all
+        percentiles: Tuple[int, ...] = (50, 90, 99)
+    ) -> List[Dict[str, Any]]:
+        """
+        Response or resolution time percentiles per group, in hours.
+
+        Answered by merging the quantile sketches of the daily fact rows, so
+        each value is within SKETCH_RELATIVE_ACCURACY (1%) of the exact
+        percentile. Resolution times cover resolved/closed tickets only.
+        """
+        key = self._fact_group_key(group_by)
+        filters = [self._facts_between(start_date, end_date)]
+        if metric == "resolution":
+            filters.append(self._fact_is_done())
+        sketches = self._merged_sketches(metric, key, filters)
+        sketches = self._by_name(sketches, self._group_names(group_by, list(sketches)))
+
+        results = []
+        for group_key, sketch in sketches.items():
+            result = {"group": group_key, "ticket_count": sketch.count}
+            for p in percentiles:
+                result[f"p{p}_hours"] = round(sketch.quantile(p / 100) / 60, 2)
+            results.append(result)
+        return sorted(results, key=lambda x: (-x["ticket_count"], x["group"]))
+
+    @staticmethod
+    def _fact_group_key(group_by: str):
+        if group_by == "priority":
+            return TicketDailyFact.priority
+        if group_by == "category":
+            return TicketDailyFact.category_id
+        if group_by == "group":
+            return TicketDailyFact.assigned_group_id
+        if group_by == "assignee":
+            return TicketDailyFact.assignee_id
+        return literal("All")
+
+    def _group_names(self, group_by: str, keys: list) -> Dict[Any, str]:
+        """Display names for the fact keys of a grouping"""
+        if group_by == "priority":
+            return {key: key or "NONE" for key in keys}
+        if group_by == "category":
+            names = dict(self.db.query(Category.id, Category.name).filter(Category.id.in_(keys)).all())
+            return {key: names.get(key, "Uncategorized") for key in keys}
+        if group_by == "group":
+            names = dict(self.db.query(Group.id, Group.name).filter(Group.id.in_(keys)).all())
+            return {key: names.get(key, "Unassigned") for key in keys}
+        if group_by == "assignee":
+            names = dict(self.db.query(User.id, User.full_name).filter(User.id.in_(keys)).all())
+            return {key: names.get(key, "Unassigned") for key in keys}
+        return {key: "All" for key in keys}
+
+    def _merged_sketches(self, metric: str, key, filters: list) -> Dict[Any, QuantileSketch]:
+        """Merge the response/resolution sketches of the matching fact rows per key"""
+        column = getattr(TicketDailyFact, f"{metric}_sketch")
+        sketches: Dict[Any, QuantileSketch] = defaultdict(QuantileSketch)
+        for group_key, sketch in self.db.query(key, column).filter(*filters, column.isnot(None)):
+            sketches[group_key].merge(QuantileSketch.from_json(sketch))
+        return sketches
+
+    @staticmethod
+    def _by_name(sketches: Dict[Any, QuantileSketch], names: Dict[Any, str]) -> Dict[str, QuantileSketch]:
+        merged: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+        for group_key, sketch in sketches.items():
+            merged[names.get(group_key, group_key)].merge(sketch)
+        return {name: sketch for name, sketch in merged.items() if sketch.count > 0}
+
     # ============================================================================
     # TICKET VOLUME TRENDS
     # ============================================================================
@@ -586,13 +704,23 @@ class ReportingService:
         granularity: str = "daily"
     ) -> Dict[str, Any]:
         """
-        Get ticket volume trends with breakdown by status, priority, category
+        Get ticket volume trends with breakdown by status, priority and type.
+
+        created counts tickets by the day they were created, resolved by the
+        day they were resolved.
         """
-        tickets = self.db.query(Ticket).filter(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date
-            )
+        rows = self.db.query(
+            TicketDailyFact.day,
+            TicketDailyFact.priority,
+            TicketDailyFact.status,
+            TicketDailyFact.ticket_type,
+            func.sum(TicketDailyFact.ticket_count).label("created"),
+            func.sum(TicketDailyFact.resolved_on_day_count).label("resolved"),
+        ).filter(
+            self._facts_between(start_date, end_date)
+        ).group_by(
+            TicketDailyFact.day, TicketDailyFact.priority,
+            TicketDailyFact.status, TicketDailyFact.ticket_type
         ).all()
 
         # Group by time period
@@ -604,27 +732,16 @@ class ReportingService:
             "by_type": defaultdict(int)
         })
 
-        for ticket in tickets:
-            if granularity == "daily":
-                period = ticket.created_at.strftime("%Y-%m-%d")
-            elif granularity == "weekly":
-                period = ticket.created_at.strftime("%Y-W%U")
-            else:  # monthly
-                period = ticket.created_at.strftime("%Y-%m")
-
-            volume_data[period]["created"] += 1
-            volume_data[period]["by_priority"][ticket.priority.value if ticket.priority else "NONE"] += 1
-            volume_data[period]["by_status"][ticket.status.value if ticket.status else "NONE"] += 1
-            volume_data[period]["by_type"][ticket.ticket_type or "NONE"] += 1
-
-            if ticket.resolved_at:
-                if granularity == "daily":
-                    resolved_period = ticket.resolved_at.strftime("%Y-%m-%d")
-                elif granularity == "weekly":
-                    resolved_period = ticket.resolved_at.strftime("%Y-W%U")
-                else:
-                    resolved_period = ticket.resolved_at.strftime("%Y-%m")
-                volume_data[resolved_period]["resolved"] += 1
+        for row in rows:
+            if not row.created and not row.resolved:
+                continue
+            data = volume_data[self._period(row.day, granularity)]
+            data["resolved"] += row.resolved
+            if row.created:
+                data["created"] += row.created
+                data["by_priority"][row.priority or "NONE"] += row.created
+                data["by_status"][row.status or "NONE"] += row.created
+                data["by_type"][row.ticket_type or "NONE"] += row.created
 
         # Convert to list
         trend_data = []
@@ -660,46 +777,85 @@ class ReportingService:
         """
         Get ticket breakdown by category with performance metrics
         """
-        categories = self.db.query(Category).filter(Category.is_active == True).all()
-        breakdown_data = []
+        done = self._fact_is_done()
+        rows = self.db.query(
+            Category.id,
+            Category.name,
+            func.sum(TicketDailyFact.ticket_count).label("total"),
+            func.sum(case((done, TicketDailyFact.ticket_count), else_=0)).label("resolved"),
+            func.sum(case((done, TicketDailyFact.resolved_count), else_=0)).label("timed"),
+            func.sum(case((done, TicketDailyFact.resolution_minutes_sum), else_=0)).label("minutes"),
+            func.sum(case((done, TicketDailyFact.sla_met_count), else_=0)).label("sla_met"),
+        ).join(
+            TicketDailyFact, TicketDailyFact.category_id == Category.id
+        ).filter(
+            Category.is_active == True,
+            self._facts_between(start_date, end_date)
+        ).group_by(Category.id, Category.name).order_by(Category.id).all()
 
-        for category in categories:
-            tickets = self.db.query(Ticket).filter(
-                and_(
-                    Ticket.category_id == category.id,
-                    Ticket.created_at >= start_date,
-                    Ticket.created_at <= end_date
-                )
-            ).all()
-
-            if not tickets:
+        breakdown_data = []
+        for row in rows:
+            total, resolved = row.total or 0, row.resolved or 0
+            if not total:
                 continue
-
-            resolved = [t for t in tickets if t.status in [TicketStatus.RESOLVED, TicketStatus.CLOSED]]
-
-            # Calculate average resolution time
-            resolution_times = [
-                (t.resolved_at - t.created_at).total_seconds() / 3600
-                for t in resolved if t.resolved_at
-            ]
-            avg_resolution = sum(resolution_times) / len(resolution_times) if resolution_times else 0
-
-            # SLA compliance
-            sla_met = sum(
-                1 for t in resolved
-                if t.resolved_at and t.resolution_due and t.resolved_at <= t.resolution_due
-            )
-            sla_compliance = (sla_met / len(resolved) * 100) if resolved else 0
+            avg_resolution = row.minutes / row.timed / 60 if row.timed else 0
+            sla_compliance = (row.sla_met / resolved * 100) if resolved else 0
 
             breakdown_data.append({
-                "category_id": category.id,
-                "category_name": category.name,
-                "total_tickets": len(tickets),
-                "resolved_tickets": len(resolved),
-                "open_tickets": len(tickets) - len(resolved),
-                "resolution_rate": round((len(resolved) / len(tickets) * 100), 2),
+                "category_id": row.id,
+                "category_name": row.name,
+                "total_tickets": total,
+                "resolved_tickets": resolved,
+                "open_tickets": total - resolved,
+                "resolution_rate": round((resolved / total * 100), 2),
                 "avg_resolution_time_hours": round(avg_resolution, 2),
                 "sla_compliance": round(sla_compliance, 2)
             })
 
         return sorted(breakdown_data, key=lambda x: x["total_tickets"], reverse=True)
+
+    def get_export_data(
+        self,
+        report_type: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Data of an exportable report, over the last 30 days unless dates are given.
+        Raises ValueError for report types that cannot be exported.
+        """
+        filters = filters or {}
+        if not start_date:
+            start_date = datetime.now(timezone.utc) - timedelta(days=30)
+        if not end_date:
+            end_date = datetime.now(timezone.utc)
+
+        if report_type == "sla_compliance":
+            return self.get_sla_compliance_metrics(
+                start_date=start_date,
+                end_date=end_date,
+                priority=filters.get("priority"),
+                category_id=filters.get("category_id")
+            )
+        if report_type == "ticket_aging":
+            return self.get_ticket_aging_report(
+                status_filter=filters.get("status_filter"),
+                priority_filter=filters.get("priority_filter"),
+                assignee_id=filters.get("assignee_id")
+            )
+        if report_type == "technician_performance":
+            return self.get_technician_performance(
+                start_date=start_date,
+                end_date=end_date,
+                user_id=filters.get("user_id")
+            )
+        if report_type == "ticket_volume":
+            return self.get_ticket_volume_trends(
+                start_date=start_date,
+                end_date=end_date,
+                granularity=filters.get("granularity", "daily")
+            )
+        if report_type == "category_breakdown":
+            return self.get_category_breakdown(start_date=start_date, end_date=end_date)
+        raise ValueError(f"Unsupported report type: {report_type}")
@@ -0,0 +1,271 @@
+"""
+Runs due scheduled reports once across all API processes.
+
+Every API process runs the report schedule timer, so each one calls
+dispatch() when a report falls due.
+Due reports are claimed with SELECT ... FOR UPDATE SKIP LOCKED, and their
+next_run_at is advanced in the same transaction. Each report is therefore
+claimed by one process; the others skip the locked rows instead of waiting
+on them.
+
+- Claimed reports are grouped by ScheduledReportService.delivery_key, and
+  each group is one run: data and file are generated once and sent to
+  every report's recipients.
+- Runs go to a bounded thread pool, so one slow report does not hold up the
+  rest. A process claims only for its free workers (REPORTS_PER_WORKER
+  reports each) and claims again whenever a run finishes, leaving the
+  remaining due reports to idle processes.
+- Timeouts: report queries run under a PostgreSQL statement_timeout and SMTP
+  under a socket timeout of SCHEDULED_REPORT_TIMEOUT_SECONDS. A run still
+  going after that is logged and counted as overdue (threads cannot be
+  killed).
+- Metrics: queue lag is the time from a report's due time to the start of
+  its run. It is kept per process and returned by get_scheduler_status().
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.scheduled_report import ScheduledReport
+from app.services.report_schedule import ReportScheduleService, next_run_for
+from app.services.scheduled_report_service import ScheduledReportService
+
+logger = logging.getLogger(__name__)
+
+# Reports claimed per free worker, so reports sharing a query can be grouped
+REPORTS_PER_WORKER = 10
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class ClaimedReport(NamedTuple):
+    report_id: int
+    due_at: datetime
+    delivery_key: Tuple[str, str, str]
+
+
+def claim_due_reports(db: Session, limit: int, now: Optional[datetime] = None) -> List[ClaimedReport]:
+    """
+    Claim up to limit due reports by advancing their next_run_at, most overdue
+    first. Rows locked by another process are skipped.
+    """
+    now = now or datetime.now(timezone.utc)
+    reports = db.query(ScheduledReport).filter(
+        ScheduledReport.is_active == True,
+        ScheduledReport.next_run_at <= now
+    ).order_by(ScheduledReport.next_run_at).limit(limit).with_for_update(skip_locked=True).all()
+
+    claimed, next_runs = [], {}
+    for report in reports:
+        due_at = report.next_run_at
+        try:
+            next_run = next_run_for(report, after=_utc(now))
+        except ValueError as e:
+            # A schedule that cannot be evaluated must not fail the whole batch
+            logger.error(f"Disabling scheduled report {report.id}: {e}")
+            db.query(ScheduledReport).filter(ScheduledReport.id == report.id).update(
+                {ScheduledReport.is_active: False}, synchronize_session=False
+            )
+            next_runs[report.id] = None
+            continue
+        # Conditional on the old due time, so the claim also holds on
+        # databases without row locks
+        if db.query(ScheduledReport).filter(
+            ScheduledReport.id == report.id,
+            ScheduledReport.next_run_at == due_at
+        ).update({ScheduledReport.next_run_at: next_run}, synchronize_session=False):
+            claimed.append(ClaimedReport(report.id, _utc(due_at), ScheduledReportService.delivery_key(report)))
+            next_runs[report.id] = next_run
+    db.commit()
+    for report_id, next_run in next_runs.items():
+        ReportScheduleService.schedule_report(report_id, next_run)
+    return claimed
+
+
+def _apply_statement_timeout(db: Session, seconds: int) -> None:
+    """SET LOCAL statement_timeout at the start of each transaction of a PostgreSQL session"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+
+    @event.listens_for(db, "after_begin")
+    def set_timeout(session, transaction, connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(seconds) * 1000}")
+
+
+class ExecutorMetrics:
+    """Counters and queue lag of scheduled report runs in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.claimed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.overdue = 0
+        self.lag_count = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.lag_last: Optional[float] = None
+
+    def record_start(self, lag_seconds: float) -> None:
+        with self._lock:
+            self.lag_count += 1
+            self.lag_total += lag_seconds
+            self.lag_max = max(self.lag_max, lag_seconds)
+            self.lag_last = lag_seconds
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "claimed": self.claimed,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "overdue": self.overdue,
+                "queue_lag_seconds": {
+                    "last": round(self.lag_last, 3) if self.lag_last is not None else None,
+                    "avg": round(self.lag_total / self.lag_count, 3) if self.lag_count else None,
+                    "max": round(self.lag_max, 3),
+                },
+            }
+
+
+class ScheduledReportExecutor:
+    def __init__(
+        self,
+        workers: int = settings.SCHEDULED_REPORT_WORKERS,
+        timeout_seconds: int = settings.SCHEDULED_REPORT_TIMEOUT_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.session_factory = session_factory
+        self.metrics = ExecutorMetrics()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduled-report")
+        self._lock = threading.Lock()
+        self._running: Dict[int, Tuple[float, bool]] = {}  # report id -> (started, flagged overdue)
+        self._stopped = False
+
+    def dispatch(self) -> int:
+        """Claim due reports for the free workers and start them; returns how many"""
+        with self._lock:
+            if self._stopped:
+                return 0
+            self._flag_overdue()
+            free = self.workers - len(self._running)
+            if free <= 0:
+                return 0
+
+            db = self.session_factory()
+            try:
+                claimed = claim_due_reports(db, free * REPORTS_PER_WORKER)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error claiming due reports: {e}")
+                return 0
+            finally:
+                db.close()
+
+            # One run per delivery key: its reports share the data and the file
+            groups: Dict[Tuple[str, str, str], List[ClaimedReport]] = {}
+            for claim in claimed:
+                groups.setdefault(claim.delivery_key, []).append(claim)
+
+            futures = []
+            for group in groups.values():
+                run_id = group[0].report_id
+                self._running[run_id] = (time.monotonic(), False)
+                futures.append((run_id, self._pool.submit(self._run, group)))
+            self.metrics.increment("claimed", len(claimed))
+
+        # Outside the lock: a run that has already finished calls back at once
+        for run_id, future in futures:
+            future.add_done_callback(lambda f, run_id=run_id: self._finished(run_id, f))
+        if claimed:
+            logger.info(f"Claimed {len(claimed)} due scheduled reports in {len(groups)} runs")
+        return len(claimed)
+
+    def _flag_overdue(self) -> None:
+        now = time.monotonic()
+        for run_id, (started, flagged) in self._running.items():
+            if not flagged and now - started > self.timeout_seconds:
+                self._running[run_id] = (started, True)
+                self.metrics.increment("overdue")
+                logger.warning(f"Scheduled report run {run_id} still running after {self.timeout_seconds}s")
+
+    def _run(self, group: List[ClaimedReport]) -> Tuple[int, int]:
+        """Execute a group of reports sharing a delivery key; returns (succeeded, failed)"""
+        now = datetime.now(timezone.utc)
+        for claim in group:
+            self.metrics.record_start(max((now - claim.due_at).total_seconds(), 0.0))
+        db = self.session_factory()
+        try:
+            _apply_statement_timeout(db, self.timeout_seconds)
+            reports = db.query(ScheduledReport).filter(
+                ScheduledReport.id.in_([claim.report_id for claim in group]),
+                ScheduledReport.is_active == True
+            ).order_by(ScheduledReport.id).all()
+            if not reports:
+                return 0, 0
+            logger.info(f"Executing reports {[r.id for r in reports]} ({group[0].delivery_key[0]})")
+            executions = ScheduledReportService.execute_reports(
+                db, reports, send_email=True, advance_schedule=False
+            )
+            failed = sum(1 for execution in executions if execution.status == "failed")
+            for report, execution in zip(reports, executions):
+                logger.info(
+                    f"Report executed: {report.name}, Status: {execution.status}, "
+                    f"Email sent: {execution.email_sent}"
+                )
+            return len(executions) - failed, failed
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error executing scheduled reports {[c.report_id for c in group]}: {e}")
+            return 0, len(group)
+        finally:
+            db.close()
+
+    def _finished(self, run_id: int, future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            self.metrics.increment("failed")
+        else:
+            succeeded, failed = future.result()
+            self.metrics.increment("succeeded", succeeded)
+            self.metrics.increment("failed", failed)
+        with self._lock:
+            self._running.pop(run_id, None)
+        # A worker is free: claim the next due reports, if any
+        self.dispatch()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stopped = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: Optional[ScheduledReportExecutor] = None
+
+
+def get_report_executor() -> ScheduledReportExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ScheduledReportExecutor()
+    return _executor
+
+
+def shutdown_report_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
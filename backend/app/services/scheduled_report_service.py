@@ -1,10 +1,9 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+import json
 import os
 import logging
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
@@ -12,8 +11,10 @@ from email.mime.application import MIMEApplication
 from app.models.scheduled_report import ScheduledReport, ReportExecution, ReportType, ReportFrequency, ExportFormat
 
 logger = logging.getLogger(__name__)
-from app.services.reporting_service import ReportingService
-from app.services.export_service import ExportService
+from app.services.reporting_service import ReportingService, EXPORT_REPORT_TYPES, parse_date
+from app.services.report_cache import ReportCache, normalize_filters
+from app.services.report_schedule import next_run_time, next_run_for
+from app.services.email_service import SMTPConnection, smtp_pool
 from app.core.config import settings
 
 
@@ -33,14 +34,14 @@ class ScheduledReportService:
         description: Optional[str] = None,
         schedule_day: Optional[int] = None,
         filters: Optional[Dict[str, Any]] = None,
-        is_active: bool = True
+        is_active: bool = True,
+        cron_expression: Optional[str] = None,
+        timezone_name: str = "UTC"
     ) -> ScheduledReport:
         """Create a new scheduled report"""
 
         # Calculate next run time
-        next_run = ScheduledReportService._calculate_next_run(
-            frequency, schedule_time, schedule_day
-        )
+        next_run = next_run_time(frequency, schedule_time, schedule_day, cron_expression or None, timezone_name)
 
         report = ScheduledReport(
             name=name,
@@ -50,6 +51,8 @@ class ScheduledReportService:
             export_format=ExportFormat(export_format),
             schedule_time=schedule_time,
             schedule_day=schedule_day,
+            cron_expression=cron_expression or None,
+            timezone=timezone_name,
             recipients=recipients,
             filters=filters or {},
             is_active=is_active,
@@ -75,6 +78,9 @@ class ScheduledReportService:
 
         for key, value in kwargs.items():
             if value is not None and hasattr(report, key):
+                if key == 'cron_expression':
+                    # An empty expression goes back to frequency scheduling
+                    value = value.strip() or None
                 if key == 'report_type':
                     value = ReportType(value)
                 elif key == 'frequency':
@@ -84,12 +90,8 @@ class ScheduledReportService:
                 setattr(report, key, value)
 
         # Recalculate next run if schedule changed
-        if any(k in kwargs for k in ['frequency', 'schedule_time', 'schedule_day']):
-            report.next_run_at = ScheduledReportService._calculate_next_run(
-                report.frequency.value,
-                report.schedule_time,
-                report.schedule_day
-            )
+        if any(k in kwargs for k in ['frequency', 'schedule_time', 'schedule_day', 'cron_expression', 'timezone']):
+            report.next_run_at = next_run_for(report)
 
         db.commit()
         db.refresh(report)
@@ -127,97 +129,109 @@ class ScheduledReportService:
         return db.query(ScheduledReport).filter(ScheduledReport.id == report_id).first()
 
     @staticmethod
-    def get_due_reports(db: Session) -> List[ScheduledReport]:
-        """Get all reports that are due to run"""
-        now = datetime.now(timezone.utc)
-        return db.query(ScheduledReport).filter(
-            and_(
-                ScheduledReport.is_active == True,
-                ScheduledReport.next_run_at <= now
-            )
-        ).all()
+    def delivery_key(report: ScheduledReport) -> Tuple[str, str, str]:
+        """Reports with equal keys share their data and file: type, format and normalized filters"""
+        filters = json.dumps(normalize_filters(report.filters), sort_keys=True, default=str)
+        return report.report_type.value, report.export_format.value, filters
 
     @staticmethod
     def execute_report(
         db: Session,
         report: ScheduledReport,
         send_email: bool = True,
-        additional_recipients: Optional[List[str]] = None
+        additional_recipients: Optional[List[str]] = None,
+        advance_schedule: bool = True
     ) -> ReportExecution:
         """Execute a scheduled report and optionally send via email"""
+        return ScheduledReportService.execute_reports(
+            db, [report], send_email, additional_recipients, advance_schedule
+        )[0]
 
-        execution = ReportExecution(
-            scheduled_report_id=report.id,
-            executed_at=datetime.now(timezone.utc),
-            status="running"
-        )
-        db.add(execution)
+    @staticmethod
+    def execute_reports(
+        db: Session,
+        reports: List[ScheduledReport],
+        send_email: bool = True,
+        additional_recipients: Optional[List[str]] = None,
+        advance_schedule: bool = True
+    ) -> List[ReportExecution]:
+        """
+        Execute reports sharing one delivery_key: the data and file are
+        generated once and mailed to every report's recipients, one message per
+        recipient over a pooled SMTP connection. Each report gets its own
+        ReportExecution with per-recipient delivery status. The scheduled
+        executor advances next_run_at when it claims reports, so it passes
+        advance_schedule=False.
+        """
+        executions = [
+            ReportExecution(
+                scheduled_report_id=report.id,
+                executed_at=datetime.now(timezone.utc),
+                status="running"
+            )
+            for report in reports
+        ]
+        db.add_all(executions)
         db.commit()
 
+        first = reports[0]
         try:
             # Generate report data using ReportingService
             report_data = ScheduledReportService._generate_report_data(
-                db, report.report_type.value, report.filters or {}
+                db, first.report_type.value, first.filters or {}
             )
 
-            # Export to specified format
-            export_service = ExportService(db)
-
-            if report.export_format == ExportFormat.PDF:
-                file_path = export_service.export_to_pdf(
-                    report_data,
-                    report.report_type.value,
-                    f"{report.name} Report"
-                )
-            elif report.export_format == ExportFormat.EXCEL:
-                file_path = export_service.export_to_excel(
-                    report_data,
-                    report.report_type.value
-                )
-            else:  # CSV
-                file_path = export_service.export_to_csv(
-                    report_data,
-                    report.report_type.value
-                )
-
-            # Update execution record
-            execution.file_path = file_path
-            execution.file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-            execution.record_count = ScheduledReportService._count_records(report_data)
-            execution.status = "generated"
-
-            # Send email if requested
-            if send_email:
-                recipients = list(report.recipients or [])
-                if additional_recipients:
-                    recipients.extend(additional_recipients)
-
-                if recipients:
-                    email_success = ScheduledReportService._send_report_email(
-                        report, file_path, recipients
-                    )
-                    execution.email_sent = email_success
-                    execution.email_sent_at = datetime.now(timezone.utc) if email_success else None
-                    if not email_success:
-                        execution.email_error = "Failed to send email"
-
-            execution.status = "success"
-
-            # Update report's last run time and calculate next run
-            report.last_run_at = datetime.now(timezone.utc)
-            report.next_run_at = ScheduledReportService._calculate_next_run(
-                report.frequency.value,
-                report.schedule_time,
-                report.schedule_day
+            # Render, or reuse an identical render from the report cache. The
+            # title names the report type so the file is shared by every report.
+            file_path, _ = ReportCache.render(
+                report_data,
+                first.report_type.value,
+                first.export_format.value,
+                filters=first.filters
             )
-
+            file_size = os.path.getsize(file_path)
+            record_count = ScheduledReportService._count_records(report_data)
         except Exception as e:
-            execution.status = "failed"
-            execution.error_message = str(e)
-
-        db.commit()
-        db.refresh(execution)
-        return execution
+            logger.error(f"Failed to generate {first.report_type.value} report: {e}")
+            for execution in executions:
+                execution.status = "failed"
+                execution.error_message = str(e)
+            db.commit()
+            return executions
+
+        with open(file_path, 'rb') as f:
+            attachment = f.read()
+
+        with smtp_pool.connection() as smtp:
+            for report, execution in zip(reports, executions):
+                execution.file_path = file_path
+                execution.file_size = file_size
+                execution.record_count = record_count
+                execution.status = "success"
+
+                # Send email if requested
+                recipients = list(dict.fromkeys((report.recipients or []) + (additional_recipients or [])))
+                if send_email and recipients:
+                    deliveries = [
+                        ScheduledReportService._deliver(smtp, report, recipient, file_path, attachment)
+                        for recipient in recipients
+                    ]
+                    failed = [d for d in deliveries if d["status"] != "sent"]
+                    execution.deliveries = deliveries
+                    execution.email_sent = not failed
+                    execution.email_sent_at = datetime.now(timezone.utc) if len(failed) < len(deliveries) else None
+                    if failed:
+                        execution.status = "failed" if len(failed) == len(deliveries) else "partial"
+                        execution.email_error = f"Failed to send to {len(failed)} of {len(deliveries)} recipients"
+
+                # Update report's last run time and calculate next run
+                report.last_run_at = datetime.now(timezone.utc)
+                if advance_schedule:
+                    report.next_run_at = next_run_for(report)
+                # Commit per report so delivery status is recorded as it happens
+                db.commit()
+
+        return executions
 
     @staticmethod
     def get_execution_history(
@@ -230,63 +244,6 @@ class ScheduledReportService:
             ReportExecution.scheduled_report_id == report_id
         ).order_by(ReportExecution.executed_at.desc()).limit(limit).all()
 
-    @staticmethod
-    def _calculate_next_run(
-        frequency: str,
-        schedule_time: str,
-        schedule_day: Optional[int] = None
-    ) -> datetime:
-        """Calculate the next run time based on frequency and schedule"""
-        now = datetime.now(timezone.utc)
-        hour, minute = map(int, schedule_time.split(':'))
-
-        if frequency == "daily":
-            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            if next_run <= now:
-                next_run += timedelta(days=1)
-
-        elif frequency == "weekly":
-            # schedule_day is 1-7 (Monday-Sunday)
-            target_weekday = (schedule_day or 1) - 1  # Convert to 0-6
-            days_ahead = target_weekday - now.weekday()
-            if days_ahead < 0 or (days_ahead == 0 and now.hour >= hour):
-                days_ahead += 7
-            next_run = now + timedelta(days=days_ahead)
-            next_run = next_run.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-        elif frequency == "monthly":
-            # schedule_day is 1-31
-            target_day = schedule_day or 1
-            next_run = now.replace(day=min(target_day, 28), hour=hour, minute=minute, second=0, microsecond=0)
-            if next_run <= now:
-                # Move to next month
-                if now.month == 12:
-                    next_run = next_run.replace(year=now.year + 1, month=1)
-                else:
-                    next_run = next_run.replace(month=now.month + 1)
-
-        elif frequency == "quarterly":
-            # Run on the first day of each quarter
-            quarter_months = [1, 4, 7, 10]
-            current_month = now.month
-            next_quarter_month = None
-            for m in quarter_months:
-                if m > current_month or (m == current_month and now.day == 1 and now.hour < hour):
-                    next_quarter_month = m
-                    break
-            if next_quarter_month is None:
-                next_quarter_month = 1
-                next_run = now.replace(year=now.year + 1, month=next_quarter_month, day=1, hour=hour, minute=minute, second=0, microsecond=0)
-            else:
-                next_run = now.replace(month=next_quarter_month, day=1, hour=hour, minute=minute, second=0, microsecond=0)
-
-        else:
-            # Default to next day
-            next_run = now + timedelta(days=1)
-            next_run = next_run.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-        return next_run
-
     @staticmethod
     def _generate_report_data(
         db: Session,
@@ -297,8 +254,8 @@ class ScheduledReportService:
         reporting_service = ReportingService(db)
 
         # Extract common filter parameters
-        start_date = filters.get('start_date')
-        end_date = filters.get('end_date')
+        start_date = parse_date(filters.get('start_date'))
+        end_date = parse_date(filters.get('end_date'))
 
         # If no dates specified, default to last 30 days
         if not start_date:
@@ -306,42 +263,10 @@ class ScheduledReportService:
         if not end_date:
             end_date = datetime.now(timezone.utc)
 
-        if report_type == "sla_compliance":
-            return reporting_service.get_sla_compliance_report(
-                start_date=start_date,
-                end_date=end_date,
-                priority=filters.get('priority'),
-                category_id=filters.get('category_id')
-            )
-
-        elif report_type == "ticket_aging":
-            return reporting_service.get_ticket_aging_report(
-                status=filters.get('status'),
-                priority=filters.get('priority'),
-                assignee_id=filters.get('assignee_id')
-            )
-
-        elif report_type == "technician_performance":
-            return reporting_service.get_technician_performance_report(
-                start_date=start_date,
-                end_date=end_date,
-                technician_ids=filters.get('technician_ids')
-            )
-
-        elif report_type == "ticket_volume":
-            return reporting_service.get_ticket_volume_trends(
-                start_date=start_date,
-                end_date=end_date,
-                granularity=filters.get('granularity', 'daily')
-            )
+        if report_type in EXPORT_REPORT_TYPES:
+            return reporting_service.get_export_data(report_type, start_date, end_date, filters)
 
-        elif report_type == "category_breakdown":
-            return reporting_service.get_category_breakdown(
-                start_date=start_date,
-                end_date=end_date
-            )
-
-        elif report_type == "first_response_time":
+        if report_type == "first_response_time":
             return reporting_service.get_response_time_trends(
                 start_date=start_date,
                 end_date=end_date,
@@ -373,81 +298,80 @@ class ScheduledReportService:
         return 0
 
     @staticmethod
-    def _send_report_email(
+    def _build_report_email(
         report: ScheduledReport,
+        recipient: str,
         file_path: str,
-        recipients: List[str]
-    ) -> bool:
-        """Send report via email with attachment"""
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM}>"
-            msg['To'] = ', '.join(recipients)
-            msg['Subject'] = f"Scheduled Report: {report.name}"
-
-            # Email body
-            body = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px;">
-                <div style="max-width: 600px; margin: 0 auto;">
-                    <div style="background: linear-gradient(135deg, #8b5cf6 0%, #6b21a8 100%); padding: 20px; border-radius: 10px 10px 0 0;">
-                        <h1 style="color: white; margin: 0;">SupportX ITSM</h1>
-                    </div>
-                    <div style="background: #f9fafb; padding: 30px; border-radius: 0 0 10px 10px;">
-                        <h2 style="color: #1f2937;">Scheduled Report: {report.name}</h2>
-                        <p style="color: #6b7280;">Your scheduled report has been generated and is attached to this email.</p>
-
-                        <table style="width: 100%; border-collapse: collapse; margin: 20px 0;">
-                            <tr>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Report Type:</strong></td>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{report.report_type.value.replace('_', ' ').title()}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Frequency:</strong></td>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{report.frequency.value.title()}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Format:</strong></td>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{report.export_format.value.upper()}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Generated At:</strong></td>
-                                <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</td>
-                            </tr>
-                        </table>
-
-                        <p style="color: #6b7280; font-size: 12px; margin-top: 30px;">
-                            This is an automated message from SupportX ITSM. Please do not reply to this email.
-                        </p>
-                    </div>
+        attachment: bytes
+    ) -> MIMEMultipart:
+        """Report email with the file attached"""
+        msg = MIMEMultipart()
+        msg['From'] = f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM}>"
+        msg['To'] = recipient
+        msg['Subject'] = f"Scheduled Report: {report.name}"
+
+        # Email body
+        body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <div style="max-width: 600px; margin: 0 auto;">
+                <div style="background: linear-gradient(135deg, #8b5cf6 0%, #6b21a8 100%); padding: 20px; border-radius: 10px 10px 0 0;">
+                    <h1 style="color: white; margin: 0;">SupportX ITSM</h1>
+                </div>
+                <div style="background: #f9fafb; padding: 30px; border-radius: 0 0 10px 10px;">
+                    <h2 style="color: #1f2937;">Scheduled Report: {report.name}</h2>
+                    <p style="color: #6b7280;">Your scheduled report has been generated and is attached to this email.</p>
+
+                    <table style="width: 100%; border-collapse: collapse; margin: 20px 0;">
+                        <tr>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Report Type:</strong></td>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{report.report_type.value.replace('_', ' ').title()}</td>
+                        </tr>
+                        <tr>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Frequency:</strong></td>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{report.frequency.value.title()}</td>
+                        </tr>
+                        <tr>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Format:</strong></td>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{report.export_format.value.upper()}</td>
+                        </tr>
+                        <tr>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;"><strong>Generated At:</strong></td>
+                            <td style="padding: 10px; background: white; border: 1px solid #e5e7eb;">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</td>
+                        </tr>
+                    </table>
+
+                    <p style="color: #6b7280; font-size: 12px; margin-top: 30px;">
+                        This is an automated message from SupportX ITSM. Please do not reply to this email.
+                    </p>
                 </div>
-            </body>
-            </html>
-            """
-
-            msg.attach(MIMEText(body, 'html'))
-
-            # Attach report file
-            if os.path.exists(file_path):
-                with open(file_path, 'rb') as f:
-                    attachment = MIMEApplication(f.read())
-                    attachment.add_header(
-                        'Content-Disposition',
-                        'attachment',
-                        filename=os.path.basename(file_path)
-                    )
-                    msg.attach(attachment)
-
-            # Send email
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                if settings.SMTP_TLS:
-                    server.starttls()
-                if settings.SMTP_USER:
-                    server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                server.send_message(msg)
-
-            return True
+            </div>
+        </body>
+        </html>
+        """
 
+        msg.attach(MIMEText(body, 'html'))
+
+        # Attach report file
+        part = MIMEApplication(attachment)
+        extension = os.path.splitext(file_path)[1]
+        filename = f"SupportX_{report.report_type.value}_{datetime.now().strftime('%Y%m%d')}{extension}"
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        msg.attach(part)
+        return msg
+
+    @staticmethod
+    def _deliver(
+        smtp: SMTPConnection,
+        report: ScheduledReport,
+        recipient: str,
+        file_path: str,
+        attachment: bytes
+    ) -> Dict[str, Any]:
+        """Send the report to one recipient; returns its delivery status"""
+        try:
+            smtp.send(ScheduledReportService._build_report_email(report, recipient, file_path, attachment))
+            return {"recipient": recipient, "status": "sent", "sent_at": datetime.now(timezone.utc).isoformat()}
         except Exception as e:
-            logger.error(f"Failed to send report email: {e}")
-            return False
+            logger.error(f"Failed to send report {report.id} to {recipient}: {e}")
+            return {"recipient": recipient, "status": "failed", "error": str(e)}
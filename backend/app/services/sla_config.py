@@ -0,0 +1,149 @@
+"""
+Cached SLA configuration: the business calendar and the active SLA policies.
+
+Resolving the SLA for a ticket used to cost several SystemSettings queries
+plus a load of every active SLAPolicy, on every create and update. The
+configuration is now loaded once into an SLAConfig snapshot and reused
+until it is invalidated.
+
+- Every snapshot records the version stamp it was built for.
+- The settings and sla-policies write endpoints call
+  SLAConfigCache.invalidate(), which bumps the stamp so the next lookup
+  reloads.
+- Other worker processes don't see that bump. They reload after
+  SLA_CONFIG_TTL seconds, so a change reaches every worker within that time.
+
+Policy conditions are compiled into a dict keyed by (priority, category_id).
+Values that no policy mentions are folded into a wildcard, so the dict has
+one entry per combination of mentioned values, and a lookup is one dict
+access.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.sla_policy import SLAPolicy
+from app.services.business_calendar import BusinessCalendar
+
+logger = logging.getLogger(__name__)
+
+SLA_CONFIG_TTL = 300  # seconds
+
+# Stands for "a value no policy condition mentions"
+_ANY = object()
+
+
+class CompiledPolicy:
+    """Detached copy of the SLAPolicy fields used for due-date calculation"""
+    __slots__ = ("id", "name", "response_time", "resolution_time", "priority_times",
+                 "business_hours_only", "conditions", "is_default")
+
+    def __init__(self, policy: SLAPolicy):
+        self.id = policy.id
+        self.name = policy.name
+        self.response_time = policy.response_time
+        self.resolution_time = policy.resolution_time
+        self.priority_times = dict(policy.priority_times or {})
+        self.business_hours_only = policy.business_hours_only
+        self.conditions = dict(policy.conditions or {})
+        self.is_default = policy.is_default
+
+    def matches(self, priority: str, category_id) -> bool:
+        if 'priority' in self.conditions and priority not in _condition_values(self.conditions['priority']):
+            return False
+        if 'category_id' in self.conditions and category_id not in _condition_values(self.conditions['category_id']):
+            return False
+        return True
+
+    def __repr__(self):
+        return f"<CompiledPolicy {self.name}>"
+
+
+def _condition_values(value) -> list:
+    """Condition values are lists; a single scalar is treated as a one-item list"""
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+class SLAConfig:
+    """Immutable snapshot of the SLA configuration"""
+
+    def __init__(self, version: int, calendar: BusinessCalendar, policies: List[CompiledPolicy]):
+        self.version = version
+        self.calendar = calendar
+        self.loaded_at = time.monotonic()
+        self.policies_by_id: Dict[int, CompiledPolicy] = {p.id: p for p in policies}
+        self.default_policy = next((p for p in policies if p.is_default), None)
+        self._priorities = set()
+        self._categories = set()
+        for policy in policies:
+            self._priorities.update(_condition_values(policy.conditions.get('priority', [])))
+            self._categories.update(_condition_values(policy.conditions.get('category_id', [])))
+        self._lookup = self._compile(policies)
+
+    def _compile(self, policies: List[CompiledPolicy]) -> Dict[Tuple, Optional[CompiledPolicy]]:
+        lookup = {}
+        for priority in list(self._priorities) + [_ANY]:
+            for category_id in list(self._categories) + [_ANY]:
+                lookup[(priority, category_id)] = next(
+                    (p for p in policies if p.matches(priority, category_id)),
+                    self.default_policy
+                )
+        return lookup
+
+    def resolve(self, priority: str, category_id: Optional[int]) -> Optional[CompiledPolicy]:
+        """First active policy whose conditions match, else the default policy"""
+        key = (
+            priority if priority in self._priorities else _ANY,
+            category_id if category_id in self._categories else _ANY,
+        )
+        return self._lookup[key]
+
+
+_config: Optional[SLAConfig] = None
+_version = 0
+_lock = threading.Lock()
+
+
+class SLAConfigCache:
+    @staticmethod
+    def get(db: Session) -> SLAConfig:
+        """Current snapshot, reloading it if it was invalidated or is older than the TTL"""
+        config = _config
+        if config is not None and config.version == _version \
+                and time.monotonic() - config.loaded_at < SLA_CONFIG_TTL:
+            return config
+        return SLAConfigCache._load(db)
+
+    @staticmethod
+    def _load(db: Session) -> SLAConfig:
+        global _config
+        # Imported here to avoid a cycle (sla_service uses this module)
+        from app.services.sla_service import get_business_calendar
+
+        with _lock:
+            version = _version
+            policies = db.query(SLAPolicy).filter(
+                SLAPolicy.is_active == True
+            ).order_by(SLAPolicy.id).all()
+            config = SLAConfig(
+                version,
+                get_business_calendar(db),
+                [CompiledPolicy(p) for p in policies]
+            )
+            _config = config
+        logger.debug(f"Loaded SLA config version {version} with {len(policies)} active policies")
+        return config
+
+    @staticmethod
+    def invalidate() -> None:
+        """Bump the version stamp; call after committing settings or SLA policy changes"""
+        global _version
+        with _lock:
+            _version += 1
+
+    @staticmethod
+    def version() -> int:
+        return _version
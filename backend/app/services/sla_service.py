@@ -1,12 +1,21 @@
+import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, update, insert, or_, exists
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from zoneinfo import ZoneInfo
-from app.models.ticket import Ticket
+from app.models.ticket import Ticket, TicketStatus
 from app.models.sla_policy import SLAPolicy
 from app.models.sla_pause import SLAPause
 from app.models.user import User
+from app.core.config import settings
+from app.services.business_calendar import BusinessCalendar, parse_holidays
+from app.services.sla_config import SLAConfigCache, SLAConfig, CompiledPolicy
+
+logger = logging.getLogger(__name__)
+
+# Statuses whose SLA clocks are still running (matches the partial indexes on tickets)
+SLA_OPEN_STATUSES = [TicketStatus.NEW, TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.PENDING]
 
 
 def get_local_timezone():
@@ -122,11 +131,35 @@ def get_business_hours_from_settings(db: Session) -> Tuple[int, int, list]:
     return (start_hour, end_hour, working_days)
 
 
+def get_business_calendar(db: Session) -> BusinessCalendar:
+    """
+    Build the business calendar from system settings.
+
+    Holidays come from the optional 'holidays' setting (comma-separated ISO
+    dates) and are ignored when 'exclude_holidays' is false.
+    """
+    from app.models.system_settings import SystemSettings
+
+    start_hour, end_hour, working_days = get_business_hours_from_settings(db)
+    holidays = []
+    try:
+        rows = dict(db.query(SystemSettings.key, SystemSettings.value).filter(
+            SystemSettings.key.in_(['holidays', 'exclude_holidays'])
+        ).all())
+        if (rows.get('exclude_holidays') or 'true').lower() in ('true', '1', 'yes'):
+            holidays = parse_holidays(rows.get('holidays'))
+    except Exception:
+        pass
+
+    return BusinessCalendar(start_hour, end_hour, working_days, holidays)
+
+
 class SLAService:
     @staticmethod
     def calculate_sla_times(ticket: Ticket, db: Session):
         """Calculate SLA response and resolution due times based on the applicable policy"""
-        sla_policy = SLAService.get_applicable_sla(ticket, db)
+        config = SLAConfigCache.get(db)
+        sla_policy = SLAService.get_applicable_sla(ticket, db, config)
         if not sla_policy:
             return
 
@@ -146,12 +179,18 @@ class SLAService:
         now = now_local()
 
         if sla_policy.business_hours_only:
-            ticket.response_due = SLAService.add_business_minutes(now, response_time, db)
-            ticket.resolution_due = SLAService.add_business_minutes(now, resolution_time, db)
+            add_minutes = config.calendar.add_minutes
         else:
             # For 24/7 SLA, just add minutes directly
-            ticket.response_due = now + timedelta(minutes=response_time)
-            ticket.resolution_due = now + timedelta(minutes=resolution_time)
+            add_minutes = lambda start, minutes: start + timedelta(minutes=minutes)
+
+        ticket.response_due = add_minutes(now, response_time)
+        ticket.resolution_due = add_minutes(now, resolution_time)
+
+        # Breach warnings go out once SLA_WARNING_THRESHOLD of each target has elapsed
+        threshold = settings.SLA_WARNING_THRESHOLD
+        ticket.response_warning_at = add_minutes(now, int(response_time * threshold))
+        ticket.resolution_warning_at = add_minutes(now, int(resolution_time * threshold))
 
         ticket.sla_policy_id = sla_policy.id
 
@@ -160,29 +199,21 @@ class SLAService:
         ticket.resolution_breached = False
 
     @staticmethod
-    def get_applicable_sla(ticket: Ticket, db: Session) -> Optional[SLAPolicy]:
-        """Find the most appropriate SLA policy for a ticket"""
+    def get_applicable_sla(ticket: Ticket, db: Session,
+                           config: Optional[SLAConfig] = None) -> Optional[CompiledPolicy]:
+        """Find the most appropriate SLA policy for a ticket (from the cached config)"""
+        if config is None:
+            config = SLAConfigCache.get(db)
+
         # If ticket already has an assigned SLA policy, use that
         if ticket.sla_policy_id:
-            policy = db.query(SLAPolicy).filter(
-                SLAPolicy.id == ticket.sla_policy_id,
-                SLAPolicy.is_active == True
-            ).first()
+            policy = config.policies_by_id.get(ticket.sla_policy_id)
             if policy:
                 return policy
 
-        # Otherwise, find matching policy based on conditions
-        policies = db.query(SLAPolicy).filter(SLAPolicy.is_active == True).all()
-
-        for policy in policies:
-            if SLAService.matches_conditions(ticket, policy):
-                return policy
-
-        # Fall back to default policy
-        return db.query(SLAPolicy).filter(
-            SLAPolicy.is_active == True,
-            SLAPolicy.is_default == True
-        ).first()
+        # Otherwise the first matching policy, falling back to the default policy
+        priority_str = ticket.priority.value if hasattr(ticket.priority, 'value') else str(ticket.priority)
+        return config.resolve(priority_str, ticket.category_id)
 
     @staticmethod
     def matches_conditions(ticket: Ticket, policy: SLAPolicy) -> bool:
@@ -219,7 +250,6 @@ class SLAService:
             working_days: List of working day indices (0=Mon, 6=Sun) (optional, default Mon-Fri)
         """
         current_time = start_time
-        remaining_minutes = minutes
 
         # Ensure we're working with timezone-aware datetime
         if current_time.tzinfo is None:
@@ -228,42 +258,25 @@ class SLAService:
         # Get business hours from settings if not provided
         if start_hour is None or end_hour is None or working_days is None:
             if db is not None:
-                settings_start, settings_end, settings_days = get_business_hours_from_settings(db)
-                start_hour = start_hour if start_hour is not None else settings_start
-                end_hour = end_hour if end_hour is not None else settings_end
-                working_days = working_days if working_days is not None else settings_days
+                calendar = SLAConfigCache.get(db).calendar
+                if start_hour is not None or end_hour is not None or working_days is not None:
+                    calendar = BusinessCalendar(
+                        start_hour if start_hour is not None else calendar.start_hour,
+                        end_hour if end_hour is not None else calendar.end_hour,
+                        working_days if working_days is not None else calendar.working_days,
+                        calendar.holidays
+                    )
             else:
                 # Defaults if no db session (matching database migration defaults: 09:00 - 18:00, Mon-Fri)
-                start_hour = start_hour if start_hour is not None else 9
-                end_hour = end_hour if end_hour is not None else 18
-                working_days = working_days if working_days is not None else [0, 1, 2, 3, 4]
-
-        while remaining_minutes > 0:
-            # Skip non-working days
-            while current_time.weekday() not in working_days:
-                current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
-
-            # If before business hours, move to start of business day
-            if current_time.hour < start_hour:
-                current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0)
-
-            # If after business hours, move to start of next business day
-            if current_time.hour >= end_hour:
-                current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
-                continue
-
-            # Calculate minutes until end of business day
-            end_of_day = current_time.replace(hour=end_hour, minute=0, second=0, microsecond=0)
-            minutes_until_eod = int((end_of_day - current_time).total_seconds() / 60)
-
-            if remaining_minutes <= minutes_until_eod:
-                current_time += timedelta(minutes=remaining_minutes)
-                remaining_minutes = 0
-            else:
-                remaining_minutes -= minutes_until_eod
-                current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
+                calendar = BusinessCalendar(
+                    start_hour if start_hour is not None else 9,
+                    end_hour if end_hour is not None else 18,
+                    working_days if working_days is not None else [0, 1, 2, 3, 4]
+                )
+        else:
+            calendar = BusinessCalendar(start_hour, end_hour, working_days)
 
-        return current_time
+        return calendar.add_minutes(current_time, minutes)
 
     @staticmethod
     def pause_sla(ticket_id: int, reason: str, user: User, db: Session) -> SLAPause:
@@ -336,6 +349,11 @@ class SLAService:
             ticket.response_due += timedelta(minutes=pause_duration)
         if ticket.resolution_due and not ticket.resolution_breached:
             ticket.resolution_due += timedelta(minutes=pause_duration)
+        # Pending breach warnings move with the due times
+        if ticket.response_warning_at:
+            ticket.response_warning_at += timedelta(minutes=pause_duration)
+        if ticket.resolution_warning_at:
+            ticket.resolution_warning_at += timedelta(minutes=pause_duration)
 
         # Create activity log
         activity = TicketActivity(
@@ -347,12 +365,20 @@ class SLAService:
         db.add(activity)
 
         db.commit()
+        # Warnings skipped while paused must be rescheduled even if the times didn't move
+        from app.services.sla_warning_service import SLAWarningService
+        SLAWarningService.schedule_ticket(ticket)
         db.refresh(active_pause)
         return active_pause
 
     @staticmethod
     def get_time_remaining(ticket: Ticket, db: Session) -> dict:
-        """Calculate time remaining for response and resolution SLAs"""
+        """
+        Calculate time remaining for response and resolution SLAs.
+
+        Read-only: breach flags are set by check_and_update_breaches, which also
+        records the breach event and notifies the assignee.
+        """
         # Get total pause time (in minutes)
         total_pause_time = db.query(func.sum(SLAPause.pause_duration)).filter(
             SLAPause.ticket_id == ticket.id,
@@ -392,9 +418,6 @@ class SLAService:
                     first_response = to_local(first_response)
 
                 is_breached = first_response > response_due
-                if is_breached and not ticket.response_breached:
-                    ticket.response_breached = True
-                    db.commit()
 
                 result['response'] = {
                     'due': response_due.isoformat(),
@@ -408,10 +431,6 @@ class SLAService:
                 time_diff = (response_due - now).total_seconds() / 60
                 is_breached = time_diff < 0
 
-                if is_breached and not ticket.response_breached:
-                    ticket.response_breached = True
-                    db.commit()
-
                 result['response'] = {
                     'due': response_due.isoformat(),
                     'remaining_minutes': max(0, int(time_diff)),
@@ -439,11 +458,6 @@ class SLAService:
             time_diff = (resolution_due - now).total_seconds() / 60
             is_breached = time_diff < 0
 
-            # Update breach flag if breached
-            if is_breached and not ticket.resolution_breached:
-                ticket.resolution_breached = True
-                db.commit()
-
             result['resolution'] = {
                 'due': resolution_due.isoformat(),
                 'remaining_minutes': max(0, int(time_diff)),
@@ -453,58 +467,94 @@ class SLAService:
         return result
 
     @staticmethod
-    def check_and_update_breaches(db: Session):
-        """Background task to check and update SLA breaches for all open tickets"""
-        from app.models.ticket import TicketStatus
+    def check_and_update_breaches(db: Session) -> int:
+        """
+        Flag open tickets whose response or resolution SLA has passed.
+
+        One set-based UPDATE ... RETURNING per SLA type, served by the partial
+        indexes on tickets, so a run costs the number of new breaches rather
+        than the size of the open backlog. Tickets with an active SLA pause are
+        skipped, as for warnings. Every newly breached ticket gets an
+        'sla_breached' activity and an SLA_BREACHED notification. Concurrent
+        runs can't both flip the same row, so each breach is reported once.
+        """
+        from app.models.ticket_activity import TicketActivity
+        from app.services.notification_service import NotificationService
+        from app.services.ticket_counter_service import TicketCounterService
+        from app.services.ticket_fact_service import TicketFactService
 
         now = now_local()
+        # A paused ticket's clock is stopped; resume_sla moves its due times on
+        not_paused = ~exists().where(SLAPause.ticket_id == Ticket.id, SLAPause.is_active == True)
+        returning = (
+            Ticket.id, Ticket.ticket_number, Ticket.title, Ticket.status, Ticket.priority,
+            Ticket.assignee_id, Ticket.assigned_group_id, Ticket.requester_id,
+            Ticket.created_at, Ticket.category_id, Ticket.ticket_type
+        )
 
-        # Get all open tickets with SLA times set
-        open_statuses = [
-            TicketStatus.NEW.value,
-            TicketStatus.OPEN.value,
-            TicketStatus.IN_PROGRESS.value,
-            TicketStatus.PENDING.value
-        ]
+        # Response: no response by the due time, or a first response that came late
+        response_rows = db.execute(
+            update(Ticket)
+            .where(
+                Ticket.status.in_(SLA_OPEN_STATUSES),
+                Ticket.response_breached.isnot(True),
+                Ticket.response_due < now,
+                not_paused,
+                or_(Ticket.first_response_at.is_(None), Ticket.first_response_at > Ticket.response_due)
+            )
+            .values(response_breached=True, response_warning_at=None)
+            .returning(*returning)
+            .execution_options(synchronize_session=False)
+        ).all()
 
-        tickets = db.query(Ticket).filter(
-            Ticket.status.in_(open_statuses)
+        resolution_rows = db.execute(
+            update(Ticket)
+            .where(
+                Ticket.status.in_(SLA_OPEN_STATUSES),
+                Ticket.resolution_breached.isnot(True),
+                Ticket.resolution_due < now,
+                not_paused
+            )
+            .values(resolution_breached=True, resolution_warning_at=None)
+            .returning(*returning)
+            .execution_options(synchronize_session=False)
         ).all()
 
-        breaches_updated = 0
-        for ticket in tickets:
-            # Check response breach
-            if ticket.response_due and not ticket.response_breached:
-                response_due = ticket.response_due
-                if response_due.tzinfo is None:
-                    response_due = response_due.replace(tzinfo=LOCAL_TZ)
-
-                # If first response was made, check if it was within SLA
-                if ticket.first_response_at:
-                    first_response = ticket.first_response_at
-                    if first_response.tzinfo is None:
-                        first_response = first_response.replace(tzinfo=LOCAL_TZ)
-                    if first_response > response_due:
-                        ticket.response_breached = True
-                        breaches_updated += 1
-                elif now > response_due:
-                    # No response yet and due time passed
-                    ticket.response_breached = True
-                    breaches_updated += 1
-
-            # Check resolution breach
-            if ticket.resolution_due and not ticket.resolution_breached:
-                resolution_due = ticket.resolution_due
-                if resolution_due.tzinfo is None:
-                    resolution_due = resolution_due.replace(tzinfo=LOCAL_TZ)
-                if now > resolution_due:
-                    ticket.resolution_breached = True
-                    breaches_updated += 1
+        if not response_rows and not resolution_rows:
+            db.rollback()
+            return 0
+
+        # Bulk UPDATEs bypass the ORM flush hook, so apply the rollup deltas here
+        TicketCounterService.add_breaches(db, resolution_rows)
+        TicketFactService.add_breaches(db, response_rows, "response")
+        TicketFactService.add_breaches(db, resolution_rows, "resolution")
+
+        breaches = [("response", row) for row in response_rows] + \
+                   [("resolution", row) for row in resolution_rows]
+        db.execute(insert(TicketActivity), [
+            {
+                "ticket_id": row.id,
+                "user_id": None,
+                "activity_type": "sla_breached",
+                "description": f"{breach_type.capitalize()} SLA breached",
+                "new_value": {"sla": breach_type, "breached_at": now.isoformat()},
+            }
+            for breach_type, row in breaches
+        ])
+        db.commit()
+        logger.info(
+            f"SLA breach scan: {len(response_rows)} response and "
+            f"{len(resolution_rows)} resolution breaches"
+        )
 
-        if breaches_updated > 0:
-            db.commit()
+        for breach_type, row in breaches:
+            try:
+                NotificationService.notify_sla_breached(db, row, breach_type)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to send SLA breach notification for ticket {row.id}: {e}")
 
-        return breaches_updated
+        return len(breaches)
 
     @staticmethod
     def get_sla_metrics(db: Session, start_date: datetime = None, end_date: datetime = None) -> dict:
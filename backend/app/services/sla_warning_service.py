@@ -0,0 +1,257 @@
+"""
+SLA breach warnings (SLA_BREACH_WARNING).
+
+Each ticket stores when its warnings are due in response_warning_at and
+resolution_warning_at. SLAService.calculate_sla_times sets them at
+SLA_WARNING_THRESHOLD of each target, and resume_sla pushes them back with
+the due times.
+
+This module keeps the pending times in an in-memory min-heap. A timer
+thread sleeps until the earliest one, so warnings fire on time without
+polling the tickets table.
+
+- At startup the heap is loaded from the warning columns, so a restart
+  loses nothing. Warnings that fell due while the app was down fire
+  immediately.
+- A Session after_commit hook pushes every ticket whose warning times
+  changed, through any code path that commits via the ORM.
+- Firing claims the warning with a conditional UPDATE that clears the
+  column. Each warning is therefore sent once, even with several workers.
+- No warning is sent for a ticket that is responded to, resolved, breached
+  or paused. A paused ticket keeps its warning time, and resume_sla pushes
+  it back and schedules it again.
+"""
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event, update, select, exists, inspect
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.ticket import Ticket
+from app.models.sla_pause import SLAPause
+
+logger = logging.getLogger(__name__)
+
+WarningKey = Tuple[int, str]  # (ticket_id, "response" | "resolution")
+
+WARNING_COLUMNS = {
+    "response": Ticket.response_warning_at,
+    "resolution": Ticket.resolution_warning_at,
+}
+
+
+class WarningTimer:
+    """
+    Min-heap of (fire time, ticket, SLA type) served by one timer thread.
+
+    Rescheduling a key just pushes a new entry; the stale one is skipped when
+    it reaches the top, so every operation is O(log n).
+    """
+
+    def __init__(self, fire: Callable[[int, str], None]):
+        self._fire = fire
+        self._heap: List[Tuple[float, int, str]] = []
+        self._pending: Dict[WarningKey, float] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def schedule(self, ticket_id: int, kind: str, when: float) -> None:
+        with self._cond:
+            if self._pending.get((ticket_id, kind)) == when:
+                return
+            self._pending[(ticket_id, kind)] = when
+            heapq.heappush(self._heap, (when, ticket_id, kind))
+            if self._heap[0][0] == when:
+                self._cond.notify()
+
+    def cancel(self, ticket_id: int, kind: str) -> None:
+        with self._cond:
+            self._pending.pop((ticket_id, kind), None)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pop_due(self, now: float) -> List[WarningKey]:
+        """Remove and return every live entry due at or before now"""
+        due = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                when, ticket_id, kind = heapq.heappop(self._heap)
+                if self._pending.get((ticket_id, kind)) == when:
+                    del self._pending[(ticket_id, kind)]
+                    due.append((ticket_id, kind))
+        return due
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="sla-warning-timer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stopped)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+            for ticket_id, kind in self.pop_due(time.time()):
+                try:
+                    self._fire(ticket_id, kind)
+                except Exception as e:
+                    logger.error(f"Error sending SLA warning for ticket {ticket_id}: {e}")
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        from app.services.sla_service import LOCAL_TZ
+        value = value.replace(tzinfo=LOCAL_TZ)
+    return value.timestamp()
+
+
+class SLAWarningService:
+    @staticmethod
+    def start() -> None:
+        """Load pending warnings and start the timer thread"""
+        db = SessionLocal()
+        try:
+            loaded = SLAWarningService.load(db)
+            logger.info(f"SLA warning timer started with {loaded} pending warnings")
+        except Exception as e:
+            logger.error(f"Could not load pending SLA warnings: {e}")
+        finally:
+            db.close()
+        _timer.start()
+
+    @staticmethod
+    def stop() -> None:
+        _timer.stop()
+
+    @staticmethod
+    def load(db: Session) -> int:
+        """Schedule every pending warning of an open ticket; returns how many"""
+        from app.services.sla_service import SLA_OPEN_STATUSES
+
+        count = 0
+        for kind, column in WARNING_COLUMNS.items():
+            rows = db.execute(
+                select(Ticket.id, column).where(
+                    column.isnot(None),
+                    Ticket.status.in_(SLA_OPEN_STATUSES)
+                )
+            ).all()
+            for ticket_id, warning_at in rows:
+                _timer.schedule(ticket_id, kind, _timestamp(warning_at))
+                count += 1
+        return count
+
+    @staticmethod
+    def schedule_ticket(ticket: Ticket) -> None:
+        """(Re)schedule both warnings of a ticket from its current columns"""
+        if not _timer.running:
+            return
+        for kind, column in WARNING_COLUMNS.items():
+            warning_at = getattr(ticket, column.key)
+            if warning_at is None:
+                _timer.cancel(ticket.id, kind)
+            else:
+                _timer.schedule(ticket.id, kind, _timestamp(warning_at))
+
+    @staticmethod
+    def fire(ticket_id: int, kind: str) -> bool:
+        """Send one warning if the ticket still qualifies; returns whether it was sent"""
+        db = SessionLocal()
+        try:
+            return SLAWarningService._fire(db, ticket_id, kind)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _fire(db: Session, ticket_id: int, kind: str) -> bool:
+        from app.services.sla_service import SLA_OPEN_STATUSES, now_local
+        from app.services.notification_service import NotificationService
+
+        column = WARNING_COLUMNS[kind]
+        now = now_local()
+        conditions = [
+            Ticket.id == ticket_id,
+            column <= now,
+            Ticket.status.in_(SLA_OPEN_STATUSES),
+            ~exists().where(SLAPause.ticket_id == Ticket.id, SLAPause.is_active == True),
+        ]
+        if kind == "response":
+            conditions += [Ticket.response_breached.isnot(True), Ticket.first_response_at.is_(None)]
+        else:
+            conditions.append(Ticket.resolution_breached.isnot(True))
+
+        # Clearing the column claims the warning, so only one worker sends it
+        row = db.execute(
+            update(Ticket).where(*conditions).values({column.key: None})
+            .returning(Ticket.id, Ticket.ticket_number, Ticket.title, Ticket.assignee_id,
+                       Ticket.response_due, Ticket.resolution_due)
+            .execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+
+        if row is None:
+            # Moved later by another worker: follow it. Otherwise (paused, resolved,
+            # already sent) drop it; a resume or recalculation schedules it again.
+            warning_at = db.execute(
+                select(column).where(Ticket.id == ticket_id, Ticket.status.in_(SLA_OPEN_STATUSES))
+            ).scalar()
+            if warning_at is not None and _timestamp(warning_at) > time.time():
+                _timer.schedule(ticket_id, kind, _timestamp(warning_at))
+            return False
+
+        due = row.response_due if kind == "response" else row.resolution_due
+        NotificationService.notify_sla_breach_warning(db, row, kind, due)
+        return True
+
+
+_timer = WarningTimer(SLAWarningService.fire)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_warning_changes(session: Session, flush_context) -> None:
+    if not _timer.running:
+        return
+    changes = session.info.setdefault("sla_warning_changes", {})
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Ticket):
+            continue
+        state = inspect(obj)
+        for kind, column in WARNING_COLUMNS.items():
+            if state.attrs[column.key].history.has_changes():
+                changes[(obj.id, kind)] = getattr(obj, column.key)
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_warning_changes(session: Session) -> None:
+    changes = session.info.pop("sla_warning_changes", None)
+    for (ticket_id, kind), warning_at in (changes or {}).items():
+        if warning_at is None:
+            _timer.cancel(ticket_id, kind)
+        else:
+            _timer.schedule(ticket_id, kind, _timestamp(warning_at))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_warning_changes(session: Session) -> None:
+    session.info.pop("sla_warning_changes", None)
@@ -0,0 +1,206 @@
+"""
+Streaming exports of row-level data (tickets, assets, audit logs).
+
+Unlike ExportService, which builds a file in exports/reports, CSV exports
+are written straight to the response: the header goes out before the query
+runs, then rows are pulled from a server-side cursor (yield_per) and sent
+in chunks. XLSX exports read the same cursor into a write-only workbook.
+Memory stays flat whatever the row count.
+"""
+import csv
+import enum
+import io
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select, Select
+from sqlalchemy.orm import Session, aliased
+from app.core.database import SessionLocal
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.models.category import Category
+from app.models.group import Group
+from app.models.asset import Asset, AssetType
+from app.models.department import Department
+from app.models.audit_log import AuditLog
+from app.services.export_service import ExportService
+
+# Rows fetched from the cursor per round trip; each batch becomes one chunk
+EXPORT_BATCH_SIZE = 2000
+
+
+def _tickets_query() -> Tuple[List[str], Select]:
+    requester = aliased(User)
+    assignee = aliased(User)
+    stmt = select(
+        Ticket.id, Ticket.ticket_number, Ticket.ticket_type, Ticket.title, Ticket.status,
+        Ticket.priority, Category.name, requester.email, assignee.full_name, Group.name,
+        Ticket.created_at, Ticket.first_response_at, Ticket.resolved_at, Ticket.closed_at,
+        Ticket.response_due, Ticket.resolution_due, Ticket.response_breached,
+        Ticket.resolution_breached,
+    ).outerjoin(Category, Ticket.category_id == Category.id) \
+        .outerjoin(requester, Ticket.requester_id == requester.id) \
+        .outerjoin(assignee, Ticket.assignee_id == assignee.id) \
+        .outerjoin(Group, Ticket.assigned_group_id == Group.id)
+    headers = [
+        "ID", "Ticket Number", "Type", "Title", "Status", "Priority", "Category", "Requester",
+        "Assignee", "Group", "Created At", "First Response At", "Resolved At", "Closed At",
+        "Response Due", "Resolution Due", "Response Breached", "Resolution Breached",
+    ]
+    return headers, stmt
+
+
+def _assets_query() -> Tuple[List[str], Select]:
+    stmt = select(
+        Asset.id, Asset.asset_tag, Asset.name, AssetType.name, Asset.status, Asset.condition,
+        Asset.manufacturer, Asset.model, Asset.serial_number, Asset.location, Department.name,
+        User.full_name, Asset.purchase_date, Asset.purchase_cost, Asset.current_value,
+        Asset.warranty_end_date, Asset.created_at,
+    ).outerjoin(AssetType, Asset.asset_type_id == AssetType.id) \
+        .outerjoin(Department, Asset.department_id == Department.id) \
+        .outerjoin(User, Asset.assigned_to_id == User.id)
+    headers = [
+        "ID", "Asset Tag", "Name", "Type", "Status", "Condition", "Manufacturer", "Model",
+        "Serial Number", "Location", "Department", "Assigned To", "Purchase Date",
+        "Purchase Cost", "Current Value", "Warranty End", "Created At",
+    ]
+    return headers, stmt
+
+
+def _audit_logs_query() -> Tuple[List[str], Select]:
+    stmt = select(
+        AuditLog.id, AuditLog.created_at, User.email, AuditLog.action, AuditLog.module,
+        AuditLog.entity_type, AuditLog.entity_id, AuditLog.description,
+        AuditLog.old_values, AuditLog.new_values, AuditLog.ip_address,
+    ).outerjoin(User, AuditLog.user_id == User.id)
+    headers = [
+        "ID", "Timestamp", "User", "Action", "Module", "Entity Type", "Entity ID",
+        "Description", "Old Values", "New Values", "IP Address",
+    ]
+    return headers, stmt
+
+
+EXPORT_DATASETS: Dict[str, Tuple[Callable[[], Tuple[List[str], Select]], type]] = {
+    "tickets": (_tickets_query, Ticket),
+    "assets": (_assets_query, Asset),
+    "audit_logs": (_audit_logs_query, AuditLog),
+}
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _xlsx_cell(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Excel has no time zones: write UTC wall time
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+class StreamingExportService:
+    @staticmethod
+    def build_query(
+        dataset: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Tuple[List[str], Select]:
+        """CSV headers and the SELECT for a dataset, filtered on created_at and in id order"""
+        build, model = EXPORT_DATASETS[dataset]
+        headers, stmt = build()
+        if start_date:
+            stmt = stmt.where(model.created_at >= start_date)
+        if end_date:
+            stmt = stmt.where(model.created_at <= end_date)
+        return headers, stmt.order_by(model.id)
+
+    @staticmethod
+    def iter_csv(
+        db: Session,
+        dataset: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[bytes]:
+        """Yield the export as UTF-8 CSV chunks: the header first, then one chunk per batch"""
+        headers, stmt = StreamingExportService.build_query(dataset, start_date, end_date)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush() -> bytes:
+            chunk = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        # BOM so Excel opens the UTF-8 file correctly
+        buffer.write("\ufeff")
+        writer.writerow(headers)
+        yield flush()
+
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            writer.writerows([_cell(value) for value in row] for row in rows)
+            yield flush()
+
+    @staticmethod
+    def write_xlsx(
+        db: Session,
+        dataset: str,
+        filepath: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> int:
+        """Write the export to a write-only workbook at filepath; returns the row count"""
+        headers, stmt = StreamingExportService.build_query(dataset, start_date, end_date)
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        wb = ExportService.write_only_workbook()
+        count = ExportService.write_table(
+            wb, dataset.replace("_", " ").title(), headers,
+            ([_xlsx_cell(value) for value in row] for row in result)
+        )
+        wb.save(filepath)
+        return count
+
+    @staticmethod
+    def export_xlsx(
+        dataset: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> str:
+        """write_xlsx into exports/reports on a session of its own; returns the file path"""
+        filename = f"SupportX_{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        filepath = os.path.join(ExportService().export_dir, filename)
+        db = SessionLocal()
+        try:
+            StreamingExportService.write_xlsx(db, dataset, filepath, start_date, end_date)
+        finally:
+            db.close()
+        return filepath
+
+    @staticmethod
+    def stream_csv(
+        dataset: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Iterator[bytes]:
+        """iter_csv on a session of its own, which lives as long as the response body"""
+        db = SessionLocal()
+        try:
+            yield from StreamingExportService.iter_csv(db, dataset, start_date, end_date)
+        finally:
+            db.close()
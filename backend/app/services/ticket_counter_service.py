@@ -0,0 +1,249 @@
+"""
+Incrementally maintained ticket counters (the `ticket_counters` table).
+
+Every flush that inserts, deletes or changes the status, priority, assignee,
+group, requester or resolution breach flag of a Ticket applies a +1/-1 delta
+to the matching counter rows in the same transaction. This covers the
+TicketService create/assign/resolve/close/update paths as well as any other
+code that edits tickets through the ORM. Bulk SQL updates bypass the hook;
+the SLA breach scanner applies its own deltas with add_breaches(), and
+reconcile() recomputes the rollup from `tickets` and repairs any drift; it is
+scheduled from report_scheduler.
+"""
+import enum
+import logging
+from collections import defaultdict
+from typing import Dict, Tuple
+from sqlalchemy import event, func, inspect, update, insert, delete, cast, String
+from sqlalchemy.orm import Session
+from app.models.ticket import Ticket
+from app.models.ticket_counter import TicketCounter
+
+logger = logging.getLogger(__name__)
+
+CounterKey = Tuple[str, str, int, int, int]
+
+KEY_ATTRS = ("status", "priority", "assignee_id", "assigned_group_id", "requester_id")
+TRACKED_ATTRS = KEY_ATTRS + ("resolution_breached",)
+
+
+def _normalize(attr: str, value):
+    if isinstance(value, enum.Enum):
+        value = value.value
+    if attr in ("status", "priority"):
+        return value or ""
+    if attr == "resolution_breached":
+        return 1 if value else 0
+    return value or 0
+
+
+def attribute_values(ticket: Ticket, attrs, old: bool) -> list:
+    """Values of attrs before (old=True) or after the flush in progress"""
+    state = inspect(ticket)
+    values = []
+    for attr in attrs:
+        added, unchanged, deleted = state.attrs[attr].history
+        if old:
+            current = deleted or unchanged
+        else:
+            current = added or unchanged
+        if current:
+            value = current[0]
+        elif old and added:
+            # Attribute was unset before this flush
+            value = None
+        else:
+            value = getattr(ticket, attr)
+        values.append(value)
+    return values
+
+
+def _snapshot(ticket: Ticket, old: bool) -> Tuple[CounterKey, int]:
+    """(counter key, breached) for the ticket before (old=True) or after the flush"""
+    values = [
+        _normalize(attr, value)
+        for attr, value in zip(TRACKED_ATTRS, attribute_values(ticket, TRACKED_ATTRS, old))
+    ]
+    return tuple(values[:5]), values[5]
+
+
+def _collect_deltas(session: Session) -> Dict[CounterKey, list]:
+    deltas: Dict[CounterKey, list] = defaultdict(lambda: [0, 0])
+
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            key, breached = _snapshot(obj, old=False)
+            deltas[key][0] += 1
+            deltas[key][1] += breached
+
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            key, breached = _snapshot(obj, old=True)
+            deltas[key][0] -= 1
+            deltas[key][1] -= breached
+
+    for obj in session.dirty:
+        if not isinstance(obj, Ticket) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRS):
+            continue
+        old_key, old_breached = _snapshot(obj, old=True)
+        new_key, new_breached = _snapshot(obj, old=False)
+        if old_key == new_key and old_breached == new_breached:
+            continue
+        deltas[old_key][0] -= 1
+        deltas[old_key][1] -= old_breached
+        deltas[new_key][0] += 1
+        deltas[new_key][1] += new_breached
+
+    return {k: v for k, v in deltas.items() if v != [0, 0]}
+
+
+def _key_filter(key: CounterKey):
+    return [
+        TicketCounter.status == key[0],
+        TicketCounter.priority == key[1],
+        TicketCounter.assignee_id == key[2],
+        TicketCounter.assigned_group_id == key[3],
+        TicketCounter.requester_id == key[4],
+    ]
+
+
+def _apply_delta(connection, key: CounterKey, count: int, breached: int) -> None:
+    result = connection.execute(
+        update(TicketCounter)
+        .where(*_key_filter(key))
+        .values(
+            ticket_count=TicketCounter.ticket_count + count,
+            breached_count=TicketCounter.breached_count + breached,
+        )
+    )
+    if result.rowcount:
+        return
+
+    values = dict(zip(KEY_ATTRS, key), ticket_count=count, breached_count=breached)
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(TicketCounter).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_ATTRS),
+            set_={
+                "ticket_count": TicketCounter.ticket_count + stmt.excluded.ticket_count,
+                "breached_count": TicketCounter.breached_count + stmt.excluded.breached_count,
+            },
+        )
+        connection.execute(stmt)
+    else:
+        connection.execute(insert(TicketCounter).values(**values))
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# active_history makes the ORM load the old value before an expired attribute
+# is overwritten, so the "before" side of a delta is always known
+for _attr in TRACKED_ATTRS:
+    event.listen(getattr(Ticket, _attr), "set", _load_previous_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_ticket_counters(session: Session, flush_context) -> None:
+    # Session.new/dirty/deleted and attribute history still describe the
+    # pre-flush state here, which is exactly what the deltas need
+    deltas = _collect_deltas(session)
+    if not deltas:
+        return
+    connection = session.connection()
+    # Fixed order so concurrent transactions lock counter rows consistently
+    for key in sorted(deltas):
+        count, breached = deltas[key]
+        _apply_delta(connection, key, count, breached)
+
+
+class TicketCounterService:
+    @staticmethod
+    def _group_by_key_query(db: Session):
+        return db.query(
+            cast(Ticket.status, String).label("status"),
+            cast(Ticket.priority, String).label("priority"),
+            func.coalesce(Ticket.assignee_id, 0).label("assignee_id"),
+            func.coalesce(Ticket.assigned_group_id, 0).label("assigned_group_id"),
+            func.coalesce(Ticket.requester_id, 0).label("requester_id"),
+            func.count(Ticket.id).label("ticket_count"),
+            func.count(Ticket.id).filter(Ticket.resolution_breached == True).label("breached_count"),
+        ).group_by(
+            Ticket.status, Ticket.priority, Ticket.assignee_id,
+            Ticket.assigned_group_id, Ticket.requester_id
+        )
+
+    @staticmethod
+    def add_breaches(db: Session, rows) -> None:
+        """
+        Count tickets that a bulk UPDATE just flagged as resolution-breached.
+
+        rows carry the ticket's status, priority, assignee_id, assigned_group_id
+        and requester_id, e.g. from UPDATE ... RETURNING.
+        """
+        deltas: Dict[CounterKey, int] = defaultdict(int)
+        for row in rows:
+            deltas[tuple(_normalize(attr, getattr(row, attr)) for attr in KEY_ATTRS)] += 1
+        if not deltas:
+            return
+        connection = db.connection()
+        for key in sorted(deltas):
+            _apply_delta(connection, key, 0, deltas[key])
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Recompute the rollup from tickets and fix rows that drifted.
+
+        The recount and the stored counters are read from one snapshot, without
+        locking ticket_counters, so ticket writes carry on during the scan. The
+        differences are then applied as deltas like any other change: anything
+        committed after the snapshot has already applied its own delta and is
+        left alone. Returns the number of counter rows that were corrected.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            # Both reads must see the same committed tickets and counters
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        actual = {}
+        for row in TicketCounterService._group_by_key_query(db).all():
+            key = tuple(_normalize(attr, getattr(row, attr)) for attr in KEY_ATTRS)
+            actual[key] = (row.ticket_count, row.breached_count or 0)
+
+        stored = {
+            (c.status, c.priority, c.assignee_id, c.assigned_group_id, c.requester_id):
+                (c.ticket_count, c.breached_count)
+            for c in db.query(TicketCounter).all()
+        }
+        # End the snapshot; the corrections run in an ordinary transaction
+        db.commit()
+
+        corrections = {}
+        for key in set(actual) | set(stored):
+            expected = actual.get(key, (0, 0))
+            current = stored.get(key, (0, 0))
+            if expected != current:
+                corrections[key] = (expected[0] - current[0], expected[1] - current[1])
+
+        connection = db.connection()
+        # Fixed order, as in the flush hook, so row locks are taken consistently
+        for key in sorted(corrections):
+            _apply_delta(connection, key, *corrections[key])
+        # Rows no tickets map to any more
+        connection.execute(
+            delete(TicketCounter).where(TicketCounter.ticket_count == 0, TicketCounter.breached_count == 0)
+        )
+        db.commit()
+
+        if corrections:
+            logger.warning(f"Ticket counters: repaired {len(corrections)} drifted rows")
+        return len(corrections)
@@ -0,0 +1,459 @@
+"""
+Incrementally maintained daily ticket facts (the `ticket_daily_facts` table).
+
+Every flush that inserts, deletes or changes a ticket field the facts depend
+on takes the ticket's contribution out of the rows it used to count towards
+and adds it to the rows it counts towards now, in the same transaction, the
+same way ticket_counter_service keeps the dashboard counters. Sums, sums
+of squares and the quantile sketches subtract cleanly; min/max columns only
+ever widen, so they can lag behind a ticket moving between rows until the
+nightly rebuild().
+
+Bulk SQL updates bypass the hook; the SLA breach scanner applies its own
+deltas with add_breaches(), and rebuild(), scheduled nightly from
+report_scheduler over the last TICKET_FACT_REBUILD_DAYS days, recomputes the
+rollup from `tickets` and repairs drift with deltas.
+"""
+import enum
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event, func, inspect, select, update, insert, delete, cast, String, case, and_, extract
+from sqlalchemy.orm import Session
+from app.models.ticket import Ticket
+from app.models.ticket_daily_fact import TicketDailyFact
+from app.services.quantile_sketch import QuantileSketch
+from app.services.ticket_counter_service import attribute_values, TRACKED_ATTRS as COUNTER_ATTRS
+
+logger = logging.getLogger(__name__)
+
+FactKey = Tuple[date, int, str, int, int, str, str]
+
+KEY_ATTRS = ("day", "category_id", "priority", "assigned_group_id", "assignee_id", "status", "ticket_type")
+TRACKED_ATTRS = (
+    "created_at", "category_id", "priority", "assigned_group_id", "assignee_id", "status",
+    "ticket_type", "first_response_at", "resolved_at", "resolution_due",
+    "response_breached", "resolution_breached",
+)
+SUM_COLUMNS = (
+    "ticket_count", "responded_count", "response_minutes_sum", "response_minutes_sq",
+    "resolved_count", "resolution_minutes_sum", "resolution_minutes_sq", "sla_met_count",
+    "response_breached_count", "resolution_breached_count", "resolved_on_day_count",
+)
+# Each also has _min/_max columns and a _sketch (response_sketch, resolution_sketch)
+EXTREME_COLUMNS = ("response_minutes", "resolution_minutes")
+
+
+def _sketch_column(column: str) -> str:
+    return column.replace("_minutes", "_sketch")
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _day(value: datetime) -> date:
+    """UTC calendar day, matching the day expression used by rebuild()"""
+    if value.tzinfo is None:
+        return value.date()
+    return value.astimezone(timezone.utc).date()
+
+
+def _minutes(start: datetime, end: datetime) -> float:
+    if (start.tzinfo is None) != (end.tzinfo is None):
+        start, end = _utc(start), _utc(end)
+    return (end - start).total_seconds() / 60
+
+
+def _label(value) -> str:
+    if isinstance(value, enum.Enum):
+        value = value.value
+    return value or ""
+
+
+def _facts(values) -> Dict[FactKey, Dict[str, float]]:
+    """The rows one ticket counts towards, with what it adds to each"""
+    t = dict(zip(TRACKED_ATTRS, values))
+    created_at = t["created_at"]
+    if created_at is None:
+        return {}
+
+    dims = (
+        t["category_id"] or 0, _label(t["priority"]), t["assigned_group_id"] or 0,
+        t["assignee_id"] or 0, _label(t["status"]), _label(t["ticket_type"]),
+    )
+    created = {"ticket_count": 1}
+    if t["first_response_at"] is not None:
+        minutes = _minutes(created_at, t["first_response_at"])
+        created.update(responded_count=1, response_minutes_sum=minutes,
+                       response_minutes_sq=minutes * minutes, response_minutes=minutes)
+    if t["resolved_at"] is not None:
+        minutes = _minutes(created_at, t["resolved_at"])
+        created.update(resolved_count=1, resolution_minutes_sum=minutes,
+                       resolution_minutes_sq=minutes * minutes, resolution_minutes=minutes)
+        if t["resolution_due"] is not None and _minutes(t["resolved_at"], t["resolution_due"]) >= 0:
+            created["sla_met_count"] = 1
+    if t["response_breached"]:
+        created["response_breached_count"] = 1
+    if t["resolution_breached"]:
+        created["resolution_breached_count"] = 1
+
+    facts = {(_day(created_at),) + dims: created}
+    if t["resolved_at"] is not None:
+        resolved_key = (_day(t["resolved_at"]),) + dims
+        facts.setdefault(resolved_key, {})["resolved_on_day_count"] = 1
+    return facts
+
+
+class _Delta:
+    __slots__ = ("sums", "extremes", "sketches")
+
+    def __init__(self):
+        self.sums: Dict[str, float] = defaultdict(float)
+        self.extremes: Dict[str, Tuple[float, float]] = {}
+        self.sketches: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+
+    def add(self, fact: Dict[str, float], sign: int) -> None:
+        for column in SUM_COLUMNS:
+            if column in fact:
+                self.sums[column] += sign * fact[column]
+        for column in EXTREME_COLUMNS:
+            if column not in fact:
+                continue
+            self.sketches[_sketch_column(column)].add(fact[column], sign)
+            if sign > 0:
+                low, high = self.extremes.get(column, (fact[column], fact[column]))
+                self.extremes[column] = (min(low, fact[column]), max(high, fact[column]))
+
+    def __bool__(self) -> bool:
+        return bool(self.extremes) or any(self.sums.values()) or any(self.sketches.values())
+
+
+def _collect_deltas(session: Session) -> Dict[FactKey, _Delta]:
+    deltas: Dict[FactKey, _Delta] = defaultdict(_Delta)
+
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            for key, fact in _facts(attribute_values(obj, TRACKED_ATTRS, old=False)).items():
+                deltas[key].add(fact, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            for key, fact in _facts(attribute_values(obj, TRACKED_ATTRS, old=True)).items():
+                deltas[key].add(fact, -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Ticket) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRS):
+            continue
+        before = _facts(attribute_values(obj, TRACKED_ATTRS, old=True))
+        after = _facts(attribute_values(obj, TRACKED_ATTRS, old=False))
+        if before == after:
+            continue
+        for key, fact in before.items():
+            deltas[key].add(fact, -1)
+        for key, fact in after.items():
+            deltas[key].add(fact, 1)
+
+    return {k: v for k, v in deltas.items() if v}
+
+
+def _key_filter(key: FactKey):
+    return [getattr(TicketDailyFact, attr) == value for attr, value in zip(KEY_ATTRS, key)]
+
+
+def _narrower(connection, column, value: float, lowest: bool):
+    """min/max of a nullable column and a value on either dialect"""
+    if connection.dialect.name == "postgresql":
+        return (func.least if lowest else func.greatest)(column, value)
+    return (func.min if lowest else func.max)(func.coalesce(column, value), value)
+
+
+def _apply_delta(connection, key: FactKey, delta: _Delta) -> None:
+    _apply_sums(connection, key, delta)
+    sketches = {column: sketch for column, sketch in delta.sketches.items() if sketch}
+    if not sketches:
+        return
+    # The row exists and is locked by this transaction now, so read-merge-write is safe
+    columns = [getattr(TicketDailyFact, column) for column in sketches]
+    stored = connection.execute(select(*columns).where(*_key_filter(key))).one()
+    values = {}
+    for (column, sketch), text_value in zip(sketches.items(), stored):
+        merged = QuantileSketch.from_json(text_value)
+        merged.merge(sketch)
+        values[column] = merged.to_json()
+    connection.execute(update(TicketDailyFact).where(*_key_filter(key)).values(**values))
+
+
+def _apply_sums(connection, key: FactKey, delta: _Delta) -> None:
+    values = {
+        column: getattr(TicketDailyFact, column) + amount
+        for column, amount in delta.sums.items() if amount
+    }
+    for column, (low, high) in delta.extremes.items():
+        values[f"{column}_min"] = _narrower(connection, getattr(TicketDailyFact, f"{column}_min"), low, True)
+        values[f"{column}_max"] = _narrower(connection, getattr(TicketDailyFact, f"{column}_max"), high, False)
+    if not values:
+        # Only sketches change; the existence check below still locks the row
+        values = {"ticket_count": TicketDailyFact.ticket_count}
+    result = connection.execute(update(TicketDailyFact).where(*_key_filter(key)).values(**values))
+    if result.rowcount:
+        return
+
+    row = dict(zip(KEY_ATTRS, key))
+    row.update({column: delta.sums.get(column, 0) for column in SUM_COLUMNS})
+    for column, (low, high) in delta.extremes.items():
+        row[f"{column}_min"], row[f"{column}_max"] = low, high
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        # Another transaction created the row first: fold this delta into it
+        stmt = dialect_insert(TicketDailyFact).values(**row)
+        stmt = stmt.on_conflict_do_update(index_elements=list(KEY_ATTRS), set_=values)
+        connection.execute(stmt)
+    else:
+        connection.execute(insert(TicketDailyFact).values(**row))
+
+
+_EXTREME_VALUE_COLUMNS = tuple(f"{c}_{end}" for c in EXTREME_COLUMNS for end in ("min", "max"))
+_ROW_COLUMNS = SUM_COLUMNS + _EXTREME_VALUE_COLUMNS + tuple(_sketch_column(c) for c in EXTREME_COLUMNS)
+# Float sums accumulated in a different order differ by rounding noise
+_RELATIVE_TOLERANCE = 1e-6
+
+
+def _correction(expected: dict, current: dict) -> Optional[Tuple[_Delta, dict]]:
+    """(delta, min/max values to set) turning a stored fact row into the recount, or None"""
+    delta = _Delta()
+    for column in SUM_COLUMNS:
+        if not _same(expected[column] or 0, current[column] or 0):
+            delta.sums[column] = (expected[column] or 0) - (current[column] or 0)
+    for column in EXTREME_COLUMNS:
+        sketch = _sketch_column(column)
+        difference = QuantileSketch.from_json(expected[sketch])
+        difference.merge(QuantileSketch.from_json(current[sketch]), sign=-1)
+        if difference:
+            delta.sketches[sketch] = difference
+    extremes = {
+        column: expected[column] for column in _EXTREME_VALUE_COLUMNS
+        if not _same(expected[column], current[column])
+    }
+    if not delta and not extremes:
+        return None
+    return delta, extremes
+
+
+def _same(a: Optional[float], b: Optional[float]) -> bool:
+    if a is None or b is None:
+        return a is b
+    return abs(a - b) <= _RELATIVE_TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# See ticket_counter_service: the "before" side of a delta needs the old value
+for _attr in TRACKED_ATTRS:
+    if _attr not in COUNTER_ATTRS:
+        event.listen(getattr(Ticket, _attr), "set", _load_previous_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_ticket_facts(session: Session, flush_context) -> None:
+    deltas = _collect_deltas(session)
+    if not deltas:
+        return
+    connection = session.connection()
+    # Fixed order so concurrent transactions lock fact rows consistently
+    for key in sorted(deltas):
+        _apply_delta(connection, key, deltas[key])
+
+
+class TicketFactService:
+    @staticmethod
+    def _day_expr(db: Session, column):
+        if db.get_bind().dialect.name == "postgresql":
+            return func.date(func.timezone("UTC", column))
+        return func.date(column)
+
+    @staticmethod
+    def _minutes_expr(db: Session, start, end):
+        if db.get_bind().dialect.name == "postgresql":
+            return (extract("epoch", end) - extract("epoch", start)) / 60.0
+        return (func.julianday(end) - func.julianday(start)) * 1440.0
+
+    @staticmethod
+    def _dimensions():
+        return (
+            func.coalesce(Ticket.category_id, 0),
+            func.coalesce(cast(Ticket.priority, String), ""),
+            func.coalesce(Ticket.assigned_group_id, 0),
+            func.coalesce(Ticket.assignee_id, 0),
+            func.coalesce(cast(Ticket.status, String), ""),
+            func.coalesce(cast(Ticket.ticket_type, String), ""),
+        )
+
+    @staticmethod
+    def _as_date(value) -> date:
+        return date.fromisoformat(value) if isinstance(value, str) else value
+
+    @staticmethod
+    def add_breaches(db: Session, rows, breach_type: str) -> None:
+        """
+        Count tickets that a bulk UPDATE just flagged as breached.
+
+        rows carry the ticket's created_at and key fields (category_id,
+        priority, assigned_group_id, assignee_id, status, ticket_type), e.g.
+        from UPDATE ... RETURNING.
+        """
+        column = f"{breach_type}_breached_count"
+        deltas: Dict[FactKey, _Delta] = defaultdict(_Delta)
+        for row in rows:
+            key = (
+                _day(row.created_at), row.category_id or 0, _label(row.priority),
+                row.assigned_group_id or 0, row.assignee_id or 0,
+                _label(row.status), _label(row.ticket_type),
+            )
+            deltas[key].add({column: 1}, 1)
+        connection = db.connection()
+        for key in sorted(deltas):
+            _apply_delta(connection, key, deltas[key])
+
+    @staticmethod
+    def rebuild(db: Session, since: Optional[date] = None) -> int:
+        """
+        Recompute the facts from tickets, for every day or from `since` on, and
+        fix rows that drifted.
+
+        As in TicketCounterService.reconcile, the recount and the stored rows
+        are read from one snapshot without locking ticket_daily_facts, so
+        ticket writes carry on during the scan. Sums and sketches are then
+        corrected with deltas through the same path as the flush hook, leaving
+        changes committed after the snapshot intact. min/max columns are set to
+        the recounted values (they may miss a ticket committed during the run
+        until the next rebuild). Returns the number of fact rows corrected.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            # Every read below must see the same committed tickets and facts
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        rows = TicketFactService._recount(db, since)
+        stored_query = db.query(TicketDailyFact)
+        if since is not None:
+            stored_query = stored_query.filter(TicketDailyFact.day >= since)
+        stored = {}
+        for fact in stored_query:
+            key = tuple(getattr(fact, attr) for attr in KEY_ATTRS)
+            stored[key] = {column: getattr(fact, column) for column in _ROW_COLUMNS}
+        # End the snapshot; the corrections run in an ordinary transaction
+        db.commit()
+
+        empty = dict.fromkeys(_ROW_COLUMNS)
+        corrections = {}
+        for key in set(rows) | set(stored):
+            correction = _correction(rows.get(key, empty), stored.get(key, empty))
+            if correction is not None:
+                corrections[key] = correction
+
+        connection = db.connection()
+        # Fixed order, as in the flush hook, so row locks are taken consistently
+        for key in sorted(corrections):
+            delta, extremes = corrections[key]
+            _apply_delta(connection, key, delta)
+            if extremes:
+                connection.execute(update(TicketDailyFact).where(*_key_filter(key)).values(**extremes))
+        # Rows no tickets map to any more
+        connection.execute(delete(TicketDailyFact).where(
+            *[getattr(TicketDailyFact, column) == 0 for column in SUM_COLUMNS]
+        ))
+        db.commit()
+
+        if corrections:
+            logger.warning(f"Ticket daily facts: repaired {len(corrections)} drifted rows")
+        return len(corrections)
+
+    @staticmethod
+    def _recount(db: Session, since: Optional[date]) -> Dict[FactKey, dict]:
+        """Every fact row as recomputed from tickets, keyed like the table"""
+        created_day = TicketFactService._day_expr(db, Ticket.created_at)
+        resolved_day = TicketFactService._day_expr(db, Ticket.resolved_at)
+        response = TicketFactService._minutes_expr(db, Ticket.created_at, Ticket.first_response_at)
+        resolution = TicketFactService._minutes_expr(db, Ticket.created_at, Ticket.resolved_at)
+        dims = TicketFactService._dimensions()
+
+        def count_if(condition):
+            return func.sum(case((condition, 1), else_=0))
+
+        created = db.query(
+            created_day, *dims,
+            func.count(Ticket.id),
+            func.count(Ticket.first_response_at),
+            func.sum(response), func.sum(response * response), func.min(response), func.max(response),
+            func.count(Ticket.resolved_at),
+            func.sum(resolution), func.sum(resolution * resolution), func.min(resolution), func.max(resolution),
+            count_if(and_(Ticket.resolution_due.isnot(None), Ticket.resolved_at <= Ticket.resolution_due)),
+            count_if(Ticket.response_breached == True),
+            count_if(Ticket.resolution_breached == True),
+        ).filter(Ticket.created_at.isnot(None)).group_by(created_day, *dims)
+
+        resolved = db.query(resolved_day, *dims, func.count(Ticket.id)) \
+            .filter(Ticket.resolved_at.isnot(None)).group_by(resolved_day, *dims)
+
+        if since is not None:
+            created = created.filter(created_day >= since)
+            resolved = resolved.filter(resolved_day >= since)
+
+        rows: Dict[FactKey, dict] = {}
+
+        def row_for(day, key_dims) -> dict:
+            key = (TicketFactService._as_date(day),) + tuple(key_dims)
+            if key not in rows:
+                rows[key] = {column: 0 for column in SUM_COLUMNS}
+            return rows[key]
+
+        for r in created.all():
+            row = row_for(r[0], r[1:7])
+            (row["ticket_count"], row["responded_count"],
+             row["response_minutes_sum"], row["response_minutes_sq"],
+             row["response_minutes_min"], row["response_minutes_max"],
+             row["resolved_count"],
+             row["resolution_minutes_sum"], row["resolution_minutes_sq"],
+             row["resolution_minutes_min"], row["resolution_minutes_max"],
+             row["sla_met_count"], row["response_breached_count"],
+             row["resolution_breached_count"]) = r[7:]
+        for r in resolved.all():
+            row_for(r[0], r[1:7])["resolved_on_day_count"] = r[7]
+
+        # Sketches need every value: stream the timestamps and bucket them here,
+        # with the same arithmetic as the flush hook
+        timed = db.query(created_day, *dims, Ticket.created_at, Ticket.first_response_at, Ticket.resolved_at) \
+            .filter(Ticket.created_at.isnot(None),
+                    (Ticket.first_response_at.isnot(None)) | (Ticket.resolved_at.isnot(None)))
+        if since is not None:
+            timed = timed.filter(created_day >= since)
+        sketches: Dict[Tuple[FactKey, str], QuantileSketch] = defaultdict(QuantileSketch)
+        for r in timed.yield_per(5000):
+            key = (TicketFactService._as_date(r[0]),) + tuple(r[1:7])
+            created_at, first_response_at, resolved_at = r[7:]
+            if first_response_at is not None:
+                sketches[key, "response_sketch"].add(_minutes(created_at, first_response_at))
+            if resolved_at is not None:
+                sketches[key, "resolution_sketch"].add(_minutes(created_at, resolved_at))
+
+        for key, row in rows.items():
+            for column in SUM_COLUMNS:
+                row[column] = row[column] or 0
+            for column in EXTREME_COLUMNS:
+                row.setdefault(f"{column}_min", None)
+                row.setdefault(f"{column}_max", None)
+                sketch = sketches.get((key, _sketch_column(column)))
+                row[_sketch_column(column)] = sketch.to_json() if sketch else None
+        return rows
@@ -0,0 +1,85 @@
+"""
+Ticket search.
+
+On PostgreSQL, title and description are matched through the generated
+`tickets.search_vector` tsvector column (GIN indexed, see migration
+ticket_search_001) and results are ranked with ts_rank_cd. Ticket numbers are
+matched anywhere, so "INC-0012" and "001234" both find INC-001234; the
+pg_trgm index from migration ticket_number_trgm_001 serves the substring
+LIKE without scanning. Numbers that start with the term rank first.
+
+Other dialects (SQLite in tests) fall back to ILIKE with a simple rank.
+"""
+import re
+from typing import Tuple
+from sqlalchemy import or_, case, func, literal_column, literal
+from sqlalchemy.orm import Query, Session
+from app.models.ticket import Ticket
+
+SEARCH_CONFIG = "english"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class TicketSearchService:
+    @staticmethod
+    def build_tsquery(term: str) -> str:
+        """
+        Turn free text into a safe to_tsquery() expression.
+
+        Every word must match (AND) and each is prefix-matched, so partial
+        words typed into the search box still find results.
+        """
+        words = _WORD_RE.findall(term.lower())
+        return " & ".join(f"{w}:*" for w in words)
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        """Escape LIKE wildcards so the value matches literally (with escape="\\")"""
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @staticmethod
+    def _ticket_number_matches(term: str):
+        """(prefix match, substring match) on ticket_number"""
+        # Ticket numbers are stored upper-case (INC-000123); LIKE keeps the
+        # indexes usable where ILIKE would not
+        escaped = TicketSearchService._escape_like(term.strip().upper())
+        return (
+            Ticket.ticket_number.like(escaped + "%", escape="\\"),
+            Ticket.ticket_number.like("%" + escaped + "%", escape="\\"),
+        )
+
+    @staticmethod
+    def apply(db: Session, query: Query, term: str) -> Tuple[Query, object]:
+        """
+        Filter a ticket query by a search term.
+
+        Returns (query, rank) where rank is a SQL expression callers can order by.
+        """
+        number_prefix, number_match = TicketSearchService._ticket_number_matches(term)
+
+        if db.get_bind().dialect.name == "postgresql":
+            number_rank = case((number_prefix, 1.0), (number_match, 0.5), else_=0.0)
+            tsquery_text = TicketSearchService.build_tsquery(term)
+            if not tsquery_text:
+                return query.filter(number_match), number_rank
+            tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+            search_vector = literal_column("tickets.search_vector")
+            query = query.filter(or_(number_match, search_vector.op("@@")(tsquery)))
+            rank = number_rank + func.ts_rank_cd(search_vector, tsquery)
+            return query, rank
+
+        pattern = f"%{TicketSearchService._escape_like(term)}%"
+        title_match = Ticket.title.ilike(pattern, escape="\\")
+        query = query.filter(or_(
+            number_match,
+            title_match,
+            Ticket.description.ilike(pattern, escape="\\")
+        ))
+        rank = case(
+            (number_prefix, literal(4)),
+            (number_match, literal(3)),
+            (title_match, literal(2)),
+            else_=literal(1)
+        )
+        return query, rank
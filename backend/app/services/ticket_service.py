@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc, func
+from sqlalchemy import desc, func, tuple_
 from fastapi import HTTPException, status
 from typing import List, Optional
 from datetime import datetime
@@ -9,20 +9,26 @@ from app.models.ticket_activity import TicketActivity
 from app.models.user import User
 from app.models.asset import Asset
 from app.schemas.ticket import TicketCreate, TicketUpdate, TicketAssign, TicketResolve, TicketClose, CommentCreate
-from app.utils.helpers import generate_ticket_number
+from app.core.cache import TTLCache
+from app.core.database import estimate_row_count
+from app.utils.helpers import encode_cursor, decode_cursor
 from app.services.sla_service import SLAService
 from app.services.email_service import EmailService
+from app.services.ticket_search_service import TicketSearchService
+from app.services.number_allocator import NumberAllocator
+from app.services.dashboard_service import DashboardService
+# Register the flush hooks that keep ticket_counters and ticket_daily_facts in step with tickets
+import app.services.ticket_counter_service  # noqa: F401
+import app.services.ticket_fact_service  # noqa: F401
+
+# Approximate totals for cursor pagination, per user and filter set
+_ticket_total_cache = TTLCache(ttl=30)
 
 class TicketService:
     @staticmethod
     def create_ticket(db: Session, ticket_data: TicketCreate, current_user: User) -> Ticket:
-        year = datetime.now().year
-        sequence = db.query(func.count(Ticket.id)).filter(
-            func.extract('year', Ticket.created_at) == year
-        ).scalar() + 1
-        
-        ticket_number = generate_ticket_number(
-            "INC" if ticket_data.ticket_type.value == "INCIDENT" else "REQ", sequence
+        ticket_number = NumberAllocator.next_number(
+            db, "INC" if ticket_data.ticket_type.value == "INCIDENT" else "REQ"
         )
         
         db_ticket = Ticket(
@@ -79,13 +85,19 @@ class TicketService:
         return db.query(Ticket).filter(Ticket.ticket_number == ticket_number).first()
     
     @staticmethod
-    def get_tickets(db: Session, skip: int = 0, limit: int = 20, search: Optional[str] = None,
-                   ticket_type: Optional[str] = None, status: Optional[str] = None,
-                   priority: Optional[str] = None, category_id: Optional[int] = None,
-                   assignee_id: Optional[int] = None, requester_id: Optional[int] = None,
-                   assigned_group_id: Optional[int] = None, current_user: Optional[User] = None,
-                   is_unassigned: Optional[bool] = None) -> tuple:
+    def _filtered_ticket_query(db: Session, search: Optional[str] = None,
+                               ticket_type: Optional[str] = None, status: Optional[str] = None,
+                               priority: Optional[str] = None, category_id: Optional[int] = None,
+                               assignee_id: Optional[int] = None, requester_id: Optional[int] = None,
+                               assigned_group_id: Optional[int] = None, current_user: Optional[User] = None,
+                               is_unassigned: Optional[bool] = None):
+        """
+        Build the unordered ticket query shared by offset and cursor pagination.
+
+        Returns (query, search_rank); search_rank is None unless search is set.
+        """
         query = db.query(Ticket)
+        search_rank = None
 
         # RBAC: End users can only see their own tickets
         if current_user and not current_user.is_superuser:
@@ -102,12 +114,7 @@ class TicketService:
                 query = query.filter(Ticket.requester_id == current_user.id)
 
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(or_(
-                Ticket.ticket_number.ilike(search_filter),
-                Ticket.title.ilike(search_filter),
-                Ticket.description.ilike(search_filter)
-            ))
+            query, search_rank = TicketSearchService.apply(db, query, search)
 
         if ticket_type: query = query.filter(Ticket.ticket_type == ticket_type)
         # Handle status filter - compare with enum value properly
@@ -124,12 +131,64 @@ class TicketService:
         if is_unassigned is True: query = query.filter(Ticket.assignee_id == None)
         if requester_id: query = query.filter(Ticket.requester_id == requester_id)
         if assigned_group_id: query = query.filter(Ticket.assigned_group_id == assigned_group_id)
-        
-        query = query.order_by(desc(Ticket.created_at))
+        return query, search_rank
+
+    @staticmethod
+    def get_tickets(db: Session, skip: int = 0, limit: int = 20, **filters) -> tuple:
+        query, search_rank = TicketService._filtered_ticket_query(db, **filters)
+        if search_rank is not None:
+            # Best matches first when searching
+            query = query.order_by(desc(search_rank), desc(Ticket.created_at))
+        else:
+            query = query.order_by(desc(Ticket.created_at))
         total = query.count()
         tickets = query.offset(skip).limit(limit).all()
         return tickets, total
-    
+
+    @staticmethod
+    def get_tickets_by_cursor(db: Session, cursor: Optional[str] = None, limit: int = 20,
+                              include_total: bool = False, **filters) -> tuple:
+        """
+        Keyset pagination over (created_at desc, id desc).
+
+        Every page is an index range scan, so page N costs the same as page 1.
+        The total is only computed when asked for, and is a planner estimate on
+        PostgreSQL (exact count elsewhere) cached briefly per filter set.
+        Search results keep the keyset order rather than relevance order.
+
+        Returns (tickets, next_cursor, total, total_is_estimate) where total
+        may be None.
+        """
+        query, _ = TicketService._filtered_ticket_query(db, **filters)
+
+        total, total_is_estimate = None, False
+        if include_total:
+            user = filters.get("current_user")
+            cache_key = (
+                user.id if user else None,
+                tuple(sorted((k, v) for k, v in filters.items() if k != "current_user")),
+            )
+            total, total_is_estimate = _ticket_total_cache.get_or_set(
+                cache_key, lambda: estimate_row_count(db, query)
+            )
+
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            # Row comparison, so the planner uses ix_tickets_created_at_id as a range
+            query = query.filter(tuple_(Ticket.created_at, Ticket.id) < tuple_(cursor_created_at, cursor_id))
+
+        # Fetch one extra row to know whether another page exists
+        rows = query.order_by(desc(Ticket.created_at), desc(Ticket.id)).limit(limit + 1).all()
+        tickets = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = tickets[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return tickets, next_cursor, total, total_is_estimate
+
     @staticmethod
     def update_ticket(db: Session, ticket_id: int, ticket_data: TicketUpdate, current_user: User) -> Ticket:
         db_ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
@@ -349,12 +408,12 @@ class TicketService:
     
     @staticmethod
     def get_ticket_stats(db: Session, current_user: User) -> dict:
+        overall = DashboardService.get_counters(db)
+        mine = DashboardService.get_counters(db, assignee_id=current_user.id)
         return {
-            "total": db.query(Ticket).count(),
-            "open": db.query(Ticket).filter(Ticket.status.in_([
-                TicketStatus.NEW.value, TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value
-            ])).count(),
-            "my_tickets": db.query(Ticket).filter(Ticket.assignee_id == current_user.id).count(),
-            "unassigned": db.query(Ticket).filter(Ticket.assignee_id == None).count(),
-            "critical": db.query(Ticket).filter(Ticket.priority == "CRITICAL").count()
-        }
\ No newline at end of file
+            "total": overall["total"],
+            "open": overall["open"],
+            "my_tickets": mine["total"],
+            "unassigned": overall["unassigned_all"],
+            "critical": overall["critical_all"]
+        }
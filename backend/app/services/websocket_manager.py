@@ -1,8 +1,117 @@
 from fastapi import WebSocket
-from typing import Dict, List, Set, Optional
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Set, Optional
+from collections import deque
 from datetime import datetime
-import json
 import asyncio
+import json
+import logging
+import uuid
+
+from app.services.chat_backplane import Backplane, create_backplane
+from app.services.presence_service import PresenceService
+
+logger = logging.getLogger(__name__)
+
+# Messages queued per socket. A client this far behind is dropped (it
+# reconnects and reloads), so one slow link cannot grow memory without bound
+OUTBOUND_QUEUE_SIZE = 256
+# A send stuck this long means the connection is dead
+SEND_TIMEOUT_SECONDS = 10
+# Close code asking the client to reconnect later (RFC 6455 "Try Again Later")
+WS_TRY_AGAIN_LATER = 1013
+
+
+def encode(message: dict) -> str:
+    """JSON text frame, as WebSocket.send_json would send it"""
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+
+class Outbox:
+    """
+    Outbound queue of one WebSocket, drained by its own writer task.
+
+    put() never waits, so a broadcast costs one append per socket however
+    slow the clients are. Messages with a coalesce key (typing, online
+    status) replace a queued message with the same key, and are dropped
+    rather than queued when the queue is full. Anything else overflowing
+    the queue closes the connection.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: int, on_closed: Callable[["Outbox", Optional[int]], Awaitable[None]]):
+        self.websocket = websocket
+        self.user_id = user_id
+        self._on_closed = on_closed
+        self._queue: Deque[List] = deque()  # [text, coalesce key]
+        self._coalescing: Dict[str, List] = {}
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.closed = False
+        self.dropped = 0
+        self._writer = asyncio.create_task(self._write())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, text: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a serialized message; returns whether it was queued"""
+        if self.closed:
+            return False
+        if coalesce_key is not None:
+            queued = self._coalescing.get(coalesce_key)
+            if queued is not None:
+                queued[0] = text
+                return True
+            if len(self._queue) >= OUTBOUND_QUEUE_SIZE:
+                self.dropped += 1
+                return False
+        elif len(self._queue) >= OUTBOUND_QUEUE_SIZE:
+            logger.warning(f"Chat client of user {self.user_id} is {len(self._queue)} messages behind, closing it")
+            self.close(WS_TRY_AGAIN_LATER)
+            return False
+
+        entry = [text, coalesce_key]
+        self._queue.append(entry)
+        if coalesce_key is not None:
+            self._coalescing[coalesce_key] = entry
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    async def drain(self) -> None:
+        """Wait until everything queued so far has been sent"""
+        await self._idle.wait()
+
+    def close(self, code: Optional[int] = None, notify: bool = True) -> None:
+        """Stop writing, discarding pending messages; notify tells the manager"""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._coalescing.clear()
+        self._idle.set()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if notify:
+            asyncio.create_task(self._on_closed(self, code))
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                if not self._queue:
+                    self._idle.set()
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                text, coalesce_key = self._queue.popleft()
+                if coalesce_key is not None:
+                    self._coalescing.pop(coalesce_key, None)
+                await asyncio.wait_for(self.websocket.send_text(text), SEND_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"Chat send to user {self.user_id} failed: {e}")
+            self.close()
 
 
 class ConnectionManager:
@@ -14,11 +123,23 @@ class ConnectionManager:
     - Typing indicators
     - Online status updates
     - Read receipts
+
+    Every socket has an Outbox, so a broadcast serializes the message once
+    and queues it on each socket without waiting for any of them.
+
+    Each API worker has its own manager holding that worker's sockets.
+    Broadcasts are delivered locally and published on the chat backplane,
+    and every other worker delivers them to the sockets it holds. Presence
+    (PresenceService) combines local connections with the users other
+    workers announce.
     """
 
-    def __init__(self):
-        # Map user_id to their WebSocket connections (user can have multiple tabs)
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(self, backplane: Optional[Backplane] = None, session_factory=None):
+        self.worker_id = uuid.uuid4().hex
+        self.backplane = backplane or create_backplane()
+        self.presence = PresenceService(self.worker_id, self._publish, session_factory)
+        # Map user_id to their connections' outboxes (user can have multiple tabs)
+        self.active_connections: Dict[int, List[Outbox]] = {}
         # Map conversation_id to set of user_ids currently in that conversation
         self.conversation_users: Dict[int, Set[int]] = {}
         # Map user_id to set of conversation_ids they're currently viewing
@@ -28,45 +149,67 @@ class ConnectionManager:
         # Lock for thread-safe operations
         self._lock = asyncio.Lock()
 
+    async def start(self):
+        """Join the backplane and start announcing this worker's users"""
+        await self.backplane.start(self._receive)
+        await self.presence.start()
+
+    async def stop(self):
+        for outboxes in list(self.active_connections.values()):
+            for outbox in outboxes:
+                outbox.close(notify=False)
+        await self.presence.stop()
+        await self.backplane.stop()
+
     async def connect(self, websocket: WebSocket, user_id: int):
         """Accept a new WebSocket connection"""
         await websocket.accept()
         async with self._lock:
-            if user_id not in self.active_connections:
+            first = user_id not in self.active_connections
+            if first:
                 self.active_connections[user_id] = []
-            self.active_connections[user_id].append(websocket)
+            self.active_connections[user_id].append(Outbox(websocket, user_id, self._outbox_closed))
 
             if user_id not in self.user_conversations:
                 self.user_conversations[user_id] = set()
 
+        if first:
+            await self.presence.connected(user_id)
         # Broadcast online status to relevant users
         await self.broadcast_online_status(user_id, True)
 
     async def disconnect(self, websocket: WebSocket, user_id: int):
         """Handle WebSocket disconnection"""
+        conv_ids = None
         async with self._lock:
             if user_id in self.active_connections:
-                if websocket in self.active_connections[user_id]:
-                    self.active_connections[user_id].remove(websocket)
+                for outbox in self.active_connections[user_id]:
+                    if outbox.websocket is websocket:
+                        self.active_connections[user_id].remove(outbox)
+                        outbox.close(notify=False)
+                        break
 
-                # If no more connections, user is offline
+                # If no more connections here, user is offline on this worker
                 if not self.active_connections[user_id]:
                     del self.active_connections[user_id]
 
                     # Clean up conversation subscriptions
-                    if user_id in self.user_conversations:
-                        for conv_id in self.user_conversations[user_id]:
-                            if conv_id in self.conversation_users:
-                                self.conversation_users[conv_id].discard(user_id)
-                        del self.user_conversations[user_id]
+                    conv_ids = list(self.user_conversations.pop(user_id, ()))
+                    for conv_id in conv_ids:
+                        if conv_id in self.conversation_users:
+                            self.conversation_users[conv_id].discard(user_id)
 
                     # Clean up typing status
                     for conv_id in list(self.typing_users.keys()):
                         if user_id in self.typing_users[conv_id]:
                             del self.typing_users[conv_id][user_id]
 
-                    # Broadcast offline status
-                    await self.broadcast_online_status(user_id, False)
+        # Outside the lock: closing outboxes call disconnect again
+        if conv_ids is not None:
+            await self.presence.disconnected(user_id)
+            # Broadcast offline status, unless still connected to another worker
+            if not self.is_user_online(user_id):
+                await self._broadcast_status(user_id, False, conv_ids)
 
     async def subscribe_to_conversation(self, user_id: int, conversation_id: int):
         """Subscribe a user to receive updates for a conversation"""
@@ -87,53 +230,130 @@ class ConnectionManager:
             if user_id in self.user_conversations:
                 self.user_conversations[user_id].discard(conversation_id)
 
+    async def _outbox_closed(self, outbox: Outbox, code: Optional[int]):
+        if code is not None:
+            try:
+                await outbox.websocket.close(code=code)
+            except Exception:
+                pass
+        await self.disconnect(outbox.websocket, outbox.user_id)
+
     async def send_personal_message(self, user_id: int, message: dict):
-        """Send a message to a specific user (all their connections)"""
-        if user_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.append(connection)
-
-            # Clean up disconnected sockets
-            for conn in disconnected:
-                await self.disconnect(conn, user_id)
-
-    async def broadcast_to_conversation(self, conversation_id: int, message: dict, exclude_user_id: Optional[int] = None):
-        """Broadcast a message to all users in a conversation"""
-        if conversation_id not in self.conversation_users:
-            return
+        """Send a message to a specific user's connections on this worker"""
+        self._enqueue([user_id], encode(message))
 
-        # Make a copy of the set to avoid "Set changed size during iteration" error
-        user_ids = list(self.conversation_users[conversation_id])
+    async def send_to_socket(self, websocket: WebSocket, user_id: int, message: dict):
+        """Send to one connection, behind whatever is already queued for it"""
+        for outbox in self.active_connections.get(user_id, []):
+            if outbox.websocket is websocket:
+                outbox.put(encode(message))
+
+    def _enqueue(self, user_ids: Iterable[int], text: str, coalesce_key: Optional[str] = None):
         for user_id in user_ids:
-            if exclude_user_id and user_id == exclude_user_id:
-                continue
-            await self.send_personal_message(user_id, message)
+            for outbox in self.active_connections.get(user_id, ()):
+                outbox.put(text, coalesce_key)
+
+    async def drain(self):
+        """Wait until every message queued so far has been sent"""
+        outboxes = [outbox for outboxes in list(self.active_connections.values()) for outbox in outboxes]
+        await asyncio.gather(*(outbox.drain() for outbox in outboxes))
+
+    async def broadcast_to_conversation(
+        self,
+        conversation_id: int,
+        message: dict,
+        exclude_user_id: Optional[int] = None,
+        coalesce_key: Optional[str] = None
+    ):
+        """
+        Broadcast a message to all users in a conversation, on every worker.
+        Pass coalesce_key for ephemeral state (typing, online status) where
+        only the latest queued message per key matters.
+        """
+        await self._fan_out(
+            message, conversation_id=conversation_id, exclude_user_id=exclude_user_id, coalesce_key=coalesce_key
+        )
 
     async def broadcast_to_users(self, user_ids: List[int], message: dict, exclude_user_id: Optional[int] = None):
-        """Broadcast a message to specific users"""
-        for user_id in user_ids:
-            if exclude_user_id and user_id == exclude_user_id:
-                continue
-            await self.send_personal_message(user_id, message)
+        """Broadcast a message to specific users, on every worker"""
+        await self._fan_out(message, user_ids=user_ids, exclude_user_id=exclude_user_id)
+
+    async def _fan_out(
+        self,
+        message: dict,
+        conversation_id: Optional[int] = None,
+        user_ids: Iterable[int] = (),
+        exclude_user_id: Optional[int] = None,
+        coalesce_key: Optional[str] = None
+    ):
+        """Deliver to this worker's sockets, then publish for the other workers"""
+        user_ids = list(user_ids)
+        await self._deliver(message, conversation_id, user_ids, exclude_user_id, coalesce_key)
+        await self._publish({
+            "kind": "deliver",
+            "conversation_id": conversation_id,
+            "user_ids": user_ids,
+            "exclude_user_id": exclude_user_id,
+            "coalesce_key": coalesce_key,
+            "message": message,
+        })
+
+    async def _deliver(
+        self,
+        message: dict,
+        conversation_id: Optional[int],
+        user_ids: List[int],
+        exclude_user_id: Optional[int],
+        coalesce_key: Optional[str] = None
+    ):
+        """Queue on local sockets of the conversation's subscribers and of user_ids"""
+        # Copy the set to avoid "Set changed size during iteration" errors
+        subscribers = list(self.conversation_users.get(conversation_id, ())) if conversation_id else []
+        recipients = [
+            user_id for user_id in dict.fromkeys(subscribers + user_ids)
+            if not (exclude_user_id and user_id == exclude_user_id)
+        ]
+        # Serialized once for every socket
+        self._enqueue(recipients, encode(message), coalesce_key)
+
+    async def _publish(self, event: Dict[str, Any]):
+        event["origin"] = self.worker_id
+        try:
+            await self.backplane.publish(event)
+        except Exception as e:
+            # Other workers miss this event; local sockets already have it
+            logger.warning(f"Could not publish chat event {event['kind']}: {e}")
+
+    async def _receive(self, event: Dict[str, Any]):
+        """Handle an event published by any worker"""
+        origin = event.get("origin")
+        if origin == self.worker_id:
+            return
+        kind = event.get("kind")
+        if kind == "deliver":
+            await self._deliver(
+                event["message"], event.get("conversation_id"),
+                event.get("user_ids") or [], event.get("exclude_user_id"), event.get("coalesce_key")
+            )
+        elif kind in ("presence", "hello", "worker_stopped"):
+            await self.presence.handle(event)
 
     async def broadcast_online_status(self, user_id: int, is_online: bool):
         """Broadcast user's online status to all their conversations"""
+        # Make a copy to avoid iteration errors
+        await self._broadcast_status(user_id, is_online, list(self.user_conversations.get(user_id, ())))
+
+    async def _broadcast_status(self, user_id: int, is_online: bool, conv_ids: List[int]):
         message = {
             "type": "online_status",
             "user_id": user_id,
             "is_online": is_online,
             "timestamp": datetime.utcnow().isoformat()
         }
-
-        # Get all conversations this user is part of (make a copy to avoid iteration errors)
-        if user_id in self.user_conversations:
-            conv_ids = list(self.user_conversations[user_id])
-            for conv_id in conv_ids:
-                await self.broadcast_to_conversation(conv_id, message, exclude_user_id=user_id)
+        for conv_id in conv_ids:
+            await self.broadcast_to_conversation(
+                conv_id, message, exclude_user_id=user_id, coalesce_key=f"online_status:{user_id}"
+            )
 
     async def set_typing(self, user_id: int, conversation_id: int, is_typing: bool):
         """Update typing status for a user in a conversation"""
@@ -154,7 +374,9 @@ class ConnectionManager:
             "is_typing": is_typing,
             "timestamp": datetime.utcnow().isoformat()
         }
-        await self.broadcast_to_conversation(conversation_id, message, exclude_user_id=user_id)
+        await self.broadcast_to_conversation(
+            conversation_id, message, exclude_user_id=user_id, coalesce_key=f"typing:{conversation_id}:{user_id}"
+        )
 
     async def send_new_message(self, conversation_id: int, message_data: dict, sender_id: int, participant_ids: List[int] = None):
         """Broadcast a new message to conversation participants"""
@@ -164,14 +386,13 @@ class ConnectionManager:
             "message": message_data,
             "timestamp": datetime.utcnow().isoformat()
         }
-        # First broadcast to subscribed users
-        await self.broadcast_to_conversation(conversation_id, message)
-
-        # Also send to all participants directly (in case they're not subscribed to this conversation yet)
-        if participant_ids:
-            for user_id in participant_ids:
-                if user_id != sender_id and user_id not in self.conversation_users.get(conversation_id, set()):
-                    await self.send_personal_message(user_id, message)
+        # Subscribed users, and participants directly (in case they're not
+        # subscribed to this conversation yet)
+        await self._fan_out(
+            message,
+            conversation_id=conversation_id,
+            user_ids=[user_id for user_id in participant_ids or [] if user_id != sender_id]
+        )
 
     async def send_message_read(self, conversation_id: int, message_id: int, user_id: int):
         """Broadcast message read receipt"""
@@ -218,12 +439,12 @@ class ConnectionManager:
         await self.broadcast_to_conversation(conversation_id, message)
 
     def is_user_online(self, user_id: int) -> bool:
-        """Check if a user is currently online"""
-        return user_id in self.active_connections and len(self.active_connections[user_id]) > 0
+        """Check if a user is currently connected to any worker"""
+        return self.presence.is_online(user_id)
 
     def get_online_users(self) -> List[int]:
         """Get list of all online user IDs"""
-        return list(self.active_connections.keys())
+        return list(self.presence.online_users())
 
     def get_online_users_in_conversation(self, conversation_id: int) -> List[int]:
         """Get list of online users in a specific conversation"""
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Optional, Tuple
 import re
 import html
+import json
+import base64
 from datetime import datetime, timedelta
 import pytz
 
@@ -72,6 +74,20 @@ def generate_ticket_number(prefix: str, sequence: int) -> str:
     """Generate ticket number with prefix"""
     return f"{prefix}-{sequence:06d}"
 
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque URL-safe cursor"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except (KeyError, TypeError, json.JSONDecodeError, UnicodeDecodeError, base64.binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
 def calculate_sla_deadline(
     start_time: datetime,
     sla_hours: int,
@@ -0,0 +1,71 @@
+"""
+Benchmark BusinessCalendar against the original day-by-day business-minutes loop
+
+Usage:
+    cd backend
+    python scripts/benchmark_business_calendar.py [ticket_count]
+"""
+
+import sys
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.business_calendar import BusinessCalendar
+
+START_HOUR, END_HOUR, WORKING_DAYS = 9, 18, [0, 1, 2, 3, 4]
+
+# Typical SLA targets: 1h response up to a 30 business-day resolution
+TARGETS = [60, 240, 480, 1440, 2880, 30 * 9 * 60]
+
+
+def legacy_add_business_minutes(current_time, remaining_minutes, start_hour, end_hour, working_days):
+    """The day-by-day loop SLAService.add_business_minutes used before BusinessCalendar; tests compare against it too"""
+    while remaining_minutes > 0:
+        while current_time.weekday() not in working_days:
+            current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        if current_time.hour < start_hour:
+            current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+        if current_time.hour >= end_hour:
+            current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            continue
+        end_of_day = current_time.replace(hour=end_hour, minute=0, second=0, microsecond=0)
+        minutes_until_eod = int((end_of_day - current_time).total_seconds() / 60)
+        if remaining_minutes <= minutes_until_eod:
+            current_time += timedelta(minutes=remaining_minutes)
+            remaining_minutes = 0
+        else:
+            remaining_minutes -= minutes_until_eod
+            current_time = current_time.replace(hour=start_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return current_time
+
+
+def run(count: int):
+    rng = random.Random(1)
+    tz = ZoneInfo("UTC")
+    starts = [datetime(2026, 1, 1, tzinfo=tz) + timedelta(minutes=rng.randrange(0, 525600)) for _ in range(count)]
+
+    calendar = BusinessCalendar(START_HOUR, END_HOUR, WORKING_DAYS)
+    print(f"{count} tickets, business hours {START_HOUR}:00-{END_HOUR}:00 Mon-Fri")
+    print(f"{'target (min)':>14} {'legacy loop':>14} {'calendar':>14} {'speedup':>9}")
+
+    for minutes in TARGETS:
+        began = time.perf_counter()
+        legacy = [legacy_add_business_minutes(s, minutes, START_HOUR, END_HOUR, WORKING_DAYS) for s in starts]
+        legacy_time = time.perf_counter() - began
+
+        began = time.perf_counter()
+        fast = calendar.add_minutes_many(starts, minutes)
+        fast_time = time.perf_counter() - began
+
+        assert legacy == fast
+        print(f"{minutes:>14} {legacy_time * 1000:>12.1f}ms {fast_time * 1000:>12.1f}ms {legacy_time / fast_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
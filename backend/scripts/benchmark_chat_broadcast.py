@@ -0,0 +1,137 @@
+"""
+Benchmark live chat broadcast: sequential sends vs per-socket outboxes
+
+Simulates one group conversation with many WebSocket subscribers, a few of
+them on slow links (every send takes --slow-ms).
+  sequential  the old broadcast: await send_json on each socket in turn,
+              serializing the message per socket
+  queued      ConnectionManager.broadcast_to_conversation: serialize once,
+              queue on each socket's Outbox, writer tasks send concurrently
+
+"call" is how long the broadcast call takes; "fast p50/p99" is the time
+from a broadcast to its arrival at the sockets on good links.
+
+Usage:
+    cd backend
+    python scripts/benchmark_chat_broadcast.py [--sockets 5000] [--slow 50] [--slow-ms 50] [--messages 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONVERSATION_ID = 1
+
+
+class SimulatedSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        # Even a fast socket yields to the event loop on write
+        await asyncio.sleep(self.delay)
+        self.received.append(time.perf_counter())
+
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data, separators=(",", ":")))
+
+
+def make_sockets(count: int, slow: int, slow_ms: float):
+    # Spread the slow sockets out, as they would be in a real conversation
+    step = count // slow if slow else count + 1
+    return [SimulatedSocket(slow_ms / 1000 if slow and n % step == 0 else 0) for n in range(count)]
+
+
+def message(n: int):
+    return {
+        "type": "new_message",
+        "conversation_id": CONVERSATION_ID,
+        "message": {"id": n, "sender_id": 1, "content": f"Status update {n}: " + "x" * 200},
+    }
+
+
+async def run_sequential(sockets, messages):
+    starts, calls = [], []
+    for n in range(messages):
+        starts.append(time.perf_counter())
+        for socket in sockets:
+            await socket.send_json(message(n))
+        calls.append(time.perf_counter() - starts[-1])
+    return starts, calls
+
+
+async def run_queued(sockets, messages):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    import app.models  # noqa: F401
+    from app.core.database import Base
+    from app.services import websocket_manager
+    from app.services.chat_backplane import LocalBackplane
+    from app.services.websocket_manager import ConnectionManager
+
+    # Presence is saved to a throwaway database
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+
+    websocket_manager.OUTBOUND_QUEUE_SIZE = max(websocket_manager.OUTBOUND_QUEUE_SIZE, messages + 1)
+    manager = ConnectionManager(LocalBackplane(), sessionmaker(bind=engine))
+    for user_id, socket in enumerate(sockets, start=1):
+        await manager.connect(socket, user_id)
+        await manager.subscribe_to_conversation(user_id, CONVERSATION_ID)
+    await manager.drain()
+    for socket in sockets:
+        socket.received.clear()
+
+    starts, calls = [], []
+    for n in range(messages):
+        starts.append(time.perf_counter())
+        await manager.broadcast_to_conversation(CONVERSATION_ID, message(n))
+        calls.append(time.perf_counter() - starts[-1])
+        # Let the writers run between broadcasts, as a real server would
+        await asyncio.sleep(0)
+    await manager.drain()
+    await manager.stop()
+    return starts, calls
+
+
+def report(mode, sockets, starts, calls, elapsed):
+    fast = [socket for socket in sockets if not socket.delay]
+    latencies = sorted(
+        (socket.received[n] - start) * 1000
+        for socket in fast for n, start in enumerate(starts)
+    )
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{mode:>11} {statistics.mean(calls) * 1000:>9.1f}ms {statistics.median(latencies):>9.1f}ms "
+          f"{p99:>9.1f}ms {elapsed:>8.2f}s")
+
+
+async def main(args):
+    print(f"{args.sockets} sockets ({args.slow} at {args.slow_ms:.0f}ms per send), {args.messages} messages")
+    print(f"{'mode':>11} {'call':>11} {'fast p50':>11} {'fast p99':>11} {'total':>9}")
+    for mode, run in (("sequential", run_sequential), ("queued", run_queued)):
+        sockets = make_sockets(args.sockets, args.slow, args.slow_ms)
+        began = time.perf_counter()
+        starts, calls = await run(sockets, args.messages)
+        report(mode, sockets, starts, calls, time.perf_counter() - began)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--slow", type=int, default=50)
+    parser.add_argument("--slow-ms", type=float, default=50)
+    parser.add_argument("--messages", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""
+Benchmark Excel export: rich per-cell layout vs write-only workbook
+
+Each run happens in a child process so its peak RSS is its own.
+  rich        ExportService.export_to_excel forced into the styled layout
+  write-only  ExportService.export_to_excel above RICH_EXCEL_MAX_ROWS
+  stream      ExportService.write_table fed by a generator, as the dataset
+              exports (StreamingExportService.write_xlsx) do
+
+The report modes hold the report rows in memory first, as the reporting
+service returns them; "baseline" is the RSS with just those rows.
+
+Usage:
+    cd backend
+    python scripts/benchmark_xlsx_export.py [row_count ...] [--rich-max N]
+"""
+
+import sys
+import os
+import random
+import resource
+import subprocess
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ["rich", "write-only", "stream"]
+PRIORITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+
+def generate(count: int):
+    rng = random.Random(1)
+    for n in range(count):
+        total = rng.randrange(1, 400)
+        yield {
+            "user_name": f"Technician {n}",
+            "email": f"tech{n}@example.com",
+            "priority": PRIORITIES[n % 4],
+            "total_tickets": total,
+            "resolved_tickets": rng.randrange(0, total + 1),
+            "open_tickets": rng.randrange(0, 20),
+            "resolution_rate": rng.uniform(0, 100),
+            "avg_resolution_time_hours": rng.uniform(0, 200),
+            "sla_compliance": rng.uniform(50, 100),
+        }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode: str, count: int):
+    from app.services import export_service
+    from app.services.export_service import ExportService
+
+    service = ExportService()
+    service.export_dir = tempfile.mkdtemp()
+    baseline = 0.0
+    began = time.perf_counter()
+    if mode == "stream":
+        wb = ExportService.write_only_workbook()
+        headers = list(next(generate(1)).keys())
+        ExportService.write_table(wb, "Rows", headers, (list(row.values()) for row in generate(count)))
+        path = os.path.join(service.export_dir, "stream.xlsx")
+        wb.save(path)
+    else:
+        data = list(generate(count))
+        baseline = peak_rss_mb()
+        began = time.perf_counter()
+        if mode == "rich":
+            export_service.RICH_EXCEL_MAX_ROWS = count
+        path = service.export_to_excel(data, "technician_performance")
+    elapsed = time.perf_counter() - began
+    size = os.path.getsize(path) / 1024 / 1024
+    print(f"{elapsed:.3f} {baseline:.1f} {peak_rss_mb():.1f} {size:.1f}")
+
+
+def run(counts, rich_max: int):
+    print(f"{'rows':>9} {'mode':>11} {'seconds':>9} {'rows/sec':>10} {'baseline':>10} {'peak RSS':>10} {'file':>8}")
+    for count in counts:
+        for mode in MODES:
+            if mode == "rich" and count > rich_max:
+                print(f"{count:>9} {mode:>11} {'skipped (--rich-max)':>31}")
+                continue
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(count)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            elapsed, baseline, peak, size = (float(v) for v in out)
+            print(f"{count:>9} {mode:>11} {elapsed:>8.2f}s {count / elapsed:>10,.0f} "
+                  f"{baseline:>8.0f}MB {peak:>8.0f}MB {size:>6.1f}MB")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--child"]:
+        child(args[1], int(args[2]))
+    else:
+        rich_max = 100000
+        if "--rich-max" in args:
+            i = args.index("--rich-max")
+            rich_max = int(args[i + 1])
+            del args[i:i + 2]
+        run([int(a) for a in args] or [100000, 1000000], rich_max)
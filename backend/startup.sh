@@ -80,8 +80,17 @@ fi
 
 echo "Correct version based on schema: $CORRECT_VERSION"
 
+# Only repair versions from before project_mgmt_001 - anything newer was
+# stamped by a real alembic upgrade and must not be rewound
+case "$CURRENT_VERSION" in
+    ""|ticket_assets_001|20251209_first_response|add_ticket_date_overrides|live_chat_001|avatar_data_001|project_mgmt_001)
+        NEEDS_REPAIR="yes" ;;
+    *)
+        NEEDS_REPAIR="no" ;;
+esac
+
 # If current version doesn't match what schema shows, fix it
-if [ "$CURRENT_VERSION" != "$CORRECT_VERSION" ]; then
+if [ "$NEEDS_REPAIR" = "yes" ] && [ "$CURRENT_VERSION" != "$CORRECT_VERSION" ]; then
     echo "Version mismatch! Updating alembic_version to $CORRECT_VERSION..."
     python -c "
 from sqlalchemy import create_engine, text
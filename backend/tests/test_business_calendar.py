@@ -0,0 +1,76 @@
+"""
+Tests for the closed-form business calendar used for SLA due dates.
+"""
+import random
+from datetime import datetime, timedelta, date
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services.business_calendar import BusinessCalendar, parse_holidays
+from scripts.benchmark_business_calendar import legacy_add_business_minutes
+
+
+@pytest.mark.parametrize("start_hour,end_hour,working_days", [
+    (9, 18, [0, 1, 2, 3, 4]),
+    (8, 17, [0, 1, 2, 3, 4, 5]),
+    (0, 23, [0, 1, 2, 3, 4, 5, 6]),
+    (10, 14, [1, 3]),
+])
+def test_matches_legacy_loop(start_hour, end_hour, working_days):
+    rng = random.Random(42)
+    tz = ZoneInfo("America/New_York")
+    calendar = BusinessCalendar(start_hour, end_hour, working_days)
+    for _ in range(2000):
+        start = datetime(2026, 1, 1, tzinfo=tz) + timedelta(seconds=rng.randrange(0, 365 * 86400))
+        minutes = rng.choice([0, 1, 30, 59, 60, 240, 540, 541, 1080, 2700, 43200, rng.randrange(1, 200000)])
+        expected = legacy_add_business_minutes(start, minutes, start_hour, end_hour, working_days)
+        assert calendar.add_minutes(start, minutes) == expected, (start, minutes)
+
+
+def test_holidays_are_skipped():
+    calendar = BusinessCalendar(9, 18, [0, 1, 2, 3, 4], holidays=[date(2026, 12, 25), date(2026, 12, 28)])
+    # Thu 24 Dec 17:00 + 2h -> 1h on Thu, Fri 25th and Mon 28th are holidays -> Tue 29th 10:00
+    start = datetime(2026, 12, 24, 17, 0)
+    assert calendar.add_minutes(start, 120) == datetime(2026, 12, 29, 10, 0)
+    # Starting on a holiday moves to the next working day
+    assert calendar.add_minutes(datetime(2026, 12, 25, 11, 0), 30) == datetime(2026, 12, 29, 9, 30)
+
+
+def test_holidays_match_day_by_day_count():
+    rng = random.Random(7)
+    holidays = sorted({date(2026, 1, 1) + timedelta(days=rng.randrange(0, 400)) for _ in range(40)})
+    calendar = BusinessCalendar(9, 17, [0, 1, 2, 3, 4], holidays)
+    for _ in range(500):
+        start = datetime(2026, 1, 1) + timedelta(minutes=rng.randrange(0, 300 * 1440))
+        minutes = rng.randrange(1, 60000)
+        due = calendar.add_minutes(start, minutes)
+        # Count the working minutes between start and due, day by day
+        counted, day = 0, start.date()
+        while day <= due.date():
+            if calendar.is_working_day(day):
+                open_at = datetime.combine(day, datetime.min.time()).replace(hour=9)
+                close_at = open_at.replace(hour=17)
+                lo, hi = max(open_at, start), min(close_at, due)
+                if hi > lo:
+                    counted += int((hi - lo).total_seconds() // 60)
+            day += timedelta(days=1)
+        assert counted == minutes, (start, minutes, due)
+
+
+def test_batch_matches_single():
+    calendar = BusinessCalendar()
+    starts = [datetime(2026, 3, 2, 8) + timedelta(hours=7 * i) for i in range(50)]
+    assert calendar.add_minutes_many(starts, 600) == [calendar.add_minutes(s, 600) for s in starts]
+
+
+def test_rejects_empty_calendar():
+    with pytest.raises(ValueError):
+        BusinessCalendar(9, 9, [0])
+    with pytest.raises(ValueError):
+        BusinessCalendar(9, 18, [])
+
+
+def test_parse_holidays():
+    assert parse_holidays("2026-12-25, bad ,2026-01-01,") == [date(2026, 12, 25), date(2026, 1, 1)]
+    assert parse_holidays(None) == []
@@ -0,0 +1,178 @@
+"""Live chat fan-out and presence between workers over a shared backplane"""
+import asyncio
+import json
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.live_chat import UserOnlineStatus
+from app.services import presence_service, websocket_manager
+from app.services.chat_backplane import LocalBackplane, LocalHub
+from app.services.websocket_manager import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    def types(self):
+        return [m["type"] for m in self.sent]
+
+
+def presence_db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+async def workers(count=2, session_factory=None):
+    hub = LocalHub()
+    session_factory = session_factory or presence_db()
+    managers = [ConnectionManager(LocalBackplane(hub), session_factory) for _ in range(count)]
+    for manager in managers:
+        await manager.start()
+    return managers
+
+
+async def test_messages_reach_sockets_on_other_workers():
+    a, b = await workers()
+    sender, reader, outsider = FakeSocket(), FakeSocket(), FakeSocket()
+    await a.connect(sender, 1)
+    await b.connect(reader, 2)
+    await b.connect(outsider, 3)
+    for manager, user_id in ((a, 1), (b, 2)):
+        await manager.subscribe_to_conversation(user_id, 10)
+
+    await a.send_new_message(10, {"id": 5, "content": "hi"}, sender_id=1, participant_ids=[1, 2])
+    await a.set_typing(1, 10, True)
+    await b.send_message_read(10, 5, 2)
+    await a.drain()
+    await b.drain()
+
+    assert reader.types() == ["new_message", "typing"]
+    assert reader.sent[0]["message"] == {"id": 5, "content": "hi"}
+    # The sender's own tabs get the message but not their typing
+    assert sender.types() == ["new_message", "message_read"]
+    assert outsider.sent == []
+    for manager in (a, b):
+        await manager.stop()
+
+
+async def test_presence_spans_workers():
+    a, b = await workers()
+    tab_a, tab_b, watcher = FakeSocket(), FakeSocket(), FakeSocket()
+    await a.connect(tab_a, 1)
+    await b.connect(tab_b, 1)
+    await b.connect(watcher, 2)
+    for manager, user_id in ((a, 1), (b, 1), (b, 2)):
+        await manager.subscribe_to_conversation(user_id, 10)
+    assert a.is_user_online(2) and sorted(a.get_online_users()) == [1, 2]
+
+    # Still connected through worker b: not offline yet
+    await a.disconnect(tab_a, 1)
+    assert a.is_user_online(1)
+    assert "online_status" not in watcher.types()
+
+    await b.disconnect(tab_b, 1)
+    await b.drain()
+    assert not a.is_user_online(1)
+    assert watcher.sent[-1]["type"] == "online_status" and watcher.sent[-1]["is_online"] is False
+
+    # A worker that stops no longer counts toward presence
+    await b.stop()
+    assert not a.is_user_online(2)
+    await a.stop()
+
+
+class SlowSocket(FakeSocket):
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def send_text(self, text):
+        await self.release.wait()
+        await super().send_text(text)
+
+
+async def test_slow_client_does_not_hold_up_the_others(monkeypatch):
+    monkeypatch.setattr(websocket_manager, "OUTBOUND_QUEUE_SIZE", 5)
+    (manager,) = await workers(1)
+    slow, fast = SlowSocket(), FakeSocket()
+    await manager.connect(slow, 1)
+    await manager.connect(fast, 2)
+    for user_id in (1, 2):
+        await manager.subscribe_to_conversation(user_id, 10)
+
+    # The slow client's writer is stuck on the first message
+    await manager.send_new_message(10, {"id": 0}, sender_id=3)
+    await asyncio.sleep(0.01)
+    # Typing from one user coalesces to its latest state
+    for is_typing in (True, False, True):
+        await manager.set_typing(3, 10, is_typing)
+    for n in range(1, 5):
+        await manager.send_new_message(10, {"id": n}, sender_id=3)
+    [fast_outbox], [slow_outbox] = manager.active_connections[2], manager.active_connections[1]
+    await asyncio.wait_for(fast_outbox.drain(), 1)
+    assert fast.types().count("new_message") == 5 and fast.sent[-1]["message"] == {"id": 4}
+
+    assert len(slow_outbox) == 5
+    slow.release.set()
+    await slow_outbox.drain()
+    assert slow.types() == ["new_message", "typing"] + ["new_message"] * 4
+    assert slow.sent[1]["is_typing"] is True
+
+    # A client too far behind is dropped instead of queueing without bound
+    slow.release.clear()
+    await manager.send_new_message(10, {"id": 5}, sender_id=3)
+    await asyncio.sleep(0.01)
+    for n in range(6, 12):
+        await manager.send_new_message(10, {"id": n}, sender_id=3)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    assert not manager.is_user_online(1) and manager.is_user_online(2)
+    await manager.stop()
+
+
+async def test_presence_is_saved_in_batches_and_expires_with_its_worker():
+    factory = presence_db()
+    a, b = await workers(session_factory=factory)
+    for user_id in range(1, 6):
+        await a.connect(FakeSocket(), user_id)
+    tab = FakeSocket()
+    await b.connect(tab, 6)
+    await b.disconnect(tab, 6)
+    assert a.presence.get_presence([1, 6, 7]) == {
+        1: (1, True, a.presence.last_seen[1]),
+        6: (6, False, a.presence.last_seen[6]),
+        7: (7, False, None),
+    }
+
+    # Nothing is written until a flush, which saves each worker's own users
+    db = factory()
+    assert db.query(UserOnlineStatus).count() == 0
+    assert await a.presence.flush() == 5 and await b.presence.flush() == 1
+    assert await a.presence.flush() == 0
+    assert {(s.user_id, s.is_online) for s in db.query(UserOnlineStatus)} == {(n, n < 6) for n in range(1, 7)}
+
+    # Worker a stops answering: b drops its users once they expire
+    a.presence.remote_users.clear()
+    _, users = b.presence.remote_users[a.worker_id]
+    b.presence.remote_users[a.worker_id] = (time.monotonic() - presence_service.PRESENCE_TTL_SECONDS - 1, users)
+    assert b.is_user_online(1) is False
+    b.presence.expire()
+    assert await b.presence.flush() == 5
+    db.expire_all()
+    assert db.query(UserOnlineStatus).filter(UserOnlineStatus.is_online == True).count() == 0
+    db.close()
+    for manager in (a, b):
+        await manager.stop()
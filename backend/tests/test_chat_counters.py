@@ -0,0 +1,122 @@
+"""Live chat unread counters and last-message pointers kept by the chat endpoints"""
+import pytest
+from sqlalchemy import Update, create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.api.v1 import live_chat
+from app.core.database import Base
+from app.models.live_chat import ConversationType, LiveConversation, conversation_participants
+from app.models.user import User
+from app.schemas.live_chat import ConversationCreate, MessageCreate
+from app.services.chat_counter_service import ChatCounterService
+
+
+def chat_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for user_id in range(1, 5):
+        db.add(User(id=user_id, email=f"u{user_id}@example.com", username=f"u{user_id}",
+                    full_name=f"User {user_id}", hashed_password="x", role_id=1))
+    db.commit()
+    return db
+
+
+def unread(db, conversation_id):
+    return dict(db.execute(
+        select(conversation_participants.c.user_id, conversation_participants.c.unread_count)
+        .where(conversation_participants.c.conversation_id == conversation_id)
+    ).all())
+
+
+async def test_endpoints_keep_counters_in_step_with_messages(tmp_path):
+    db = chat_db(tmp_path)
+    alice, bob, carol, dave = (db.get(User, n) for n in range(1, 5))
+    conversation = await live_chat.create_conversation(
+        ConversationCreate(conversation_type=ConversationType.GROUP, name="Ops", participant_ids=[2, 3]),
+        current_user=alice, db=db
+    )
+    conv_id = conversation["id"]
+    # Nobody else has read the "created the group" message yet
+    assert unread(db, conv_id) == {1: 0, 2: 1, 3: 1}
+
+    await live_chat.mark_conversation_read(conv_id, current_user=alice, db=db)
+    sent = [await live_chat.send_message(conv_id, MessageCreate(content=f"m{n}"), current_user=bob, db=db)
+            for n in range(3)]
+    # Bob has never read the conversation, but his own messages are not unread
+    assert unread(db, conv_id) == {1: 3, 2: 1, 3: 4}
+    assert db.get(LiveConversation, conv_id).last_message_id == sent[-1]["id"]
+
+    await live_chat.mark_message_read(conv_id, sent[0]["id"], current_user=alice, db=db)
+    await live_chat.mark_message_read(conv_id, sent[2]["id"], current_user=bob, db=db)
+    await live_chat.delete_message(sent[1]["id"], current_user=bob, db=db)
+    await live_chat.delete_message(sent[1]["id"], current_user=bob, db=db)
+    assert unread(db, conv_id) == {1: 1, 2: 0, 3: 3}
+
+    # Dave joins with the whole history unread, Carol leaves
+    await live_chat.add_participants(conv_id, [4], current_user=alice, db=db)
+    await live_chat.leave_conversation(conv_id, current_user=carol, db=db)
+    assert unread(db, conv_id) == {1: 2, 2: 2, 4: 5}
+
+    # Deleting the last message points back to the one before it
+    last = await live_chat.send_message(conv_id, MessageCreate(content="oops"), current_user=bob, db=db)
+    assert unread(db, conv_id) == {1: 3, 2: 2, 4: 6}
+    await live_chat.delete_message(last["id"], current_user=bob, db=db)
+    assert unread(db, conv_id) == {1: 2, 2: 2, 4: 5}
+
+    listing = await live_chat.get_conversations(current_user=dave, db=db, page=1, page_size=20, search=None)
+    [listed] = listing["items"]
+    assert listed["unread_count"] == 5 and listed["last_message"]["content"] == "User 3 left the group"
+
+    # The counters agree with a recount from live_messages
+    assert ChatCounterService.reconcile(db) == 0
+    db.close()
+
+
+async def test_message_sent_during_mark_all_read_stays_unread(tmp_path, monkeypatch):
+    db = chat_db(tmp_path)
+    other = sessionmaker(bind=db.get_bind())()
+    alice, bob = db.get(User, 1), other.get(User, 2)
+    conversation = await live_chat.create_conversation(
+        ConversationCreate(conversation_type=ConversationType.DIRECT, participant_ids=[2]),
+        current_user=alice, db=db
+    )
+    conv_id = conversation["id"]
+    await live_chat.send_message(conv_id, MessageCreate(content="first"), current_user=bob, db=other)
+    assert unread(db, conv_id) == {1: 1, 2: 0}
+
+    # Bob's next message commits after Alice's read of last_message_id, before her update
+    execute = db.execute
+
+    async def send():
+        await live_chat.send_message(conv_id, MessageCreate(content="second"), current_user=bob, db=other)
+
+    def interleaved(statement, *args, **kwargs):
+        if isinstance(statement, Update):
+            monkeypatch.setattr(db, "execute", execute)
+            with pytest.raises(StopIteration):
+                send().send(None)
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", interleaved)
+    await live_chat.mark_conversation_read(conv_id, current_user=alice, db=db)
+    assert unread(db, conv_id) == {1: 1, 2: 0}
+    assert ChatCounterService.reconcile(db) == 0
+    other.close()
+    db.close()
+
+
+def test_reconcile_repairs_drift(tmp_path):
+    db = chat_db(tmp_path)
+    conversation = LiveConversation(conversation_type=ConversationType.DIRECT, created_by_id=1)
+    db.add(conversation)
+    db.flush()
+    db.execute(conversation_participants.insert(), [
+        {"conversation_id": conversation.id, "user_id": 1, "unread_count": 7},
+        {"conversation_id": conversation.id, "user_id": 2, "unread_count": 0},
+    ])
+    db.commit()
+    assert ChatCounterService.reconcile(db) == 1
+    assert unread(db, conversation.id) == {1: 0, 2: 0}
+    db.close()
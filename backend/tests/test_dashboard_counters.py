@@ -0,0 +1,130 @@
+"""Dashboard counters from the ticket_counters rollup vs the per-counter ticket queries they replaced"""
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import and_, create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+import app.services.ticket_counter_service  # noqa: F401  (registers the ticket_counters flush hook)
+from app.core.database import Base
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.services.dashboard_service import DashboardService
+from app.services.ticket_service import TicketService
+
+AGENT, END_USER = 3, 7
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dashboard.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    rng = random.Random(4)
+    now = datetime.now()
+    for n in range(300):
+        status = rng.choice(list(TicketStatus))
+        resolved = status in (TicketStatus.RESOLVED, TicketStatus.CLOSED)
+        # Added through the ORM, so the flush hook fills ticket_counters
+        session.add(Ticket(
+            ticket_number=f"INC-{n:06d}", title="t", description="d",
+            requester_id=rng.choice([END_USER, 8, 9]),
+            assignee_id=rng.choice([None, AGENT, 4, 5]),
+            status=status, priority=rng.choice(list(TicketPriority)),
+            resolution_breached=rng.random() < 0.3,
+            resolved_at=now - timedelta(hours=rng.choice([0, 30])) if resolved else None,
+        ))
+    session.commit()
+    DashboardService.invalidate()
+    yield session
+    DashboardService.invalidate()
+    session.close()
+
+
+def legacy_stats(db, user_id, end_user):
+    """The per-counter queries /dashboard/stats used to run"""
+    def base_query():
+        q = db.query(Ticket)
+        if end_user:
+            q = q.filter(Ticket.requester_id == user_id)
+        return q
+
+    not_closed = Ticket.status != TicketStatus.CLOSED.value
+    return {
+        "total_tickets": base_query().count(),
+        "open_tickets": base_query().filter(Ticket.status.in_([
+            TicketStatus.NEW.value, TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value
+        ])).count(),
+        "my_tickets": base_query().filter(not_closed).count() if end_user else
+        db.query(Ticket).filter(Ticket.assignee_id == user_id, not_closed).count(),
+        "unassigned": 0 if end_user else db.query(Ticket).filter(Ticket.assignee_id == None, not_closed).count(),
+        "sla_breached": base_query().filter(and_(Ticket.resolution_breached == True, not_closed)).count(),
+        "critical_tickets": base_query().filter(
+            Ticket.priority == TicketPriority.CRITICAL.value, not_closed
+        ).count(),
+        "resolved_today": base_query().filter(func.date(Ticket.resolved_at) == datetime.now().date()).count(),
+        "pending_tickets": base_query().filter(Ticket.status == TicketStatus.PENDING.value).count(),
+        "closed_tickets": base_query().filter(
+            Ticket.status.in_([TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value])
+        ).count(),
+        "is_end_user": end_user,
+    }
+
+
+@pytest.mark.parametrize("user_id, end_user", [(AGENT, False), (END_USER, True)])
+def test_stats_match_the_per_counter_queries(db, user_id, end_user):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        stats = DashboardService.get_stats(db, user_id, end_user)
+        # Cached: a second refresh runs nothing
+        assert DashboardService.get_stats(db, user_id, end_user) == stats
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    # One rollup aggregate plus resolved_today, per scope (agents: global and their own)
+    assert len(statements) == (2 if end_user else 4)
+    expected = legacy_stats(db, user_id, end_user)
+    assert expected["total_tickets"] and expected["resolved_today"] and expected["sla_breached"]
+    assert stats == expected
+
+
+def test_ticket_stats_share_the_per_scope_aggregate(db):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        stats = [TicketService.get_ticket_stats(db, SimpleNamespace(id=agent)) for agent in (AGENT, 4, 5)]
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    # The global scope is computed once for all agents, then one aggregate per agent
+    assert len(statements) == 2 + 2 * 3
+    for agent, agent_stats in zip((AGENT, 4, 5), stats):
+        # The five COUNT queries get_ticket_stats used to run
+        assert agent_stats == {
+            "total": db.query(Ticket).count(),
+            "open": db.query(Ticket).filter(Ticket.status.in_([
+                TicketStatus.NEW.value, TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value
+            ])).count(),
+            "my_tickets": db.query(Ticket).filter(Ticket.assignee_id == agent).count(),
+            "unassigned": db.query(Ticket).filter(Ticket.assignee_id == None).count(),
+            "critical": db.query(Ticket).filter(Ticket.priority == TicketPriority.CRITICAL.value).count(),
+        }
+
+
+def test_chart_counts_match_grouped_ticket_queries(db):
+    by_status = db.query(Ticket.status, func.count(Ticket.id)).group_by(Ticket.status).all()
+    assert sorted(DashboardService.count_by_status(db)) == sorted(
+        (status.value, count) for status, count in by_status
+    )
+
+    open_by_priority = db.query(Ticket.priority, func.count(Ticket.id)).filter(
+        Ticket.status != TicketStatus.CLOSED.value
+    ).group_by(Ticket.priority).all()
+    assert sorted(DashboardService.count_open_by_priority(db)) == sorted(
+        (priority.value, count) for priority, count in open_by_priority
+    )
@@ -0,0 +1,139 @@
+"""Background export jobs: dedupe of identical requests, claiming and status"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.api.v1.reports import get_export_job, list_export_jobs
+from app.core.database import Base
+from app.models.export_job import ExportJob, ExportJobStatus
+from app.models.role import Role
+from app.models.user import User
+from app.services import export_job_service
+from app.services.export_job_service import EXPORT_JOB_TIMEOUT_MINUTES, ExportJobService, run_export_job
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    # ExportService writes to exports/reports under the working directory
+    monkeypatch.chdir(tmp_path)
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def enqueue(db, export_format="csv", requested_by_id=None, **filters):
+    return ExportJobService.enqueue(
+        db, "category_breakdown", export_format, "2026-05-01", "2026-05-31", filters or None,
+        requested_by_id, submit=False
+    )
+
+
+def test_identical_requests_share_one_job(session_factory):
+    db = session_factory()
+    job, created = enqueue(db)
+    same, joined = enqueue(db)
+    assert created and not joined and same.id == job.id
+    assert enqueue(db, "pdf")[0].id != job.id
+    assert enqueue(db, priority="HIGH")[0].id != job.id
+
+    # The partial unique index stops a concurrent duplicate of an active job
+    db.add(ExportJob(dedupe_key=job.dedupe_key, status=ExportJobStatus.PENDING,
+                     report_type="category_breakdown", export_format="csv", progress=0))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+    run_export_job(job.id, session_factory)
+    db.expire_all()
+    assert job.status == ExportJobStatus.COMPLETED and job.progress == 100
+    assert os.path.exists(job.file_path) and job.file_name.endswith(".csv")
+
+    # Finished jobs are not joined: the same request now starts a fresh export
+    again, created = enqueue(db)
+    assert created and again.id != job.id
+    db.close()
+
+
+def test_job_runs_once_and_records_failures(session_factory):
+    db = session_factory()
+    job, _ = enqueue(db)
+    run_export_job(job.id, session_factory)
+    db.expire_all()
+    completed_at = job.completed_at
+    assert completed_at is not None
+    # A second submission of the same job finds it already claimed
+    run_export_job(job.id, session_factory)
+    db.expire_all()
+    assert db.get(ExportJob, job.id).completed_at == completed_at
+
+    bad, _ = ExportJobService.enqueue(db, "custom", "csv", submit=False)
+    run_export_job(bad.id, session_factory)
+    db.expire_all()
+    assert bad.status == ExportJobStatus.FAILED
+    assert bad.error_message == "Unsupported report type: custom"
+    db.close()
+
+
+def test_stale_jobs_are_failed_and_stay_failed(session_factory, monkeypatch):
+    db = session_factory()
+    long_ago = datetime.now(timezone.utc) - timedelta(minutes=EXPORT_JOB_TIMEOUT_MINUTES + 1)
+    lost, _ = enqueue(db)
+    lost.created_at = long_ago
+    fresh, _ = enqueue(db, "pdf")
+    db.commit()
+    assert ExportJobService.fail_stale_jobs(db) == 1
+    db.expire_all()
+    assert lost.status == ExportJobStatus.FAILED and fresh.status == ExportJobStatus.PENDING
+
+    # The job is failed as stale while it renders; finishing does not revive it
+    render = export_job_service.ReportCache.render
+
+    def slow_render(*args, **kwargs):
+        other = session_factory()
+        other.query(ExportJob).filter(ExportJob.id == fresh.id).update({ExportJob.started_at: long_ago})
+        other.commit()
+        assert ExportJobService.fail_stale_jobs(other) == 1
+        other.close()
+        return render(*args, **kwargs)
+
+    monkeypatch.setattr(export_job_service.ReportCache, "render", slow_render)
+    run_export_job(fresh.id, session_factory)
+    db.expire_all()
+    assert fresh.status == ExportJobStatus.FAILED and fresh.error_message == "Export timed out"
+    db.close()
+
+
+async def test_jobs_are_visible_to_their_requesters_and_managers(session_factory):
+    db = session_factory()
+    db.add_all([
+        Role(id=1, name="agent", display_name="Agent", role_type="system", level=40),
+        Role(id=2, name="manager", display_name="Manager", role_type="system", level=80),
+    ])
+    for user_id, role_id in ((1, 1), (2, 1), (3, 1), (4, 2)):
+        db.add(User(id=user_id, email=f"u{user_id}@example.com", username=f"u{user_id}",
+                    full_name=f"User {user_id}", hashed_password="x", role_id=role_id))
+    db.commit()
+    owner, joiner, other, manager = (db.get(User, n) for n in range(1, 5))
+
+    job, _ = enqueue(db, requested_by_id=owner.id)
+    assert not enqueue(db, requested_by_id=joiner.id)[1]
+    # Joining twice records the joiner once
+    enqueue(db, requested_by_id=joiner.id)
+
+    for user in (owner, joiner, manager):
+        response = await get_export_job(job.id, current_user=user, db=db)
+        assert response.job_id == job.id
+    with pytest.raises(HTTPException) as error:
+        await get_export_job(job.id, current_user=other, db=db)
+    assert error.value.status_code == 404
+
+    listed = await list_export_jobs(limit=20, current_user=joiner, db=db)
+    assert [response.job_id for response in listed] == [job.id]
+    assert await list_export_jobs(limit=20, current_user=other, db=db) == []
+    db.close()
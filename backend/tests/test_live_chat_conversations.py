@@ -0,0 +1,125 @@
+"""Conversation list responses: built for a whole page in a fixed number of queries"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.api.v1.live_chat import get_conversation_response, get_conversation_responses
+from app.core.database import Base
+from app.models.live_chat import (
+    ConversationType, LiveConversation, LiveMessage, MessageReaction, conversation_participants
+)
+from app.models.user import User
+from app.services.chat_counter_service import ChatCounterService
+from app.services.websocket_manager import manager
+
+ME = 1
+
+
+def chat_db(tmp_path, conversation_count):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for user_id in range(1, 5):
+        db.add(User(id=user_id, email=f"u{user_id}@example.com", username=f"u{user_id}",
+                    full_name=f"User {user_id}", hashed_password="x", role_id=1))
+    db.flush()
+
+    start = datetime(2026, 10, 16, 9, tzinfo=timezone.utc)
+    for n in range(conversation_count):
+        group = n % 2 == 1
+        conversation = LiveConversation(
+            name=f"Group {n}" if group else None, created_by_id=ME,
+            conversation_type=ConversationType.GROUP if group else ConversationType.DIRECT
+        )
+        db.add(conversation)
+        db.flush()
+        others = [2, 3, 4] if group else [2 + n % 3]
+        db.execute(conversation_participants.insert(), [
+            {"conversation_id": conversation.id, "user_id": user_id, "is_admin": user_id == ME}
+            for user_id in [ME] + others
+        ])
+        messages = []
+        for m in range(3):
+            message = LiveMessage(conversation_id=conversation.id, sender_id=others[m % len(others)],
+                                  content=f"{n}.{m}", created_at=start + timedelta(minutes=n * 10 + m),
+                                  reply_to=messages[-1] if messages else None)
+            db.add(message)
+            messages.append(message)
+        db.flush()
+        db.add(MessageReaction(message_id=messages[-1].id, user_id=ME, emoji="👍"))
+        # Read up to the first message
+        db.execute(conversation_participants.update().where(
+            conversation_participants.c.conversation_id == conversation.id,
+            conversation_participants.c.user_id == ME
+        ).values(last_read_message_id=messages[0].id))
+    db.commit()
+    # Messages were inserted directly; let the repair job fill in the counters
+    ChatCounterService.reconcile(db)
+    db.close()
+    return engine
+
+
+def list_conversations(engine, limit):
+    """Load a page of conversations as the endpoint does, then count the queries building it"""
+    db = sessionmaker(bind=engine)()
+    conversations = db.query(LiveConversation).order_by(LiveConversation.id).limit(limit).all()
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        return get_conversation_responses(conversations, ME, db), len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+        db.close()
+
+
+def test_query_count_does_not_grow_with_the_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(manager.presence, "local", {2})
+    engine = chat_db(tmp_path, 12)
+    _, few = list_conversations(engine, 2)
+    responses, many = list_conversations(engine, 12)
+    assert len(responses) == 12 and few == many
+
+    direct, group = responses[0], responses[1]
+    assert direct["name"] == "User 2" and [p.id for p in direct["participants"]] == [1, 2]
+    assert direct["participants"][1].is_online is True and direct["participants"][0].is_admin is True
+    assert group["name"] == "Group 1"
+    assert [(p.id, p.is_online, p.is_admin) for p in group["participants"]] == [
+        (1, False, True), (2, True, False), (3, False, False), (4, False, False)
+    ]
+    for response in responses:
+        assert response["unread_count"] == 2
+        last = response["last_message"]
+        assert last["content"].endswith(".2") and last["reactions"][0].reacted_by_me
+        assert last["reply_to"]["content"].endswith(".1")
+
+
+def test_single_conversation_matches_the_list(tmp_path):
+    db = sessionmaker(bind=chat_db(tmp_path, 3))()
+    conversations = db.query(LiveConversation).order_by(LiveConversation.id).all()
+    listed = get_conversation_responses(conversations, ME, db)
+    assert [get_conversation_response(c, ME, db) for c in conversations] == listed
+    assert get_conversation_responses([], ME, db) == []
+    db.close()
+
+
+def test_deleted_last_message_and_own_messages(tmp_path):
+    engine = chat_db(tmp_path, 1)
+    db = sessionmaker(bind=engine)()
+    conversation = db.query(LiveConversation).one()
+    # I have never read it, and sent two messages after the others; the last is deleted
+    db.execute(conversation_participants.update().where(
+        conversation_participants.c.user_id == ME
+    ).values(last_read_message_id=None))
+    for content, deleted in (("mine", False), ("secret", True)):
+        db.add(LiveMessage(conversation_id=conversation.id, sender_id=ME, content=content,
+                           created_at=datetime(2026, 10, 17, tzinfo=timezone.utc), is_deleted=deleted))
+    db.commit()
+    ChatCounterService.reconcile(db)
+
+    [response] = get_conversation_responses([conversation], ME, db)
+    assert response["unread_count"] == 3
+    assert response["last_message"]["content"] == "mine"
+    db.close()
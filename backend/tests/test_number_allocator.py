@@ -0,0 +1,105 @@
+"""Record numbers from number_sequences: seeding, blocks and the two reservation paths"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.config import settings
+from app.core.database import Base
+from app.models.number_sequence import NumberSequence
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.services import number_allocator
+from app.services.number_allocator import NumberAllocator
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # A short lock timeout, so waiting on a lock fails the test quickly
+    engine = create_engine(f"sqlite:///{tmp_path / 'numbers.db'}", connect_args={"timeout": 0.2})
+    Base.metadata.create_all(engine)
+    NumberAllocator.reset()
+    yield sessionmaker(bind=engine)
+    NumberAllocator.reset()
+
+
+@pytest.fixture
+def own_transaction(monkeypatch):
+    """Reserve in a separate transaction, as on PostgreSQL"""
+    monkeypatch.setattr(number_allocator, "CALLER_TRANSACTION_DIALECTS", set())
+
+
+def ticket(number):
+    return Ticket(ticket_number=number, title="t", description="d", requester_id=1,
+                  status=TicketStatus.NEW, priority=TicketPriority.MEDIUM)
+
+
+def counter(db, prefix):
+    db.expire_all()
+    return db.get(NumberSequence, prefix).last_value
+
+
+@pytest.mark.parametrize("separate", [False, True])
+def test_counter_is_seeded_after_the_highest_existing_number(session_factory, monkeypatch, separate):
+    if separate:
+        monkeypatch.setattr(number_allocator, "CALLER_TRANSACTION_DIALECTS", set())
+    db = session_factory()
+    db.add_all([ticket(n) for n in ("INC-000041", "INC-000120", "INC-000099", "INC-1000000", "REQ-000007")])
+    db.commit()
+    assert NumberAllocator.next_number(db, "INC") == "INC-1000001"
+    assert NumberAllocator.next_number(db, "REQ") == "REQ-000008"
+    assert NumberAllocator.next_number(db, "CHG") == "CHG-000001"
+    assert NumberAllocator.next_number(db, "INC") == "INC-1000002"
+    db.commit()
+
+    # Resetting a prefix (dropping its counter) seeds it again from the table
+    db.add(ticket("INC-1000002"))
+    db.query(NumberSequence).filter(NumberSequence.prefix == "INC").delete()
+    db.commit()
+    NumberAllocator.reset()
+    assert NumberAllocator.next_number(db, "INC") == "INC-1000003"
+    assert NumberAllocator.next_number(db, "REQ") == "REQ-000009"
+    db.close()
+
+
+def test_workers_reserve_disjoint_blocks(session_factory, own_transaction, monkeypatch):
+    monkeypatch.setattr(settings, "NUMBER_BLOCK_SIZE", 10)
+    db = session_factory()
+    worker_blocks = [{}, {}]
+
+    def next_value(worker):
+        # Each worker process has its own blocks in memory
+        monkeypatch.setattr(number_allocator, "_blocks", worker_blocks[worker])
+        return NumberAllocator.next_value(db, "CHG")
+
+    assert [next_value(0), next_value(1), next_value(0), next_value(1)] == [1, 11, 2, 12]
+    assert counter(db, "CHG") == 20
+    values = [next_value(n % 2) for n in range(16)]
+    assert len(set(values)) == 16 and counter(db, "CHG") == 20
+    # Both blocks are used up: the next value starts a third block
+    assert next_value(0) == 21 and counter(db, "CHG") == 30
+    db.close()
+
+
+def test_separate_transaction_survives_the_callers_rollback(session_factory, own_transaction):
+    db = session_factory()
+    assert NumberAllocator.next_number(db, "PRB") == "PRB-000001"
+    db.rollback()
+    # The number is spent, as with a database sequence
+    assert NumberAllocator.next_number(db, "PRB") == "PRB-000002"
+    assert counter(db, "PRB") == 2
+    db.close()
+
+
+def test_caller_transaction_does_not_wait_on_its_own_write_lock(session_factory):
+    db = session_factory()
+    db.add(ticket("INC-000005"))
+    # The caller now holds SQLite's write lock
+    db.flush()
+    assert NumberAllocator.next_number(db, "INC") == "INC-000006"
+    assert NumberAllocator.next_number(db, "INC") == "INC-000007"
+    db.rollback()
+    # Reserved in the rolled-back transaction, so nothing is spent
+    assert db.query(NumberSequence).count() == 0
+    assert NumberAllocator.next_number(db, "INC") == "INC-000001"
+    db.commit()
+    db.close()
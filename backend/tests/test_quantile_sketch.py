@@ -0,0 +1,86 @@
+"""
+Accuracy bounds of the DDSketch behind the percentile reports.
+
+Guarantee: for any data and any q, quantile(q) is within a relative error
+of SKETCH_RELATIVE_ACCURACY (1%) of the exact value at rank floor(q * n)
+of the sorted data. Merging sketches, or adding and then removing values,
+gives exactly the sketch of the resulting data, so the bound holds for
+percentiles over any combination of fact rows.
+"""
+import random
+
+import pytest
+
+from app.services.quantile_sketch import QuantileSketch, SKETCH_RELATIVE_ACCURACY
+
+QUANTILES = (0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 0.999, 1.0)
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def sketch_of(values):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def assert_within_bound(sketch, values):
+    for q in QUANTILES:
+        expected = exact(values, q)
+        estimate = sketch.quantile(q)
+        if expected <= 0:
+            assert estimate == 0
+        else:
+            assert abs(estimate - expected) <= SKETCH_RELATIVE_ACCURACY * expected, (q, estimate, expected)
+
+
+@pytest.mark.parametrize("distribution", ["lognormal", "uniform", "pareto", "constant"])
+def test_relative_error_bound(distribution):
+    rng = random.Random(13)
+    generate = {
+        # Minutes: a few seconds to months, the range tickets actually span
+        "lognormal": lambda: rng.lognormvariate(5, 2),
+        "uniform": lambda: rng.uniform(0.5, 10000),
+        "pareto": lambda: rng.paretovariate(1.2),
+        "constant": lambda: 480.0,
+    }[distribution]
+    values = [generate() for _ in range(20000)]
+    assert_within_bound(sketch_of(values), values)
+
+
+def test_merged_sketches_keep_the_bound():
+    rng = random.Random(5)
+    parts = [[rng.lognormvariate(4 + i % 3, 1.5) for _ in range(rng.randint(1, 500))] for i in range(60)]
+    merged = QuantileSketch()
+    for part in parts:
+        merged.merge(sketch_of(part))
+    values = [v for part in parts for v in part]
+    assert merged.count == len(values)
+    assert merged.bins == sketch_of(values).bins
+    assert_within_bound(merged, values)
+
+
+def test_removal_and_serialization():
+    rng = random.Random(3)
+    values = [rng.expovariate(1 / 300) for _ in range(2000)] + [0.0, -2.0]
+    sketch = sketch_of(values)
+    removed = values[:700]
+    for value in removed:
+        sketch.add(value, -1)
+    kept = values[700:]
+    assert sketch.count == len(kept)
+    assert_within_bound(sketch, kept)
+
+    restored = QuantileSketch.from_json(sketch.to_json())
+    assert restored.bins == sketch.bins and restored.zero_count == sketch.zero_count == 2
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.to_json() is None
+    assert QuantileSketch.from_json(None).count == 0
@@ -0,0 +1,51 @@
+"""Content-addressed report cache: hits, ETags and LRU eviction"""
+import os
+import time
+
+import pytest
+
+from app.services.report_cache import ReportCache
+
+SLA_DATA = {"overall_compliance": 91.5, "by_priority": [{"priority": "HIGH", "compliance": 88.0}]}
+
+
+@pytest.fixture(autouse=True)
+def in_tmp(tmp_path, monkeypatch):
+    # ExportService writes to exports/reports under the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def test_identical_reports_render_once():
+    path, hit = ReportCache.render(SLA_DATA, "custom", "csv", filters={"priority": None})
+    assert not hit
+    again, hit = ReportCache.render(dict(SLA_DATA), "custom", "csv", filters={})
+    assert hit and again == path
+    assert os.listdir("exports/reports") == [os.path.basename(path)]
+
+    changed, hit = ReportCache.render({**SLA_DATA, "overall_compliance": 92.0}, "custom", "csv")
+    assert not hit and changed != path
+    assert ReportCache.render(SLA_DATA, "custom", "excel")[0].endswith(".xlsx")
+
+    # The cache key is the ETag, so it survives a re-render of the same data
+    etag = ReportCache.etag(path)
+    os.remove(path)
+    assert ReportCache.etag(ReportCache.render(SLA_DATA, "custom", "csv")[0]) == etag
+    assert ReportCache.etag_matches(f'"abc", W/{etag}', etag)
+    assert ReportCache.etag_matches("*", etag)
+    assert not ReportCache.etag_matches('"abc"', etag)
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    now = time.time()
+    for age, name in ((300, "old.csv"), (200, "used.csv"), (100, "new.csv")):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - age, now - age))
+    ReportCache.touch(str(tmp_path / "old.csv"))
+    mtime = os.stat(tmp_path / "old.csv").st_mtime
+
+    assert ReportCache.evict(str(tmp_path), max_bytes=250) == 1
+    assert sorted(os.listdir(tmp_path)) == ["new.csv", "old.csv"]
+    # Touching leaves mtime, and so the ETag of ad-hoc files, unchanged
+    assert os.stat(tmp_path / "old.csv").st_mtime == mtime
+    assert ReportCache.evict(str(tmp_path), max_bytes=250) == 0
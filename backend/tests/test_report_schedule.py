@@ -0,0 +1,96 @@
+"""Scheduled report recurrence and the ReportTimer heap"""
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from pydantic import ValidationError
+
+from app.schemas.scheduled_report import ScheduledReportCreate
+from app.services.report_schedule import ReportTimer, next_run_time, validate_cron_expression
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_monthly_runs_on_the_last_day_of_short_months():
+    assert next_run_time("monthly", "08:00", 31, after=utc(2026, 1, 31, 9)) == utc(2026, 2, 28, 8)
+    assert next_run_time("monthly", "08:00", 31, after=utc(2026, 2, 28, 9)) == utc(2026, 3, 31, 8)
+    assert next_run_time("monthly", "08:00", 30, after=utc(2028, 1, 31)) == utc(2028, 2, 29, 8)
+    assert next_run_time("quarterly", "06:30", after=utc(2026, 4, 1, 7)) == utc(2026, 7, 1, 6, 30)
+
+
+def test_schedule_follows_local_time_across_dst():
+    # 08:00 in Berlin is 07:00 UTC in winter and 06:00 UTC in summer
+    assert next_run_time("daily", "08:00", timezone_name="Europe/Berlin",
+                         after=utc(2026, 3, 28, 12)) == utc(2026, 3, 29, 6)
+    # Weekly: schedule_day 1 is Monday; a run time equal to `after` is not repeated
+    assert next_run_time("weekly", "08:00", 1, timezone_name="Europe/Berlin",
+                         after=utc(2026, 10, 26, 7)) == utc(2026, 11, 2, 7)
+
+
+def test_weekly_schedule_day_must_be_a_weekday():
+    with pytest.raises(ValueError):
+        next_run_time("weekly", "08:00", 15, after=utc(2026, 10, 16))
+    fields = dict(name="Weekly", report_type="sla_compliance", frequency="weekly",
+                  schedule_time="08:00", recipients=["ops@example.com"])
+    assert ScheduledReportCreate(**fields, schedule_day=7).schedule_day == 7
+    with pytest.raises(ValidationError):
+        ScheduledReportCreate(**fields, schedule_day=8)
+
+
+def test_cron_expression_uses_crontab_weekday_numbers():
+    # 1-5 is Monday-Friday in crontab; 2026-10-16 is a Friday
+    assert next_run_time("daily", "08:00", cron_expression="30 9 * * 1-5",
+                         after=utc(2026, 10, 16, 10)) == utc(2026, 10, 19, 9, 30)
+    assert next_run_time("daily", "08:00", cron_expression="0 7 * * 0",
+                         after=utc(2026, 10, 16)) == utc(2026, 10, 18, 7)
+    for bad in ("* * *", "61 * * * *", "0 9 * * 8", "0 9 * * */0", "0 9 * * 5-2", "0 9 * * last"):
+        with pytest.raises(ValueError):
+            validate_cron_expression(bad)
+
+
+def test_cron_day_of_week_steps_count_from_sunday():
+    runs, after = [], utc(2026, 10, 16, 10)
+    for _ in range(5):
+        after = next_run_time("daily", "08:00", cron_expression="0 9 * * */2", after=after)
+        runs.append(after)
+    assert runs == [utc(2026, 10, d, 9) for d in (17, 18, 20, 22, 24)]
+    assert next_run_time("daily", "08:00", cron_expression="0 9 * * mon-fri",
+                         after=utc(2026, 10, 16, 10)) == utc(2026, 10, 19, 9)
+
+
+def test_cron_day_of_month_or_day_of_week():
+    # Both fields restricted: the 20th (a Tuesday) or any Monday
+    runs, after = [], utc(2026, 10, 16)
+    for _ in range(3):
+        after = next_run_time("daily", "08:00", cron_expression="0 9 20 * 1", after=after)
+        runs.append(after)
+    assert runs == [utc(2026, 10, 19, 9), utc(2026, 10, 20, 9), utc(2026, 10, 26, 9)]
+
+
+def test_timer_fires_due_reports_together_at_the_earliest_deadline():
+    fired = []
+    done = threading.Event()
+
+    def fire(report_ids):
+        fired.append((sorted(report_ids), time.time()))
+        done.set()
+
+    timer = ReportTimer(fire)
+    timer.schedule(1, time.time() + 60)
+    timer.schedule(2, time.time() + 60)
+    timer.cancel(2)
+    assert len(timer) == 1
+    timer.start()
+    try:
+        deadline = time.time() + 0.2
+        timer.schedule(3, deadline)
+        timer.schedule(4, deadline)
+        assert done.wait(2)
+        assert fired[0][0] == [3, 4] and fired[0][1] >= deadline
+        assert timer.pop_due(time.time() + 120) == [1]
+    finally:
+        timer.stop()
@@ -0,0 +1,160 @@
+"""
+Regression test: grouped technician performance query vs the original per-technician loop.
+
+LegacyTechnicianReporting is a verbatim copy of the Python implementation that
+ReportingService.iter_technician_performance replaced.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pytest
+from sqlalchemy import and_, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.api.v1 import reports
+from app.core.database import Base
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.user import User
+from app.schemas.reporting import TechnicianPerformanceRequest
+from app.services.reporting_service import ReportingService
+
+START = datetime(2026, 9, 1)
+
+
+class LegacyTechnicianReporting(ReportingService):
+    def get_technician_performance(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        query = self.db.query(User).filter(User.is_active == True)
+
+        if user_id:
+            query = query.filter(User.id == user_id)
+
+        users = query.all()
+        performance_data = []
+
+        for user in users:
+            # Get tickets assigned to this user
+            tickets = self.db.query(Ticket).filter(
+                and_(
+                    Ticket.assignee_id == user.id,
+                    Ticket.created_at >= start_date,
+                    Ticket.created_at <= end_date
+                )
+            ).all()
+
+            if not tickets:
+                continue
+
+            total_tickets = len(tickets)
+            resolved_tickets = [t for t in tickets if t.status in [TicketStatus.RESOLVED, TicketStatus.CLOSED]]
+
+            # Calculate average resolution time
+            resolution_times = [
+                (t.resolved_at - t.created_at).total_seconds() / 3600
+                for t in resolved_tickets if t.resolved_at
+            ]
+            avg_resolution_time = sum(resolution_times) / len(resolution_times) if resolution_times else 0
+
+            # Calculate average first response time using first_response_at
+            response_times = [
+                (t.first_response_at - t.created_at).total_seconds() / 3600
+                for t in tickets if t.first_response_at
+            ]
+            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+
+            # Calculate SLA compliance
+            sla_met = sum(
+                1 for t in resolved_tickets
+                if t.resolved_at and t.resolution_due and t.resolved_at <= t.resolution_due
+            )
+            sla_compliance = (sla_met / len(resolved_tickets) * 100) if resolved_tickets else 0
+
+            performance_data.append({
+                "user_id": user.id,
+                "user_name": user.full_name,
+                "email": user.email,
+                "total_tickets": total_tickets,
+                "resolved_tickets": len(resolved_tickets),
+                "resolution_rate": round((len(resolved_tickets) / total_tickets * 100), 2) if total_tickets > 0 else 0,
+                "avg_resolution_time_hours": round(avg_resolution_time, 2),
+                "avg_response_time_hours": round(avg_response_time, 2),
+                "sla_compliance": round(sla_compliance, 2),
+                "open_tickets": total_tickets - len(resolved_tickets)
+            })
+
+        return sorted(performance_data, key=lambda x: x["total_tickets"], reverse=True)
+
+
+@pytest.fixture(scope="module")
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    rng = random.Random(11)
+
+    # Every fifth technician is inactive; some have no tickets in range
+    for user_id in range(1, 41):
+        session.add(User(id=user_id, email=f"tech{user_id}@example.com", username=f"tech{user_id}",
+                         full_name=f"Tech {user_id}", hashed_password="x", role_id=1,
+                         is_active=user_id % 5 != 0))
+
+    def maybe(value, chance=0.8):
+        return value if rng.random() < chance else None
+
+    for n in range(1500):
+        created = START + timedelta(seconds=rng.uniform(0, 30 * 86400))
+        status = rng.choice(list(TicketStatus))
+        done = status in (TicketStatus.RESOLVED, TicketStatus.CLOSED)
+        session.add(Ticket(
+            ticket_number=f"INC-{n:06d}",
+            title="Generated ticket",
+            description="Generated for the technician performance regression test",
+            requester_id=1,
+            assignee_id=maybe(rng.randint(1, 35), 0.9),
+            priority=rng.choice(list(TicketPriority)),
+            status=status,
+            created_at=created,
+            resolution_due=maybe(created + timedelta(seconds=rng.uniform(3600, 5 * 86400))),
+            first_response_at=maybe(created + timedelta(seconds=rng.uniform(60, 3 * 86400)), 0.6),
+            resolved_at=maybe(created + timedelta(seconds=rng.uniform(600, 6 * 86400)), 0.9 if done else 0.1),
+        ))
+    session.commit()
+    session.close()
+    return factory
+
+
+@pytest.mark.parametrize("days, user_id", [(30, None), (10, None), (30, 7), (30, 5), (30, 38)])
+def test_technician_performance_matches_legacy(session_factory, days, user_id):
+    db = session_factory()
+    end = START + timedelta(days=days)
+    expected = LegacyTechnicianReporting(db).get_technician_performance(START, end, user_id)
+    actual = ReportingService(db).get_technician_performance(START, end, user_id)
+    db.close()
+
+    # Inactive (5) and ticketless (38) technicians are left out
+    assert len(expected) == (0 if user_id in (5, 38) else 1 if user_id else 28)
+    assert actual == expected
+
+
+async def test_stream_sends_the_same_rows_as_ndjson(session_factory, monkeypatch):
+    monkeypatch.setattr(reports, "SessionLocal", session_factory)
+    db = session_factory()
+    request = TechnicianPerformanceRequest(start_date="2026-09-01", end_date="2026-09-20")
+    expected = await reports.get_technician_performance(request, stream=False, current_user=None, db=db)
+
+    response = await reports.get_technician_performance(request, stream=True, current_user=None, db=db)
+    assert response.media_type == "application/x-ndjson"
+    body = "".join([chunk async for chunk in response.body_iterator])
+    assert body.endswith("\n")
+    assert [json.loads(line) for line in body.splitlines()] == expected
+    assert len(expected) == 28
+    db.close()
@@ -0,0 +1,141 @@
+"""Scheduled report executor: each due report claimed once, run on a bounded pool, rendered once per group"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.scheduled_report import ScheduledReport, ReportExecution, ReportType, ReportFrequency, ExportFormat
+from app.services import scheduled_report_executor
+from app.services.email_service import SMTPConnection
+from app.services.scheduled_report_executor import ScheduledReportExecutor, claim_due_reports
+from app.services.scheduled_report_service import ScheduledReportService
+
+
+def report_db(tmp_path, due_count, recipients=()):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    now = datetime.now(timezone.utc)
+    for n in range(due_count):
+        db.add(ScheduledReport(
+            name=f"Report {n}", report_type=ReportType.SLA_COMPLIANCE, frequency=ReportFrequency.DAILY,
+            export_format=ExportFormat.CSV, schedule_time="08:00", recipients=list(recipients),
+            filters={"priority": "HIGH" if n % 2 else None},
+            next_run_at=now - timedelta(minutes=n + 1), is_active=True,
+        ))
+    # Not due, and inactive
+    db.add(ScheduledReport(name="Later", report_type=ReportType.SLA_COMPLIANCE, frequency=ReportFrequency.DAILY,
+                           schedule_time="08:00", next_run_at=now + timedelta(hours=1), is_active=True))
+    db.add(ScheduledReport(name="Off", report_type=ReportType.SLA_COMPLIANCE, frequency=ReportFrequency.DAILY,
+                           schedule_time="08:00", next_run_at=now - timedelta(hours=1), is_active=False))
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_claim_advances_next_run(tmp_path):
+    factory = report_db(tmp_path, 3)
+    db = factory()
+    claimed = claim_due_reports(db, limit=2)
+    # Most overdue first
+    assert [claim.report_id for claim in claimed] == [3, 2]
+    assert claimed[0].delivery_key == ("sla_compliance", "csv", "{}")
+    [last] = claim_due_reports(db, limit=10)
+    assert (last.report_id, last.due_at) == (1, claimed[0].due_at + timedelta(minutes=2))
+    assert claim_due_reports(db, limit=10) == []
+    db.expire_all()
+    assert all(r.next_run_at > datetime.now() for r in db.query(ScheduledReport).filter(ScheduledReport.is_active))
+    db.close()
+
+
+def test_unschedulable_report_is_disabled_without_failing_the_claim(tmp_path):
+    factory = report_db(tmp_path, 2)
+    db = factory()
+    db.add(ScheduledReport(name="Bad weekly", report_type=ReportType.SLA_COMPLIANCE, frequency=ReportFrequency.WEEKLY,
+                           schedule_time="08:00", schedule_day=15, is_active=True,
+                           next_run_at=datetime.now(timezone.utc) - timedelta(hours=2)))
+    db.commit()
+    claimed = claim_due_reports(db, limit=10)
+    assert sorted(claim.report_id for claim in claimed) == [1, 2]
+    db.expire_all()
+    assert db.query(ScheduledReport).filter(ScheduledReport.name == "Bad weekly").one().is_active is False
+    db.close()
+
+
+def test_processes_share_due_reports_without_duplicates(tmp_path, monkeypatch):
+    factory = report_db(tmp_path, 7)
+    runs, lock = [], threading.Lock()
+
+    def execute_reports(db, reports, send_email=True, advance_schedule=True):
+        assert advance_schedule is False
+        time.sleep(0.05)
+        with lock:
+            runs.extend(report.id for report in reports)
+        return [SimpleNamespace(status="success", email_sent=False) for _ in reports]
+
+    monkeypatch.setattr(scheduled_report_executor, "REPORTS_PER_WORKER", 1)
+    monkeypatch.setattr(ScheduledReportService, "execute_reports", staticmethod(execute_reports))
+    # Two API processes with two workers each
+    executors = [ScheduledReportExecutor(workers=2, session_factory=factory) for _ in range(2)]
+    for executor in executors:
+        assert executor.dispatch() == 2
+
+    deadline = time.monotonic() + 10
+    while len(runs) < 7 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.1)
+    assert sorted(runs) == list(range(1, 8))
+
+    metrics = [executor.metrics.snapshot() for executor in executors]
+    assert sum(m["claimed"] for m in metrics) == sum(m["succeeded"] for m in metrics) == 7
+    assert all(m["queue_lag_seconds"]["max"] >= 60 for m in metrics)
+    for executor in executors:
+        executor.shutdown()
+
+
+def test_reports_sharing_a_query_render_once_and_deliver_per_recipient(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    factory = report_db(tmp_path, 4, recipients=["a@x.io", "b@x.io", "a@x.io"])
+    queries, sent = [], []
+
+    def generate(db, report_type, filters):
+        queries.append(filters)
+        return {"data": [{"priority": "HIGH", "count": 3}]}
+
+    def send(self, msg):
+        if msg["To"] == "c@x.io" or (msg["To"] == "b@x.io" and len(sent) > 2):
+            raise OSError("mailbox unavailable")
+        sent.append(msg["To"])
+
+    monkeypatch.setattr(ScheduledReportService, "_generate_report_data", staticmethod(generate))
+    monkeypatch.setattr(SMTPConnection, "send", send)
+    db = factory()
+    db.get(ScheduledReport, 1).recipients = ["c@x.io"]
+    db.commit()
+    db.close()
+    executor = ScheduledReportExecutor(workers=1, session_factory=factory)
+    assert executor.dispatch() == 4
+
+    deadline = time.monotonic() + 10
+    while executor.metrics.snapshot()["succeeded"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    executor.shutdown()
+
+    # Two filter sets, so two queries and two files for four reports
+    assert len(queries) == 2
+    db = factory()
+    executions = db.query(ReportExecution).order_by(ReportExecution.scheduled_report_id).all()
+    assert len({e.file_path for e in executions}) == 2
+    # Each distinct recipient gets its own message
+    assert [d["recipient"] for d in executions[1].deliveries] == ["a@x.io", "b@x.io"]
+    # Every recipient of report 1 failed, so its run failed
+    assert executions[0].status == "failed" and executions[0].email_sent_at is None
+    assert sorted(e.status for e in executions[1:]) == ["partial", "partial", "success"]
+    assert all(e.email_sent is (e.status == "success") for e in executions)
+    db.close()
@@ -0,0 +1,93 @@
+"""check_and_update_breaches: set-based breach flagging, reported once per breach"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.notification import Notification, NotificationPreference, NotificationType
+from app.models.sla_pause import SLAPause
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.ticket_activity import TicketActivity
+from app.services import sla_service
+from app.services.sla_service import SLAService
+from app.services.ticket_counter_service import TicketCounterService
+
+NOW = datetime(2026, 10, 16, 12, 0)
+ASSIGNEE = 5
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(sla_service, "now_local", lambda: NOW)
+    engine = create_engine(f"sqlite:///{tmp_path / 'sla.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    # In-app only, so no email is attempted
+    session.add(NotificationPreference(user_id=ASSIGNEE, email_sla_warnings=False))
+    session.commit()
+    yield session
+    session.close()
+
+
+def ticket(number, response_due, resolution_due, status=TicketStatus.OPEN, **values):
+    return Ticket(ticket_number=f"INC-{number:06d}", title=f"t{number}", description="d", requester_id=1,
+                  status=status, priority=TicketPriority.HIGH, assignee_id=ASSIGNEE,
+                  created_at=NOW - timedelta(hours=8),
+                  response_due=NOW + timedelta(minutes=response_due),
+                  resolution_due=NOW + timedelta(minutes=resolution_due), **values)
+
+
+def breaches(db):
+    activities = sorted(
+        (a.ticket_id, a.new_value["sla"])
+        for a in db.query(TicketActivity).filter(TicketActivity.activity_type == "sla_breached")
+    )
+    notifications = sorted(
+        (n.entity_id, n.message.split()[1])
+        for n in db.query(Notification).filter(Notification.type == NotificationType.SLA_BREACHED)
+    )
+    return activities, notifications
+
+
+def test_breaches_are_flagged_and_reported_once(db, monkeypatch):
+    tickets = [
+        ticket(1, -10, 60),                                                   # no response in time
+        ticket(2, -60, -5, first_response_at=NOW - timedelta(minutes=90)),    # responded, not resolved
+        ticket(3, -60, 60, first_response_at=NOW - timedelta(minutes=30)),    # responded late
+        ticket(4, -60, -5, status=TicketStatus.RESOLVED),                     # no longer open
+        ticket(5, -60, 60, response_breached=True),                           # already flagged
+        ticket(6, 10, 60),                                                    # not due yet
+        ticket(7, -60, -5),                                                   # paused
+    ]
+    db.add_all(tickets)
+    db.flush()
+    db.add(SLAPause(ticket_id=tickets[6].id, paused_by_id=ASSIGNEE, reason="Waiting on vendor",
+                    paused_at=NOW - timedelta(hours=2), is_active=True))
+    db.commit()
+
+    assert SLAService.check_and_update_breaches(db) == 3
+    db.expire_all()
+    flags = [(t.response_breached, t.resolution_breached) for t in tickets]
+    assert flags == [(True, False), (False, True), (True, False), (False, False), (True, False), (False, False),
+                     (False, False)]
+    expected = [(1, "response"), (2, "resolution"), (3, "response")]
+    assert breaches(db) == (expected, expected)
+    # The bulk UPDATE applied its own deltas to ticket_counters
+    assert TicketCounterService.reconcile(db) == 0
+
+    # A second run finds nothing new
+    assert SLAService.check_and_update_breaches(db) == 0
+    assert breaches(db) == (expected, expected)
+
+    # Two hours on, the remaining open targets have all passed
+    monkeypatch.setattr(sla_service, "now_local", lambda: NOW + timedelta(hours=2))
+    assert SLAService.check_and_update_breaches(db) == 5
+    later = [(1, "resolution"), (3, "resolution"), (5, "resolution"), (6, "resolution"), (6, "response")]
+    assert breaches(db) == (sorted(expected + later),) * 2
+    assert TicketCounterService.reconcile(db) == 0
+    # The paused ticket's clock is stopped, however long it stays paused
+    db.expire_all()
+    assert (tickets[6].response_breached, tickets[6].resolution_breached) == (False, False)
@@ -0,0 +1,53 @@
+"""Compiled SLA policy lookup must pick the same policy as the linear scan"""
+import itertools
+from types import SimpleNamespace
+
+from app.services.business_calendar import BusinessCalendar
+from app.services.sla_config import CompiledPolicy, SLAConfig
+from app.services.sla_service import SLAService
+
+
+def policy(id, conditions=None, is_default=False):
+    return SimpleNamespace(
+        id=id, name=f"policy-{id}", response_time=60, resolution_time=240,
+        priority_times=None, business_hours_only=True,
+        conditions=conditions, is_default=is_default,
+    )
+
+
+POLICIES = [
+    policy(1, {"priority": ["CRITICAL"], "category_id": [3]}),
+    policy(2, {"priority": ["CRITICAL", "HIGH"]}),
+    policy(3, {"category_id": [3, 7]}),
+    policy(4, {"priority": []}),
+    policy(5, {"priority": ["LOW"], "category_id": [7]}, is_default=True),
+]
+
+
+def linear_scan(priority, category_id, policies):
+    ticket = SimpleNamespace(priority=priority, category_id=category_id)
+    for p in policies:
+        if SLAService.matches_conditions(ticket, p):
+            return p.id
+    return next((p.id for p in policies if p.is_default), None)
+
+
+def test_lookup_matches_linear_scan():
+    config = SLAConfig(1, BusinessCalendar(), [CompiledPolicy(p) for p in POLICIES])
+    for priority, category_id in itertools.product(
+        ["CRITICAL", "HIGH", "MEDIUM", "LOW"], [None, 1, 3, 7, 99]
+    ):
+        resolved = config.resolve(priority, category_id)
+        assert (resolved.id if resolved else None) == linear_scan(priority, category_id, POLICIES)
+
+
+def test_unconditional_policy_matches_everything():
+    policies = [policy(1, {"priority": ["HIGH"]}), policy(2)]
+    config = SLAConfig(1, BusinessCalendar(), [CompiledPolicy(p) for p in policies])
+    assert config.resolve("HIGH", None).id == 1
+    assert config.resolve("LOW", 42).id == 2
+
+
+def test_no_match_and_no_default():
+    config = SLAConfig(1, BusinessCalendar(), [CompiledPolicy(policy(1, {"priority": ["HIGH"]}))])
+    assert config.resolve("LOW", None) is None
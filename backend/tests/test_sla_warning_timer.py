@@ -0,0 +1,173 @@
+"""WarningTimer ordering, rescheduling and firing; claiming warnings and the session hooks"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.notification import Notification, NotificationPreference, NotificationType
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.user import User
+from app.services import sla_service, sla_warning_service
+from app.services.sla_service import LOCAL_TZ, SLAService
+from app.services.sla_warning_service import SLAWarningService, WarningTimer, _timestamp
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=LOCAL_TZ)
+AGENT = 5
+
+
+def test_pop_due_in_order_and_skips_stale_entries():
+    timer = WarningTimer(fire=lambda ticket_id, kind: None)
+    timer.schedule(1, "response", 30.0)
+    timer.schedule(2, "resolution", 10.0)
+    timer.schedule(3, "response", 20.0)
+    timer.schedule(1, "response", 50.0)  # moved later
+    timer.cancel(3, "response")
+
+    assert timer.pop_due(40.0) == [(2, "resolution")]
+    assert len(timer) == 1
+    assert timer.pop_due(60.0) == [(1, "response")]
+    assert len(timer) == 0
+
+
+def test_thread_fires_at_deadline():
+    fired = []
+    done = threading.Event()
+
+    def fire(ticket_id, kind):
+        fired.append((ticket_id, kind, time.time()))
+        done.set()
+
+    timer = WarningTimer(fire)
+    timer.start()
+    try:
+        deadline = time.time() + 0.2
+        timer.schedule(7, "response", time.time() + 60)
+        timer.schedule(8, "resolution", deadline)  # earlier entry wakes the thread
+        assert done.wait(2)
+        assert fired[0][:2] == (8, "resolution")
+        assert fired[0][2] >= deadline
+    finally:
+        timer.stop()
+
+
+class IdleTimer(WarningTimer):
+    """Takes schedule changes like a running timer, but never fires"""
+    running = True
+
+
+@pytest.fixture
+def timer(monkeypatch):
+    timer = IdleTimer(fire=lambda ticket_id, kind: None)
+    monkeypatch.setattr(sla_warning_service, "_timer", timer)
+    return timer
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch, timer):
+    monkeypatch.setattr(sla_service, "now_local", lambda: NOW)
+    engine = create_engine(f"sqlite:///{tmp_path / 'warnings.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(User(id=AGENT, email="agent@example.com", username="agent", full_name="Agent",
+                hashed_password="x", role_id=1))
+    # In-app only, so no email is attempted
+    db.add(NotificationPreference(user_id=AGENT, email_sla_warnings=False))
+    db.commit()
+    db.close()
+    return factory
+
+
+def add_ticket(db, number, warn_in, status=TicketStatus.OPEN, **values):
+    """A ticket whose response and resolution warnings are due warn_in minutes from NOW"""
+    ticket = Ticket(ticket_number=f"INC-{number:06d}", title=f"t{number}", description="d", requester_id=1,
+                    assignee_id=AGENT, status=status, priority=TicketPriority.HIGH,
+                    response_due=NOW + timedelta(minutes=warn_in + 30),
+                    resolution_due=NOW + timedelta(minutes=warn_in + 60),
+                    response_warning_at=NOW + timedelta(minutes=warn_in),
+                    resolution_warning_at=NOW + timedelta(minutes=warn_in), **values)
+    db.add(ticket)
+    db.commit()
+    return ticket
+
+
+def warnings(db):
+    return sorted(
+        (n.entity_id, n.message.split()[1])
+        for n in db.query(Notification).filter(Notification.type == NotificationType.SLA_BREACH_WARNING)
+    )
+
+
+def test_warning_is_claimed_once(session_factory):
+    db, other = session_factory(), session_factory()
+    ticket = add_ticket(db, 1, -5)
+
+    assert SLAWarningService._fire(db, ticket.id, "response")
+    # Another worker, or a stale heap entry, finds it already claimed
+    assert not SLAWarningService._fire(other, ticket.id, "response")
+    assert not SLAWarningService._fire(db, ticket.id, "response")
+    assert SLAWarningService._fire(other, ticket.id, "resolution")
+
+    db.expire_all()
+    assert ticket.response_warning_at is None and ticket.resolution_warning_at is None
+    assert warnings(db) == [(ticket.id, "resolution"), (ticket.id, "response")]
+    db.close()
+    other.close()
+
+
+def test_paused_resolved_and_responded_tickets_are_not_warned(session_factory, monkeypatch):
+    db = session_factory()
+    paused = add_ticket(db, 1, -5)
+    resolved = add_ticket(db, 2, -5, status=TicketStatus.RESOLVED)
+    responded = add_ticket(db, 3, -5, first_response_at=NOW - timedelta(minutes=20))
+    SLAService.pause_sla(paused.id, "Waiting on vendor", db.get(User, AGENT), db)
+
+    for ticket_id in (paused.id, resolved.id):
+        for kind in ("response", "resolution"):
+            assert not SLAWarningService._fire(db, ticket_id, kind)
+    assert not SLAWarningService._fire(db, responded.id, "response")
+    assert SLAWarningService._fire(db, responded.id, "resolution")
+    assert warnings(db) == [(responded.id, "resolution")]
+
+    # A paused ticket keeps its warning: resuming pushes it back and it fires then
+    db.expire_all()
+    assert paused.response_warning_at is not None
+    monkeypatch.setattr(sla_service, "now_local", lambda: NOW + timedelta(minutes=90))
+    SLAService.resume_sla(paused.id, db.get(User, AGENT), db)
+    db.expire_all()
+    assert _timestamp(paused.response_warning_at) == _timestamp(NOW + timedelta(minutes=85))
+    assert SLAWarningService._fire(db, paused.id, "response")
+    db.close()
+
+
+def test_warning_time_changes_reschedule_through_the_session_hooks(session_factory, timer):
+    db = session_factory()
+    ticket = add_ticket(db, 1, 30)
+    assert timer._pending == {
+        (ticket.id, "response"): _timestamp(NOW + timedelta(minutes=30)),
+        (ticket.id, "resolution"): _timestamp(NOW + timedelta(minutes=30)),
+    }
+
+    # A due time moved later (e.g. by a priority change or a resume)
+    ticket.resolution_warning_at = NOW + timedelta(hours=3)
+    db.commit()
+    assert timer._pending[(ticket.id, "resolution")] == _timestamp(NOW + timedelta(hours=3))
+
+    # Rolled-back changes are not scheduled
+    ticket.response_warning_at = NOW + timedelta(hours=5)
+    db.flush()
+    db.rollback()
+    assert timer._pending[(ticket.id, "response")] == _timestamp(NOW + timedelta(minutes=30))
+
+    # Clearing a warning cancels it, and only the live entry ever fires
+    ticket.response_warning_at = None
+    db.commit()
+    assert (ticket.id, "response") not in timer._pending
+    far_future = _timestamp(NOW + timedelta(days=1))
+    assert timer.pop_due(far_future) == [(ticket.id, "resolution")]
+    db.close()
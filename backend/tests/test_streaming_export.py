@@ -0,0 +1,83 @@
+"""Streaming exports: CSV chunked per cursor batch, write-only XLSX"""
+import csv
+import io
+from datetime import datetime, timedelta
+
+from openpyxl import load_workbook
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.services import export_service
+from app.services.export_service import ExportService
+from app.services.streaming_export_service import StreamingExportService
+
+
+BASE = datetime(2026, 5, 1)
+
+
+def ticket_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for n in range(25):
+        db.add(Ticket(
+            ticket_number=f"INC-{n:06d}", title=f'Ticket "{n}", with comma', description="Generated",
+            requester_id=1, created_at=BASE + timedelta(hours=n),
+            status=TicketStatus.OPEN, priority=TicketPriority.HIGH,
+        ))
+    db.commit()
+    return db
+
+
+def test_ticket_export_streams_in_batches():
+    db = ticket_db()
+    base = BASE
+    chunks = list(StreamingExportService.iter_csv(
+        db, "tickets", start_date=base + timedelta(hours=5), batch_size=8
+    ))
+    # Header alone, then 20 rows in batches of 8, 8 and 4
+    assert len(chunks) == 4
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8-sig"))))
+    assert rows[0][:3] == ["ID", "Ticket Number", "Type"]
+    assert len(rows) == 21
+    assert rows[1][1:6] == ["INC-000005", "INCIDENT", 'Ticket "5", with comma', "OPEN", "HIGH"]
+    db.close()
+
+
+def test_ticket_export_to_write_only_xlsx(tmp_path):
+    db = ticket_db()
+    path = tmp_path / "tickets.xlsx"
+    count = StreamingExportService.write_xlsx(db, "tickets", str(path), start_date=BASE, batch_size=8)
+    assert count == 25
+
+    ws = load_workbook(path).active
+    assert ws.freeze_panes == "A2" and ws.auto_filter.ref == "A1:R26"
+    assert ws["A1"].style == export_service.EXCEL_HEADER_STYLE
+    row = [cell.value for cell in ws[2]]
+    assert row[1:6] == ["INC-000000", "INCIDENT", 'Ticket "0", with comma', "OPEN", "HIGH"]
+    assert row[10] == BASE
+    db.close()
+
+
+def test_large_reports_switch_to_write_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_service, "RICH_EXCEL_MAX_ROWS", 10)
+    service = ExportService()
+    service.export_dir = str(tmp_path)
+    techs = [
+        {"user_name": f"Tech {n}", "email": f"t{n}@x.io", "total_tickets": n, "resolved_tickets": n,
+         "open_tickets": 0, "resolution_rate": 100.0, "avg_resolution_time_hours": 2.5, "sla_compliance": 95.0}
+        for n in range(12)
+    ]
+
+    wb = load_workbook(service.export_to_excel(techs, "technician_performance"))
+    ws = wb["Team Performance"]
+    # Write-only layout: a plain table without the title block or chart
+    assert ws.max_row == 13 and ws["A2"].value == "Tech 0" and ws["G2"].value == 2.5
+    assert ws._charts == []
+
+    small = load_workbook(service.export_to_excel(techs[:5], "technician_performance"))
+    assert small["Team Performance"]["A1"].value == "Team Performance Report"
@@ -0,0 +1,71 @@
+"""ticket_counters kept by the flush hook, and the reconcile job that repairs drift"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.ticket_counter import TicketCounter
+from app.services.ticket_counter_service import TicketCounterService
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'counters.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def counters(db):
+    db.expire_all()
+    return {
+        (c.status, c.priority, c.assignee_id, c.requester_id): (c.ticket_count, c.breached_count)
+        for c in db.query(TicketCounter)
+        if c.ticket_count or c.breached_count
+    }
+
+
+def ticket(n, **values):
+    values.setdefault("priority", TicketPriority.MEDIUM)
+    return Ticket(ticket_number=f"INC-{n:06d}", title="t", description="d", requester_id=1,
+                  status=TicketStatus.NEW, **values)
+
+
+def test_flush_hook_applies_deltas(db):
+    tickets = [ticket(n) for n in range(3)] + [ticket(3, priority=TicketPriority.HIGH, assignee_id=5)]
+    db.add_all(tickets)
+    db.commit()
+    assert counters(db) == {("NEW", "MEDIUM", 0, 1): (3, 0), ("NEW", "HIGH", 5, 1): (1, 0)}
+
+    tickets[0].status = TicketStatus.IN_PROGRESS
+    tickets[0].assignee_id = 5
+    tickets[1].resolution_breached = True
+    db.delete(tickets[2])
+    # A change to an untracked column moves nothing
+    tickets[3].title = "renamed"
+    db.commit()
+    assert counters(db) == {
+        ("IN_PROGRESS", "MEDIUM", 5, 1): (1, 0),
+        ("NEW", "MEDIUM", 0, 1): (1, 1),
+        ("NEW", "HIGH", 5, 1): (1, 0),
+    }
+    # Nothing for reconcile to repair
+    assert TicketCounterService.reconcile(db) == 0
+
+
+def test_reconcile_repairs_drift_with_deltas(db):
+    db.add_all([ticket(n) for n in range(4)])
+    db.commit()
+    # Drift: a wrong count, a breach nobody counted, and a row with no tickets
+    db.query(TicketCounter).update({"ticket_count": 9, "breached_count": 2})
+    db.add(TicketCounter(status="CLOSED", priority="LOW", assignee_id=0, assigned_group_id=0,
+                         requester_id=1, ticket_count=3, breached_count=0))
+    db.commit()
+
+    assert TicketCounterService.reconcile(db) == 2
+    assert counters(db) == {("NEW", "MEDIUM", 0, 1): (4, 0)}
+    assert db.query(TicketCounter).count() == 1
+    assert TicketCounterService.reconcile(db) == 0
@@ -0,0 +1,76 @@
+"""Keyset (cursor) pagination of the ticket list"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base, estimate_row_count
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.services import ticket_service
+from app.services.ticket_service import TicketService
+from app.utils.helpers import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tickets.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2026, 10, 1, 9)
+    for n in range(25):
+        # Pairs of tickets share a created_at, so pages that split a pair must break the tie on id
+        session.add(Ticket(ticket_number=f"INC-{n:06d}", title="t", description="d", requester_id=1,
+                           status=TicketStatus.NEW, priority=TicketPriority.MEDIUM,
+                           created_at=start + timedelta(minutes=n // 2)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 16, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_pages_cover_every_ticket_once_in_order(db):
+    expected = [t.id for t in db.query(Ticket).order_by(Ticket.created_at.desc(), Ticket.id.desc())]
+    seen, cursor, pages = [], None, 0
+    while True:
+        tickets, cursor, _, _ = TicketService.get_tickets_by_cursor(db, cursor=cursor, limit=3)
+        seen.extend(t.id for t in tickets)
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == expected and pages == 9
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_invalid_cursor_is_a_bad_request(db, cursor):
+    with pytest.raises(HTTPException) as error:
+        TicketService.get_tickets_by_cursor(db, cursor=cursor)
+    assert error.value.status_code == 400
+
+
+def test_total_says_whether_it_is_an_estimate(db, monkeypatch):
+    ticket_service._ticket_total_cache.invalidate()
+    # SQLite has no planner estimates, so the total is an exact COUNT
+    _, _, total, total_is_estimate = TicketService.get_tickets_by_cursor(db, limit=3, include_total=True)
+    assert (total, total_is_estimate) == (25, False)
+    assert TicketService.get_tickets_by_cursor(db, limit=3)[2:] == (None, False)
+
+    # PostgreSQL reads the planner's estimate from EXPLAIN
+    pg = Session(bind=create_engine("postgresql://u:p@localhost/db"))
+    monkeypatch.setattr(pg, "execute", lambda statement: SimpleNamespace(
+        scalar=lambda: '[{"Plan": {"Plan Rows": 30}}]'
+    ))
+    assert estimate_row_count(pg, pg.query(Ticket)) == (30, True)
+
+    ticket_service._ticket_total_cache.invalidate()
+    monkeypatch.setattr(ticket_service, "estimate_row_count", lambda db, query: (30, True))
+    _, _, total, total_is_estimate = TicketService.get_tickets_by_cursor(db, limit=3, include_total=True)
+    assert (total, total_is_estimate) == (30, True)
+    ticket_service._ticket_total_cache.invalidate()
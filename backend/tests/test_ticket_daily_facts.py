@@ -0,0 +1,185 @@
+"""ticket_daily_facts kept by the flush hook must match a rebuild from tickets"""
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.ticket_daily_fact import TicketDailyFact
+from app.services.quantile_sketch import QuantileSketch, SKETCH_RELATIVE_ACCURACY
+from app.services.reporting_service import ReportingService
+from app.services.ticket_fact_service import TicketFactService, KEY_ATTRS, SUM_COLUMNS
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def snapshot(db):
+    return {
+        tuple(getattr(f, attr) for attr in KEY_ATTRS): [getattr(f, c) for c in SUM_COLUMNS]
+        for f in db.query(TicketDailyFact)
+        if f.ticket_count or f.resolved_on_day_count
+    }
+
+
+def sketches(db):
+    return {
+        tuple(getattr(f, attr) for attr in KEY_ATTRS): (
+            QuantileSketch.from_json(f.response_sketch).bins,
+            QuantileSketch.from_json(f.resolution_sketch).bins,
+        )
+        for f in db.query(TicketDailyFact)
+        if f.ticket_count or f.resolved_on_day_count
+    }
+
+
+def test_incremental_facts_match_rebuild(db):
+    rng = random.Random(7)
+    base = datetime(2026, 3, 1)
+    tickets = []
+    for n in range(200):
+        created = base + timedelta(minutes=rng.randint(0, 20 * 1440))
+        ticket = Ticket(
+            ticket_number=f"INC-{n:06d}", title="Generated", description="Generated",
+            requester_id=1, created_at=created, priority=rng.choice(list(TicketPriority)),
+            resolution_due=created + timedelta(hours=rng.randint(4, 72)),
+        )
+        if rng.random() < 0.7:
+            ticket.first_response_at = created + timedelta(minutes=rng.randint(1, 600))
+        tickets.append(ticket)
+    db.add_all(tickets)
+    db.commit()
+
+    # Lifecycle changes: resolve, reassign, reprioritise, close, reopen, delete
+    for ticket in rng.sample(tickets, 120):
+        ticket.status = TicketStatus.RESOLVED
+        ticket.resolved_at = ticket.created_at + timedelta(minutes=rng.randint(30, 5000))
+    db.commit()
+    for ticket in rng.sample(tickets, 60):
+        ticket.priority = rng.choice(list(TicketPriority))
+        ticket.assignee_id = rng.choice([None, 1, 2])
+        ticket.response_breached = rng.random() < 0.3
+    for ticket in [t for t in tickets if t.status == TicketStatus.RESOLVED][:30]:
+        ticket.status = TicketStatus.CLOSED
+    reopened = [t for t in tickets if t.status == TicketStatus.RESOLVED][-10:]
+    for ticket in reopened:
+        ticket.status = TicketStatus.OPEN
+        ticket.resolved_at = None
+    db.delete(tickets[0])
+    db.commit()
+
+    incremental, incremental_sketches = snapshot(db), sketches(db)
+    TicketFactService.rebuild(db)
+    # Everything is repaired in one pass
+    assert TicketFactService.rebuild(db) == 0
+    rebuilt = snapshot(db)
+    assert sketches(db) == incremental_sketches
+    assert rebuilt.keys() == incremental.keys()
+    for key, values in rebuilt.items():
+        # sqlite's julianday() differences carry float noise in the sums
+        assert incremental[key] == pytest.approx(values, rel=1e-6), key
+
+
+def test_rebuild_repairs_drift_with_deltas(db):
+    created = datetime(2026, 3, 2, 9, 0)
+    for n in range(6):
+        db.add(Ticket(
+            ticket_number=f"INC-{n:06d}", title="Generated", description="Generated", requester_id=1,
+            created_at=created + timedelta(days=n % 3), priority=TicketPriority.HIGH,
+            first_response_at=created + timedelta(days=n % 3, minutes=10 * (n + 1)),
+        ))
+    db.commit()
+    expected, expected_sketches = snapshot(db), sketches(db)
+
+    # Drift on every day: a wrong count, a lost sketch, and a row nothing maps to
+    facts = db.query(TicketDailyFact).order_by(TicketDailyFact.day).all()
+    facts[0].ticket_count += 5
+    facts[1].response_sketch = None
+    facts[2].response_minutes_min = 0.5
+    db.add(TicketDailyFact(day=date(2026, 3, 4), category_id=0, priority="LOW", assigned_group_id=0,
+                           assignee_id=0, status="NEW", ticket_type="INCIDENT", ticket_count=2,
+                           **{c: 0 for c in SUM_COLUMNS if c != "ticket_count"}))
+    db.commit()
+
+    # Only days from `since` on are recomputed
+    assert TicketFactService.rebuild(db, since=date(2026, 3, 3)) == 3
+    assert db.query(TicketDailyFact).filter(TicketDailyFact.day == date(2026, 3, 2)).one().ticket_count == 7
+    assert TicketFactService.rebuild(db) == 1
+    assert TicketFactService.rebuild(db) == 0
+    assert sketches(db) == expected_sketches
+    repaired = snapshot(db)
+    assert repaired.keys() == expected.keys()
+    for key, values in repaired.items():
+        assert expected[key] == pytest.approx(values, rel=1e-6), key
+    assert facts[2].response_minutes_min == pytest.approx(30.0)
+
+
+def test_trend_reports_read_the_facts(db):
+    created = datetime(2026, 3, 2, 9, 0)
+    for n, (response, resolution) in enumerate([(30, 120), (90, 600), (None, None)]):
+        db.add(Ticket(
+            ticket_number=f"INC-{n:06d}", title="Generated", description="Generated",
+            requester_id=1, created_at=created, priority=TicketPriority.HIGH,
+            status=TicketStatus.RESOLVED if resolution else TicketStatus.OPEN,
+            first_response_at=created + timedelta(minutes=response) if response else None,
+            resolved_at=created + timedelta(minutes=resolution) if resolution else None,
+        ))
+    db.commit()
+
+    reporting = ReportingService(db)
+    day = datetime(2026, 3, 2)
+    assert reporting.get_response_time_trends(day, day) == [{
+        "period": "2026-03-02",
+        "avg_response_time_hours": 1.0,
+        "min_response_time_hours": 0.5,
+        "max_response_time_hours": 1.5,
+        "ticket_count": 2,
+    }]
+    [analysis] = reporting.get_resolution_time_analysis(day, day, "priority")
+    assert analysis["group"] == "HIGH"
+    assert analysis["ticket_count"] == 2
+    assert analysis["avg_resolution_time_hours"] == 6.0
+    assert (analysis["min_resolution_time_hours"], analysis["max_resolution_time_hours"]) == (2.0, 10.0)
+
+    volume = reporting.get_ticket_volume_trends(day, day)
+    assert volume["total_created"] == 3
+    assert volume["total_resolved"] == 2
+    assert volume["trend_data"][0]["by_status"] == {"RESOLVED": 2, "OPEN": 1}
+
+
+def test_percentiles_from_merged_sketches(db):
+    rng = random.Random(11)
+    base = datetime(2026, 4, 1)
+    minutes = {priority: [] for priority in TicketPriority}
+    for n in range(3000):
+        created = base + timedelta(minutes=rng.randint(0, 30 * 1440))
+        priority = rng.choice(list(TicketPriority))
+        resolution = rng.randint(5, 20000)
+        if created.day <= 20:
+            minutes[priority].append(resolution)
+        db.add(Ticket(
+            ticket_number=f"INC-{n:06d}", title="Generated", description="Generated",
+            requester_id=1, created_at=created, priority=priority, status=TicketStatus.CLOSED,
+            resolved_at=created + timedelta(minutes=resolution),
+        ))
+    db.commit()
+
+    results = ReportingService(db).get_time_percentiles(datetime(2026, 4, 1), datetime(2026, 4, 20))
+    assert {r["group"] for r in results} == {p.value for p in TicketPriority}
+    for result in results:
+        ordered = sorted(minutes[TicketPriority(result["group"])])
+        assert result["ticket_count"] == len(ordered)
+        for p in (50, 90, 99):
+            expected = ordered[int(p / 100 * len(ordered))] / 60
+            # Sketch bound plus the report's rounding to 0.01h
+            assert abs(result[f"p{p}_hours"] - expected) <= SKETCH_RELATIVE_ACCURACY * expected + 0.005
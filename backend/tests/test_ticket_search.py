@@ -0,0 +1,65 @@
+"""Ticket search: full-text on PostgreSQL, ILIKE elsewhere, substring ticket numbers on both"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper)
+from app.core.database import Base
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.services.ticket_search_service import TicketSearchService
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for number, title, description in (
+        ("INC-000123", "Printer offline", "Floor 3 printer"),
+        ("INC-001230", "VPN drops", "Disconnects every hour"),
+        ("REQ-000456", "New laptop", "Replace the broken printer tray"),
+        ("INC-000789", "Email quota", "Mailbox 100% full"),
+    ):
+        session.add(Ticket(ticket_number=number, title=title, description=description, requester_id=1,
+                           status=TicketStatus.NEW, priority=TicketPriority.MEDIUM))
+    session.commit()
+    yield session
+    session.close()
+
+
+def search(db, term):
+    query, rank = TicketSearchService.apply(db, db.query(Ticket), term)
+    return [t.ticket_number for t in query.order_by(rank.desc(), Ticket.ticket_number)]
+
+
+def test_fallback_matches_numbers_anywhere_and_text_case_insensitively(db):
+    assert search(db, "000123") == ["INC-000123"]
+    assert search(db, "inc-0001") == ["INC-000123"]
+    # A number that starts with the term ranks above one that only contains it
+    assert search(db, "123") == ["INC-000123", "INC-001230"]
+    assert search(db, "INC-00") == ["INC-000123", "INC-000789", "INC-001230"]
+    # Title matches rank above description matches
+    assert search(db, "PRINTER") == ["INC-000123", "REQ-000456"]
+    # LIKE wildcards in the term are literal
+    assert search(db, "100%") == ["INC-000789"]
+    assert search(db, "INC_") == []
+    assert search(db, "%") == ["INC-000789"]
+    assert search(db, "_") == []
+    assert search(db, "\\") == []
+
+
+def test_postgresql_uses_full_text_and_substring_numbers():
+    db = Session(bind=create_engine("postgresql://u:p@localhost/db"))
+    query, rank = TicketSearchService.apply(db, db.query(Ticket), "printer 000123")
+    sql = str(query.order_by(rank.desc()).statement.compile(dialect=postgresql.dialect()))
+    assert "tickets.search_vector @@ to_tsquery" in sql and "ts_rank_cd" in sql
+    assert sql.count("tickets.ticket_number LIKE") == 3  # filter, then prefix and substring ranks
+    params = query.statement.compile(dialect=postgresql.dialect()).params
+    assert "printer:* & 000123:*" in params.values()
+    assert "%PRINTER 000123%" in params.values()
+
+    # Terms without words (e.g. punctuation) search ticket numbers only
+    query, _ = TicketSearchService.apply(db, db.query(Ticket), "-")
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    assert "search_vector" not in sql and "ticket_number LIKE" in sql
@@ -301,8 +301,14 @@ export default function ScheduledReportsPage() {
 
   const executeMutation = useMutation({
     mutationFn: (id: number) => scheduledReportService.executeReport(id, { send_email: true }),
-    onSuccess: () => {
-      toast.success('Report executed and sent via email');
+    onSuccess: (execution) => {
+      if (execution.status === 'failed') {
+        toast.error(execution.error_message || execution.email_error || 'Failed to generate report');
+      } else if (execution.status === 'partial') {
+        toast(`Report generated, but not every email was sent: ${execution.email_error}`, { icon: '⚠️' });
+      } else {
+        toast.success('Report executed and sent via email');
+      }
       queryClient.invalidateQueries({ queryKey: ['scheduled-reports'] });
     },
     onError: (error: any) => {
@@ -191,12 +191,18 @@ export interface ExportReportRequest {
   filters?: Record<string, any>;
 }
 
-export interface ExportResponse {
-  success: boolean;
-  file_path?: string;
+export interface ExportJob {
+  job_id: number;
+  status: 'PENDING' | 'IN_PROGRESS' | 'COMPLETED' | 'FAILED';
+  progress: number;
+  report_type: string;
+  format: string;
   file_name?: string;
   download_url?: string;
-  message?: string;
+  error_message?: string;
+  created_at?: string;
+  started_at?: string;
+  completed_at?: string;
 }
 
 export interface CurrentKPIs {
@@ -284,13 +290,28 @@ class ReportingService {
     return response.data;
   }
 
-  // Export Report
-  async exportReport(request: ExportReportRequest): Promise<ExportResponse> {
+  // Export Report: queued as a background job, polled until it finishes
+  async exportReport(
+    request: ExportReportRequest,
+    onProgress?: (job: ExportJob) => void
+  ): Promise<ExportJob> {
     const response = await axiosInstance.post('/reports/export', request);
-    const data = response.data as ExportResponse;
+    let data = response.data as ExportJob;
+
+    // Poll quickly at first: cached reports complete almost at once
+    for (let polls = 0; data.status === 'PENDING' || data.status === 'IN_PROGRESS'; polls++) {
+      onProgress?.(data);
+      await new Promise((resolve) => setTimeout(resolve, polls < 4 ? 250 : 1000));
+      data = await this.getExportJob(data.job_id);
+    }
+    onProgress?.(data);
+
+    if (data.status === 'FAILED') {
+      throw new Error(data.error_message || 'Export failed');
+    }
 
     // Automatically trigger download if download_url is available
-    if (data.success && data.download_url) {
+    if (data.download_url) {
       // Use axios to fetch the file with auth headers
       const downloadResponse = await axiosInstance.get(data.download_url, {
         responseType: 'blob',
@@ -316,6 +337,11 @@ class ReportingService {
     return data;
   }
 
+  async getExportJob(jobId: number): Promise<ExportJob> {
+    const response = await axiosInstance.get(`/reports/export/jobs/${jobId}`);
+    return response.data;
+  }
+
   // Get Current KPIs
   async getCurrentKPIs(): Promise<CurrentKPIs> {
     const response = await axiosInstance.get('/reports/kpis/current');
@@ -9,6 +9,8 @@ export interface ScheduledReport {
   export_format: string;
   schedule_time?: string;
   schedule_day?: number;
+  cron_expression?: string;
+  timezone?: string;
   recipients: string[];
   filters?: Record<string, any>;
   is_active: boolean;
@@ -20,11 +22,14 @@ export interface ScheduledReport {
   updated_at?: string;
 }
 
+// partial: the report was generated but some recipients could not be emailed
+export type ReportExecutionStatus = 'success' | 'failed' | 'partial';
+
 export interface ReportExecution {
   id: number;
   scheduled_report_id: number;
   executed_at: string;
-  status: string;
+  status: ReportExecutionStatus;
   error_message?: string;
   file_path?: string;
   file_size?: number;
@@ -42,6 +47,8 @@ export interface CreateScheduledReportRequest {
   export_format: string;
   schedule_time: string;
   schedule_day?: number;
+  cron_expression?: string;
+  timezone?: string;
   recipients: string[];
   filters?: Record<string, any>;
   is_active?: boolean;
@@ -55,6 +62,8 @@ export interface UpdateScheduledReportRequest {
   export_format?: string;
   schedule_time?: string;
   schedule_day?: number;
+  cron_expression?: string;
+  timezone?: string;
   recipients?: string[];
   filters?: Record<string, any>;
   is_active?: boolean;